@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from backend.domain.entities.audit_log import AuditLog
 
 class IAuditLogRepository(ABC):
     @abstractmethod
-    async def get_all(self) -> List[AuditLog]:
+    async def get_all(self, since: datetime, until: Optional[datetime] = None, limit: int = 500) -> List[AuditLog]:
         pass
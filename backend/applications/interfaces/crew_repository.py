@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from backend.domain.entities.crew import Crew
 from datetime import datetime
 
@@ -8,6 +8,12 @@ class ICrewRepository(ABC):
     async def get_by_id(self, crew_id: int) -> Optional[Crew]:
         pass
     @abstractmethod
+    async def get_by_ids(self, crew_ids: Sequence[int]) -> Dict[int, Crew]:
+        pass
+    @abstractmethod
+    async def get_all(self) -> List[Crew]:
+        pass
+    @abstractmethod
     async def get_available_crew(self, start_time: datetime, end_time: datetime) -> List[Crew]:
         pass
     @abstractmethod
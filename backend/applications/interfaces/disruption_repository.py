@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from backend.domain.entities.disruption import Disruption
 
 class IDisruptionRepository(ABC):
@@ -7,6 +7,10 @@ class IDisruptionRepository(ABC):
     async def get_disruptions(self) -> List[Disruption]:
         pass
 
+    @abstractmethod
+    async def get_by_id(self, disruption_id: int) -> Optional[Disruption]:
+        pass
+
     @abstractmethod
     async def get_total_count(self) -> int:
         pass
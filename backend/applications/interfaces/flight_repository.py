@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from backend.domain.entities.flight import Flight
 from datetime import datetime
 
@@ -8,6 +8,12 @@ class IFlightRepository(ABC):
     async def get_by_id(self, flight_id: int) -> Optional[Flight]:
         pass
     @abstractmethod
+    async def get_by_ids(self, flight_ids: Sequence[int]) -> Dict[int, Flight]:
+        pass
+    @abstractmethod
+    async def get_by_flight_numbers(self, flight_numbers: Sequence[str]) -> List[Flight]:
+        pass
+    @abstractmethod
     async def get_flights_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Flight]:
         pass
     @abstractmethod
@@ -1,13 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from backend.domain.entities.roster import Roster
-from datetime import datetime
+from backend.domain.services.duty_hours import DutyHoursLedger
+from datetime import date, datetime
 
 class IRosterRepository(ABC):
     @abstractmethod
     async def get_by_crew_and_date(self, crew_id: int, start_date: datetime, end_date: datetime) -> List[Roster]:
         pass
     @abstractmethod
+    async def get_by_crew_ids_and_date(self, crew_ids: Sequence[int], start_date: datetime, end_date: datetime) -> Dict[int, List[Roster]]:
+        pass
+    @abstractmethod
+    async def get_by_flight_ids(self, flight_ids: Sequence[int]) -> Dict[int, List[Roster]]:
+        pass
+    @abstractmethod
+    async def get_on_duty(self, start: datetime, end: datetime, crew_id: Optional[int] = None) -> List[Roster]:
+        pass
+    @abstractmethod
+    async def get_month_hours(self, crew_ids: Sequence[int], months: Sequence[date]) -> DutyHoursLedger:
+        pass
+    @abstractmethod
     async def save(self, roster: Roster) -> Roster:
         pass
     @abstractmethod
@@ -0,0 +1,73 @@
+from backend.applications.interfaces.flight_repository import IFlightRepository
+from backend.applications.interfaces.roster_repository import IRosterRepository
+from backend.domain.entities.disruption import Disruption
+from backend.domain.entities.flight import Flight
+from backend.domain.services.impact_service import SEVERITY_DELAY_MIN, ImpactGraph, ImpactResult
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# Longest scheduled block time; flights departing inside the horizon land before window end + this
+MAX_BLOCK_TIME = timedelta(hours=20)
+
+
+@dataclass
+class DisruptionImpact:
+    seeds: List[Flight] = field(default_factory=list)
+    flights: List[Flight] = field(default_factory=list)
+    result: ImpactResult = field(default_factory=ImpactResult)
+    delay_min: float = 0.0
+    graph_size: int = 0
+
+
+def _pick_seeds(candidates: List[Flight], timestamp: Optional[datetime]) -> List[Flight]:
+    # A flight number recurs daily: take the occurrence closest to the disruption
+    by_number: Dict[str, Flight] = {}
+    for f in candidates:
+        if f.scheduled_departure is None:
+            continue
+        current = by_number.get(f.flight_number)
+        if current is None or (
+            timestamp is not None
+            and abs(f.scheduled_departure - timestamp) < abs(current.scheduled_departure - timestamp)
+        ):
+            by_number[f.flight_number] = f
+    return list(by_number.values())
+
+
+class ComputeDisruptionImpactUseCase:
+    def __init__(self, flight_repo: IFlightRepository, roster_repo: IRosterRepository):
+        self.flight_repo = flight_repo
+        self.roster_repo = roster_repo
+
+    async def execute(
+        self,
+        disruption: Disruption,
+        delay_min: Optional[float] = None,
+        horizon: timedelta = timedelta(hours=24),
+        max_depth: int = 6,
+    ) -> DisruptionImpact:
+        delay_min = delay_min if delay_min is not None else SEVERITY_DELAY_MIN.get(disruption.severity, 60.0)
+        if not disruption.affected_flights:
+            return DisruptionImpact(delay_min=delay_min)
+        timestamp = datetime.fromisoformat(disruption.timestamp) if disruption.timestamp else None
+        if timestamp is not None and timestamp.tzinfo is not None:
+            # Schedules are stored as naive UTC
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        seeds = _pick_seeds(await self.flight_repo.get_by_flight_numbers(disruption.affected_flights), timestamp)
+        if not seeds:
+            return DisruptionImpact(delay_min=delay_min)
+
+        # Two queries for the window, then everything else happens in memory
+        start = min(f.scheduled_departure for f in seeds)
+        end = max(f.scheduled_departure for f in seeds) + horizon + MAX_BLOCK_TIME
+        window = await self.flight_repo.get_flights_by_date_range(start, end)
+        ids = {f.id for f in window}
+        window += [f for f in seeds if f.id not in ids]
+        rosters = await self.roster_repo.get_by_flight_ids([f.id for f in window])
+        graph = ImpactGraph(window, [r for group in rosters.values() for r in group])
+
+        result = graph.propagate([f.id for f in seeds], delay_min, max_depth=max_depth, horizon=horizon)
+        return DisruptionImpact(
+            seeds=seeds, flights=graph.apply(result), result=result, delay_min=delay_min, graph_size=len(graph)
+        )
@@ -2,16 +2,11 @@ from __future__ import annotations
 
 import json
 from typing import List, Dict, Literal
-from openai import OpenAI  # type: ignore
-from backend.infrastructure.ai.perplexity_client import chat_perplexity
+from backend.infrastructure.ai.provider_router import get_provider_router
 
 from backend.infrastructure.ai.rag_service import get_chroma_client, embed_texts
 
 
-def _get_openai_client() -> OpenAI:
-    return OpenAI()
-
-
 def _build_extraction_prompt(context: str) -> str:
     return (
         "You are a compliance analyst. From the provided regulations context, extract a concise list of actionable crew rostering rules.\n"
@@ -21,7 +16,7 @@ def _build_extraction_prompt(context: str) -> str:
     )
 
 
-def get_compliance_rules_from_vector_store(top_k: int = 8) -> List[Dict[str, object]]:
+async def get_compliance_rules_from_vector_store(top_k: int = 8) -> List[Dict[str, object]]:
     client = get_chroma_client()
     collection = client.get_or_create_collection(name="compliance_rules")
     if collection.count() == 0:
@@ -33,27 +28,15 @@ def get_compliance_rules_from_vector_store(top_k: int = 8) -> List[Dict[str, obj
     context = "\n\n".join(docs)
 
     prompt = _build_extraction_prompt(context)
-    # Try OpenAI first
+    messages = [{"role": "system", "content": "You output JSON only."}, {"role": "user", "content": prompt}]
+    # Prefer OpenAI; the router hedges/falls back to the other providers (Perplexity etc.)
     try:
-        oai = _get_openai_client()
-        chat = oai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": "You output JSON only."}, {"role": "user", "content": prompt}],
-            temperature=0.1,
-        )
-        content = chat.choices[0].message.content or "[]"
-        data = json.loads(content)
+        result = await get_provider_router().complete(messages, provider="openai", model="gpt-4o-mini")
+        data = json.loads(result.answer or "[]")
         if isinstance(data, list):
             return data
     except Exception:
-        # Fallback to Perplexity chat if available
-        try:
-            content = asyncio.run(chat_perplexity(prompt, model="pplx-7b-online"))  # type: ignore
-            data = json.loads(content)
-            if isinstance(data, list):
-                return data
-        except Exception:
-            pass
+        pass
     return []
 
 
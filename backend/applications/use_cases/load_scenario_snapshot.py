@@ -0,0 +1,29 @@
+from backend.applications.interfaces.crew_repository import ICrewRepository
+from backend.applications.interfaces.flight_repository import IFlightRepository
+from backend.applications.interfaces.roster_repository import IRosterRepository
+from backend.domain.services.duty_hours import month_of
+from backend.domain.services.scenario_service import Snapshot
+from datetime import datetime, timedelta
+
+
+class LoadScenarioSnapshotUseCase:
+    def __init__(self, flight_repo: IFlightRepository, crew_repo: ICrewRepository, roster_repo: IRosterRepository):
+        self.flight_repo = flight_repo
+        self.crew_repo = crew_repo
+        self.roster_repo = roster_repo
+
+    async def execute(self, start: datetime, end: datetime, taken_at: datetime) -> Snapshot:
+        """Flights, crew and active rosters for [start, end), plus monthly hours for the months it spans."""
+        crew = await self.crew_repo.get_all()
+        rosters = await self.roster_repo.get_on_duty(start, end)
+        flights = {f.id: f for f in await self.flight_repo.get_flights_by_date_range(start, end)}
+        # Duties overlapping the window edges belong to flights that straddle them
+        straddling = sorted({r.flight_id for r in rosters} - flights.keys())
+        if straddling:
+            flights.update(await self.flight_repo.get_by_ids(straddling))
+        months, month = [], month_of(start)
+        while month < end.date():
+            months.append(month)
+            month = month_of(month + timedelta(days=32))
+        ledger = await self.roster_repo.get_month_hours([c.id for c in crew], months)
+        return Snapshot(flights.values(), crew, rosters, ledger, (start, end), taken_at)
@@ -0,0 +1,52 @@
+import asyncio
+from backend.applications.interfaces.crew_repository import ICrewRepository
+from backend.applications.interfaces.flight_repository import IFlightRepository
+from backend.applications.interfaces.roster_repository import IRosterRepository
+from backend.domain.services.recovery_service import OpenPosition, RecoveryPlan, RecoveryService
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class RecoverOpenPositionsUseCase:
+    def __init__(
+        self,
+        flight_repo: IFlightRepository,
+        crew_repo: ICrewRepository,
+        roster_repo: IRosterRepository,
+        service: RecoveryService,
+    ):
+        self.flight_repo = flight_repo
+        self.crew_repo = crew_repo
+        self.roster_repo = roster_repo
+        self.service = service
+
+    async def execute(
+        self,
+        open_positions: Sequence[Tuple[int, str]],
+        exclude_crew: Iterable[int] = (),
+        alternatives: int = 3,
+    ) -> Tuple[RecoveryPlan, List[int]]:
+        """Plan for (flight id, crew position) pairs, and the flight ids that were not found."""
+        flights = await self.flight_repo.get_by_ids(sorted({fid for fid, _ in open_positions}))
+        missing = sorted({fid for fid, _ in open_positions if fid not in flights})
+        positions = [
+            OpenPosition(flights[fid], position)
+            for fid, position in open_positions
+            if fid in flights and flights[fid].scheduled_departure is not None
+        ]
+        if not positions:
+            return RecoveryPlan(), missing
+
+        start = min(p.duty_start for p in positions)
+        end = max(p.duty_end for p in positions)
+        excluded = set(exclude_crew)
+        crew = [c for c in await self.crew_repo.get_available_crew(start, end) if c.id not in excluded]
+        busy: Dict[int, List[Tuple[datetime, datetime]]] = {}
+        for r in await self.roster_repo.get_on_duty(start, end):
+            busy.setdefault(r.crew_id, []).append((r.duty_start, r.duty_end))
+        ledger = await self.roster_repo.get_month_hours([c.id for c in crew], sorted({p.month for p in positions}))
+        # The solve is CPU-bound; keep it off the event loop
+        plan = await asyncio.to_thread(
+            self.service.recover, positions, crew, busy, alternatives=alternatives, ledger=ledger
+        )
+        return plan, missing
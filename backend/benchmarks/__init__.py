@@ -0,0 +1 @@
+# Declares benchmarks as a package
@@ -0,0 +1,222 @@
+"""
+In-process API load benchmark.
+
+Drives the FastAPI app through httpx.ASGITransport, either against a recorded
+in-memory fake of Postgres (default) or the seeded database configured by the
+POSTGRES_* variables (--postgres), with fake AI providers. Reports throughput
+and p50/p95/p99 per endpoint and can compare against a previous JSON result.
+
+    python -m backend.benchmarks.api_benchmark --requests 300 --concurrency 16 --out bench.json
+    python -m backend.benchmarks.api_benchmark --baseline bench.json --fail-on-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from httpx import ASGITransport, AsyncClient
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("flights", "GET", "/api/flights/"),
+    Scenario("crew", "GET", "/api/crew/"),
+    Scenario("crew_by_id", "GET", "/api/crew/7"),
+    Scenario("rosters", "GET", "/api/rosters/"),
+    Scenario("disruptions", "GET", "/api/disruptions/"),
+    Scenario("analytics_metrics", "GET", "/api/analytics/metrics"),
+    Scenario("analytics_violations", "GET", "/api/analytics/violations"),
+    Scenario("analytics_auditlog", "GET", "/api/analytics/auditlog"),
+    Scenario("compliance_rules", "GET", "/api/compliance/rules"),
+    Scenario("chat", "POST", "/api/chat/", {"message": "Who is on standby at DEL tonight?", "history": []}),
+]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    concurrency: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    status_codes: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+async def run_scenario(client: AsyncClient, scenario: Scenario, requests: int, concurrency: int,
+                       warmup: int = 5) -> ScenarioResult:
+    for _ in range(warmup):
+        await client.request(scenario.method, scenario.path, json=scenario.body)
+
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path, json=scenario.body)
+                code = str(response.status_code)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                code = "exception"
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies),
+        concurrency=concurrency,
+        errors=errors,
+        throughput_rps=round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        p50_ms=round(percentile(ms, 0.50), 2),
+        p95_ms=round(percentile(ms, 0.95), 2),
+        p99_ms=round(percentile(ms, 0.99), 2),
+        mean_ms=round(sum(ms) / len(ms), 2) if ms else 0.0,
+        status_codes=status_codes,
+    )
+
+
+async def run_benchmark(
+    requests: int = 200,
+    concurrency: int = 8,
+    postgres: bool = False,
+    db_latency_ms: float = 0.0,
+    ai_latency_ms: float = 5.0,
+    crew: int = 300,
+    flights: int = 1200,
+    only: Optional[List[str]] = None,
+) -> Dict[str, object]:
+    # Keep the vector store and AI keys local to the run
+    os.environ.setdefault("CHROMA_DIR", tempfile.mkdtemp(prefix="bench-chroma-"))
+    from backend import app
+    from backend.benchmarks.fakes import FakeDataset, install_fake_database, install_fake_providers
+    from backend.infrastructure.ai.provider_router import set_provider_router
+    from backend.infrastructure.settings import settings
+
+    settings.chroma_dir = os.environ["CHROMA_DIR"]
+    if not postgres:
+        install_fake_database(app, FakeDataset(crew=crew, flights=flights), latency_s=db_latency_ms / 1000)
+    install_fake_providers(latency_s=ai_latency_ms / 1000, jitter_s=ai_latency_ms / 2000)
+
+    scenarios = [s for s in SCENARIOS if not only or s.name in only]
+    results: Dict[str, dict] = {}
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                result = await run_scenario(client, scenario, requests, concurrency)
+                results[scenario.name] = asdict(result)
+    finally:
+        app.dependency_overrides.clear()
+        set_provider_router(None)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "backend": "postgres" if postgres else "fake",
+            "requests": requests,
+            "concurrency": concurrency,
+            "db_latency_ms": db_latency_ms,
+            "ai_latency_ms": ai_latency_ms,
+            "dataset": {"crew": crew, "flights": flights},
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, result in current["results"].items():
+        base = base_results.get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}.{metric}: {base[metric]} -> {result[metric]}")
+        if base["throughput_rps"] > 0 and result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}.throughput_rps: {base['throughput_rps']} -> {result['throughput_rps']}")
+    return regressions
+
+
+def print_table(report: Dict[str, object]) -> None:
+    print(f"{'scenario':24} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for name, r in report["results"].items():
+        print(f"{name:24} {r['throughput_rps']:>9} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['errors']:>7}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="In-process API latency/throughput benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--postgres", action="store_true",
+                        help="Use the seeded Postgres from POSTGRES_* instead of the in-memory fake")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated round trip for the fake DB")
+    parser.add_argument("--ai-latency-ms", type=float, default=5.0, help="Latency of the fake AI providers")
+    parser.add_argument("--crew", type=int, default=300)
+    parser.add_argument("--flights", type=int, default=1200)
+    parser.add_argument("--only", action="append", help="Run only these scenarios (repeatable)")
+    parser.add_argument("--out", help="Write JSON results here")
+    parser.add_argument("--baseline", help="Compare with a previous JSON result")
+    parser.add_argument("--fail-on-regression", type=float, default=None,
+                        help="Exit 1 if any latency/throughput is worse than baseline by this fraction")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_benchmark(
+        requests=args.requests, concurrency=args.concurrency, postgres=args.postgres, db_latency_ms=args.db_latency_ms,
+        ai_latency_ms=args.ai_latency_ms, crew=args.crew, flights=args.flights, only=args.only,
+    ))
+    print_table(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.fail_on_regression or 0.1)
+        for line in regressions:
+            print(f"[regression] {line}")
+        if regressions and args.fail_on_regression is not None:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
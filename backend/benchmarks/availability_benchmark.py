@@ -0,0 +1,138 @@
+"""
+Crew availability: SQL path versus the in-memory AvailabilityIndex.
+
+Asks "which crew of this rank are free for this duty window" for random flight
+windows, first through available_crew_sql (get_available_crew plus the overlapping
+duties, two round trips) and then through the index, and checks both return the same
+crew. Against the in-memory fake, --db-latency-ms sets the simulated round trip;
+--postgres uses the seeded database from POSTGRES_* instead.
+
+    python -m backend.benchmarks.availability_benchmark --queries 2000 --db-latency-ms 0.5
+    python -m backend.benchmarks.availability_benchmark --postgres --queries 500 --out availability.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.benchmarks.fakes import RANKS, FakeConnection, FakeDataset
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.domain.services.availability_index import AvailabilityIndex
+from backend.infrastructure.database.availability import available_crew_sql
+from backend.infrastructure.database.crew_repository import CrewRepository
+from backend.infrastructure.database.roster_repository import RosterRepository
+
+
+async def _windows(conn, queries: int, seed: int) -> List[Tuple[Any, Any, str]]:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT * FROM flights ORDER BY scheduled_departure LIMIT 5000")
+        rows = await cur.fetchall()
+        columns = [desc[0] for desc in cur.description]
+    flights = [Flight(**dict(zip(columns, row))) for row in rows]
+    rng = random.Random(seed)
+    picks = [rng.choice(flights) for _ in range(queries)]
+    return [
+        (f.scheduled_departure - timedelta(hours=1), f.scheduled_arrival + timedelta(minutes=30), rng.choice(RANKS)[0])
+        for f in picks
+    ]
+
+
+async def run_availability_benchmark(
+    queries: int = 1000,
+    crew: int = 3000,
+    flights: int = 20000,
+    db_latency_ms: float = 0.5,
+    postgres: bool = False,
+    seed: int = 11,
+) -> Dict[str, Any]:
+    if postgres:
+        import psycopg
+        from backend.infrastructure.database.core import DSN
+
+        conn = await psycopg.AsyncConnection.connect(DSN)
+    else:
+        conn = FakeConnection(FakeDataset(crew=crew, flights=flights), latency_s=db_latency_ms / 1000)
+    try:
+        windows = await _windows(conn, queries, seed)
+        span_start = min(w[0] for w in windows)
+        span_end = max(w[1] for w in windows)
+
+        started = time.perf_counter()
+        index = AvailabilityIndex(await CrewRepository(conn).get_all(), await RosterRepository(conn).get_on_duty(span_start, span_end))
+        build_ms = (time.perf_counter() - started) * 1000
+
+        sql_samples, index_samples, mismatches = [], [], 0
+        for start, end, rank in windows:
+            t0 = time.perf_counter()
+            expected = [c.id for c in await available_crew_sql(conn, start, end, rank)]
+            t1 = time.perf_counter()
+            got = [index.get_crew(i).id for i in index.available(start, end, rank)]
+            t2 = time.perf_counter()
+            sql_samples.append((t1 - t0) * 1000)
+            index_samples.append((t2 - t1) * 1000)
+            mismatches += expected != got
+
+        # Incremental update cost: shift one duty back and forth, as a roster edit notification would
+        start, end, crew_id, roster_id = next(iter(index._duties.values()))
+        updates = 1000
+        started = time.perf_counter()
+        for i in range(updates):
+            shift = timedelta(minutes=i % 2)
+            index.upsert_roster(Roster(id=roster_id, crew_id=crew_id, flight_id=0,
+                                       duty_start=start + shift, duty_end=end + shift))
+        update_us = (time.perf_counter() - started) * 1e6 / updates
+    finally:
+        await conn.close()
+
+    sql_ms = statistics.mean(sql_samples)
+    index_ms = statistics.mean(index_samples)
+    return {
+        "meta": {
+            "backend": "postgres" if postgres else "fake",
+            "db_latency_ms": None if postgres else db_latency_ms,
+            "queries": queries,
+            "crew": len(index),
+            "duties": index.duty_count,
+        },
+        "build_ms": round(build_ms, 1),
+        "sql_mean_ms": round(sql_ms, 3),
+        "sql_p95_ms": round(statistics.quantiles(sql_samples, n=20)[-1], 3) if len(sql_samples) > 1 else sql_ms,
+        "index_mean_ms": round(index_ms, 4),
+        "index_p95_ms": round(statistics.quantiles(index_samples, n=20)[-1], 4) if len(index_samples) > 1 else index_ms,
+        "speedup": round(sql_ms / index_ms, 1) if index_ms else float("inf"),
+        "update_us": round(update_us, 2),
+        "mismatches": mismatches,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Crew availability: SQL path vs in-memory index")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--crew", type=int, default=3000)
+    parser.add_argument("--flights", type=int, default=20000)
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="Simulated round trip for the fake DB")
+    parser.add_argument("--postgres", action="store_true",
+                        help="Use the seeded Postgres from POSTGRES_* instead of the in-memory fake")
+    parser.add_argument("--out", help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_availability_benchmark(
+        queries=args.queries, crew=args.crew, flights=args.flights, db_latency_ms=args.db_latency_ms,
+        postgres=args.postgres,
+    ))
+    for key, value in report.items():
+        print(f"{key:>14}: {value}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
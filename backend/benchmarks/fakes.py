@@ -0,0 +1,376 @@
+# In-memory stand-ins for Postgres and the AI providers, used by the benchmark
+# suite and the API tests so the app can be driven end-to-end without services.
+import asyncio
+import json
+import random
+import re
+from contextlib import asynccontextmanager
+from dataclasses import fields
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.domain.entities.audit_log import AuditLog
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.infrastructure.ai.provider_router import Provider, ProviderRouter, set_provider_router
+
+AIRPORTS = ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "DXB", "SIN"]
+AIRCRAFT = ["A320", "A321", "ATR72", "B737"]
+# Flights rotate round this many aircraft, so each tail flies every TAILS * 45 minutes
+TAILS = 8
+RANKS = [("CAPTAIN", "captain"), ("FIRST_OFFICER", "first_officer"), ("FLIGHT_ATTENDANT", "flight_attendant")]
+
+
+class Table:
+    def __init__(self, columns: Sequence[str], rows: Optional[List[tuple]] = None):
+        self.columns = list(columns)
+        self.rows: List[tuple] = rows or []
+
+    def index_of(self, column: str) -> int:
+        return self.columns.index(column)
+
+
+class FakeDataset:
+    """Deterministic crew/flight/roster/disruption/audit rows, shaped like the real tables."""
+
+    def __init__(self, crew: int = 300, flights: int = 1200, seed: int = 7, start: Optional[datetime] = None):
+        rng = random.Random(seed)
+        start = start or datetime(2025, 1, 1)
+        self.tables: Dict[str, Table] = {}
+
+        crew_rows = []
+        for i in range(1, crew + 1):
+            rank, _ = RANKS[i % len(RANKS)]
+            row = {f.name: None for f in fields(Crew)}
+            row.update(
+                id=i, employee_id=f"EMP{i:05d}", first_name=f"First{i}", last_name=f"Last{i}", rank=rank,
+                base_airport=AIRPORTS[i % len(AIRPORTS)], status="available" if i % 5 else "off_duty",
+                duty_start_time=start, duty_end_time=start + timedelta(days=90),
+                qualifications=[AIRCRAFT[i % len(AIRCRAFT)]], created_at=start, updated_at=start,
+            )
+            crew_rows.append(row)
+        self._add("crew", [f.name for f in fields(Crew)], crew_rows)
+
+        flight_rows = []
+        for i in range(1, flights + 1):
+            dep = start + timedelta(minutes=45 * i)
+            origin, dest = rng.sample(AIRPORTS, 2)
+            row = {f.name: None for f in fields(Flight)}
+            row.update(
+                id=i, flight_number=f"6E{1000 + i}", airline_code="6E", departure_airport=origin,
+                arrival_airport=dest, scheduled_departure=dep,
+                scheduled_arrival=dep + timedelta(minutes=rng.choice([75, 110, 150, 240])),
+                aircraft_type=rng.choice(AIRCRAFT), aircraft_registration=f"VT-IF{i % TAILS}", status="scheduled",
+                crew_requirements=["A320"], minimum_crew_count=4, created_at=start, updated_at=start,
+            )
+            flight_rows.append(row)
+        self._add("flights", [f.name for f in fields(Flight)], flight_rows)
+
+        roster_rows = []
+        roster_id = 1
+        for flight in flight_rows:
+            for offset, (_, position) in enumerate(RANKS):
+                row = {f.name: None for f in fields(Roster)}
+                row.update(
+                    id=roster_id, crew_id=((flight["id"] * 3 + offset) % crew) + 1, flight_id=flight["id"],
+                    assignment_type="regular", status="confirmed", crew_position=position,
+                    duty_start=flight["scheduled_departure"] - timedelta(hours=1),
+                    duty_end=flight["scheduled_arrival"] + timedelta(minutes=30),
+                    created_at=start, updated_at=start,
+                )
+                roster_rows.append(row)
+                roster_id += 1
+        self._add("rosters", [f.name for f in fields(Roster)], roster_rows)
+
+        disruption_rows = [
+            {"id": i, "type": "foreseen" if i % 2 else "unforeseen", "severity": ["low", "medium", "high"][i % 3],
+             "title": f"Disruption {i}", "description": "Weather and ATC constraints.",
+             "affected_flights": [f"6E{1000 + i}"], "timestamp": start + timedelta(hours=i)}
+            for i in range(1, 41)
+        ]
+        self._add("disruptions", ["id", "type", "severity", "title", "description", "affected_flights", "timestamp"],
+                  disruption_rows)
+
+        # Audit history ends now, like a live system, so the default 30-day window has rows
+        audit_end = datetime.now().replace(minute=0, second=0, microsecond=0)
+        audit_rows = [
+            {"id": i, "timestamp": audit_end - timedelta(hours=4 * i), "user": "dispatcher", "action": "Roster Update",
+             "details": "Details about the action.", "type": "roster_change"}
+            for i in range(1, 401)
+        ]
+        self._add("audit_log", [f.name for f in fields(AuditLog)], audit_rows)
+
+        # What the migration 0007 triggers maintain
+        self._add("table_versions", ["table_name", "version"],
+                  [{"table_name": t, "version": 1} for t in ("crew", "flights", "rosters", "disruptions")])
+
+        # What the migration 0010 triggers maintain
+        block = {f["id"]: (f["scheduled_arrival"] - f["scheduled_departure"]).total_seconds() / 3600 for f in flight_rows}
+        month_hours: Dict[Tuple[int, date], Dict[str, Any]] = {}
+        for r in roster_rows:
+            month = date(r["duty_start"].year, r["duty_start"].month, 1)
+            row = month_hours.setdefault((r["crew_id"], month), {
+                "crew_id": r["crew_id"], "month": month, "duty_hours": 0.0, "flight_hours": 0.0, "duties": 0,
+            })
+            row["duty_hours"] += (r["duty_end"] - r["duty_start"]).total_seconds() / 3600
+            row["flight_hours"] += block[r["flight_id"]]
+            row["duties"] += 1
+        self._add("crew_month_hours", ["crew_id", "month", "duty_hours", "flight_hours", "duties"],
+                  list(month_hours.values()))
+
+    def bump_version(self, table: str) -> int:
+        versions = self.tables["table_versions"]
+        for i, (name, version) in enumerate(versions.rows):
+            if name == table:
+                versions.rows[i] = (name, version + 1)
+                return version + 1
+        versions.rows.append((table, 1))
+        return 1
+
+    def _add(self, name: str, columns: List[str], rows: List[Dict[str, Any]]) -> None:
+        self.tables[name] = Table(columns, [tuple(r[c] for c in columns) for r in rows])
+
+
+_FROM = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection"):
+        self._conn = conn
+        self.description: Optional[List[Tuple[str]]] = None
+        self.rowcount = -1
+        self._rows: List[tuple] = []
+        self._pos = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    def _result(self, columns: Sequence[str], rows: List[tuple]) -> None:
+        self.description = [(c,) for c in columns]
+        self._rows = rows
+        self._pos = 0
+        self.rowcount = len(rows)
+
+    async def execute(self, query, params=None):
+        await self._conn.tick()
+        self._conn.queries.append(" ".join(str(query).split()))
+        self._conn.answer(self, str(query), list(params or []))
+        return self
+
+    # Like psycopg's cursors, each fetch continues where the last one stopped
+    async def fetchone(self):
+        rows = await self.fetchmany(1)
+        return rows[0] if rows else None
+
+    async def fetchall(self):
+        return await self.fetchmany(len(self._rows))
+
+    async def fetchmany(self, size: int = 0):
+        rows = self._rows[self._pos:self._pos + (size or 1)]
+        self._pos += len(rows)
+        return list(rows)
+
+
+class FakeConnection:
+    """Answers the statements the API issues from a FakeDataset (a recorded fake, not a SQL engine)."""
+
+    def __init__(self, dataset: FakeDataset, latency_s: float = 0.0):
+        self.dataset = dataset
+        self.latency_s = latency_s
+        self.queries: List[str] = []
+        self.notifications: List[Tuple[str, str]] = []
+        self._flights_with_crew: Optional[Tuple[List[str], List[tuple]]] = None
+
+    async def tick(self) -> None:
+        # Simulated network round trip; 0 still yields to the loop like a real driver
+        await asyncio.sleep(self.latency_s)
+
+    def cursor(self, *args, **kwargs) -> FakeCursor:
+        return FakeCursor(self)
+
+    async def commit(self):
+        return None
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield self
+
+    async def rollback(self):
+        return None
+
+    async def close(self):
+        return None
+
+    def answer(self, cur: FakeCursor, query: str, params: List[Any]) -> None:
+        compact = " ".join(query.split())
+        upper = compact.upper()
+        if "JSON_AGG" in upper:
+            cur._result(*self._flights_join())
+            return
+        if upper.startswith("SELECT PG_NOTIFY"):
+            self.notifications.append((params[0], params[1]))
+            cur._result(["pg_notify"], [(None,)])
+            return
+        if upper.startswith("INSERT INTO DISRUPTIONS"):
+            cur._result(*self._insert_disruption(params))
+            return
+        if "EXTRACT(EPOCH FROM DUTY_START" in upper:
+            cur._result(*self._duty_hours(upper, params))
+            return
+        if upper.startswith("UPDATE") and "FROM UNNEST" in upper:
+            self._update_from_unnest(cur, compact, params)
+            return
+        match = _FROM.search(compact)
+        if match is None or match.group(1) not in self.dataset.tables:
+            raise NotImplementedError(f"FakeConnection cannot answer: {compact}")
+        table = self.dataset.tables[match.group(1)]
+        rows = table.rows
+        if "STATUS = 'AVAILABLE'" in upper:
+            rows = [r for r in rows if r[table.index_of("status")] == "available"]
+        if "DUTY_START_TIME <= %S AND DUTY_END_TIME >= %S" in upper:
+            ws, we = table.index_of("duty_start_time"), table.index_of("duty_end_time")
+            rows = [r for r in rows if r[ws] <= params[0] and r[we] >= params[1]]
+        any_match = re.search(r"WHERE\s+(\w+)\s*=\s*ANY\(%S\)", upper)
+        if any_match:
+            column = table.index_of(any_match.group(1).lower())
+            rows = [r for r in rows if r[column] in params[0]]
+        if "COUNT(*)" in upper:
+            cur._result(["count"], [(len(rows),)])
+            return
+        if "DUTY_PERIOD &&" in upper:
+            start, end = table.index_of("duty_start"), table.index_of("duty_end")
+            rows = [r for r in rows if r[start] < params[1] and (r[end] is None or r[end] > params[0])]
+            if "AND CREW_ID = %S" in upper:
+                rows = [r for r in rows if r[table.index_of("crew_id")] == params[-1]]
+        if re.search(r"WHERE\s+ID\s*=\s*%S", upper):
+            rows = [r for r in rows if r[0] == params[0]]
+        if re.search(r"WHERE\s+SCHEDULED_DEPARTURE\s*>=\s*%S\s+AND\s+SCHEDULED_ARRIVAL\s*<=\s*%S", upper):
+            dep, arr = table.index_of("scheduled_departure"), table.index_of("scheduled_arrival")
+            rows = [r for r in rows if r[dep] >= params[0] and r[arr] <= params[1]]
+        if re.search(r"WHERE\s+TIMESTAMP\s*>=\s*%S\s+AND\s+TIMESTAMP\s*<\s*%S", upper):
+            ts = table.index_of("timestamp")
+            rows = [r for r in rows if params[0] <= r[ts] < params[1]]
+        if "ORDER BY SCHEDULED_DEPARTURE" in upper:
+            dep = table.index_of("scheduled_departure")
+            rows = sorted(rows, key=lambda r: r[dep])
+        if "ORDER BY TIMESTAMP DESC" in upper:
+            ts = table.index_of("timestamp")
+            rows = sorted(rows, key=lambda r: r[ts], reverse=True)
+        if re.search(r"LIMIT\s+%S", upper):
+            rows = rows[: params[-1]]
+        cur._result(table.columns, rows)
+
+    def _flights_join(self) -> Tuple[List[str], List[tuple]]:
+        if self._flights_with_crew is None:
+            tables = self.dataset.tables
+            crew = {r[0]: r for r in tables["crew"].rows}
+            first, last = tables["crew"].index_of("first_name"), tables["crew"].index_of("last_name")
+            by_flight: Dict[int, List[Dict[str, Any]]] = {}
+            rosters = tables["rosters"]
+            cid, fid, pos = rosters.index_of("crew_id"), rosters.index_of("flight_id"), rosters.index_of("crew_position")
+            for r in rosters.rows:
+                c = crew.get(r[cid])
+                by_flight.setdefault(r[fid], []).append({
+                    "crew_id": r[cid], "crew_position": r[pos],
+                    "first_name": c[first] if c else None, "last_name": c[last] if c else None,
+                })
+            empty = [{"crew_id": None, "crew_position": None, "first_name": None, "last_name": None}]
+            flights = tables["flights"]
+            dep = flights.index_of("scheduled_departure")
+            rows = [r + (by_flight.get(r[0], empty),) for r in sorted(flights.rows, key=lambda r: r[dep])]
+            self._flights_with_crew = (flights.columns + ["assigned_crew"], rows)
+        return self._flights_with_crew
+
+    def _duty_hours(self, upper: str, params: List[Any]) -> Tuple[List[str], List[tuple]]:
+        # Fatigue history: duty times as hours relative to as_of, NaN for an open duty
+        table = self.dataset.tables["rosters"]
+        cid, fid = table.index_of("crew_id"), table.index_of("flight_id")
+        start, end, status = table.index_of("duty_start"), table.index_of("duty_end"), table.index_of("status")
+        as_of, lo, hi = params[0], params[2], params[3]
+        crew_ids = set(params[4]) if "CREW_ID = ANY(%S)" in upper else None
+        rows = [
+            (r[cid], r[fid], (r[start] - as_of).total_seconds() / 3600,
+             (r[end] - as_of).total_seconds() / 3600 if r[end] is not None else float("nan"))
+            for r in table.rows
+            if lo <= r[start] < hi and r[status] != "cancelled" and (crew_ids is None or r[cid] in crew_ids)
+        ]
+        return ["crew_id", "flight_id", "start_h", "end_h"], rows
+
+    def _update_from_unnest(self, cur: FakeCursor, query: str, params: List[Any]) -> None:
+        # UPDATE t SET col = s.x, ... FROM unnest(...) AS s(id, x, ...) WHERE t.id = s.id
+        name = re.match(r"UPDATE\s+(\w+)", query, re.IGNORECASE).group(1)
+        table = self.dataset.tables[name]
+        names = [n.strip() for n in re.search(r"AS\s+s\(([^)]*)\)", query, re.IGNORECASE).group(1).split(",")]
+        assignments = re.findall(r"(\w+)\s*=\s*s\.(\w+)", query.split(" FROM ", 1)[0])
+        values = {row[0]: dict(zip(names, row)) for row in zip(*params)}
+        changed = 0
+        for i, row in enumerate(table.rows):
+            new = values.get(row[0])
+            if new is None:
+                continue
+            updated = list(row)
+            for column, source in assignments:
+                updated[table.index_of(column)] = new[source]
+            if tuple(updated) != row:
+                table.rows[i] = tuple(updated)
+                changed += 1
+        if changed:
+            self.dataset.bump_version(name)
+        cur._result([], [])
+        cur.rowcount = changed
+
+    def _insert_disruption(self, params: List[Any]) -> Tuple[List[str], List[tuple]]:
+        table = self.dataset.tables["disruptions"]
+        new_id = max((r[0] for r in table.rows), default=0) + 1
+        # disruptions.timestamp is TIMESTAMP: Postgres drops the offset on the way in
+        stamp = params[5].astimezone(timezone.utc).replace(tzinfo=None) if params[5].tzinfo else params[5]
+        # affected_flights is JSONB: sent as JSON text, read back as the decoded list
+        row = (new_id, params[0], params[1], params[2], params[3], json.loads(params[4]), stamp)
+        table.rows.append(row)
+        self.dataset.bump_version("disruptions")
+        return table.columns, [row]
+
+
+def install_fake_database(app, dataset: Optional[FakeDataset] = None, latency_s: float = 0.0) -> FakeDataset:
+    """Point every DB dependency of `app` at an in-memory dataset."""
+    from backend.infrastructure.cache.response_cache import capture_fill_versions
+    from backend.infrastructure.database.core import get_db_conn, get_read_conn
+    from backend.infrastructure.database.instrumentation import InstrumentedConnection
+
+    dataset = dataset or FakeDataset()
+
+    async def fake_conn():
+        yield InstrumentedConnection(FakeConnection(dataset, latency_s))
+
+    async def fake_read_conn():
+        # Like get_read_conn, report snapshot versions to a pending response-cache fill
+        conn = InstrumentedConnection(FakeConnection(dataset, latency_s))
+        await capture_fill_versions(conn)
+        yield conn
+
+    app.dependency_overrides[get_db_conn] = fake_conn
+    app.dependency_overrides[get_read_conn] = fake_read_conn
+    return dataset
+
+
+def fake_chat_provider(name: str = "fake", latency_s: float = 0.0, jitter_s: float = 0.0, seed: int = 1) -> Provider:
+    rng = random.Random(seed)
+
+    async def chat(messages, model):
+        await asyncio.sleep(latency_s + rng.random() * jitter_s)
+        return json.dumps({"echo": messages[-1]["content"][:80], "model": model})
+
+    return Provider(name, chat, f"{name}-model")
+
+
+def install_fake_providers(latency_s: float = 0.0, jitter_s: float = 0.0) -> ProviderRouter:
+    router = ProviderRouter([
+        fake_chat_provider("fake-fast", latency_s, jitter_s, seed=1),
+        fake_chat_provider("fake-slow", latency_s * 3, jitter_s, seed=2),
+    ])
+    set_provider_router(router)
+    return router
@@ -0,0 +1,136 @@
+"""
+Crew pairing generation on a generated quarter of flights.
+
+Builds the hub-and-spoke schedule of rostering_benchmark over 91 days (52k flights at
+the defaults), then times each step: the connection graph, pairing enumeration, the
+greedy cover of flights by pairings, crew assignment to the chosen pairings, and fill()
+for the flights no pairing covered. --compare also runs the flight-by-flight solve on
+the same schedule.
+
+    python -m backend.benchmarks.pairing_benchmark
+    python -m backend.benchmarks.pairing_benchmark --days 28 --max-duties 2 --compare --out pairing.json
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.benchmarks.rostering_benchmark import synthetic_schedule
+from backend.domain.services.pairing_service import (
+    MAX_DUTIES,
+    MAX_LEGS_PER_DUTY,
+    MAX_REST,
+    MAX_REST_ARCS,
+    MAX_SIT,
+    MAX_SIT_ARCS,
+    PairingGenerator,
+)
+from backend.domain.services.rostering_service import RosteringProblem, RosteringService
+
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def run_pairing_benchmark(
+    bases: int = 6,
+    days: int = 91,
+    aircraft_per_base: int = 20,
+    crew_per_aircraft: float = 9.0,
+    generator: Optional[PairingGenerator] = None,
+    wave_hours: float = 24.0,
+    compare: bool = False,
+) -> Dict[str, Any]:
+    generator = generator or PairingGenerator()
+    flights, crew = synthetic_schedule(bases, days, aircraft_per_base, crew_per_aircraft)
+    started = time.perf_counter()
+    problem = RosteringProblem.from_entities(flights, crew)
+    report: Dict[str, Any] = {
+        "meta": {
+            "flights": len(flights), "crew": len(crew), "bases": bases, "days": days,
+            "max_duties": generator.max_duties, "max_legs_per_duty": generator.max_legs_per_duty,
+            "max_sit_arcs": generator.max_sit_arcs, "max_rest_arcs": generator.max_rest_arcs,
+        },
+        "build_ms": _ms(started),
+    }
+
+    started = time.perf_counter()
+    graph = generator.graph(problem)
+    report["graph"] = {"ms": _ms(started), "sit_arcs": len(graph.sit_to), "rest_arcs": len(graph.rest_to)}
+
+    started = time.perf_counter()
+    pairings = generator.generate(problem, graph=graph)
+    report["generate"] = {
+        "ms": _ms(started), "pairings": len(pairings), "legs": len(pairings.legs),
+        "by_duties": {int(d): int(n) for d, n in enumerate(np.bincount(pairings.duties)) if n},
+        "pairings_per_flight": round(len(pairings.legs) / max(len(flights), 1), 2),
+    }
+
+    started = time.perf_counter()
+    chosen = pairings.select(len(flights))
+    covered = len(np.unique(pairings.legs[pairings.legs_of(chosen)]))
+    report["select"] = {
+        "ms": _ms(started), "chosen": len(chosen), "covered_flights": covered,
+        "coverage": round(covered / max(len(flights), 1), 4), "cost": round(float(pairings.cost[chosen].sum()), 1),
+    }
+
+    service = RosteringService(wave_hours)
+    started = time.perf_counter()
+    assigned = service.assign_pairings(problem, pairings, chosen)
+    report["assign"] = {"ms": _ms(started), "filled": len(assigned.flight), "open": len(assigned.unfilled),
+                        "candidate_pairs": assigned.candidate_pairs}
+    started = time.perf_counter()
+    filled = service.fill(problem, assigned)
+    report["fill"] = {"ms": _ms(started), "filled": len(filled.flight), "open": len(filled.unfilled)}
+
+    if compare:
+        started = time.perf_counter()
+        whole = RosteringService().solve(problem)
+        report["flight_by_flight"] = {"ms": _ms(started), "open": len(whole.unfilled),
+                                      "deadheads": int((whole.deadhead_km > 0).sum())}
+    report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Crew pairing generation on a generated quarter")
+    parser.add_argument("--bases", type=int, default=6)
+    parser.add_argument("--days", type=int, default=91)
+    parser.add_argument("--aircraft-per-base", type=int, default=20)
+    parser.add_argument("--crew-per-aircraft", type=float, default=9.0)
+    parser.add_argument("--max-duties", type=int, default=MAX_DUTIES)
+    parser.add_argument("--max-legs-per-duty", type=int, default=MAX_LEGS_PER_DUTY)
+    parser.add_argument("--max-sit-hours", type=float, default=MAX_SIT.total_seconds() / 3600)
+    parser.add_argument("--max-rest-hours", type=float, default=MAX_REST.total_seconds() / 3600)
+    parser.add_argument("--max-sit-arcs", type=int, default=MAX_SIT_ARCS, help="Sit successors kept per flight")
+    parser.add_argument("--max-rest-arcs", type=int, default=MAX_REST_ARCS, help="Rest successors kept per flight")
+    parser.add_argument("--wave-hours", type=float, default=24.0, help="Pairing start window per assignment")
+    parser.add_argument("--compare", action="store_true", help="Also run the flight-by-flight solve")
+    parser.add_argument("--out", help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    generator = PairingGenerator(
+        max_duties=args.max_duties, max_legs_per_duty=args.max_legs_per_duty,
+        max_sit=timedelta(hours=args.max_sit_hours), max_rest=timedelta(hours=args.max_rest_hours),
+        max_sit_arcs=args.max_sit_arcs, max_rest_arcs=args.max_rest_arcs,
+    )
+    report = run_pairing_benchmark(
+        bases=args.bases, days=args.days, aircraft_per_base=args.aircraft_per_base,
+        crew_per_aircraft=args.crew_per_aircraft, generator=generator, wave_hours=args.wave_hours,
+        compare=args.compare,
+    )
+    for key, value in report.items():
+        print(f"{key:>16}: {value}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Rostering: one serial solve over every base versus the decomposed, parallel solve.
+
+Generates a hub-and-spoke schedule (aircraft flying out-and-back rotations from each
+base, every day of the horizon) with crew at each base, then solves it once as a whole
+with RosteringService and once with solve_decomposed: per-base (or --by aircraft_type)
+subproblems in a process pool reading shared memory, then the cross-base final pass.
+Reports per-partition timings, the speedup and how many positions each left open.
+
+    python -m backend.benchmarks.rostering_benchmark --days 7 --aircraft-per-base 12 --workers 4
+    python -m backend.benchmarks.rostering_benchmark --by aircraft_type --out rostering.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.benchmarks.fakes import AIRCRAFT, RANKS
+from backend.domain.airports import AIRPORTS, distance_km
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.services.decomposition import BY_BASE, solve_decomposed
+from backend.domain.services.rostering_service import RosteringProblem, RosteringService
+
+START = datetime(2025, 3, 1)
+TURN = timedelta(minutes=45)
+
+
+def synthetic_schedule(
+    bases: int = 6, days: int = 7, aircraft_per_base: int = 10, crew_per_aircraft: float = 9.0, seed: int = 5,
+) -> Tuple[List[Flight], List[Crew]]:
+    """Out-and-back rotations from each base between 05:00 and 23:00, and crew at each base."""
+    rng = random.Random(seed)
+    airports = list(AIRPORTS)
+    hubs, outstations = airports[:bases], airports[bases:]
+    flights: List[Flight] = []
+    crew: List[Crew] = []
+    template = {f.name: None for f in fields(Flight)}
+    for hub in hubs:
+        fleet = [rng.choice(AIRCRAFT) for _ in range(aircraft_per_base)]
+        for day in range(days):
+            for tail, aircraft_type in enumerate(fleet):
+                t = START + timedelta(days=day, hours=5, minutes=rng.randrange(0, 180, 5))
+                while True:
+                    out = rng.choice(outstations + [h for h in hubs if h != hub])
+                    block = timedelta(hours=round(distance_km(hub, out) / 750 + 0.5, 2))
+                    if t + 2 * block + TURN > START + timedelta(days=day, hours=23):
+                        break
+                    for origin, dest in ((hub, out), (out, hub)):
+                        flights.append(Flight(**{**template, **dict(
+                            id=len(flights) + 1, flight_number=f"6E{len(flights) + 1}", departure_airport=origin,
+                            arrival_airport=dest, scheduled_departure=t, scheduled_arrival=t + block,
+                            aircraft_type=aircraft_type, aircraft_registration=f"VT-{hub}{tail}", status="scheduled",
+                        )}))
+                        t += block + TURN
+        for k in range(int(aircraft_per_base * crew_per_aircraft)):
+            rank, position = RANKS[k % len(RANKS)]
+            values = {f.name: None for f in fields(Crew)}
+            values.update(
+                id=len(crew) + 1, employee_id=f"EMP{len(crew) + 1:05d}", first_name="F", last_name="L", rank=rank,
+                base_airport=hub, current_location=hub, status="available",
+                qualifications=[fleet[(k // len(RANKS)) % len(fleet)]],
+                total_duty_hours_month=float(rng.randrange(0, 60)), fatigue_score=rng.random() * 0.3,
+            )
+            crew.append(Crew(**values))
+    return flights, crew
+
+
+def run_rostering_benchmark(
+    bases: int = 6,
+    days: int = 7,
+    aircraft_per_base: int = 10,
+    crew_per_aircraft: float = 9.0,
+    workers: int = 4,
+    by: str = BY_BASE,
+    wave_hours: float = 4.0,
+    serial: bool = True,
+) -> Dict[str, Any]:
+    flights, crew = synthetic_schedule(bases, days, aircraft_per_base, crew_per_aircraft)
+    started = time.perf_counter()
+    problem = RosteringProblem.from_entities(flights, crew)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "flights": len(flights), "crew": len(crew), "positions": problem.slots, "bases": bases, "days": days,
+            "by": by, "workers": workers, "cpus": os.cpu_count(), "wave_hours": wave_hours,
+        },
+        "build_ms": round(build_ms, 1),
+    }
+    if serial:
+        started = time.perf_counter()
+        whole = RosteringService(wave_hours).solve(problem)
+        serial_ms = (time.perf_counter() - started) * 1000
+        report["serial"] = {
+            "ms": round(serial_ms, 1), "unfilled": len(whole.unfilled),
+            "total_cost": round(whole.total_cost, 1), "deadheads": int((whole.deadhead_km > 0).sum()),
+            "candidate_pairs": whole.candidate_pairs,
+        }
+
+    decomposed = solve_decomposed(problem, by, workers, wave_hours)
+    result = decomposed.result
+    report["decomposed"] = {
+        "ms": decomposed.wall_ms,
+        "partition_ms": round(decomposed.partition_ms, 1),
+        "final_pass_ms": decomposed.final_pass.solve_ms,
+        "unfilled": len(result.unfilled),
+        "total_cost": round(result.total_cost, 1),
+        "deadheads": int((result.deadhead_km > 0).sum()),
+        "filled_in_final_pass": decomposed.final_pass.filled,
+    }
+    report["partitions"] = [asdict(p) for p in decomposed.partitions] + [asdict(decomposed.final_pass)]
+    if serial:
+        report["speedup"] = round(serial_ms / decomposed.wall_ms, 2) if decomposed.wall_ms else float("inf")
+    # Each crew member at most once per flight, and no flight position twice
+    pairs = set(zip(result.flight.tolist(), result.position.tolist()))
+    report["duplicates"] = (len(result.flight) - len(pairs)) + (
+        len(result.flight) - len(set(zip(result.flight.tolist(), result.crew.tolist())))
+    )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rostering: serial vs decomposed parallel solve")
+    parser.add_argument("--bases", type=int, default=6)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--aircraft-per-base", type=int, default=10)
+    parser.add_argument("--crew-per-aircraft", type=float, default=9.0, help="Crew of all ranks per aircraft")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the partitions (0: in this process)")
+    parser.add_argument("--by", choices=["base", "aircraft_type"], default=BY_BASE)
+    parser.add_argument("--wave-hours", type=float, default=4.0)
+    parser.add_argument("--skip-serial", action="store_true", help="Only run the decomposed solve")
+    parser.add_argument("--out", help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    report = run_rostering_benchmark(
+        bases=args.bases, days=args.days, aircraft_per_base=args.aircraft_per_base,
+        crew_per_aircraft=args.crew_per_aircraft, workers=args.workers, by=args.by, wave_hours=args.wave_hours,
+        serial=not args.skip_serial,
+    )
+    for key, value in report.items():
+        if key == "partitions":
+            print(f"{key:>14}:")
+            for p in value:
+                print(f"{'':>16}{p['key']:>10}  flights={p['flights']:<6} crew={p['crew']:<5} "
+                      f"filled={p['filled']}/{p['positions']:<6} {p['solve_ms']:>9.1f} ms")
+        else:
+            print(f"{key:>14}: {value}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["duplicates"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
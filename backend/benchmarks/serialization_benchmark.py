@@ -0,0 +1,153 @@
+"""
+Serialization and compression benchmark for the large list payloads.
+
+Compares FastAPI's default path for a route with a response_model (Pydantic
+validation, JSON-mode dump, then json.dumps in JSONResponse) with returning
+FastJSONResponse(entities) directly, and reports gzip/brotli cost and ratio
+for the rendered body.
+
+    python -m backend.benchmarks.serialization_benchmark --rows 50000
+    python -m backend.benchmarks.serialization_benchmark --rows 50000 --out serialization.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import fields
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from backend.benchmarks.fakes import AIRCRAFT, AIRPORTS, RANKS
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.roster import Roster
+from backend.infrastructure.api.compression import brotli, compress_body
+from backend.infrastructure.api.controllers.flight_controller import FlightOut
+from backend.infrastructure.api.responses import FastJSONResponse
+
+
+def make_crew(n: int, start: datetime = datetime(2025, 1, 1)) -> List[Crew]:
+    rows = []
+    for i in range(1, n + 1):
+        row = {f.name: None for f in fields(Crew)}
+        row.update(
+            id=i, employee_id=f"EMP{i:06d}", first_name=f"First{i}", last_name=f"Last{i}",
+            rank=RANKS[i % len(RANKS)][0], base_airport=AIRPORTS[i % len(AIRPORTS)], status="available",
+            duty_start_time=start + timedelta(minutes=i), duty_end_time=start + timedelta(minutes=i, hours=9),
+            total_flight_hours_month=float(i % 90), qualifications=[AIRCRAFT[i % len(AIRCRAFT)]],
+            languages=["en", "hi"], created_at=start, updated_at=start,
+        )
+        rows.append(Crew(**row))
+    return rows
+
+
+def make_rosters(n: int, start: datetime = datetime(2025, 1, 1)) -> List[Roster]:
+    return [
+        Roster(
+            id=i, crew_id=i % 5000 + 1, flight_id=i // 3 + 1, assignment_type="regular", status="confirmed",
+            crew_position=RANKS[i % len(RANKS)][1], duty_start=start + timedelta(minutes=15 * i),
+            duty_end=start + timedelta(minutes=15 * i, hours=8), created_at=start, updated_at=start,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def make_flights(n: int, start: datetime = datetime(2025, 1, 1)) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": str(i), "flightNumber": f"6E{i}", "aircraft": AIRCRAFT[i % len(AIRCRAFT)],
+            "route": {"from": AIRPORTS[i % 8], "to": AIRPORTS[(i + 3) % 8]},
+            "departure": start + timedelta(minutes=5 * i), "arrival": start + timedelta(minutes=5 * i + 95),
+            "status": "scheduled",
+            "assignedCrew": {"captain": f"Capt {i}", "firstOfficer": f"FO {i}", "flightAttendants": ["A B", "C D"]},
+            "requiredQualifications": ["A320"], "conflicts": [],
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def default_path(adapter: TypeAdapter) -> Callable[[Any], bytes]:
+    # What FastAPI does for a returned value when the route declares response_model
+    def render(content: Any) -> bytes:
+        validated = adapter.validate_python(content)
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    return render
+
+
+def fast_path(content: Any) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def time_it(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run_serialization_benchmark(rows: int = 50_000, repeat: int = 3) -> Dict[str, Any]:
+    payloads = {
+        "crew": (make_crew(rows), TypeAdapter(List[Crew])),
+        "rosters": (make_rosters(rows), TypeAdapter(List[Roster])),
+        # The old controller built FlightOut models with isoformat()-ed strings
+        "flights": (make_flights(rows), TypeAdapter(List[FlightOut])),
+    }
+    results: Dict[str, Any] = {}
+    for name, (content, adapter) in payloads.items():
+        before_content = content
+        if name == "flights":
+            before_content = [
+                {**f, "departure": f["departure"].isoformat(), "arrival": f["arrival"].isoformat()} for f in content
+            ]
+        before = default_path(adapter)
+        body = fast_path(content)
+        assert json.loads(body) == json.loads(before(before_content)), f"{name}: renderings differ"
+        result = {
+            "rows": rows,
+            "bytes": len(body),
+            "before_ms": time_it(lambda: before(before_content), repeat) * 1000,
+            "after_ms": time_it(lambda: fast_path(content), repeat) * 1000,
+        }
+        result["speedup"] = result["before_ms"] / result["after_ms"] if result["after_ms"] else float("inf")
+        for encoding in ("gzip", "br"):
+            if encoding == "br" and brotli is None:
+                continue
+            compressed = compress_body(body, encoding)
+            result[f"{encoding}_ms"] = time_it(lambda: compress_body(body, encoding), repeat) * 1000
+            result[f"{encoding}_ratio"] = len(body) / len(compressed)
+        results[name] = result
+    return {"python": sys.version.split()[0], "brotli": brotli is not None, "results": results}
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    print(f"{'payload':<10}{'rows':>8}{'MB':>8}{'before ms':>11}{'after ms':>10}{'speedup':>9}{'gzip ms':>9}"
+          f"{'gzip x':>8}{'br ms':>8}{'br x':>7}")
+    for name, r in report["results"].items():
+        br = f"{r['br_ms']:>8.1f}{r['br_ratio']:>7.1f}" if "br_ms" in r else f"{'-':>8}{'-':>7}"
+        print(f"{name:<10}{r['rows']:>8}{r['bytes'] / 1e6:>8.2f}{r['before_ms']:>11.1f}{r['after_ms']:>10.1f}"
+              f"{r['speedup']:>8.1f}x{r['gzip_ms']:>9.1f}{r['gzip_ratio']:>8.1f}{br}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSON serialization and compression benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    report = run_serialization_benchmark(args.rows, args.repeat)
+    print_table(report)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# Airport reference coordinates (lat, lon) for positioning distances.
+# Same domestic network as scripts/synthetic_data_generator.py, plus the international outstations.
+import math
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+AIRPORTS: Dict[str, Tuple[float, float]] = {
+    "DEL": (28.556, 77.100), "BOM": (19.089, 72.868), "BLR": (13.199, 77.706), "HYD": (17.240, 78.429),
+    "MAA": (12.994, 80.171), "CCU": (22.654, 88.447), "AMD": (23.077, 72.635), "PNQ": (18.582, 73.920),
+    "COK": (10.152, 76.402), "GOI": (15.381, 73.831), "JAI": (26.824, 75.812), "LKO": (26.761, 80.889),
+    "GAU": (26.106, 91.586), "PAT": (25.591, 85.088), "IXC": (30.673, 76.788), "TRV": (8.482, 76.920),
+    "DXB": (25.253, 55.365), "SIN": (1.364, 103.991),
+}
+
+EARTH_RADIUS_KM = 6371.0
+
+
+@lru_cache(maxsize=4096)
+def distance_km(origin: Optional[str], destination: Optional[str]) -> Optional[float]:
+    """Great-circle distance between two airports, or None when either is unknown."""
+    if origin == destination and origin is not None:
+        return 0.0
+    a, b = AIRPORTS.get(origin or ""), AIRPORTS.get(destination or "")
+    if a is None or b is None:
+        return None
+    p1, p2 = math.radians(a[0]), math.radians(b[0])
+    dp, dl = p2 - p1, math.radians(b[1] - a[1])
+    h = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
@@ -0,0 +1,8 @@
+# Crew duty-time limits shared by the impact, recovery, scenario and rostering services.
+from datetime import timedelta
+
+REPORT_BEFORE = timedelta(minutes=60)  # report for duty before the first departure
+RELEASE_AFTER = timedelta(minutes=30)  # released from duty after the last arrival
+MIN_TURNAROUND = timedelta(minutes=30)  # arrival to next departure on the same aircraft
+MIN_REST = timedelta(hours=10)  # release to next report between duty periods
+MAX_DUTY_PERIOD = timedelta(hours=13)  # report to release within one duty period
@@ -1,3 +1,15 @@
 class DomainException(Exception):
     """Base exception for domain errors."""
     pass
+
+
+class RosterOverlapError(DomainException):
+    """A crew member would be rostered on two duties whose periods overlap."""
+
+    def __init__(self, crew_id, duty_start=None, duty_end=None, detail: str = ""):
+        self.crew_id = crew_id
+        self.duty_start = duty_start
+        self.duty_end = duty_end
+        super().__init__(
+            f"Crew {crew_id} already has a duty overlapping {duty_start} - {duty_end}" + (f": {detail}" if detail else "")
+        )
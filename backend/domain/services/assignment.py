@@ -0,0 +1,85 @@
+# Rectangular linear assignment: each row gets a distinct column, minimising total cost.
+# Uses scipy's solver when it is installed; otherwise a numpy shortest-augmenting-path
+# implementation of the same algorithm (Crouse, 2016), O(n^2 m) with the inner loop vectorised.
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_lsa
+except ImportError:  # optional dependency
+    _scipy_lsa = None
+
+
+class InfeasibleAssignment(ValueError):
+    """Some row has no finite-cost column left."""
+
+
+def _lsa_numpy(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n, m = cost.shape
+    u = np.zeros(n)
+    v = np.zeros(m)
+    col4row = np.full(n, -1, dtype=np.int64)
+    row4col = np.full(m, -1, dtype=np.int64)
+
+    for cur_row in range(n):
+        shortest = np.full(m, np.inf)
+        path = np.full(m, -1, dtype=np.int64)
+        visited_rows = np.zeros(n, dtype=bool)
+        visited_cols = np.zeros(m, dtype=bool)
+        min_val = 0.0
+        i = cur_row
+        sink = -1
+        # Dijkstra over reduced costs until an unassigned column is reached
+        while sink == -1:
+            visited_rows[i] = True
+            reduced = min_val + cost[i] - u[i] - v
+            better = ~visited_cols & (reduced < shortest)
+            shortest[better] = reduced[better]
+            path[better] = i
+            open_costs = np.where(visited_cols, np.inf, shortest)
+            j = int(np.argmin(open_costs))
+            min_val = open_costs[j]
+            if not np.isfinite(min_val):
+                raise InfeasibleAssignment(f"row {cur_row} cannot be assigned")
+            # On ties prefer a free column: it ends the search now
+            free = np.flatnonzero((open_costs == min_val) & (row4col == -1))
+            if free.size:
+                j = int(free[0])
+            visited_cols[j] = True
+            if row4col[j] == -1:
+                sink = j
+            else:
+                i = int(row4col[j])
+
+        u[cur_row] += min_val
+        others = visited_rows.copy()
+        others[cur_row] = False
+        u[others] += min_val - shortest[col4row[others]]
+        v[visited_cols] -= min_val - shortest[visited_cols]
+
+        j = sink
+        while True:
+            i = int(path[j])
+            row4col[j] = i
+            col4row[i], j = j, int(col4row[i])
+            if i == cur_row:
+                break
+
+    return np.arange(n), col4row
+
+
+def solve_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(rows, cols) of a minimum-cost assignment; needs rows <= columns. Use np.inf to forbid a pair."""
+    cost = np.asarray(cost, dtype=float)
+    if cost.ndim != 2 or cost.shape[0] > cost.shape[1]:
+        raise ValueError(f"expected a rows <= columns cost matrix, got shape {cost.shape}")
+    if cost.shape[0] == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    if _scipy_lsa is not None:
+        try:
+            return _scipy_lsa(cost)
+        except ValueError as exc:
+            raise InfeasibleAssignment(str(exc)) from exc
+    return _lsa_numpy(cost)
@@ -0,0 +1,160 @@
+# In-memory answer to "which crew are free for this window", for solvers that ask it thousands
+# of times. Crew are grouped by (rank, base); each group keeps its duties sorted by start, and
+# each crew member keeps their own duties sorted too. No duty is longer than the group's longest,
+# so the duties that can overlap [start, end) sit between two bisections: start - longest and end.
+# Queries cost O(log n) plus the duties found and the group's members. Single-crew checks cost O(log k).
+# Updates are applied per roster/crew row, so the index never needs a full rebuild to stay current.
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.roster import Roster
+
+# Assumed length of an open-ended duty (no duty_end yet)
+OPEN_DUTY = timedelta(hours=14)
+
+Duty = Tuple[datetime, datetime, int, int]  # (start, end, crew_id, roster_id)
+_start = itemgetter(0)
+
+
+@dataclass
+class _CrewSlot:
+    rank: str
+    base: Optional[str]
+    status: str
+    window_start: Optional[datetime]
+    window_end: Optional[datetime]
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        # Same test as CrewRepository.get_available_crew
+        return (
+            self.status == "available"
+            and (self.window_start is None or self.window_start <= start)
+            and (self.window_end is None or self.window_end >= end)
+        )
+
+
+@dataclass
+class _Group:
+    members: Set[int] = field(default_factory=set)
+    duties: List[Duty] = field(default_factory=list)
+    longest: timedelta = timedelta(0)  # only grows; a stale upper bound just widens the scan
+
+    def busy(self, start: datetime, end: datetime) -> Set[int]:
+        lo = bisect_left(self.duties, start - self.longest, key=_start)
+        hi = bisect_left(self.duties, end, key=_start)
+        return {d[2] for d in self.duties[lo:hi] if d[1] > start}
+
+
+class AvailabilityIndex:
+    def __init__(self, crew: Iterable[Crew] = (), rosters: Iterable[Roster] = ()):
+        self._crew: Dict[int, _CrewSlot] = {}
+        self._entities: Dict[int, Crew] = {}
+        self._groups: Dict[Tuple[str, Optional[str]], _Group] = {}
+        self._duties: Dict[int, Duty] = {}  # roster id -> duty
+        self._by_crew: Dict[int, List[Duty]] = {}
+        for c in crew:
+            self.upsert_crew(c)
+        for r in rosters:
+            self.upsert_roster(r)
+
+    def __len__(self) -> int:
+        return len(self._crew)
+
+    @property
+    def duty_count(self) -> int:
+        return len(self._duties)
+
+    def get_crew(self, crew_id: int) -> Optional[Crew]:
+        return self._entities.get(crew_id)
+
+    def crew_ids(self) -> List[int]:
+        return list(self._crew)
+
+    def _group_of(self, crew_id: int) -> Optional[_Group]:
+        slot = self._crew.get(crew_id)
+        return self._groups.get((slot.rank, slot.base)) if slot else None
+
+    def upsert_crew(self, crew: Crew) -> None:
+        old = self._crew.get(crew.id)
+        slot = _CrewSlot(crew.rank, crew.base_airport, crew.status, crew.duty_start_time, crew.duty_end_time)
+        self._crew[crew.id] = slot
+        self._entities[crew.id] = crew
+        if old is not None and (old.rank, old.base) == (slot.rank, slot.base):
+            return
+        # New crew member, or a rank/base change: (re)file them and their duties
+        duties = list(self._by_crew.get(crew.id, ()))
+        if old is not None:
+            group = self._groups[(old.rank, old.base)]
+            group.members.discard(crew.id)
+            for duty in duties:
+                self._remove_from_group(group, duty)
+        group = self._groups.setdefault((slot.rank, slot.base), _Group())
+        group.members.add(crew.id)
+        for duty in duties:
+            self._add_to_group(group, duty)
+
+    def remove_crew(self, crew_id: int) -> None:
+        for duty in list(self._by_crew.get(crew_id, ())):
+            self.remove_roster(duty[3])
+        slot = self._crew.pop(crew_id, None)
+        self._entities.pop(crew_id, None)
+        if slot is not None:
+            self._groups[(slot.rank, slot.base)].members.discard(crew_id)
+
+    def upsert_roster(self, roster: Roster) -> None:
+        self.remove_roster(roster.id)
+        if roster.status == "cancelled" or roster.duty_start is None:
+            return
+        duty: Duty = (roster.duty_start, roster.duty_end or roster.duty_start + OPEN_DUTY, roster.crew_id, roster.id)
+        self._duties[roster.id] = duty
+        insort(self._by_crew.setdefault(roster.crew_id, []), duty)
+        group = self._group_of(roster.crew_id)
+        if group is not None:
+            self._add_to_group(group, duty)
+
+    def remove_roster(self, roster_id: int) -> None:
+        duty = self._duties.pop(roster_id, None)
+        if duty is None:
+            return
+        own = self._by_crew[duty[2]]
+        del own[bisect_left(own, duty)]
+        group = self._group_of(duty[2])
+        if group is not None:
+            self._remove_from_group(group, duty)
+
+    @staticmethod
+    def _add_to_group(group: _Group, duty: Duty) -> None:
+        insort(group.duties, duty)
+        group.longest = max(group.longest, duty[1] - duty[0])
+
+    @staticmethod
+    def _remove_from_group(group: _Group, duty: Duty) -> None:
+        i = bisect_left(group.duties, duty)
+        if i < len(group.duties) and group.duties[i] == duty:
+            del group.duties[i]
+
+    def is_free(self, crew_id: int, start: datetime, end: datetime) -> bool:
+        slot = self._crew.get(crew_id)
+        if slot is None or not slot.covers(start, end):
+            return False
+        own = self._by_crew.get(crew_id, ())
+        # Duties of one crew member never overlap each other, so only the one starting just before can reach in
+        i = bisect_left(own, end, key=_start)
+        return i == 0 or own[i - 1][1] <= start
+
+    def available(
+        self, start: datetime, end: datetime, rank: Optional[str] = None, base: Optional[str] = None
+    ) -> List[int]:
+        """Crew ids available for [start, end) and not rostered on an overlapping duty, in id order."""
+        free: List[int] = []
+        for (group_rank, group_base), group in self._groups.items():
+            if (rank is not None and group_rank != rank) or (base is not None and group_base != base):
+                continue
+            busy = group.busy(start, end)
+            free.extend(c for c in group.members if c not in busy and self._crew[c].covers(start, end))
+        free.sort()
+        return free
@@ -0,0 +1,167 @@
+# Decomposed rostering: split one RosteringProblem into independent subproblems (per crew base,
+# or per fleet), solve them in a process pool, then fill what they left open from any crew in a
+# final pass. Workers read the problem from one shared-memory block holding its arrays, so only
+# index arrays and results cross process boundaries.
+#
+# By base, crew go to their base and a flight to the base at either end of it: both legs of an
+# out-and-back to an outstation stay together. Flights between two bases (or two outstations) are
+# left to the final pass, which sees every crew member's duties so far: solved per departure
+# base, they strand the crew at the other base and cost a deadhead home. By fleet, flights go by
+# aircraft type and crew by their first type rating; crew with none only join the final pass.
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.domain.services.rostering_service import POSITIONS, RosteringProblem, RosteringResult, RosteringService
+
+BY_BASE, BY_FLEET = "base", "aircraft_type"
+_ALIGN = 64
+
+
+class SharedArrays:
+    """Named numpy arrays packed into one shared-memory block."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.layout: Dict[str, Tuple[int, str, Tuple[int, ...]]] = {}
+        offset = 0
+        for name, a in arrays.items():
+            self.layout[name] = (offset, a.dtype.str, a.shape)
+            offset += -(-a.nbytes // _ALIGN) * _ALIGN
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, view in self.views(self.shm, self.layout).items():
+            view[...] = arrays[name]
+
+    @property
+    def spec(self) -> Tuple[str, Dict[str, Tuple[int, str, Tuple[int, ...]]]]:
+        return self.shm.name, self.layout
+
+    @staticmethod
+    def views(shm: shared_memory.SharedMemory, layout) -> Dict[str, np.ndarray]:
+        return {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (offset, dtype, shape) in layout.items()
+        }
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+@dataclass
+class PartitionTiming:
+    key: str
+    flights: int
+    crew: int
+    positions: int
+    filled: int
+    solve_ms: float
+
+
+@dataclass
+class DecomposedResult:
+    result: RosteringResult  # indices into the full problem
+    partitions: List[PartitionTiming] = field(default_factory=list)
+    final_pass: Optional[PartitionTiming] = None
+    workers: int = 0
+    wall_ms: float = 0.0
+
+    @property
+    def partition_ms(self) -> float:
+        return sum(p.solve_ms for p in self.partitions)
+
+
+def partition(problem: RosteringProblem, by: str = BY_BASE) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """(keys, partition index per flight, per crew member); -1 means the final pass only."""
+    if by == BY_BASE:
+        bases = np.unique(problem.base)
+        lookup = np.full(len(problem.airports), -1, dtype=np.int64)
+        lookup[bases] = np.arange(len(bases))
+        dep, arr = lookup[problem.dep], lookup[problem.arr]
+        flight_part = np.where((dep >= 0) != (arr >= 0), np.maximum(dep, arr), -1)
+        return [problem.airports[b] for b in bases], flight_part, lookup[problem.base]
+    if by == BY_FLEET:
+        lowest = problem.quals & -problem.quals
+        # Lowest set bit: the first type rating; 0 (none) stays -1 and is kept out of the log
+        first = np.where(lowest > 0, np.log2(np.maximum(lowest, 1).astype(float)).astype(np.int64), -1)
+        return list(problem.aircraft_types), problem.aircraft.astype(np.int64), first
+    raise ValueError(f"unknown partitioning {by!r}")
+
+
+_shared: Dict[str, object] = {}
+
+
+def _attach(spec, meta) -> None:
+    name, layout = spec
+    shm = shared_memory.SharedMemory(name=name)
+    _shared.update(shm=shm, problem=RosteringProblem.from_arrays(SharedArrays.views(shm, layout), meta))
+
+
+def _solve_partition(flight_idx: np.ndarray, crew_idx: np.ndarray, wave_hours: float) -> Tuple[RosteringResult, float]:
+    started = time.perf_counter()
+    result = RosteringService(wave_hours).solve(_shared["problem"].subset(flight_idx, crew_idx))
+    return result, (time.perf_counter() - started) * 1000
+
+
+def solve_decomposed(
+    problem: RosteringProblem,
+    by: str = BY_BASE,
+    workers: int = 4,
+    wave_hours: float = 4.0,
+) -> DecomposedResult:
+    """Solve per partition (in `workers` processes; 0 solves them in this process), then fill across."""
+    started = time.perf_counter()
+    keys, flight_part, crew_part = partition(problem, by)
+    jobs = [
+        (key, np.flatnonzero(flight_part == k), np.flatnonzero(crew_part == k))
+        for k, key in enumerate(keys)
+    ]
+    # Largest first, so the pool is not left waiting on one big partition at the end
+    jobs = [j for j in jobs if len(j[1])]
+    jobs.sort(key=lambda j: len(j[1]) * max(len(j[2]), 1), reverse=True)
+
+    if workers > 0 and len(jobs) > 1:
+        shared = SharedArrays(problem.arrays())
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shared.spec, problem.meta)) as pool:
+                futures = [pool.submit(_solve_partition, f, c, wave_hours) for _, f, c in jobs]
+                solved = [future.result() for future in futures]
+        finally:
+            shared.close()
+    else:
+        service = RosteringService(wave_hours)
+        solved = []
+        for _, f, c in jobs:
+            t0 = time.perf_counter()
+            solved.append((service.solve(problem.subset(f, c)), (time.perf_counter() - t0) * 1000))
+
+    # Back to full-problem indices; flights no partition took start out open
+    parts, timings = [], []
+    month_hours = problem.month_hours.astype(float, copy=True)
+    for (key, f, c), (result, ms) in zip(jobs, solved):
+        month_hours[c] = result.month_hours
+        parts.append(result.remap(f, c))
+        timings.append(PartitionTiming(key, len(f), len(c), len(f) * len(POSITIONS), len(result.flight), round(ms, 2)))
+    orphans = np.flatnonzero(flight_part < 0)
+    parts.append(RosteringResult(unfilled=np.column_stack([
+        np.repeat(orphans, len(POSITIONS)), np.tile(np.arange(len(POSITIONS)), len(orphans)),
+    ]).astype(np.int64)))
+    combined = RosteringResult.concat(parts)
+    combined.month_hours = month_hours
+
+    t0 = time.perf_counter()
+    filled = RosteringService(wave_hours).fill(problem, combined)
+    final_ms = (time.perf_counter() - t0) * 1000
+    final = RosteringResult.concat([combined, filled])
+    final.unfilled = filled.unfilled
+    final.month_hours = filled.month_hours
+    return DecomposedResult(
+        final, timings,
+        PartitionTiming("final pass", len(np.unique(combined.unfilled[:, 0])), len(problem.crew_ids),
+                        len(combined.unfilled), len(filled.flight), round(final_ms, 2)),
+        workers if workers > 0 and len(jobs) > 1 else 0,
+        round((time.perf_counter() - started) * 1000, 2),
+    )
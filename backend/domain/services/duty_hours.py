@@ -0,0 +1,59 @@
+# Monthly duty and flight hours per crew member as O(1) lookups, for limit checks while solving.
+# Loaded from the crew_month_hours summary that migration 0010 keeps in step with rosters; `add`
+# books a tentative assignment so later checks in the same solve see it. A duty counts toward
+# the month it starts in, as in the summary.
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, Tuple
+
+MONTHLY_DUTY_LIMIT_H = 190.0
+MONTHLY_FLIGHT_LIMIT_H = 100.0
+
+MonthRow = Tuple[int, date, float, float, int]  # (crew_id, month, duty_hours, flight_hours, duties)
+
+
+def month_of(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+@dataclass
+class MonthHours:
+    duty_hours: float = 0.0
+    flight_hours: float = 0.0
+    duties: int = 0
+
+
+_NONE = MonthHours()
+
+
+class DutyHoursLedger:
+    def __init__(self, rows: Iterable[MonthRow] = ()):
+        self._hours: Dict[Tuple[int, date], MonthHours] = {
+            (crew_id, month): MonthHours(duty_hours, flight_hours, duties)
+            for crew_id, month, duty_hours, flight_hours, duties in rows
+        }
+
+    def __len__(self) -> int:
+        return len(self._hours)
+
+    def get(self, crew_id: int, month: date) -> MonthHours:
+        return self._hours.get((crew_id, month), _NONE)
+
+    def duty_hours(self, crew_id: int, month: date) -> float:
+        return self.get(crew_id, month).duty_hours
+
+    def remaining_duty(self, crew_id: int, month: date, limit: float = MONTHLY_DUTY_LIMIT_H) -> float:
+        return limit - self.get(crew_id, month).duty_hours
+
+    def fits(self, crew_id: int, start: datetime, duty_hours: float, flight_hours: float = 0.0) -> bool:
+        used = self.get(crew_id, month_of(start))
+        return (
+            used.duty_hours + duty_hours <= MONTHLY_DUTY_LIMIT_H
+            and used.flight_hours + flight_hours <= MONTHLY_FLIGHT_LIMIT_H
+        )
+
+    def add(self, crew_id: int, start: datetime, duty_hours: float, flight_hours: float = 0.0) -> None:
+        hours = self._hours.setdefault((crew_id, month_of(start)), MonthHours())
+        hours.duty_hours += duty_hours
+        hours.flight_hours += flight_hours
+        hours.duties += 1
@@ -0,0 +1,158 @@
+# Biomathematical fatigue score for every crew member in one vectorised pass over their duty history.
+# Three components, each from the duties before `as_of`:
+#   sleep opportunity: rest before a duty, less the commute/wind-down overhead, short of a full sleep
+#     is debt, which recovers exponentially once the duty is over
+#   time of day: hours worked in the window of circadian low (02:00-06:00 network local time),
+#     decaying more slowly than sleep debt
+#   cumulative duty: duty hours in the last 7 and 28 days against the FDTL limits
+# Their weighted sum is a load; fatigue_score = 1 - exp(-load) stays in [0, 1) and reaches
+# recovery_service.MAX_FATIGUE when both cumulative limits are hit. Duties after `as_of` only
+# feed predicted_availability, the share of next week's duty allowance still free, discounted by fatigue.
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+SLEEP_NEED_H = 8.0
+SLEEP_OVERHEAD_H = 2.0
+FIRST_REST_H = 48.0  # rest assumed before the first duty in the history
+SLEEP_DEBT_DECAY_H = 36.0
+WOCL_START_H, WOCL_LEN_H = 2.0, 4.0
+WOCL_DECAY_H = 72.0
+NETWORK_UTC_OFFSET_H = 5.5  # duty times are UTC; the window of circadian low is in local time
+DUTY_LIMIT_7D_H = 60.0
+DUTY_LIMIT_28D_H = 190.0
+OPEN_DUTY_H = 14.0  # assumed length of a duty with no end yet
+
+SLEEP_WEIGHT = 0.5
+WOCL_WEIGHT = 0.3
+DUTY_7D_WEIGHT = 1.2
+DUTY_28D_WEIGHT = 0.6
+
+# Duty history needed to score at `as_of`: the 28-day window, a day for duties already under way, a week ahead
+HISTORY_BEFORE = timedelta(days=29)
+HISTORY_AFTER = timedelta(days=7)
+
+DutyRow = Tuple[int, int, datetime, Optional[datetime]]  # (crew_id, flight_id, duty_start, duty_end)
+
+
+@dataclass
+class DutyHistory:
+    """Duties as parallel arrays, sorted by (crew, start); times are hours relative to `as_of`."""
+
+    as_of: datetime
+    crew_ids: np.ndarray  # one entry per scored crew member, sorted
+    crew: np.ndarray  # per duty: index into crew_ids
+    flight_ids: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls,
+        as_of: datetime,
+        duty_crew: np.ndarray,
+        flight_ids: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray,
+        crew_ids: Optional[Sequence[int]] = None,
+    ) -> "DutyHistory":
+        """Duties of crew outside `crew_ids` (when given) are dropped; crew without duties still get a score.
+
+        `start`/`end` are hours relative to `as_of`; NaN ends are open duties.
+        """
+        duty_crew = np.asarray(duty_crew, dtype=np.int64)
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        end = np.where(np.isnan(end), start + OPEN_DUTY_H, end)
+        ids = np.unique(duty_crew if crew_ids is None else np.asarray(crew_ids, dtype=np.int64))
+        crew = np.searchsorted(ids, duty_crew)
+        known = crew < len(ids)
+        known[known] = ids[crew[known]] == duty_crew[known]
+        crew, start, end = crew[known], start[known], end[known]
+        order = np.lexsort((start, crew))
+        return cls(as_of, ids, crew[order], np.asarray(flight_ids, dtype=np.int64)[known][order], start[order], end[order])
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[DutyRow], as_of: datetime, crew_ids: Optional[Sequence[int]] = None) -> "DutyHistory":
+        n = len(rows)
+        origin = np.datetime64(as_of, "s")
+        hour = np.timedelta64(3600, "s")
+        return cls.from_arrays(
+            as_of,
+            np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+            np.fromiter((r[1] for r in rows), dtype=np.int64, count=n),
+            (np.array([r[2] for r in rows], dtype="datetime64[s]") - origin) / hour,
+            (np.array([r[3] for r in rows], dtype="datetime64[s]") - origin) / hour,
+            crew_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+@dataclass
+class FatigueScores:
+    crew_ids: np.ndarray
+    fatigue: np.ndarray
+    predicted_availability: np.ndarray
+    utilization: np.ndarray  # 28-day duty hours over the limit
+    flight_ids: np.ndarray  # upcoming flights in the history
+    flight_utilization: np.ndarray  # mean utilization of the crew rostered on each
+
+
+def _wocl_hours_before(t: np.ndarray) -> np.ndarray:
+    # Hours of window of circadian low in (-inf, t], up to a constant; local time t is in hours since midnight
+    return WOCL_LEN_H * np.floor(t / 24.0) + np.clip(np.mod(t, 24.0) - WOCL_START_H, 0.0, WOCL_LEN_H)
+
+
+def _overlap(start: np.ndarray, end: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    return np.clip(np.minimum(end, hi) - np.maximum(start, lo), 0.0, None)
+
+
+def compute_fatigue(history: DutyHistory, utc_offset_h: float = NETWORK_UTC_OFFSET_H) -> FatigueScores:
+    n = len(history.crew_ids)
+    c, s, e = history.crew, history.start, history.end
+
+    def per_crew(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(c, weights=weights, minlength=n)
+
+    # Rest before each duty: since the previous duty of the same crew member
+    first = np.ones(len(c), dtype=bool)
+    first[1:] = c[1:] != c[:-1]
+    prev_end = np.concatenate(([0.0], e[:-1]))
+    rest = np.where(first, FIRST_REST_H, s - prev_end)
+    debt = SLEEP_NEED_H - np.clip(rest - SLEEP_OVERHEAD_H, 0.0, SLEEP_NEED_H)
+
+    started = s < 0.0
+    worked_end = np.minimum(e, 0.0)  # an ongoing duty counts up to now
+    age = -worked_end
+    sleep_load = per_crew(np.where(started, debt * np.exp(-age / SLEEP_DEBT_DECAY_H), 0.0)) / SLEEP_NEED_H
+
+    midnight = history.as_of.replace(hour=0, minute=0, second=0, microsecond=0)
+    shift = (history.as_of - midnight).total_seconds() / 3600.0 + utc_offset_h
+    wocl = _wocl_hours_before(worked_end + shift) - _wocl_hours_before(s + shift)
+    wocl_load = per_crew(np.where(started, wocl * np.exp(-age / WOCL_DECAY_H), 0.0)) / WOCL_LEN_H
+
+    duty_7d = per_crew(_overlap(s, e, -7 * 24.0, 0.0))
+    duty_28d = per_crew(_overlap(s, e, -28 * 24.0, 0.0))
+    ahead_7d = per_crew(_overlap(s, e, 0.0, 7 * 24.0))
+
+    load = (
+        SLEEP_WEIGHT * sleep_load
+        + WOCL_WEIGHT * wocl_load
+        + DUTY_7D_WEIGHT * duty_7d / DUTY_LIMIT_7D_H
+        + DUTY_28D_WEIGHT * duty_28d / DUTY_LIMIT_28D_H
+    )
+    fatigue = 1.0 - np.exp(-load)
+    availability = np.clip(1.0 - ahead_7d / DUTY_LIMIT_7D_H, 0.0, 1.0) * (1.0 - fatigue)
+    utilization = duty_28d / DUTY_LIMIT_28D_H
+
+    upcoming = e > 0.0
+    flight_ids, flight_index = np.unique(history.flight_ids[upcoming], return_inverse=True)
+    totals = np.bincount(flight_index, weights=utilization[c[upcoming]], minlength=len(flight_ids))
+    counts = np.bincount(flight_index, minlength=len(flight_ids))
+    return FatigueScores(
+        history.crew_ids, fatigue, availability, utilization, flight_ids, totals / np.maximum(counts, 1)
+    )
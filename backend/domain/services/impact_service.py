@@ -0,0 +1,155 @@
+# Knock-on effect of a disruption: flights are linked by the aircraft that flies them next
+# (rotation) and by the next duty of each crew member on board (connection, or a rest period).
+# A delay travels along a link minus the slack it has, so it dies out where the schedule absorbs it.
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.domain.duty_limits import MIN_REST, MIN_TURNAROUND
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+
+# Minutes of delay assumed for a disrupted flight when the caller does not give one
+SEVERITY_DELAY_MIN = {"low": 30.0, "medium": 90.0, "high": 180.0}
+
+ROTATION, CONNECTION, REST = "rotation", "connection", "rest"
+
+
+@dataclass(frozen=True)
+class ImpactLink:
+    to_index: int
+    kind: str
+    slack_min: float
+    crew_id: Optional[int] = None
+
+
+@dataclass
+class ImpactResult:
+    delays: Dict[int, float] = field(default_factory=dict)  # flight id -> propagated delay, minutes
+    depth: Dict[int, int] = field(default_factory=dict)
+    via: Dict[int, Tuple[int, str]] = field(default_factory=dict)  # flight id -> (upstream flight id, link kind)
+    crew_ids: Set[int] = field(default_factory=set)
+    roster_ids: Set[int] = field(default_factory=set)
+    truncated: bool = False  # a delay was still alive at max_depth
+
+
+def _minutes(delta: timedelta) -> float:
+    return delta.total_seconds() / 60.0
+
+
+class ImpactGraph:
+    """Flights in a time window as nodes (by list index), links built once, then queried many times."""
+
+    def __init__(
+        self,
+        flights: Iterable[Flight],
+        rosters: Iterable[Roster],
+        min_turnaround: timedelta = MIN_TURNAROUND,
+        min_rest: timedelta = MIN_REST,
+    ):
+        self.flights: List[Flight] = sorted(
+            (f for f in flights if f.scheduled_departure is not None), key=lambda f: f.scheduled_departure
+        )
+        self.index: Dict[int, int] = {f.id: i for i, f in enumerate(self.flights)}
+        self.links: List[List[ImpactLink]] = [[] for _ in self.flights]
+        self.rosters_by_flight: List[List[Roster]] = [[] for _ in self.flights]
+
+        by_tail: Dict[str, List[int]] = {}
+        for i, f in enumerate(self.flights):
+            if f.aircraft_registration:
+                by_tail.setdefault(f.aircraft_registration, []).append(i)
+        for legs in by_tail.values():
+            for a, b in zip(legs, legs[1:]):
+                ground = self.flights[b].scheduled_departure - self._arrival(a)
+                self.links[a].append(ImpactLink(b, ROTATION, _minutes(ground - min_turnaround)))
+
+        by_crew: Dict[int, List[Roster]] = {}
+        for r in rosters:
+            i = self.index.get(r.flight_id)
+            if i is None or r.status == "cancelled":
+                continue
+            self.rosters_by_flight[i].append(r)
+            by_crew.setdefault(r.crew_id, []).append(r)
+        for crew_id, duties in by_crew.items():
+            duties.sort(key=lambda r: self._duty_start(r))
+            for a, b in zip(duties, duties[1:]):
+                gap = self._duty_start(b) - self._duty_end(a)
+                # Within a duty the whole sit absorbs delay; across a rest only the excess over the minimum does
+                kind, slack = (REST, gap - min_rest) if gap >= min_rest else (CONNECTION, gap)
+                self.links[self.index[a.flight_id]].append(
+                    ImpactLink(self.index[b.flight_id], kind, _minutes(slack), crew_id)
+                )
+
+    def _arrival(self, i: int) -> datetime:
+        f = self.flights[i]
+        return f.scheduled_arrival or f.scheduled_departure
+
+    def _duty_start(self, r: Roster) -> datetime:
+        return r.duty_start or r.report_time or self.flights[self.index[r.flight_id]].scheduled_departure
+
+    def _duty_end(self, r: Roster) -> datetime:
+        return r.duty_end or r.release_time or self._arrival(self.index[r.flight_id])
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def propagate(
+        self,
+        seed_flight_ids: Iterable[int],
+        delay_min: float,
+        max_depth: int = 6,
+        horizon: Optional[timedelta] = None,
+    ) -> ImpactResult:
+        """Bounded BFS from the seed flights, keeping the largest delay that reaches each flight."""
+        result = ImpactResult()
+        best: Dict[int, float] = {}
+        queue: Deque[Tuple[int, int]] = deque()
+        for fid in seed_flight_ids:
+            i = self.index.get(fid)
+            if i is not None and delay_min > best.get(i, 0.0):
+                best[i] = delay_min
+                result.depth[fid] = 0
+                queue.append((i, 0))
+        if not queue:
+            return result
+        cutoff = None
+        if horizon is not None:
+            cutoff = min(self.flights[i].scheduled_departure for i in best) + horizon
+
+        while queue:
+            i, depth = queue.popleft()
+            delay = best[i]
+            for link in self.links[i]:
+                # Negative slack is a plan that is already tight; it passes the delay on, it does not grow it
+                passed = delay - max(link.slack_min, 0.0)
+                if passed <= 0 or passed <= best.get(link.to_index, 0.0):
+                    continue
+                target = self.flights[link.to_index]
+                if cutoff is not None and target.scheduled_departure > cutoff:
+                    continue
+                if depth + 1 > max_depth:
+                    result.truncated = True
+                    continue
+                best[link.to_index] = passed
+                result.depth[target.id] = depth + 1
+                result.via[target.id] = (self.flights[i].id, link.kind)
+                queue.append((link.to_index, depth + 1))
+
+        for i, delay in best.items():
+            flight = self.flights[i]
+            result.delays[flight.id] = round(delay, 1)
+            for r in self.rosters_by_flight[i]:
+                result.crew_ids.add(r.crew_id)
+                result.roster_ids.add(r.id)
+        return result
+
+    def apply(self, result: ImpactResult) -> List[Flight]:
+        """The affected flights with disruption_impact set to their propagated delay in minutes."""
+        affected = []
+        for fid, delay in result.delays.items():
+            flight = self.flights[self.index[fid]]
+            flight.disruption_impact = delay
+            affected.append(flight)
+        affected.sort(key=lambda f: f.scheduled_departure)
+        return affected
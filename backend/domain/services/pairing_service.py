@@ -0,0 +1,287 @@
+# Crew pairings: trips of one or more duties that start and end at a crew base. Flights are the
+# nodes of a time-expanded connection graph. A sit arc joins a flight to a later departure of the
+# same fleet from the airport it lands at, inside one duty: at least MIN_TURNAROUND on the same
+# aircraft, MIN_CONNECTION when changing aircraft, at most MAX_SIT. A rest arc joins it to one at
+# least MIN_REST and at most MAX_REST (a layover) from release to report. Both keep only the
+# earliest few successors. Pairings are enumerated breadth-first over the graph, one leg per
+# level, with every partial trip as a row of arrays; a partial trip is dropped as soon as it
+# breaks the duty period limit or runs out of legs or duties, and kept as a pairing whenever it
+# is back at its base. The PairingSet is the column set a cover and the crew assignment choose
+# from (select, RosteringService.assign_pairings).
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.domain.services.rostering_service import (
+    MAX_DUTY_PERIOD_H,
+    MIN_REST_H,
+    MIN_TURNAROUND_H,
+    RELEASE_H,
+    REPORT_H,
+    RosteringProblem,
+)
+
+MIN_CONNECTION = timedelta(minutes=45)  # changing aircraft; staying on one needs MIN_TURNAROUND
+MAX_SIT = timedelta(hours=4)  # longer on the ground is a rest or nothing
+MAX_REST = timedelta(hours=30)  # longest layover worth building
+MAX_DUTIES = 3
+MAX_LEGS_PER_DUTY = 4
+MAX_SIT_ARCS = 2
+MAX_REST_ARCS = 1
+LAYOVER_WEIGHT = 0.25  # per hour away from base between duties, against one idle duty hour
+
+_H = 3600.0
+MIN_CONNECTION_H = MIN_CONNECTION.total_seconds() / _H
+
+
+@dataclass
+class ConnectionGraph:
+    # CSR adjacency over flight indices, earliest departure first: flight i's sit successors are
+    # sit_to[sit_ptr[i]:sit_ptr[i + 1]], its rest successors rest_to[rest_ptr[i]:rest_ptr[i + 1]]
+    sit_ptr: np.ndarray
+    sit_to: np.ndarray
+    rest_ptr: np.ndarray
+    rest_to: np.ndarray
+
+    @property
+    def arcs(self) -> int:
+        return len(self.sit_to) + len(self.rest_to)
+
+    @classmethod
+    def build(
+        cls, problem: RosteringProblem, max_sit_h: float, max_rest_h: float, max_sit_arcs: int, max_rest_arcs: int,
+    ) -> "ConnectionGraph":
+        p = problem
+        n = len(p.flight_ids)
+        if not n:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(np.zeros(1, dtype=np.int64), empty, np.zeros(1, dtype=np.int64), empty)
+        # Departures sorted by (airport, fleet, time) on one float key, so each flight's successor
+        # window is two searchsorted calls; `span` keeps the (airport, fleet) groups apart
+        origin = p.dep_h.min()
+        span = p.arr_h.max() - origin + max_rest_h + REPORT_H + RELEASE_H + 1.0
+        n_types = max(len(p.aircraft_types), 1)
+        dep_key = (p.dep.astype(np.int64) * n_types + p.aircraft) * span + (p.dep_h - origin)
+        order = np.argsort(dep_key, kind="stable")
+        keys = dep_key[order]
+        landed = (p.arr.astype(np.int64) * n_types + p.aircraft) * span + (p.arr_h - origin)
+
+        def arcs(lo_h: float, hi_h: float) -> Tuple[np.ndarray, np.ndarray]:
+            lo = np.searchsorted(keys, landed + lo_h, side="left")
+            hi = np.searchsorted(keys, landed + hi_h, side="right")
+            return _expand(lo, hi, order)
+
+        src, dst = arcs(MIN_TURNAROUND_H, max_sit_h)
+        gap = p.dep_h[dst] - p.arr_h[src]
+        same_tail = (p.tail[src] == p.tail[dst]) & (p.tail[src] >= 0)
+        keep = (gap >= MIN_CONNECTION_H) | same_tail
+        sit_ptr, sit_to = _csr(src[keep], dst[keep], n, max_sit_arcs)
+
+        between = REPORT_H + RELEASE_H  # departure - arrival = rest + release + report
+        src, dst = arcs(MIN_REST_H + between, max_rest_h + between)
+        rest_ptr, rest_to = _csr(src, dst, n, max_rest_arcs)
+        return cls(sit_ptr, sit_to, rest_ptr, rest_to)
+
+
+@dataclass
+class PairingSet:
+    # Pairing i flies legs[ptr[i]:ptr[i + 1]] (flight indices, in order). Per pairing: base
+    # airport and fleet indices, first report and last release, hours on duty and in the air,
+    # number of duties, cost (idle duty hours plus weighted layover hours)
+    ptr: np.ndarray
+    legs: np.ndarray
+    base: np.ndarray
+    aircraft: np.ndarray
+    start_h: np.ndarray
+    end_h: np.ndarray
+    duty_h: np.ndarray
+    block_h: np.ndarray
+    duties: np.ndarray
+    cost: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @property
+    def n_legs(self) -> np.ndarray:
+        return np.diff(self.ptr)
+
+    def flights_of(self, i: int) -> np.ndarray:
+        return self.legs[self.ptr[i]:self.ptr[i + 1]]
+
+    def legs_of(self, pairings: np.ndarray) -> np.ndarray:
+        """Positions in `legs` of every leg of `pairings`, pairing by pairing."""
+        return _ranges(self.ptr[pairings], self.ptr[pairings + 1])
+
+    def duty_spans(
+        self, problem: RosteringProblem, pairings: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Per leg of `pairings` (in legs_of order): the flight, the start of its duty period and
+        its own duty span, from report (or the previous leg's release in the same duty: time sat
+        between legs is duty time) to release. The spans of a pairing add up to its duty_h.
+
+        Derived rather than stored, as only the pairings a solve picks need them: legs a rest
+        apart are in different duties, and sit arcs are always shorter than a rest.
+        """
+        p = problem
+        n_legs = self.n_legs[pairings]
+        flights = self.legs[self.legs_of(pairings)]
+        report, release = p.dep_h[flights] - REPORT_H, p.arr_h[flights] + RELEASE_H
+        previous = np.roll(release, 1)
+        new_duty = report - previous >= MIN_REST_H
+        new_duty[(np.cumsum(n_legs) - n_legs)[n_legs > 0]] = True
+        period = report[np.maximum.accumulate(np.where(new_duty, np.arange(len(flights)), 0))]
+        return flights, period, np.where(new_duty, report, previous), release
+
+    def select(self, n_flights: int) -> np.ndarray:
+        """Pairings covering each flight at most once, greedily by cost per leg (then longest).
+
+        A set-partitioning heuristic: the flights it leaves uncovered are the ones no remaining
+        pairing can take without flying something twice.
+        """
+        order = np.lexsort((-self.n_legs, self.cost / np.maximum(self.n_legs, 1)))
+        covered = np.zeros(n_flights, dtype=bool)
+        chosen: List[int] = []
+        ptr, legs = self.ptr, self.legs
+        for i in order.tolist():
+            flights = legs[ptr[i]:ptr[i + 1]]
+            if not covered[flights].any():
+                covered[flights] = True
+                chosen.append(i)
+                if covered.all():
+                    break
+        return np.array(sorted(chosen), dtype=np.int64)
+
+
+class PairingGenerator:
+    def __init__(
+        self,
+        max_duties: int = MAX_DUTIES,
+        max_legs_per_duty: int = MAX_LEGS_PER_DUTY,
+        max_sit: timedelta = MAX_SIT,
+        max_rest: timedelta = MAX_REST,
+        max_sit_arcs: int = MAX_SIT_ARCS,
+        max_rest_arcs: int = MAX_REST_ARCS,
+    ):
+        self.max_duties = max_duties
+        self.max_legs_per_duty = max_legs_per_duty
+        self.max_sit_h = max_sit.total_seconds() / _H
+        self.max_rest_h = max_rest.total_seconds() / _H
+        self.max_sit_arcs = max_sit_arcs
+        self.max_rest_arcs = max_rest_arcs
+
+    def graph(self, problem: RosteringProblem) -> ConnectionGraph:
+        return ConnectionGraph.build(problem, self.max_sit_h, self.max_rest_h, self.max_sit_arcs, self.max_rest_arcs)
+
+    def generate(
+        self, problem: RosteringProblem, bases: Optional[Sequence[int]] = None, graph: Optional[ConnectionGraph] = None,
+    ) -> PairingSet:
+        """Every legal pairing from `bases` (airport indices; default: the crew's bases)."""
+        p = problem
+        graph = graph or self.graph(p)
+        is_base = np.zeros(len(p.airports), dtype=bool)
+        is_base[np.unique(p.base) if bases is None else np.asarray(bases, dtype=np.int64)] = True
+        report, release, block = p.dep_h - REPORT_H, p.arr_h + RELEASE_H, p.arr_h - p.dep_h
+
+        first = np.flatnonzero(is_base[p.dep] & (release - report <= MAX_DUTY_PERIOD_H))
+        ones = np.ones(len(first), dtype=np.int64)
+        frontier = {
+            "node": np.arange(len(first)), "flight": first, "base": p.dep[first].astype(np.int64),
+            "first": report[first], "period": report[first], "legs_in_duty": ones, "duties": ones, "legs": ones,
+            "worked": np.zeros(len(first)), "block": block[first],
+        }
+        # Every partial trip is a node: its last flight and the node before it (-1: first leg)
+        tree = {"flight": [first.astype(np.int32)], "parent": [np.full(len(first), -1, dtype=np.int32)]}
+        n_nodes = len(first)
+        found: List[Dict[str, np.ndarray]] = []
+
+        while len(frontier["node"]):
+            f = frontier
+            home = p.arr[f["flight"]] == f["base"]
+            if home.any():
+                found.append({key: values[home] for key, values in f.items()})
+
+            # Sit: the next leg in the same duty, if the duty period stays within the limit
+            src, dst = _follow(graph.sit_ptr, graph.sit_to, f["flight"], f["legs_in_duty"] < self.max_legs_per_duty)
+            ok = release[dst] - f["period"][src] <= MAX_DUTY_PERIOD_H
+            sit_src, sit_dst = src[ok], dst[ok]
+            # Rest: a layover away from base, then a new duty
+            src, dst = _follow(graph.rest_ptr, graph.rest_to, f["flight"], (f["duties"] < self.max_duties) & ~home)
+            ok = release[dst] - report[dst] <= MAX_DUTY_PERIOD_H
+            rest_src, rest_dst = src[ok], dst[ok]
+
+            src, dst = np.concatenate([sit_src, rest_src]), np.concatenate([sit_dst, rest_dst])
+            rested = np.arange(len(src)) >= len(sit_src)
+            period = np.where(rested, report[dst], f["period"][src])
+            frontier = {
+                "node": n_nodes + np.arange(len(src)),
+                "flight": dst,
+                "base": f["base"][src],
+                "first": f["first"][src],
+                "period": period,
+                "legs_in_duty": np.where(rested, 1, f["legs_in_duty"][src] + 1),
+                "duties": f["duties"][src] + rested,
+                "legs": f["legs"][src] + 1,
+                "worked": f["worked"][src] + np.where(rested, release[f["flight"][src]] - f["period"][src], 0.0),
+                "block": f["block"][src] + block[dst],
+            }
+            tree["flight"].append(dst.astype(np.int32))
+            tree["parent"].append(f["node"][src].astype(np.int32))
+            n_nodes += len(src)
+
+        done = {key: np.concatenate([d[key] for d in found]) if found else np.zeros(0, dtype=values.dtype)
+                for key, values in frontier.items()}
+        return _pairing_set(p, done, {key: np.concatenate(values) for key, values in tree.items()}, release)
+
+
+def _pairing_set(
+    p: RosteringProblem, done: Dict[str, np.ndarray], tree: Dict[str, np.ndarray], release: np.ndarray,
+) -> PairingSet:
+    n_legs = done["legs"]
+    ptr = np.concatenate([[0], np.cumsum(n_legs)]).astype(np.int64)
+    legs = np.zeros(int(ptr[-1]), dtype=np.int32)
+    # Walk each pairing's nodes back to its first leg, filling its legs from the last
+    node = done["node"].copy()
+    for back in range(int(n_legs.max(initial=0))):
+        active = n_legs > back
+        legs[ptr[:-1][active] + n_legs[active] - 1 - back] = tree["flight"][node[active]]
+        node[active] = tree["parent"][node[active]]
+
+    end_h = release[done["flight"]]
+    duty_h = done["worked"] + end_h - done["period"]
+    layover_h = end_h - done["first"] - duty_h
+    return PairingSet(
+        ptr=ptr, legs=legs, base=done["base"], aircraft=p.aircraft[done["flight"]].astype(np.int64),
+        start_h=done["first"], end_h=end_h, duty_h=duty_h, block_h=done["block"], duties=done["duties"],
+        cost=duty_h - done["block"] + LAYOVER_WEIGHT * layover_h,
+    )
+
+
+def _ranges(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """lo[0]..hi[0]-1, lo[1]..hi[1]-1, ... as one array."""
+    counts = hi - lo
+    return np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+
+
+def _expand(lo: np.ndarray, hi: np.ndarray, order: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(source, target) for every target order[lo[i]:hi[i]] of each source i."""
+    hi = np.maximum(hi, lo)
+    return np.repeat(np.arange(len(lo)), hi - lo), order[_ranges(lo, hi)]
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int, cap: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Arcs sorted by source (and, within one, earliest first) as CSR, keeping `cap` per source."""
+    rank = np.arange(len(src)) - np.searchsorted(src, src, side="left")
+    keep = rank < cap
+    src, dst = src[keep], dst[keep]
+    ptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))]).astype(np.int64)
+    return ptr, dst.astype(np.int64)
+
+
+def _follow(ptr: np.ndarray, to: np.ndarray, flights: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(row, successor) for every arc out of flights[row] where mask[row]."""
+    rows = np.flatnonzero(mask)
+    lo, hi = ptr[flights[rows]], ptr[flights[rows] + 1]
+    return np.repeat(rows, hi - lo), to[_ranges(lo, hi)]
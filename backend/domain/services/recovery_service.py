@@ -0,0 +1,214 @@
+# Recovery mode for rostering: fill open positions (sick crew, a weather diversion) from the crew
+# who are available right now, without re-optimising the whole roster.
+# Each position keeps only its cheapest feasible candidates (a sparse cost matrix); the
+# candidate columns plus one "leave unfilled" column per position are then solved as a
+# rectangular assignment. Alternatives come from re-solving with one chosen pair forbidden.
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.domain.airports import distance_km
+from backend.domain.duty_limits import RELEASE_AFTER, REPORT_BEFORE
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.services.assignment import solve_assignment
+from backend.domain.services.duty_hours import MONTHLY_DUTY_LIMIT_H, DutyHoursLedger, month_of
+
+RANK_FOR_POSITION = {"captain": "CAPTAIN", "first_officer": "FIRST_OFFICER", "flight_attendant": "FLIGHT_ATTENDANT"}
+COCKPIT = {"captain", "first_officer"}
+
+MAX_FATIGUE = 0.8  # fatigue_score is 0 (rested) .. 1
+
+# Cost weights: roughly "points per unit", so one positioning hour of flying ~ one point
+DISTANCE_WEIGHT = 1 / 750.0  # per km of deadheading
+UNKNOWN_DISTANCE_COST = 2.0
+UNRATED_COST = 1.0  # no recorded qualifications (or cabin crew off their usual type)
+HEADROOM_WEIGHT = 4.0  # times duty hours / remaining monthly hours
+FATIGUE_WEIGHT = 3.0
+UNFILLED_COST = 1e4
+
+
+@dataclass(frozen=True)
+class OpenPosition:
+    flight: Flight
+    position: str
+
+    @cached_property
+    def duty_start(self) -> datetime:
+        return self.flight.scheduled_departure - REPORT_BEFORE
+
+    @cached_property
+    def duty_end(self) -> datetime:
+        return (self.flight.scheduled_arrival or self.flight.scheduled_departure) + RELEASE_AFTER
+
+    @cached_property
+    def duty_hours(self) -> float:
+        return (self.duty_end - self.duty_start).total_seconds() / 3600
+
+    @cached_property
+    def month(self) -> date:
+        return month_of(self.duty_start)
+
+
+@dataclass
+class Assignment:
+    position: OpenPosition
+    crew: Crew
+    cost: float
+
+
+@dataclass
+class RecoverySolution:
+    assignments: List[Assignment] = field(default_factory=list)
+    unfilled: List[OpenPosition] = field(default_factory=list)
+    total_cost: float = 0.0
+
+
+@dataclass
+class RecoveryPlan:
+    positions: List[OpenPosition] = field(default_factory=list)
+    solutions: List[RecoverySolution] = field(default_factory=list)
+    # position index -> next-best crew still free in the best solution, with the extra cost of using them
+    fallbacks: Dict[int, List[Tuple[Crew, float]]] = field(default_factory=dict)
+    candidate_pairs: int = 0
+
+
+def _overlaps(start: datetime, end: datetime, busy: Sequence[Tuple[datetime, datetime]]) -> bool:
+    return any(s < end and (e is None or e > start) for s, e in busy)
+
+
+def pair_cost(
+    position: OpenPosition,
+    crew: Crew,
+    busy: Sequence[Tuple[datetime, datetime]] = (),
+    month_duty_hours: Optional[float] = None,
+) -> Optional[float]:
+    """Cost of crew taking position, or None when they may not.
+
+    `month_duty_hours` is what the crew member already has in the position's month; without it
+    the crew row's current-month total is used.
+    """
+    if crew.rank != RANK_FOR_POSITION.get(position.position):
+        return None
+    aircraft = position.flight.aircraft_type
+    cost = 0.0
+    if crew.qualifications:
+        if aircraft not in crew.qualifications:
+            if position.position in COCKPIT:
+                return None  # type rating is mandatory on the flight deck
+            cost += UNRATED_COST
+    else:
+        cost += UNRATED_COST
+    duty_end, hours = position.duty_end, position.duty_hours
+    if crew.medical_expiry and crew.medical_expiry < duty_end:
+        return None
+    if crew.license_expiry and crew.license_expiry < duty_end:
+        return None
+    if busy and _overlaps(position.duty_start, duty_end, busy):
+        return None
+
+    if month_duty_hours is None:
+        month_duty_hours = crew.total_duty_hours_month or 0.0
+    remaining = MONTHLY_DUTY_LIMIT_H - month_duty_hours
+    if remaining < hours:
+        return None
+    cost += HEADROOM_WEIGHT * hours / remaining
+
+    fatigue = crew.fatigue_score or 0.0
+    if fatigue > MAX_FATIGUE:
+        return None
+    cost += FATIGUE_WEIGHT * fatigue
+
+    km = distance_km(crew.current_location or crew.base_airport, position.flight.departure_airport)
+    cost += UNKNOWN_DISTANCE_COST if km is None else km * DISTANCE_WEIGHT
+    return cost
+
+
+class RecoveryService:
+    def __init__(self, max_candidates: int = 40):
+        self.max_candidates = max_candidates
+
+    def candidates(
+        self,
+        positions: Sequence[OpenPosition],
+        crew: Sequence[Crew],
+        busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None,
+        ledger: Optional[DutyHoursLedger] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """Per position, the cheapest feasible (crew index, cost) pairs: the sparse rows of the matrix."""
+        busy = busy or {}
+        by_rank: Dict[str, List[int]] = {}
+        for k, c in enumerate(crew):
+            by_rank.setdefault(c.rank, []).append(k)
+        rows = []
+        for p in positions:
+            row = []
+            for k in by_rank.get(RANK_FOR_POSITION.get(p.position, ""), ()):
+                used = ledger.duty_hours(crew[k].id, p.month) if ledger is not None else None
+                cost = pair_cost(p, crew[k], busy.get(crew[k].id, ()), used)
+                if cost is not None:
+                    row.append((k, cost))
+            row.sort(key=lambda kc: kc[1])
+            rows.append(row[: self.max_candidates])
+        return rows
+
+    def recover(
+        self,
+        positions: Sequence[OpenPosition],
+        crew: Sequence[Crew],
+        busy: Optional[Dict[int, List[Tuple[datetime, datetime]]]] = None,
+        alternatives: int = 3,
+        fallbacks: int = 3,
+        ledger: Optional[DutyHoursLedger] = None,
+    ) -> RecoveryPlan:
+        rows = self.candidates(positions, crew, busy, ledger)
+        columns = sorted({k for row in rows for k, _ in row})
+        col_of = {k: j for j, k in enumerate(columns)}
+        n, m = len(positions), len(columns)
+
+        # Dense only over crew that are a candidate somewhere; position i may always fall back to column m + i
+        cost = np.full((n, m + n), np.inf)
+        for i, row in enumerate(rows):
+            for k, c in row:
+                cost[i, col_of[k]] = c
+        cost[np.arange(n), m + np.arange(n)] = UNFILLED_COST
+
+        def to_solution(cols: np.ndarray) -> RecoverySolution:
+            solution = RecoverySolution()
+            for i, j in enumerate(cols):
+                if j >= m:
+                    solution.unfilled.append(positions[i])
+                else:
+                    solution.assignments.append(Assignment(positions[i], crew[columns[j]], float(cost[i, j])))
+                    solution.total_cost += float(cost[i, j])
+            solution.total_cost += UNFILLED_COST * len(solution.unfilled)
+            return solution
+
+        _, best_cols = solve_assignment(cost)
+        used = set(int(j) for j in best_cols)
+
+        # Cheapest crew who are free in the best solution, per position (a swap nobody else notices)
+        spare: Dict[int, List[Tuple[Crew, float]]] = {}
+        for i, row in enumerate(rows):
+            base = float(cost[i, best_cols[i]])
+            spare[i] = [(crew[k], round(c - base, 3)) for k, c in row if col_of[k] not in used][:fallbacks]
+
+        # Forbid the pairs that are cheapest to give up, one per alternative
+        def regret(i: int) -> float:
+            free = [c for k, c in rows[i] if col_of[k] not in used]
+            return (min(free) if free else UNFILLED_COST) - float(cost[i, best_cols[i]])
+
+        solutions = [to_solution(best_cols)]
+        seen = {tuple(best_cols)}
+        for i in sorted((i for i in range(n) if best_cols[i] < m), key=regret)[: max(alternatives - 1, 0)]:
+            forbidden = cost.copy()
+            forbidden[i, best_cols[i]] = np.inf
+            _, cols = solve_assignment(forbidden)
+            if tuple(cols) not in seen:
+                seen.add(tuple(cols))
+                solutions.append(to_solution(cols))
+        solutions[1:] = sorted(solutions[1:], key=lambda s: s.total_cost)
+        return RecoveryPlan(list(positions), solutions, spare, sum(len(r) for r in rows))
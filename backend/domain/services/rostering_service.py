@@ -1,10 +1,548 @@
-# Example domain service for rostering
+# Rostering: crew for every position on a horizon of flights. Flights are taken in departure
+# order in waves; each wave is one rectangular assignment per rank of the wave's positions to the
+# crew of that rank, given where each crew member is, when they are next free, how long their
+# current duty period already is and how many hours they have in the month. A wave's choices are
+# the next wave's starting state. Crew not at the departure airport may deadhead there first.
+# Everything is arrays so a problem can be sliced into subproblems (see decomposition.py) and
+# shared between processes without pickling entities.
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.domain.airports import distance_km
+from backend.domain.duty_limits import MAX_DUTY_PERIOD, MIN_REST, MIN_TURNAROUND, RELEASE_AFTER, REPORT_BEFORE
 from backend.domain.entities.crew import Crew
 from backend.domain.entities.flight import Flight
 from backend.domain.entities.roster import Roster
-from typing import List
+from backend.domain.services.assignment import solve_assignment
+from backend.domain.services.duty_hours import MONTHLY_DUTY_LIMIT_H, DutyHoursLedger, month_of
+from backend.domain.services.recovery_service import (
+    DISTANCE_WEIGHT,
+    FATIGUE_WEIGHT,
+    HEADROOM_WEIGHT,
+    MAX_FATIGUE,
+    RANK_FOR_POSITION,
+    UNFILLED_COST,
+    UNRATED_COST,
+)
+
+if TYPE_CHECKING:
+    from backend.domain.services.pairing_service import PairingSet
+
+POSITIONS = ("captain", "first_officer", "flight_attendant")
+RANKS = tuple(RANK_FOR_POSITION[p] for p in POSITIONS)  # crew rank code i flies position i
+COCKPIT_RANKS = (0, 1)
+
+DEADHEAD_KMH = 750.0  # as DISTANCE_WEIGHT: one point per positioning hour
+DEADHEAD_OVERHEAD_H = 1.0  # check-in and connection time on top of the flying
+AWAY_COST = 0.5  # ending a duty away from base: someone pays to bring them back later
+
+_H = 3600.0
+REPORT_H = REPORT_BEFORE.total_seconds() / _H
+RELEASE_H = RELEASE_AFTER.total_seconds() / _H
+MIN_REST_H = MIN_REST.total_seconds() / _H
+MIN_TURNAROUND_H = MIN_TURNAROUND.total_seconds() / _H
+MAX_DUTY_PERIOD_H = MAX_DUTY_PERIOD.total_seconds() / _H
+
+# Array names, so a problem can be rebuilt from shared memory; the rest of the problem is `meta`
+FLIGHT_ARRAYS = ("flight_ids", "dep", "arr", "dep_h", "arr_h", "aircraft", "tail", "month")
+CREW_ARRAYS = ("crew_ids", "rank", "base", "location", "quals", "fatigue", "month_hours")
+
+
+@dataclass
+class RosteringProblem:
+    # Flights: ids, airport and aircraft type indices, hours since `epoch`, aircraft
+    # registration index (-1: not known yet), month index
+    flight_ids: np.ndarray
+    dep: np.ndarray
+    arr: np.ndarray
+    dep_h: np.ndarray
+    arr_h: np.ndarray
+    aircraft: np.ndarray
+    tail: np.ndarray
+    month: np.ndarray
+    # Crew: rank index into RANKS, base and location airport indices, bitmask of type ratings,
+    # fatigue score, hours already worked per month (crew x months) outside these flights
+    crew_ids: np.ndarray
+    rank: np.ndarray
+    base: np.ndarray
+    location: np.ndarray
+    quals: np.ndarray
+    fatigue: np.ndarray
+    month_hours: np.ndarray
+    # Airport x airport great-circle km, NaN when unknown
+    distance: np.ndarray
+    airports: List[str] = field(default_factory=list)
+    aircraft_types: List[str] = field(default_factory=list)
+    months: List[date] = field(default_factory=list)
+    epoch: Optional[datetime] = None
+
+    @property
+    def meta(self) -> dict:
+        return {"airports": self.airports, "aircraft_types": self.aircraft_types, "months": self.months, "epoch": self.epoch}
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in FLIGHT_ARRAYS + CREW_ARRAYS + ("distance",)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], meta: dict) -> "RosteringProblem":
+        return cls(**{name: arrays[name] for name in FLIGHT_ARRAYS + CREW_ARRAYS + ("distance",)}, **meta)
+
+    def subset(self, flight_idx: np.ndarray, crew_idx: np.ndarray) -> "RosteringProblem":
+        arrays = self.arrays()
+        for name in FLIGHT_ARRAYS:
+            arrays[name] = arrays[name][flight_idx]
+        for name in CREW_ARRAYS:
+            arrays[name] = arrays[name][crew_idx]
+        return RosteringProblem.from_arrays(arrays, self.meta)
+
+    @property
+    def slots(self) -> int:
+        return len(self.flight_ids) * len(POSITIONS)
+
+    @classmethod
+    def from_entities(
+        cls,
+        flights: Sequence[Flight],
+        crew: Sequence[Crew],
+        ledger: Optional[DutyHoursLedger] = None,
+        epoch: Optional[datetime] = None,
+    ) -> "RosteringProblem":
+        """Flights with times, and crew; `ledger` holds hours worked outside these flights.
+
+        Without a ledger the crew rows' current-month totals count toward the first month.
+        """
+        flights = [f for f in flights if f.scheduled_departure is not None]
+        epoch = epoch or min((f.scheduled_departure for f in flights), default=datetime(2000, 1, 1))
+        airports = sorted({f.departure_airport for f in flights} | {f.arrival_airport for f in flights}
+                          | {c.base_airport for c in crew} | {c.current_location or c.base_airport for c in crew})
+        types = sorted({f.aircraft_type for f in flights} | {q for c in crew for q in c.qualifications or ()})
+        months = sorted({month_of(f.scheduled_departure - REPORT_BEFORE) for f in flights})
+        airport_of = {a: i for i, a in enumerate(airports)}
+        type_of = {t: i for i, t in enumerate(types)}
+        tail_of = {r: i for i, r in enumerate(sorted({f.aircraft_registration for f in flights} - {None}))}
+        month_idx = {m: i for i, m in enumerate(months)}
+
+        def hours(value: datetime) -> float:
+            return (value - epoch).total_seconds() / _H
+
+        month_hours = np.zeros((len(crew), len(months)))
+        for k, c in enumerate(crew):
+            for m, i in month_idx.items():
+                month_hours[k, i] = ledger.duty_hours(c.id, m) if ledger is not None else 0.0
+            if ledger is None and months:
+                month_hours[k, 0] = c.total_duty_hours_month or 0.0
+        distance = np.array([[distance_km(a, b) if distance_km(a, b) is not None else np.nan for b in airports]
+                             for a in airports]).reshape(len(airports), len(airports))
+        return cls(
+            flight_ids=np.array([f.id for f in flights], dtype=np.int64),
+            dep=np.array([airport_of[f.departure_airport] for f in flights], dtype=np.int32),
+            arr=np.array([airport_of[f.arrival_airport] for f in flights], dtype=np.int32),
+            dep_h=np.array([hours(f.scheduled_departure) for f in flights]),
+            arr_h=np.array([hours(f.scheduled_arrival or f.scheduled_departure) for f in flights]),
+            aircraft=np.array([type_of[f.aircraft_type] for f in flights], dtype=np.int32),
+            tail=np.array([tail_of.get(f.aircraft_registration, -1) for f in flights], dtype=np.int32),
+            month=np.array([month_idx[month_of(f.scheduled_departure - REPORT_BEFORE)] for f in flights], dtype=np.int32),
+            crew_ids=np.array([c.id for c in crew], dtype=np.int64),
+            rank=np.array([RANKS.index(c.rank) if c.rank in RANKS else -1 for c in crew], dtype=np.int8),
+            base=np.array([airport_of[c.base_airport] for c in crew], dtype=np.int32),
+            location=np.array([airport_of[c.current_location or c.base_airport] for c in crew], dtype=np.int32),
+            quals=np.array([sum(1 << type_of[q] for q in set(c.qualifications or ())) for c in crew], dtype=np.int64),
+            fatigue=np.array([c.fatigue_score or 0.0 for c in crew]),
+            month_hours=month_hours,
+            distance=distance,
+            airports=airports, aircraft_types=types, months=months, epoch=epoch,
+        )
+
+
+RESULT_ARRAYS = ("flight", "position", "crew", "start_h", "end_h", "period_h", "deadhead_km", "cost")
+_RESULT_DTYPES = (np.int64, np.int8, np.int64, float, float, float, float, float)
+
+
+def _no_slots() -> np.ndarray:
+    return np.zeros((0, 2), dtype=np.int64)
+
+
+@dataclass
+class RosteringResult:
+    # One entry per filled position: flight and crew indices into the problem, position index
+    # into POSITIONS, duty span in hours (from any deadhead to release), start of the duty period
+    # it belongs to, deadhead km, cost
+    flight: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    position: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int8))
+    crew: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    start_h: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    end_h: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    period_h: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    deadhead_km: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    cost: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    # Positions left open: (flight index, position index)
+    unfilled: np.ndarray = field(default_factory=_no_slots)
+    # Crew hours per month including these assignments (crew x months)
+    month_hours: Optional[np.ndarray] = None
+    candidate_pairs: int = 0
+
+    @property
+    def total_cost(self) -> float:
+        return float(self.cost.sum()) + UNFILLED_COST * len(self.unfilled)
+
+    @staticmethod
+    def from_parts(parts: Dict[str, List[np.ndarray]], **extra) -> "RosteringResult":
+        return RosteringResult(**{
+            name: np.concatenate(parts[name]).astype(dtype) if parts.get(name) else np.zeros(0, dtype=dtype)
+            for name, dtype in zip(RESULT_ARRAYS, _RESULT_DTYPES)
+        }, **extra)
+
+    @staticmethod
+    def concat(results: Sequence["RosteringResult"]) -> "RosteringResult":
+        """Assignments and open positions of all `results`; month hours are left to the caller."""
+        results = list(results)
+        return RosteringResult.from_parts(
+            {name: [getattr(r, name) for r in results] for name in RESULT_ARRAYS},
+            unfilled=np.concatenate([r.unfilled for r in results] + [_no_slots()]),
+            candidate_pairs=sum(r.candidate_pairs for r in results),
+        )
+
+    def remap(self, flight_idx: np.ndarray, crew_idx: np.ndarray) -> "RosteringResult":
+        """The same result for a subproblem, with indices into the problem it was cut from."""
+        return replace(
+            self, flight=flight_idx[self.flight], crew=crew_idx[self.crew],
+            unfilled=np.column_stack([flight_idx[self.unfilled[:, 0]], self.unfilled[:, 1]]).astype(np.int64),
+            month_hours=None,
+        )
+
+    def rosters(self, problem: RosteringProblem) -> List[Roster]:
+        """Unsaved roster rows (id 0) for the filled positions, timed from any deadhead to release."""
+        def to_time(h: float) -> datetime:
+            return problem.epoch + timedelta(hours=float(h))
+
+        return [
+            Roster(
+                id=0, crew_id=int(problem.crew_ids[c]), flight_id=int(problem.flight_ids[f]),
+                assignment_type="optimized", status="proposed", crew_position=POSITIONS[p],
+                duty_start=to_time(start), duty_end=to_time(end), optimization_score=round(float(cost), 4),
+            )
+            for f, p, c, start, end, cost in zip(self.flight, self.position, self.crew, self.start_h, self.end_h, self.cost)
+        ]
+
+
+@dataclass
+class _Costs:
+    cost: np.ndarray  # slots x crew, inf where not allowed
+    start: np.ndarray  # duty start including the deadhead
+    period_start: np.ndarray
+    duty_h: np.ndarray
+    km: np.ndarray
+
 
 class RosteringService:
+    def __init__(self, wave_hours: float = 4.0):
+        self.wave_hours = wave_hours
+
     def assign_crew_to_flight(self, crew: List[Crew], flight: Flight) -> List[Roster]:
-        # Placeholder for business logic
+        problem = RosteringProblem.from_entities([flight], crew)
+        return self.solve(problem).rosters(problem)
+
+    def _costs(
+        self, problem: RosteringProblem, flights: np.ndarray, position: int, crew: np.ndarray,
+        location: np.ndarray, free_h: np.ndarray, period_start: np.ndarray, month_hours: np.ndarray,
+        next_start: Optional[np.ndarray] = None,
+    ) -> _Costs:
+        """Cost of each crew member (columns) taking `position` on each flight (rows).
+
+        `location`, `free_h` (last release) and `period_start` describe each crew member's
+        previous duty, per crew or per (flight, crew) pair; `next_start`, when given, is the
+        start of their next duty, which must stay a full rest away.
+        """
+        p = problem
+        report = (p.dep_h[flights] - REPORT_H)[:, None]
+        release = (p.arr_h[flights] + RELEASE_H)[:, None]
+        km = p.distance[p.dep[flights][:, None], location]
+        start, period, duty_h, allowed = _timing(report, release, km, free_h, period_start)
+        used = month_hours[crew][:, p.month[flights]].T
+        remaining = MONTHLY_DUTY_LIMIT_H - used
+
+        rated = ((p.quals[crew][None, :] >> p.aircraft[flights][:, None]) & 1).astype(bool)
+        allowed &= (
+            (release - period <= MAX_DUTY_PERIOD_H)
+            & (duty_h <= remaining)
+            & (p.fatigue[crew] <= MAX_FATIGUE)[None, :]
+        )
+        if next_start is not None:
+            allowed &= next_start - release >= MIN_REST_H
+        if position in COCKPIT_RANKS:
+            allowed &= rated  # type rating is mandatory on the flight deck
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost = (
+                HEADROOM_WEIGHT * duty_h / remaining
+                + np.nan_to_num(km) * DISTANCE_WEIGHT
+                + np.where(rated, 0.0, UNRATED_COST)
+                + AWAY_COST * (p.arr[flights][:, None] != p.base[crew][None, :])
+                + FATIGUE_WEIGHT * p.fatigue[crew][None, :]
+            )
+        cost[~allowed] = np.inf
+        return _Costs(cost, start, period, duty_h, km)
+
+    def _assign(self, cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """(rows, columns) chosen by one rectangular assignment, and the candidate pairs it saw."""
+        finite = np.isfinite(cost)
+        columns = np.flatnonzero(finite.any(axis=0))
+        n, m = cost.shape[0], len(columns)
+        if not m:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0
+        # Only crew who can take something; row i may always fall back to "unfilled" column m + i
+        matrix = np.full((n, m + n), np.inf)
+        matrix[:, :m] = cost[:, columns]
+        matrix[np.arange(n), m + np.arange(n)] = UNFILLED_COST
+        _, cols = solve_assignment(matrix)
+        rows = np.flatnonzero(cols < m)
+        return rows, columns[cols[rows]], int(finite[:, columns].sum())
+
+    def solve(self, problem: RosteringProblem) -> RosteringResult:
+        p = problem
+        location = p.location.copy()
+        free_h = np.full(len(p.crew_ids), -np.inf)
+        period_start = np.full(len(p.crew_ids), -np.inf)
+        month_hours = p.month_hours.astype(float, copy=True)
+        crew_of_rank = [np.flatnonzero(p.rank == r) for r in range(len(RANKS))]
+        out: Dict[str, List[np.ndarray]] = {name: [] for name in RESULT_ARRAYS}
+        unfilled: List[np.ndarray] = []
+        pairs = 0
+
+        for flights in _waves(np.argsort(p.dep_h, kind="stable"), p.dep_h, self.wave_hours):
+            for position, crew in enumerate(crew_of_rank):
+                taken = np.zeros(len(flights), dtype=bool)
+                if len(crew):
+                    costs = self._costs(p, flights, position, crew, location[crew][None, :], free_h[crew][None, :],
+                                        period_start[crew][None, :], month_hours)
+                    rows, cols, seen = self._assign(costs.cost)
+                    pairs += seen
+                    chosen, f = crew[cols], flights[rows]
+                    start, duty_h = costs.start[rows, cols], costs.duty_h[rows, cols]
+                    location[chosen] = p.arr[f]
+                    free_h[chosen] = start + duty_h
+                    period_start[chosen] = costs.period_start[rows, cols]
+                    month_hours[chosen, p.month[f]] += duty_h
+                    taken[rows] = True
+                    _append(out, f, position, chosen, start, start + duty_h, period_start[chosen],
+                            costs.km[rows, cols], costs.cost[rows, cols])
+                open_flights = flights[~taken]
+                unfilled.append(np.column_stack([open_flights, np.full(len(open_flights), position)]))
+
+        return RosteringResult.from_parts(
+            out, unfilled=np.concatenate(unfilled + [_no_slots()]).astype(np.int64),
+            month_hours=month_hours, candidate_pairs=pairs,
+        )
+
+    def fill(self, problem: RosteringProblem, result: RosteringResult) -> RosteringResult:
+        """Fill `result`'s open positions from any crew, around the duties they already have.
+
+        Used after solving subproblems separately: an open position may go to crew of another
+        subproblem, who deadhead in from wherever their previous duty ended. A fill may extend
+        the duty period before it but must leave a full rest before the next duty, so the duties
+        around it stay legal as they are. Returns only the added assignments; their month hours
+        include `result`'s.
+        """
+        p = problem
+        month_hours = (result.month_hours if result.month_hours is not None else p.month_hours).astype(float, copy=True)
+        timeline = {
+            "crew": result.crew, "start": result.start_h, "end": result.end_h, "period": result.period_h,
+            "dep": p.dep[result.flight], "arr": p.arr[result.flight],
+        }
+        out: Dict[str, List[np.ndarray]] = {name: [] for name in RESULT_ARRAYS}
+        unfilled: List[np.ndarray] = []
+        pairs = 0
+        slots = result.unfilled
+        for wave in _waves(np.argsort(p.dep_h[slots[:, 0]], kind="stable"), p.dep_h[slots[:, 0]], self.wave_hours):
+            grid = _padded(timeline, len(p.crew_ids))
+            for position in range(len(RANKS)):
+                flights = slots[wave][slots[wave][:, 1] == position, 0]
+                crew = np.flatnonzero(p.rank == position)
+                taken = np.zeros(len(flights), dtype=bool)
+                if len(flights) and len(crew):
+                    costs = self._fill_costs(p, flights, position, crew, grid, month_hours)
+                    rows, cols, seen = self._assign(costs.cost)
+                    pairs += seen
+                    chosen, f = crew[cols], flights[rows]
+                    start, duty_h = costs.start[rows, cols], costs.duty_h[rows, cols]
+                    month_hours[chosen, p.month[f]] += duty_h
+                    taken[rows] = True
+                    period = costs.period_start[rows, cols]
+                    _append(out, f, position, chosen, start, start + duty_h, period, costs.km[rows, cols],
+                            costs.cost[rows, cols])
+                    for key, values in (("crew", chosen), ("start", start), ("end", start + duty_h),
+                                        ("period", period), ("dep", p.dep[f]), ("arr", p.arr[f])):
+                        timeline[key] = np.concatenate([timeline[key], values])
+                open_flights = flights[~taken]
+                unfilled.append(np.column_stack([open_flights, np.full(len(open_flights), position)]))
+        return RosteringResult.from_parts(
+            out, unfilled=np.concatenate(unfilled + [_no_slots()]).astype(np.int64),
+            month_hours=month_hours, candidate_pairs=pairs,
+        )
+
+    def assign_pairings(
+        self, problem: RosteringProblem, pairings: "PairingSet", chosen: Optional[np.ndarray] = None,
+    ) -> RosteringResult:
+        """Crew for whole pairings (a PairingSet from pairing_service) instead of single flights.
+
+        The `chosen` pairings (default: pairings.select) are taken in start order in waves; each
+        wave is one assignment per rank of its pairings to crew based where they start, rested
+        since their last pairing and with the hours left in the month. Every leg of a pairing goes
+        to the same crew member. Flights no chosen pairing covers are left open, for fill().
+        """
+        p = problem
+        if chosen is None:
+            chosen = pairings.select(len(p.flight_ids))
+        free_h = np.full(len(p.crew_ids), -np.inf)
+        month_hours = p.month_hours.astype(float, copy=True)
+        crew_of_rank = [np.flatnonzero(p.rank == r) for r in range(len(RANKS))]
+        out: Dict[str, List[np.ndarray]] = {name: [] for name in RESULT_ARRAYS}
+        unfilled: List[np.ndarray] = []
+        pairs = 0
+
+        for wave in _waves(chosen[np.argsort(pairings.start_h[chosen], kind="stable")], pairings.start_h, self.wave_hours):
+            # Duty hours of each pairing per month: one that crosses a month end counts toward both
+            legs, _, start, end = pairings.duty_spans(p, wave)
+            month_share = np.zeros((len(wave), month_hours.shape[1]))
+            np.add.at(month_share, (np.repeat(np.arange(len(wave)), pairings.n_legs[wave]), p.month[legs]), end - start)
+            for position, crew in enumerate(crew_of_rank):
+                taken = np.zeros(len(wave), dtype=bool)
+                if len(crew):
+                    cost = self._pairing_costs(p, pairings, wave, position, crew, free_h, month_hours, month_share)
+                    rows, cols, seen = self._assign(cost)
+                    pairs += seen
+                    picked, n_legs = wave[rows], pairings.n_legs[wave[rows]]
+                    free_h[crew[cols]] = pairings.end_h[picked]
+                    taken[rows] = True
+                    flights, period, start, end = pairings.duty_spans(p, picked)
+                    who = np.repeat(crew[cols], n_legs)
+                    np.add.at(month_hours, (who, p.month[flights]), end - start)
+                    _append(out, flights, position, who, start, end, period, np.zeros(len(flights)),
+                            np.repeat(cost[rows, cols] / n_legs, n_legs))
+                open_legs = pairings.legs[pairings.legs_of(wave[~taken])]
+                unfilled.append(np.column_stack([open_legs, np.full(len(open_legs), position)]))
+
+        covered = np.zeros(len(p.flight_ids), dtype=bool)
+        covered[pairings.legs[pairings.legs_of(chosen)]] = True
+        loose = np.flatnonzero(~covered)
+        unfilled.append(np.column_stack([np.repeat(loose, len(POSITIONS)), np.tile(np.arange(len(POSITIONS)), len(loose))]))
+        return RosteringResult.from_parts(
+            out, unfilled=np.concatenate(unfilled + [_no_slots()]).astype(np.int64),
+            month_hours=month_hours, candidate_pairs=pairs,
+        )
+
+    def _pairing_costs(
+        self, problem: RosteringProblem, pairings: "PairingSet", wave: np.ndarray, position: int, crew: np.ndarray,
+        free_h: np.ndarray, month_hours: np.ndarray, month_share: np.ndarray,
+    ) -> np.ndarray:
+        """Cost of each crew member (columns) flying each pairing (rows) in `position`, inf where not allowed.
+
+        `month_share` holds each pairing's duty hours per month (pairings x months).
+        """
+        p = problem
+        share = month_share[:, None, :]
+        remaining = (MONTHLY_DUTY_LIMIT_H - month_hours[crew])[None, :, :]
+        rated = ((p.quals[crew][None, :] >> pairings.aircraft[wave][:, None]) & 1).astype(bool)
+        # Crew not yet given a pairing start from wherever they are now
+        home = (p.location[crew] == p.base[crew]) | np.isfinite(free_h[crew])
+        allowed = (
+            (p.base[crew][None, :] == pairings.base[wave][:, None])
+            & home[None, :]
+            & (pairings.start_h[wave][:, None] - free_h[crew][None, :] >= MIN_REST_H)
+            & (share <= remaining).all(axis=2)
+            & (p.fatigue[crew] <= MAX_FATIGUE)[None, :]
+        )
+        if position in COCKPIT_RANKS:
+            allowed &= rated
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost = (
+                HEADROOM_WEIGHT * np.where(share > 0, share / remaining, 0.0).sum(axis=2)
+                + np.where(rated, 0.0, UNRATED_COST)
+                + FATIGUE_WEIGHT * p.fatigue[crew][None, :]
+            )
+        cost[~allowed] = np.inf
+        return cost
+
+    def _fill_costs(
+        self, problem: RosteringProblem, flights: np.ndarray, position: int, crew: np.ndarray,
+        grid: Dict[str, np.ndarray], month_hours: np.ndarray,
+    ) -> _Costs:
+        # Per (flight, crew): the crew member's last duty starting before the flight's report
+        # and the first one after it
+        p = problem
+        starts = grid["start"][crew]  # crew x duties in start order, padded with +inf
+        report = p.dep_h[flights] - REPORT_H
+        before = (starts[None, :, :] < report[:, None, None]).sum(axis=2) - 1
+        n_duties = np.isfinite(starts).sum(axis=1)[None, :]
+        has_prev, has_next = before >= 0, before + 1 < n_duties
+        columns = np.broadcast_to(crew[None, :], before.shape)
+        prev, after = np.maximum(before, 0), np.minimum(before + 1, starts.shape[1] - 1)
+        location = np.where(has_prev, grid["arr"][columns, prev], p.location[crew][None, :])
+        costs = self._costs(
+            p, flights, position, crew,
+            location=location,
+            free_h=np.where(has_prev, grid["end"][columns, prev], -np.inf),
+            period_start=np.where(has_prev, grid["period"][columns, prev], -np.inf),
+            month_hours=month_hours,
+            next_start=np.where(has_next, grid["start"][columns, after], np.inf),
+        )
+        # The next duty was costed from `location`: the fill must end there or where that duty departs
+        arrival = p.arr[flights][:, None]
+        costs.cost[has_next & (arrival != location) & (arrival != grid["dep"][columns, after])] = np.inf
+        return costs
+
+
+def _timing(report, release, km, free_h, period_start):
+    """Start, duty period start, duty hours, and whether the crew can make it, for a duty
+    report..release taken by crew released at `free_h` `km` away (NaN: no way there).
+
+    Within a duty period, a sector from where the crew already are needs only MIN_TURNAROUND
+    after their last arrival; report and release times overlap there, so the duty is counted
+    from the previous release. Anything else starts with the deadhead, after the last release.
+    """
+    deadhead = np.where(km > 0, km / DEADHEAD_KMH + DEADHEAD_OVERHEAD_H, 0.0)
+    start = report - deadhead
+    free_h, period_start = np.broadcast_to(free_h, start.shape), np.broadcast_to(period_start, start.shape)
+    # A duty within MIN_REST of the last one extends that duty period
+    continues = start - free_h < MIN_REST_H
+    connecting = continues & (km == 0)
+    last_arrival = free_h - RELEASE_H
+    timely = ~np.isnan(km) & np.where(
+        connecting, report + REPORT_H >= last_arrival + MIN_TURNAROUND_H, start >= free_h
+    )
+    start = np.where(connecting, np.maximum(start, free_h), start)
+    period = np.where(continues, period_start, start)
+    return start, period, release - start, timely
+
+
+def _waves(order: np.ndarray, dep_h: np.ndarray, hours: float) -> List[np.ndarray]:
+    """`order` (indices by departure) cut into runs departing within the same `hours` bucket."""
+    if not len(order):
         return []
+    bucket = np.floor((dep_h[order] - dep_h[order[0]]) / hours).astype(np.int64)
+    return np.split(order, np.flatnonzero(np.diff(bucket)) + 1)
+
+
+def _append(out: Dict[str, List[np.ndarray]], flights, position, crew, start, end, period, km, cost) -> None:
+    for name, values in zip(RESULT_ARRAYS, (flights, np.full(len(flights), position), crew, start, end, period,
+                                            np.nan_to_num(km), cost)):
+        out[name].append(values)
+
+
+def _padded(timeline: Dict[str, np.ndarray], n_crew: int) -> Dict[str, np.ndarray]:
+    """Per-crew duty arrays as crew x most-duties rows in start order, padded with +inf / -1."""
+    order = np.lexsort((timeline["start"], timeline["crew"]))
+    crew = timeline["crew"][order]
+    counts = np.bincount(crew, minlength=n_crew)
+    width = max(int(counts.max(initial=0)), 1)
+    slot = np.arange(len(crew)) - np.repeat(np.cumsum(counts) - counts, counts)
+    grid = {}
+    for key in ("start", "end", "period"):
+        grid[key] = np.full((n_crew, width), np.inf)
+        grid[key][crew, slot] = timeline[key][order]
+    for key in ("dep", "arr"):
+        grid[key] = np.full((n_crew, width), -1, dtype=np.int64)
+        grid[key][crew, slot] = timeline[key][order]
+    return grid
@@ -0,0 +1,417 @@
+# What-if scenarios over one in-memory snapshot of flights, crew and rosters. A Scenario is a
+# copy-on-write fork: it keeps only the entities it changed (replaced, never mutated, so forks
+# and the snapshot share everything else) plus per-crew and per-flight roster id lists for the
+# crew and flights it touched. Rule checks run per crew member, so a fork re-checks only the crew
+# it touched and compares against the snapshot's findings for them, which are computed once and
+# cached. Forks share no mutable state, so any number can be evaluated side by side.
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, fields, replace
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from backend.domain.duty_limits import MAX_DUTY_PERIOD, MIN_REST
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.domain.services.duty_hours import MONTHLY_DUTY_LIMIT_H, DutyHoursLedger, month_of
+from backend.domain.services.recovery_service import OpenPosition, RecoveryService
+
+OVERLAP, DUTY_PERIOD, MONTHLY_DUTY, AWAY_FROM_BASE = "overlap", "duty_period", "monthly_duty", "away_from_base"
+HARD = {OVERLAP, DUTY_PERIOD, MONTHLY_DUTY}
+
+
+@dataclass(frozen=True)
+class Finding:
+    kind: str
+    crew_id: int
+    roster_ids: Tuple[int, ...] = ()
+    month: Optional[date] = None
+    detail: str = ""
+
+    @property
+    def key(self) -> Tuple:
+        # What the finding is about, not its numbers: a longer breach of the same duty period is not a new finding
+        return self.kind, self.crew_id, self.roster_ids, self.month
+
+    @property
+    def hard(self) -> bool:
+        return self.kind in HARD
+
+
+def _active(roster: Optional[Roster]) -> bool:
+    return roster is not None and roster.status != "cancelled" and roster.duty_start is not None
+
+
+def _hours(roster: Roster) -> float:
+    return ((roster.duty_end or roster.duty_start) - roster.duty_start).total_seconds() / 3600
+
+
+class _View(ABC):
+    """Read access shared by the snapshot and its forks."""
+
+    snapshot: "Snapshot"
+
+    @abstractmethod
+    def flight(self, flight_id: int) -> Optional[Flight]:
+        pass
+
+    @abstractmethod
+    def crew(self, crew_id: int) -> Optional[Crew]:
+        pass
+
+    @abstractmethod
+    def roster(self, roster_id: int) -> Optional[Roster]:
+        pass
+
+    @abstractmethod
+    def roster_ids_of_crew(self, crew_id: int) -> Sequence[int]:
+        pass
+
+    @abstractmethod
+    def roster_ids_of_flight(self, flight_id: int) -> Sequence[int]:
+        pass
+
+    def duties(self, crew_id: int) -> List[Roster]:
+        duties = [r for r in map(self.roster, self.roster_ids_of_crew(crew_id)) if _active(r)]
+        duties.sort(key=lambda r: (r.duty_start, r.id))
+        return duties
+
+    def window_hours(self, crew_id: int) -> Dict[date, float]:
+        hours: Dict[date, float] = {}
+        for r in self.duties(crew_id):
+            month = month_of(r.duty_start)
+            hours[month] = hours.get(month, 0.0) + _hours(r)
+        return hours
+
+    def check_crew(self, crew_id: int) -> List[Finding]:
+        """Rule findings for one crew member's rostered duties in the snapshot window."""
+        crew = self.crew(crew_id)
+        duties = self.duties(crew_id)
+        findings: List[Finding] = []
+        period: List[Roster] = []
+
+        def close_period() -> None:
+            if not period:
+                return
+            length = max(r.duty_end or r.duty_start for r in period) - period[0].duty_start
+            ids = tuple(r.id for r in period)
+            if length > MAX_DUTY_PERIOD:
+                findings.append(Finding(DUTY_PERIOD, crew_id, ids, detail=f"{length.total_seconds() / 3600:.1f}h duty period"))
+            first = self.flight(period[0].flight_id)
+            if crew is not None and first is not None and first.departure_airport != crew.base_airport:
+                findings.append(Finding(AWAY_FROM_BASE, crew_id, ids[:1],
+                                        detail=f"duty period starts at {first.departure_airport}, base {crew.base_airport}"))
+
+        # Duties sort by start; compare each with the one that ends latest so far
+        latest: Optional[Roster] = None
+        for r in duties:
+            if latest is not None:
+                end = latest.duty_end or latest.duty_start
+                if r.duty_start < end:
+                    findings.append(Finding(OVERLAP, crew_id, (latest.id, r.id), detail="duties overlap"))
+                if r.duty_start - end >= MIN_REST:
+                    close_period()
+                    period.clear()
+            period.append(r)
+            if latest is None or (r.duty_end or r.duty_start) > (latest.duty_end or latest.duty_start):
+                latest = r
+        close_period()
+
+        for month, total in sorted(self.month_totals(crew_id).items()):
+            if total > MONTHLY_DUTY_LIMIT_H:
+                findings.append(Finding(MONTHLY_DUTY, crew_id, month=month, detail=f"{total:.1f}h of {MONTHLY_DUTY_LIMIT_H:.0f}h"))
+        return findings
+
+    @abstractmethod
+    def month_total(self, crew_id: int, month: date) -> float:
+        pass
+
+    def month_totals(self, crew_id: int) -> Dict[date, float]:
+        months = self.snapshot.baseline_window_hours(crew_id).keys() | self.window_hours(crew_id).keys()
+        return {m: self.month_total(crew_id, m) for m in months}
+
+
+class Snapshot(_View):
+    def __init__(
+        self,
+        flights: Iterable[Flight],
+        crew: Iterable[Crew],
+        rosters: Iterable[Roster],
+        ledger: Optional[DutyHoursLedger] = None,
+        window: Optional[Tuple[datetime, datetime]] = None,
+        taken_at: Optional[datetime] = None,
+    ):
+        self.snapshot = self
+        self.flights: Dict[int, Flight] = {f.id: f for f in flights}
+        self.crew_by_id: Dict[int, Crew] = {c.id: c for c in crew}
+        self.rosters: Dict[int, Roster] = {r.id: r for r in rosters}
+        self.ledger = ledger or DutyHoursLedger()
+        self.window = window
+        self.taken_at = taken_at
+        self.by_crew: Dict[int, List[int]] = {}
+        self.by_flight: Dict[int, List[int]] = {}
+        for r in self.rosters.values():
+            self.by_crew.setdefault(r.crew_id, []).append(r.id)
+            self.by_flight.setdefault(r.flight_id, []).append(r.id)
+        self._findings: Dict[int, List[Finding]] = {}
+        self._window_hours: Dict[int, Dict[date, float]] = {}
+
+    def flight(self, flight_id: int) -> Optional[Flight]:
+        return self.flights.get(flight_id)
+
+    def crew(self, crew_id: int) -> Optional[Crew]:
+        return self.crew_by_id.get(crew_id)
+
+    def roster(self, roster_id: int) -> Optional[Roster]:
+        return self.rosters.get(roster_id)
+
+    def roster_ids_of_crew(self, crew_id: int) -> Sequence[int]:
+        return self.by_crew.get(crew_id, ())
+
+    def roster_ids_of_flight(self, flight_id: int) -> Sequence[int]:
+        return self.by_flight.get(flight_id, ())
+
+    def month_total(self, crew_id: int, month: date) -> float:
+        # The summary covers the whole month, not just the window
+        return self.ledger.duty_hours(crew_id, month)
+
+    def baseline_window_hours(self, crew_id: int) -> Dict[date, float]:
+        if crew_id not in self._window_hours:
+            self._window_hours[crew_id] = self.window_hours(crew_id)
+        return self._window_hours[crew_id]
+
+    def findings(self, crew_id: int) -> List[Finding]:
+        # Computed on first use and kept: the snapshot never changes
+        if crew_id not in self._findings:
+            self._findings[crew_id] = self.check_crew(crew_id)
+        return self._findings[crew_id]
+
+    def fork(self) -> "Scenario":
+        return Scenario(self)
+
+
+@dataclass
+class EntityChange:
+    kind: str  # flight, crew, roster
+    id: int
+    changes: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)  # field -> (baseline, scenario)
+    added: bool = False
+
+
+@dataclass
+class ScenarioResult:
+    changes: List[EntityChange]
+    new_findings: List[Finding]
+    resolved_findings: List[Finding]
+    open_positions: List[Tuple[int, str]]
+    missing: Dict[str, List[int]]
+    recovered: Optional[int] = None  # positions filled by the recovery step, when it ran
+
+
+class Scenario(_View):
+    def __init__(self, snapshot: Snapshot, parent: Optional["Scenario"] = None):
+        self.snapshot = snapshot
+        self._flights: Dict[int, Flight] = dict(parent._flights) if parent else {}
+        self._crew: Dict[int, Crew] = dict(parent._crew) if parent else {}
+        self._rosters: Dict[int, Roster] = dict(parent._rosters) if parent else {}
+        self._by_crew: Dict[int, List[int]] = {k: list(v) for k, v in parent._by_crew.items()} if parent else {}
+        self._by_flight: Dict[int, List[int]] = {k: list(v) for k, v in parent._by_flight.items()} if parent else {}
+        self.open_positions: List[Tuple[int, str]] = list(parent.open_positions) if parent else []
+        self.missing: Dict[str, Set[int]] = {k: set(v) for k, v in parent.missing.items()} if parent else {}
+        self.recovered: Optional[int] = parent.recovered if parent else None
+        self._next_id = parent._next_id if parent else -1  # rosters added in a scenario get negative ids
+
+    def fork(self) -> "Scenario":
+        return Scenario(self.snapshot, self)
+
+    # Reads: the scenario's copy if it has one, else the snapshot's
+
+    def flight(self, flight_id: int) -> Optional[Flight]:
+        return self._flights.get(flight_id) or self.snapshot.flights.get(flight_id)
+
+    def crew(self, crew_id: int) -> Optional[Crew]:
+        return self._crew.get(crew_id) or self.snapshot.crew_by_id.get(crew_id)
+
+    def roster(self, roster_id: int) -> Optional[Roster]:
+        return self._rosters.get(roster_id) or self.snapshot.rosters.get(roster_id)
+
+    def roster_ids_of_crew(self, crew_id: int) -> Sequence[int]:
+        ids = self._by_crew.get(crew_id)
+        return ids if ids is not None else self.snapshot.by_crew.get(crew_id, ())
+
+    def roster_ids_of_flight(self, flight_id: int) -> Sequence[int]:
+        ids = self._by_flight.get(flight_id)
+        return ids if ids is not None else self.snapshot.by_flight.get(flight_id, ())
+
+    @property
+    def touched_crew(self) -> Set[int]:
+        # Every roster write claims its crew's list, so these cover all crew whose duties changed
+        return set(self._crew) | set(self._by_crew)
+
+    def month_total(self, crew_id: int, month: date) -> float:
+        # Summary total, less what the snapshot window had, plus what this scenario has
+        if crew_id not in self._by_crew:
+            return self.snapshot.month_total(crew_id, month)
+        return (
+            self.snapshot.month_total(crew_id, month)
+            - self.snapshot.baseline_window_hours(crew_id).get(month, 0.0)
+            + self.window_hours(crew_id).get(month, 0.0)
+        )
+
+    # Writes: replace, never mutate, so the snapshot and sibling forks are unaffected
+
+    def _own_list(self, lists: Dict[int, List[int]], shared: Dict[int, List[int]], key: int) -> List[int]:
+        if key not in lists:
+            lists[key] = list(shared.get(key, ()))
+        return lists[key]
+
+    def update_flight(self, flight_id: int, **changes) -> Flight:
+        flight = self._flights[flight_id] = replace(self.flight(flight_id), **changes)
+        return flight
+
+    def update_crew(self, crew_id: int, **changes) -> Crew:
+        crew = self._crew[crew_id] = replace(self.crew(crew_id), **changes)
+        return crew
+
+    def update_roster(self, roster_id: int, **changes) -> Roster:
+        old = self.roster(roster_id)
+        new = self._rosters[roster_id] = replace(old, **changes)
+        # Re-checks look the crew up through these lists, so claim both sides of a change
+        self._own_list(self._by_crew, self.snapshot.by_crew, old.crew_id)
+        if new.crew_id != old.crew_id:
+            self._by_crew[old.crew_id].remove(roster_id)
+            self._own_list(self._by_crew, self.snapshot.by_crew, new.crew_id).append(roster_id)
+        return new
+
+    def add_roster(self, **values) -> Roster:
+        roster = Roster(id=self._next_id, **values)
+        self._next_id -= 1
+        self._rosters[roster.id] = roster
+        self._own_list(self._by_crew, self.snapshot.by_crew, roster.crew_id).append(roster.id)
+        self._own_list(self._by_flight, self.snapshot.by_flight, roster.flight_id).append(roster.id)
+        return roster
+
+    def _note_missing(self, kind: str, ids: Iterable[int]) -> None:
+        ids = set(ids)
+        if ids:
+            self.missing.setdefault(kind, set()).update(ids)
+
+    # Planner actions
+
+    def cancel_flights(self, flight_ids: Iterable[int]) -> None:
+        flight_ids = list(flight_ids)
+        self._note_missing("flights", (fid for fid in flight_ids if self.flight(fid) is None))
+        for fid in flight_ids:
+            if self.flight(fid) is None:
+                continue
+            self.update_flight(fid, status="cancelled")
+            for rid in self.roster_ids_of_flight(fid):
+                if _active(self.roster(rid)):
+                    self.update_roster(rid, status="cancelled")
+            self.open_positions = [p for p in self.open_positions if p[0] != fid]
+
+    def delay_flight(self, flight_id: int, minutes: float) -> None:
+        flight = self.flight(flight_id)
+        if flight is None or flight.scheduled_departure is None:
+            self._note_missing("flights", [flight_id])
+            return
+        shift = timedelta(minutes=minutes)
+        self.update_flight(
+            flight_id,
+            scheduled_departure=flight.scheduled_departure + shift,
+            scheduled_arrival=flight.scheduled_arrival + shift if flight.scheduled_arrival else None,
+        )
+        for rid in self.roster_ids_of_flight(flight_id):
+            r = self.roster(rid)
+            if _active(r):
+                self.update_roster(rid, duty_start=r.duty_start + shift,
+                                   duty_end=r.duty_end + shift if r.duty_end else None)
+
+    def move_crew(self, crew_ids: Iterable[int], base: str) -> None:
+        crew_ids = list(crew_ids)
+        self._note_missing("crew", (cid for cid in crew_ids if self.crew(cid) is None))
+        for cid in crew_ids:
+            if self.crew(cid) is not None:
+                self.update_crew(cid, base_airport=base, current_location=base)
+
+    def remove_crew(self, crew_ids: Iterable[int]) -> None:
+        """Take crew off (sickness, a strike): their duties on flights still operating become open positions."""
+        crew_ids = list(crew_ids)
+        self._note_missing("crew", (cid for cid in crew_ids if self.crew(cid) is None))
+        for cid in crew_ids:
+            if self.crew(cid) is None:
+                continue
+            self.update_crew(cid, status="unavailable")
+            for rid in list(self.roster_ids_of_crew(cid)):
+                r = self.roster(rid)
+                if not _active(r):
+                    continue
+                self.update_roster(rid, status="cancelled")
+                flight = self.flight(r.flight_id)
+                if flight is not None and flight.status != "cancelled" and r.crew_position:
+                    self.open_positions.append((r.flight_id, r.crew_position))
+
+    def recover(self, service: RecoveryService) -> int:
+        """Fill open positions with the best recovery solution; returns how many were filled."""
+        positions = [
+            OpenPosition(self.flight(fid), position)
+            for fid, position in self.open_positions
+            if self.flight(fid) is not None and self.flight(fid).scheduled_departure is not None
+        ]
+        filled = 0
+        if positions:
+            crew = [c for c in map(self.crew, self.candidate_crew()) if c is not None and c.status == "available"]
+            busy = {c.id: [(r.duty_start, r.duty_end) for r in self.duties(c.id)] for c in crew}
+            months = {p.month for p in positions}
+            ledger = DutyHoursLedger((c.id, m, self.month_total(c.id, m), 0.0, 0) for c in crew for m in months)
+            plan = service.recover(positions, crew, busy, alternatives=1, fallbacks=0, ledger=ledger)
+            for a in plan.solutions[0].assignments:
+                self.add_roster(
+                    crew_id=a.crew.id, flight_id=a.position.flight.id, assignment_type="recovery",
+                    status="proposed", crew_position=a.position.position,
+                    duty_start=a.position.duty_start, duty_end=a.position.duty_end,
+                )
+                self.open_positions.remove((a.position.flight.id, a.position.position))
+                filled += 1
+        self.recovered = (self.recovered or 0) + filled
+        return filled
+
+    def candidate_crew(self) -> List[int]:
+        return sorted(self.snapshot.crew_by_id.keys() | self._crew.keys())
+
+    # Results
+
+    def diff(self) -> List[EntityChange]:
+        changes: List[EntityChange] = []
+        for kind, mine, base in (
+            ("flight", self._flights, self.snapshot.flights),
+            ("crew", self._crew, self.snapshot.crew_by_id),
+            ("roster", self._rosters, self.snapshot.rosters),
+        ):
+            for entity_id in sorted(mine):
+                new, old = mine[entity_id], base.get(entity_id)
+                if old is None:
+                    changes.append(EntityChange(kind, entity_id, {
+                        f.name: (None, getattr(new, f.name)) for f in fields(new) if getattr(new, f.name) is not None
+                    }, added=True))
+                    continue
+                delta = {
+                    f.name: (getattr(old, f.name), getattr(new, f.name))
+                    for f in fields(new) if getattr(old, f.name) != getattr(new, f.name)
+                }
+                if delta:
+                    changes.append(EntityChange(kind, entity_id, delta))
+        return changes
+
+    def evaluate(self) -> ScenarioResult:
+        new: List[Finding] = []
+        resolved: List[Finding] = []
+        for crew_id in sorted(self.touched_crew):
+            before = {f.key: f for f in self.snapshot.findings(crew_id)}
+            after = {f.key: f for f in self.check_crew(crew_id)}
+            new.extend(f for k, f in after.items() if k not in before)
+            resolved.extend(f for k, f in before.items() if k not in after)
+        return ScenarioResult(
+            self.diff(), new, resolved, list(self.open_positions),
+            {k: sorted(v) for k, v in self.missing.items()}, self.recovered,
+        )
@@ -0,0 +1,171 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.infrastructure.ai.rag_service import count_tokens
+
+Message = Dict[str, str]
+Summarizer = Callable[[List[Message], int], Awaitable[str]]
+
+# Prompt budgets (history + new message), well under each model's context window
+MODEL_TOKEN_BUDGETS: Dict[str, int] = {
+    "gemma2-9b-it": 6000,
+    "gpt-oss:20b": 6000,
+    "pplx-7b-online": 3000,
+    "gpt-4": 6000,
+    "gpt-4o-mini": 12000,
+    "cursor-pro": 6000,
+}
+DEFAULT_TOKEN_BUDGET = 4000
+
+# Rough per-message framing overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_PREFIX = "Summary of earlier conversation:\n"
+
+
+@dataclass
+class ContextResult:
+    messages: List[Message]
+    tokens_before: int
+    tokens_after: int
+    summarized_turns: int = 0
+    summary_cached: bool = False
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+
+def message_tokens(message: Message, model: str) -> int:
+    return count_tokens(message.get("content", ""), model) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _clip_oldest_lines(text: str, max_tokens: int) -> str:
+    lines = text.splitlines()
+    while lines and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+async def extractive_summary(turns: List[Message], max_tokens: int) -> str:
+    # Cheap, deterministic default: first line of each turn, newest last, clipped to budget
+    lines = []
+    for turn in turns:
+        first_line = (turn.get("content") or "").strip().splitlines()
+        if first_line:
+            lines.append(f"{turn.get('role', 'user')}: {first_line[0][:300]}")
+    return _clip_oldest_lines("\n".join(lines), max_tokens)
+
+
+def _turns_digest(turns: List[Message]) -> str:
+    h = hashlib.sha256()
+    for turn in turns:
+        h.update(turn.get("role", "").encode("utf-8"))
+        h.update(b"\0")
+        h.update(turn.get("content", "").encode("utf-8"))
+        h.update(b"\1")
+    return h.hexdigest()
+
+
+class ConversationContextManager:
+    """Fits chat history into a per-model token budget.
+
+    The newest turns are kept verbatim; older turns are folded into one
+    summary message. Summaries are cached per conversation and extended
+    incrementally as more turns age out, so a long session only summarizes
+    each turn once.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: int = DEFAULT_TOKEN_BUDGET,
+        summary_share: float = 0.2,
+        summarizer: Summarizer = extractive_summary,
+        cache_size: int = 1024,
+    ):
+        self.budgets = dict(MODEL_TOKEN_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self.summary_share = summary_share
+        self.summarizer = summarizer
+        self.cache_size = cache_size
+        # conversation key -> (digest of summarized prefix, turns summarized, summary)
+        self._summaries: "OrderedDict[str, Tuple[str, int, str]]" = OrderedDict()
+
+    def budget_for(self, model: Optional[str]) -> int:
+        return self.budgets.get(model or "", self.default_budget)
+
+    async def build(
+        self,
+        history: Optional[List[Message]],
+        message: str,
+        model: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+    ) -> ContextResult:
+        encoding_model = model or "gpt-4o-mini"
+        # Never mutate the caller's list
+        turns = [dict(m) for m in (history or [])]
+        current = {"role": "user", "content": message}
+        system = [m for m in turns if m.get("role") == "system"]
+        dialogue = [m for m in turns if m.get("role") != "system"]
+
+        costs = [message_tokens(m, encoding_model) for m in dialogue]
+        fixed = sum(message_tokens(m, encoding_model) for m in system) + message_tokens(current, encoding_model)
+        tokens_before = fixed + sum(costs)
+        budget = self.budget_for(model)
+        if tokens_before <= budget:
+            return ContextResult(system + dialogue + [current], tokens_before, tokens_before)
+
+        summary_budget = int(budget * self.summary_share)
+        remaining = budget - fixed - summary_budget - MESSAGE_OVERHEAD_TOKENS
+        keep_from = len(dialogue)
+        while keep_from > 0 and costs[keep_from - 1] <= remaining:
+            remaining -= costs[keep_from - 1]
+            keep_from -= 1
+        older, recent = dialogue[:keep_from], dialogue[keep_from:]
+
+        summary, cached = await self._summary_for(conversation_id, older, summary_budget)
+        kept = list(system)
+        if summary:
+            kept.append({"role": "system", "content": SUMMARY_PREFIX + summary})
+        kept.extend(recent)
+        kept.append(current)
+        tokens_after = sum(message_tokens(m, encoding_model) for m in kept)
+        return ContextResult(kept, tokens_before, tokens_after, summarized_turns=len(older), summary_cached=cached)
+
+    async def _summary_for(self, conversation_id: Optional[str], older: List[Message], max_tokens: int) -> Tuple[str, bool]:
+        if not older:
+            return "", False
+        key = conversation_id or _turns_digest(older[:1])
+        entry = self._summaries.get(key)
+        if entry is not None:
+            digest, count, summary = entry
+            if count <= len(older) and _turns_digest(older[:count]) == digest:
+                self._summaries.move_to_end(key)
+                if count == len(older):
+                    return summary, True
+                # Fold only the newly aged-out turns into the cached summary
+                new_part = await self.summarizer(older[count:], max_tokens)
+                summary = _clip_oldest_lines(f"{summary}\n{new_part}" if summary else new_part, max_tokens)
+                self._store(key, older, summary)
+                return summary, False
+        summary = await self.summarizer(older, max_tokens)
+        self._store(key, older, summary)
+        return summary, False
+
+    def _store(self, key: str, older: List[Message], summary: str) -> None:
+        self._summaries[key] = (_turns_digest(older), len(older), summary)
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
+
+
+_context_manager: Optional[ConversationContextManager] = None
+
+
+def get_context_manager() -> ConversationContextManager:
+    global _context_manager
+    if _context_manager is None:
+        _context_manager = ConversationContextManager()
+    return _context_manager
@@ -1,6 +1,8 @@
 import os
 import httpx
 
+from backend.infrastructure.ai.resilience import get_guard
+
 CURSOR_API_KEY = os.getenv("CURSOR_API_KEY")
 CURSOR_API_URL = "https://api.cursor.com"
 
@@ -15,8 +17,11 @@ async def chat_cursor(messages, model: str = "cursor-pro") -> str:
         "Authorization": f"Bearer {CURSOR_API_KEY}",
         "Content-Type": "application/json"
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.post(CURSOR_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+    guard = get_guard("cursor")
+    async with guard.slot():
+        async with httpx.AsyncClient(timeout=guard.timeout) as client:
+            response = await client.post(CURSOR_API_URL, json=payload, headers=headers)
+            guard.check_response(response)
+            response.raise_for_status()
+            data = response.json()
+    return data["choices"][0]["message"]["content"]
@@ -1,6 +1,8 @@
 import os
 import httpx
 
+from backend.infrastructure.ai.resilience import get_guard
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 
@@ -15,8 +17,11 @@ async def chat_groq(messages, model: str = "gpt-oss:20b") -> str:
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json"
     }
-    async with httpx.AsyncClient() as client:
-        groq_resp = await client.post(GROQ_API_URL, json=payload, headers=headers)
-        groq_resp.raise_for_status()
-        data = groq_resp.json()
-        return data["choices"][0]["message"]["content"]
+    guard = get_guard("groq")
+    async with guard.slot():
+        async with httpx.AsyncClient(timeout=guard.timeout) as client:
+            groq_resp = await client.post(GROQ_API_URL, json=payload, headers=headers)
+            guard.check_response(groq_resp)
+            groq_resp.raise_for_status()
+            data = groq_resp.json()
+    return data["choices"][0]["message"]["content"]
@@ -1,6 +1,8 @@
 import os
 import httpx
 
+from backend.infrastructure.ai.resilience import get_guard
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 
@@ -15,8 +17,11 @@ async def chat_openai(messages, model: str = "gpt-4") -> str:
         "Authorization": f"Bearer {OPENAI_API_KEY}",
         "Content-Type": "application/json"
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.post(OPENAI_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+    guard = get_guard("openai")
+    async with guard.slot():
+        async with httpx.AsyncClient(timeout=guard.timeout) as client:
+            response = await client.post(OPENAI_API_URL, json=payload, headers=headers)
+            guard.check_response(response)
+            response.raise_for_status()
+            data = response.json()
+    return data["choices"][0]["message"]["content"]
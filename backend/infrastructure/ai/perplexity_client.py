@@ -1,6 +1,8 @@
 import os
 import httpx
 
+from backend.infrastructure.ai.resilience import get_guard
+
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
 
@@ -15,8 +17,11 @@ async def chat_perplexity(messages, model: str = "pplx-7b-online") -> str:
         "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
         "Content-Type": "application/json"
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.post(PERPLEXITY_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+    guard = get_guard("perplexity")
+    async with guard.slot():
+        async with httpx.AsyncClient(timeout=guard.timeout) as client:
+            response = await client.post(PERPLEXITY_API_URL, json=payload, headers=headers)
+            guard.check_response(response)
+            response.raise_for_status()
+            data = response.json()
+    return data["choices"][0]["message"]["content"]
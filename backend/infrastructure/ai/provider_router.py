@@ -0,0 +1,249 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from backend.infrastructure.logging.logging_middleware import logger
+
+ChatFn = Callable[[List[Dict[str, str]], str], Awaitable[str]]
+
+
+@dataclass
+class Provider:
+    name: str
+    call: ChatFn
+    default_model: str
+    # Checked before routing; lets a provider opt out (e.g. missing key)
+    available: Callable[[], bool] = field(default=lambda: True)
+
+
+@dataclass
+class RouteResult:
+    answer: str
+    provider: str
+    model: str
+    hedged: bool = False
+    latency_ms: float = 0.0
+
+
+class LatencyStats:
+    """Rolling window of latencies and outcomes for one provider/model pair."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, latency_s: float, ok: bool) -> None:
+        self._samples.append((latency_s, ok))
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        # Only successful calls say anything about how fast a provider answers
+        latencies = sorted(lat for lat, ok in self._samples if ok)
+        if not latencies:
+            return None
+        idx = min(len(latencies) - 1, max(0, int(round(q * (len(latencies) - 1)))))
+        return latencies[idx]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "samples": self.count,
+            "p50_ms": round(self.p50 * 1000, 1) if self.p50 is not None else None,
+            "p95_ms": round(self.p95 * 1000, 1) if self.p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+class ProviderRouter:
+    """Routes chat completions across providers.
+
+    Keeps rolling p50/p95 and error rates per provider/model, picks the best
+    provider when the caller has no preference, and fires a hedged backup
+    request once the primary has run past its own p95. Whichever call
+    finishes first wins and the other one is cancelled. A provider the caller
+    names is used alone: no hedge and no fallback to another provider.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider] = (),
+        window: int = 200,
+        min_samples_for_hedge: int = 20,
+        min_hedge_delay_s: float = 0.05,
+        error_penalty: float = 4.0,
+    ):
+        self._providers: Dict[str, Provider] = {}
+        self._stats: Dict[Tuple[str, str], LatencyStats] = {}
+        self.window = window
+        self.min_samples_for_hedge = min_samples_for_hedge
+        self.min_hedge_delay_s = min_hedge_delay_s
+        self.error_penalty = error_penalty
+        for provider in providers:
+            self.register(provider)
+
+    def register(self, provider: Provider) -> None:
+        self._providers[provider.name] = provider
+
+    def has_provider(self, name: str) -> bool:
+        return name in self._providers
+
+    def default_model(self, name: str) -> Optional[str]:
+        provider = self._providers.get(name)
+        return provider.default_model if provider else None
+
+    def stats(self, provider: str, model: str) -> LatencyStats:
+        key = (provider, model)
+        if key not in self._stats:
+            self._stats[key] = LatencyStats(self.window)
+        return self._stats[key]
+
+    def _score(self, provider: Provider) -> float:
+        stats = self.stats(provider.name, provider.default_model)
+        # Unmeasured providers sort first so every provider gets explored
+        if stats.count == 0 or stats.p50 is None:
+            return 0.0 if stats.count == 0 else float("inf")
+        return stats.p50 * (1.0 + self.error_penalty * stats.error_rate)
+
+    def ranked(self, exclude: Sequence[str] = ()) -> List[Provider]:
+        candidates = [
+            p for p in self._providers.values()
+            if p.name not in exclude and p.available()
+        ]
+        return sorted(candidates, key=self._score)
+
+    def choose(self, exclude: Sequence[str] = ()) -> Optional[Provider]:
+        ranked = self.ranked(exclude)
+        return ranked[0] if ranked else None
+
+    def _hedge_delay(self, provider: str, model: str) -> Optional[float]:
+        stats = self.stats(provider, model)
+        if stats.count < self.min_samples_for_hedge or stats.p95 is None:
+            return None
+        return max(stats.p95, self.min_hedge_delay_s)
+
+    async def _timed_call(self, provider: Provider, model: str, messages: List[Dict[str, str]]) -> RouteResult:
+        start = time.perf_counter()
+        try:
+            answer = await provider.call(messages, model)
+        except asyncio.CancelledError:
+            # A cancelled hedge loser is not the provider's fault
+            raise
+        except Exception:
+            self.stats(provider.name, model).record(time.perf_counter() - start, ok=False)
+            raise
+        elapsed = time.perf_counter() - start
+        self.stats(provider.name, model).record(elapsed, ok=True)
+        return RouteResult(answer=answer, provider=provider.name, model=model, latency_ms=elapsed * 1000)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        hedge: bool = True,
+    ) -> RouteResult:
+        if provider is not None:
+            if provider not in self._providers:
+                raise KeyError(provider)
+            primary = self._providers[provider]
+        else:
+            primary = self.choose()
+            if primary is None:
+                raise RuntimeError("No AI provider is available.")
+        primary_model = model or primary.default_model
+
+        pinned = provider is not None
+        tried = [primary.name]
+        primary_task = asyncio.create_task(self._timed_call(primary, primary_model, messages))
+        delay = self._hedge_delay(primary.name, primary_model) if hedge and not pinned else None
+        pending = {primary_task}
+        backup: Optional[Provider] = None
+
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    backup = self.choose(exclude=tried)
+                    if backup is not None:
+                        tried.append(backup.name)
+                        logger.info(
+                            f"Hedging {primary.name}/{primary_model} after {delay * 1000:.0f}ms with {backup.name}"
+                        )
+                        pending.add(asyncio.create_task(self._timed_call(backup, backup.default_model, messages)))
+
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        result = task.result()
+                        result.hedged = backup is not None
+                        return result
+                    last_error = task.exception()
+                if not pending and backup is None and not pinned:
+                    # Primary failed before a hedge was sent: fall back once
+                    backup = self.choose(exclude=tried)
+                    if backup is not None:
+                        tried.append(backup.name)
+                        logger.warning(f"{primary.name} failed ({last_error!r}); falling back to {backup.name}")
+                        pending.add(asyncio.create_task(self._timed_call(backup, backup.default_model, messages)))
+            assert last_error is not None
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let the losers finish unwinding, so their cancellation is not left unobserved
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {f"{name}/{model}": stats.snapshot() for (name, model), stats in self._stats.items()}
+
+
+def _default_providers() -> List[Provider]:
+    from backend.infrastructure.ai import cursor_client, groq_client, openai_client, perplexity_client
+    from backend.infrastructure.ai.resilience import get_guard
+
+    def ready(name: str, key_holder, key_attr: str) -> Callable[[], bool]:
+        # Skip providers without a key or whose circuit breaker is open
+        return lambda: bool(getattr(key_holder, key_attr)) and get_guard(name).available()
+
+    return [
+        Provider("groq", groq_client.chat_groq, "gemma2-9b-it", available=ready("groq", groq_client, "GROQ_API_KEY")),
+        Provider("perplexity", perplexity_client.chat_perplexity, "pplx-7b-online",
+                 available=ready("perplexity", perplexity_client, "PERPLEXITY_API_KEY")),
+        Provider("openai", openai_client.chat_openai, "gpt-4", available=ready("openai", openai_client, "OPENAI_API_KEY")),
+        Provider("cursor", cursor_client.chat_cursor, "cursor-pro", available=ready("cursor", cursor_client, "CURSOR_API_KEY")),
+    ]
+
+
+_router: Optional[ProviderRouter] = None
+
+
+def get_provider_router() -> ProviderRouter:
+    global _router
+    if _router is None:
+        _router = ProviderRouter(_default_providers())
+    return _router
+
+
+def set_provider_router(router: Optional[ProviderRouter]) -> None:
+    # For tests/benchmarks: swap in a router with local fake providers (None restores the default)
+    global _router
+    _router = router
@@ -8,6 +8,7 @@ from chromadb.config import Settings  # type: ignore
 from typing import Optional
 from backend.infrastructure.settings import settings
 import hashlib
+from functools import lru_cache
 
 _st_model = None
 
@@ -39,6 +40,21 @@ def tokenize_text(text: str, model: str = "gpt-4o-mini") -> List[int]:
     return enc.encode(text)
 
 
+_encoding_unavailable = False
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    global _encoding_unavailable
+    if not _encoding_unavailable:
+        try:
+            return len(_get_encoding(model).encode(text))
+        except Exception:
+            # tiktoken could not load its BPE files (offline host); don't retry per call
+            _encoding_unavailable = True
+    return (len(text) + 3) // 4
+
+
 def chunk_text(text: str, max_tokens: int = 700, overlap_tokens: int = 80, model: str = "gpt-4o-mini") -> List[str]:
     enc = _get_encoding(model)
     tokens = enc.encode(text)
@@ -0,0 +1,268 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from backend.infrastructure.logging.logging_middleware import logger
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised without calling the provider when it is tripped, rate limited or saturated."""
+
+    def __init__(self, provider: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"{provider} unavailable: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    # Retry-After is either delta-seconds or an HTTP-date
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() >= self._opened_until:
+            return self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_until - self._clock())
+
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            # Let exactly one probe through; its outcome closes or re-opens the breaker
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self.trip(self.reset_timeout)
+
+    def trip(self, duration: float) -> None:
+        self._state = self.OPEN
+        self._probe_in_flight = False
+        self._opened_until = max(self._opened_until, self._clock() + duration)
+
+    def release_probe(self) -> None:
+        # Probe ended without telling us anything about provider health
+        self._probe_in_flight = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight calls: +1 per window of successes, halved on overload."""
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        max_queue_wait: float = 2.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.max_queue_wait = max_queue_wait
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self) -> bool:
+        if self._in_flight < self.limit:
+            self._in_flight += 1
+            return True
+        cond = self._condition()
+        try:
+            async with cond:
+                await asyncio.wait_for(cond.wait_for(lambda: self._in_flight < self.limit), self.max_queue_wait)
+                self._in_flight += 1
+                return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def release(self, overloaded: bool = False) -> None:
+        self._in_flight -= 1
+        if overloaded:
+            self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        else:
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+        if self._cond is not None:
+            async with self._cond:
+                self._cond.notify_all()
+
+
+class ProviderGuard:
+    def __init__(
+        self,
+        name: str,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        timeout: Optional[httpx.Timeout] = None,
+    ):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.timeout = timeout or httpx.Timeout(20.0, connect=5.0)
+        self.counters: Dict[str, int] = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "rate_limited": 0,
+            "timeouts": 0,
+            "rejected_open": 0,
+            "rejected_saturated": 0,
+        }
+
+    def available(self) -> bool:
+        return not self.breaker.is_open()
+
+    def check_response(self, response: httpx.Response) -> None:
+        if response.status_code in (429, 503):
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                self.counters["rate_limited"] += 1
+            self.breaker.trip(retry_after if retry_after is not None else self.breaker.reset_timeout)
+            logger.warning(f"{self.name} returned {response.status_code}; backing off {self.breaker.retry_after():.1f}s")
+            raise ProviderUnavailableError(self.name, f"HTTP {response.status_code}", self.breaker.retry_after())
+
+    @asynccontextmanager
+    async def slot(self):
+        if not self.breaker.allow_request():
+            self.counters["rejected_open"] += 1
+            raise ProviderUnavailableError(self.name, "circuit open", self.breaker.retry_after())
+        if not await self.limiter.acquire():
+            self.counters["rejected_saturated"] += 1
+            self.breaker.release_probe()
+            raise ProviderUnavailableError(self.name, f"concurrency limit {self.limiter.limit} reached", 1.0)
+        self.counters["requests"] += 1
+        overloaded = False
+        try:
+            yield self
+        except ProviderUnavailableError:
+            # check_response already tripped the breaker for the advertised period
+            overloaded = True
+            self.counters["failures"] += 1
+            raise
+        except (httpx.TimeoutException, httpx.TransportError):
+            overloaded = True
+            self.counters["failures"] += 1
+            self.counters["timeouts"] += 1
+            self.breaker.record_failure()
+            raise
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code >= 500:
+                overloaded = True
+                self.counters["failures"] += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.release_probe()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            self.counters["failures"] += 1
+            self.breaker.record_failure()
+            raise
+        else:
+            self.counters["successes"] += 1
+            self.breaker.record_success()
+        finally:
+            await self.limiter.release(overloaded=overloaded)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "state": self.breaker.state,
+            "retry_after_s": round(self.breaker.retry_after(), 1),
+            "concurrency_limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            **self.counters,
+        }
+
+
+_guards: Dict[str, ProviderGuard] = {}
+
+
+def get_guard(provider: str) -> ProviderGuard:
+    guard = _guards.get(provider)
+    if guard is None:
+        from backend.infrastructure.settings import settings
+
+        guard = ProviderGuard(
+            provider,
+            breaker=CircuitBreaker(settings.ai_breaker_failure_threshold, settings.ai_breaker_reset_s),
+            limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=settings.ai_initial_concurrency,
+                max_limit=settings.ai_max_concurrency,
+                max_queue_wait=settings.ai_max_queue_wait_s,
+            ),
+            timeout=httpx.Timeout(settings.ai_request_timeout_s, connect=settings.ai_connect_timeout_s),
+        )
+        _guards[provider] = guard
+    return guard
+
+
+def guards_snapshot() -> Dict[str, Dict[str, object]]:
+    return {name: guard.snapshot() for name, guard in _guards.items()}
@@ -0,0 +1,182 @@
+# Negotiated response compression (brotli when the optional `brotli` package is installed, else gzip).
+# Bodies below the threshold, already-encoded or non-text responses and event streams pass through.
+# Streamed bodies are buffered only up to the threshold, then compressed chunk by chunk.
+import gzip
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.infrastructure.metrics.registry import SIZE_BUCKETS, registry
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+compressed_bytes = registry.histogram(
+    "http_response_compressed_bytes", "Response body size after compression", ("encoding",), buckets=SIZE_BUCKETS
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    weights = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token.strip().lower()] = q
+    return weights
+
+
+def choose_encoding(header: Optional[str], brotli_available: bool = brotli is not None) -> Optional[str]:
+    if not header:
+        return None
+    weights = parse_accept_encoding(header)
+    offered = (["br"] if brotli_available else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in offered:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=brotli_quality)
+            self._compress, self._finish = self._obj.process, self._obj.finish
+        else:
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress, self._finish = self._obj.compress, self._obj.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self, encoding, send).run(scope, receive)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.mw = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.buffered: List[bytes] = []
+        self.size = 0
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.out_size = 0
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.mw.app(scope, receive, self.on_send)
+
+    def _eligible(self, start: Message) -> bool:
+        headers = Headers(raw=start["headers"])
+        content_type = headers.get("content-type", "")
+        return (
+            start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and not content_type.startswith("text/event-stream")
+            and any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES)
+        )
+
+    def _encoded_start(self, content_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The encoded bytes differ from the identity ones, so the validator becomes weak (as nginx does);
+            # If-None-Match compares weakly, so revalidation still answers 304
+            headers["ETag"] = "W/" + etag
+        if content_length is None:
+            del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        return {**self.start, "headers": headers.raw}
+
+    async def _flush_plain(self, more_body: bool) -> None:
+        self.passthrough = True
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": b"".join(self.buffered), "more_body": more_body})
+        self.buffered = []
+
+    async def on_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            if not self._eligible(message):
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            chunk = self.compressor.compress(body) + (b"" if more_body else self.compressor.finish())
+            self.out_size += len(chunk)
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if not more_body:
+                compressed_bytes.observe(self.out_size, self.encoding)
+            return
+
+        self.buffered.append(body)
+        self.size += len(body)
+        if not more_body:
+            if self.size < self.mw.minimum_size:
+                await self._flush_plain(False)
+                return
+            data = compress_body(b"".join(self.buffered), self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+            compressed_bytes.observe(len(data), self.encoding)
+            await self.send(self._encoded_start(len(data)))
+            await self.send({"type": "http.response.body", "body": data, "more_body": False})
+            return
+        if self.size >= self.mw.minimum_size:
+            # Long streamed body: compress incrementally from here on
+            self.compressor = _Compressor(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+            await self.send(self._encoded_start(None))
+            chunk = self.compressor.compress(b"".join(self.buffered))
+            self.out_size += len(chunk)
+            self.buffered = []
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from backend.domain.entities.crew import Crew
+from backend.infrastructure.database.core import get_read_conn
+from backend.infrastructure.database.availability import available_crew_sql, get_availability_manager
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.api.responses import FastJSONResponse
+
+router = APIRouter(prefix="/api/availability", tags=["availability"])
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+@router.get("/crew", response_model=List[Crew])
+@traced()
+async def get_available_crew(
+    start: datetime = Query(..., description="Window start (UTC if no offset)"),
+    end: datetime = Query(..., description="Window end"),
+    rank: Optional[str] = Query(None, description="CAPTAIN, FIRST_OFFICER or FLIGHT_ATTENDANT"),
+    base: Optional[str] = Query(None, description="Base airport code"),
+    conn=Depends(get_read_conn),
+):
+    # Crew whose availability covers the window and who have no overlapping duty
+    start, end = _naive_utc(start), _naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    manager = get_availability_manager()
+    index = await manager.get()
+    if index is not None and manager.covers(start, end):
+        crew = [index.get_crew(crew_id) for crew_id in index.available(start, end, rank, base)]
+        source = "index"
+    else:
+        crew = await available_crew_sql(conn, start, end, rank, base)
+        source = "database"
+    return FastJSONResponse(crew, headers={"X-Availability-Source": source})
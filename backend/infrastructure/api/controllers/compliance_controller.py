@@ -20,7 +20,7 @@ router = APIRouter(prefix="/api/compliance", tags=["compliance"])
 
 @router.get("/rules", response_model=List[ComplianceRule])
 async def get_compliance_rules():
-    data = get_compliance_rules_from_vector_store()
+    data = await get_compliance_rules_from_vector_store()
     return [ComplianceRule(**item) for item in data]
 
 class UpdateRulesRequest(BaseModel):
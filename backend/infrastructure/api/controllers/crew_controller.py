@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from backend.infrastructure.database.core import get_db_conn
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.infrastructure.database.core import get_read_conn
 from backend.domain.entities.crew import Crew
 from typing import List
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.infrastructure.api.controllers.params import parse_ids
+from backend.infrastructure.database.loaders import Loaders, get_loaders
 
 router = APIRouter(prefix="/api/crew", tags=["crew"])
 
 @router.get("/", response_model=List[Crew])
-async def get_all_crew(conn=Depends(get_db_conn)):
+@traced()
+async def get_all_crew(conn=Depends(get_read_conn)):
     # Remove repository instantiation, use connection directly
     query = "SELECT * FROM crew"
     async with conn.cursor() as cur:
@@ -15,10 +20,19 @@ async def get_all_crew(conn=Depends(get_db_conn)):
         if not rows:
             raise HTTPException(status_code=404, detail="No crew found")
         columns = [desc[0] for desc in cur.description]
-        return [Crew(**dict(zip(columns, row))) for row in rows]
+        return FastJSONResponse([Crew(**dict(zip(columns, row))) for row in rows])
+
+# Declared before /{crew_id} so "batch" is not parsed as an ID
+@router.get("/batch", response_model=List[Crew])
+@traced()
+async def get_crew_batch(ids: str = Query(..., description="Comma-separated crew IDs"), loaders: Loaders = Depends(get_loaders)):
+    # One query for all IDs; unknown IDs are left out, the rest keep the requested order
+    crew = await loaders.crew.load_many(parse_ids(ids))
+    return FastJSONResponse([c for c in crew if c is not None])
 
 @router.get("/{crew_id}", response_model=Crew)
-async def get_crew_by_id(crew_id: int, conn=Depends(get_db_conn)):
+@traced()
+async def get_crew_by_id(crew_id: int, conn=Depends(get_read_conn)):
     # Use connection directly
     query = "SELECT * FROM crew WHERE id = %s"
     async with conn.cursor() as cur:
@@ -27,4 +41,4 @@ async def get_crew_by_id(crew_id: int, conn=Depends(get_db_conn)):
         if not row:
             raise HTTPException(status_code=404, detail="Crew not found")
         columns = [desc[0] for desc in cur.description]
-        return Crew(**dict(zip(columns, row)))
\ No newline at end of file
+        return FastJSONResponse(Crew(**dict(zip(columns, row))))
\ No newline at end of file
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Depends, status
-from backend.infrastructure.database.core import get_db_conn
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from backend.infrastructure.database.core import get_db_conn, get_read_conn
 from typing import List
 from pydantic import BaseModel
 from datetime import timezone
 import datetime, json
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.infrastructure.cache.response_cache import commit_and_invalidate
+from backend.infrastructure.events.broker import get_event_broker
+from backend.infrastructure.events.feeds import notify_event
+from backend.infrastructure.database.disruption_repository import DisruptionRepositoryImpl
+from backend.infrastructure.database.flight_repository import FlightRepository
+from backend.infrastructure.database.roster_repository import RosterRepository
+from backend.applications.use_cases.compute_disruption_impact import ComputeDisruptionImpactUseCase
+from backend.infrastructure.settings import settings
+import time
 
 class DisruptionIn(BaseModel):
     type: str
@@ -19,7 +30,8 @@ class DisruptionOut(DisruptionIn):
 router = APIRouter(prefix="/api/disruptions", tags=["disruptions"])
 
 @router.get("/", response_model=List[DisruptionOut])
-async def get_disruptions(conn=Depends(get_db_conn)):
+@traced()
+async def get_disruptions(conn=Depends(get_read_conn)):
     # Use connection directly, remove repository instantiation
     query = "SELECT * FROM disruptions ORDER BY timestamp DESC"
     async with conn.cursor() as cur:
@@ -29,18 +41,19 @@ async def get_disruptions(conn=Depends(get_db_conn)):
         disruptions = []
         for row in rows:
             d = dict(zip(columns, row))
-            disruptions.append(DisruptionOut(
-                id=d["id"],
-                type=d["type"],
-                severity=d["severity"],
-                title=d["title"],
-                description=d["description"],
-                affectedFlights=d["affected_flights"] if isinstance(d["affected_flights"], list) else [],
-                timestamp=d["timestamp"].isoformat() if d["timestamp"] else ""
-            ))
-        return disruptions
+            disruptions.append({
+                "type": d["type"],
+                "severity": d["severity"],
+                "title": d["title"],
+                "description": d["description"],
+                "affectedFlights": d["affected_flights"] if isinstance(d["affected_flights"], list) else [],
+                "id": d["id"],
+                "timestamp": d["timestamp"] or ""
+            })
+        return FastJSONResponse(disruptions)
 
 @router.post("/", response_model=DisruptionOut, status_code=status.HTTP_201_CREATED)
+@traced()
 async def create_disruption(disruption: DisruptionIn, conn=Depends(get_db_conn)):
     # Fix the INSERT query - it was missing INSERT INTO
     query = """
@@ -61,13 +74,63 @@ async def create_disruption(disruption: DisruptionIn, conn=Depends(get_db_conn))
         await cur.execute(query, values)
         row = await cur.fetchone()
         columns = [desc[0] for desc in cur.description]
-        d = dict(zip(columns, row))
-        return DisruptionOut(
-            id=d["id"],
-            type=d["type"],
-            severity=d["severity"],
-            title=d["title"],
-            description=d["description"],
-            affectedFlights=json.loads(d["affected_flights"]) if d["affected_flights"] else [],
-            timestamp=d["timestamp"].isoformat() if d["timestamp"] else ""
-        )
\ No newline at end of file
+    d = dict(zip(columns, row))
+    affected = d["affected_flights"]
+    created = DisruptionOut(
+        id=d["id"],
+        type=d["type"],
+        severity=d["severity"],
+        title=d["title"],
+        description=d["description"],
+        # JSONB comes back decoded; a JSON string only from drivers without the JSONB loader
+        affectedFlights=json.loads(affected) if isinstance(affected, str) else (affected or []),
+        timestamp=d["timestamp"].isoformat() if d["timestamp"] else ""
+    )
+    # Other workers hear about it only if the insert commits; this one publishes straight away
+    await notify_event(conn, "disruptions", "disruption.created", created.model_dump())
+    await commit_and_invalidate(conn, ("disruptions",))
+    get_event_broker().publish("disruptions", "disruption.created", created.model_dump())
+    return created
+
+@router.get("/{disruption_id}/impact")
+@traced()
+async def get_disruption_impact(
+    disruption_id: int,
+    delay_minutes: float | None = Query(None, gt=0, description="Initial delay; defaults by severity"),
+    horizon_hours: float | None = Query(None, gt=0, le=72),
+    max_depth: int | None = Query(None, ge=1, le=20),
+    conn=Depends(get_read_conn),
+):
+    disruption = await DisruptionRepositoryImpl(conn).get_by_id(disruption_id)
+    if disruption is None:
+        raise HTTPException(status_code=404, detail="Disruption not found")
+    started = time.perf_counter()
+    impact = await ComputeDisruptionImpactUseCase(FlightRepository(conn), RosterRepository(conn)).execute(
+        disruption,
+        delay_min=delay_minutes,
+        horizon=datetime.timedelta(hours=horizon_hours or settings.impact_horizon_hours),
+        max_depth=max_depth or settings.impact_max_depth,
+    )
+    result = impact.result
+    return FastJSONResponse({
+        "disruptionId": disruption.id,
+        "initialDelayMinutes": impact.delay_min,
+        "seedFlights": [f.flight_number for f in impact.seeds],
+        "flights": [
+            {
+                "id": f.id,
+                "flightNumber": f.flight_number,
+                "departure": f.scheduled_departure,
+                "aircraftRegistration": f.aircraft_registration,
+                "disruptionImpact": f.disruption_impact,
+                "depth": result.depth[f.id],
+                "via": {"flightId": result.via[f.id][0], "link": result.via[f.id][1]} if f.id in result.via else None,
+            }
+            for f in impact.flights
+        ],
+        "affectedCrew": sorted(result.crew_ids),
+        "affectedRosters": sorted(result.roster_ids),
+        "truncated": result.truncated,
+        "graphFlights": impact.graph_size,
+        "computeMs": round((time.perf_counter() - started) * 1000, 2),
+    })
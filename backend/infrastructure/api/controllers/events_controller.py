@@ -0,0 +1,72 @@
+import asyncio
+from typing import AsyncIterator, Optional, Set
+from fastapi import APIRouter, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from backend.infrastructure.events.broker import TOPICS, EventBroker, Subscription, get_event_broker
+from backend.infrastructure.settings import settings
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+def _topics(raw: Optional[str]) -> Set[str]:
+    return {t.strip() for t in raw.split(",") if t.strip()} if raw else set(TOPICS)
+
+async def _sse(broker: EventBroker, sub: Subscription, last_event_id: Optional[str]) -> AsyncIterator[bytes]:
+    try:
+        # Reconnect delay hint for EventSource, then whatever the client missed (or a resync)
+        yield b"retry: 3000\n\n"
+        if last_event_id:
+            missed = broker.replay_since(last_event_id, sub.topics)
+            for event in missed if missed is not None else [broker.resync_event()]:
+                yield event.sse()
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), settings.events_heartbeat_s)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield b": keep-alive\n\n"
+                continue
+            yield event.sse()
+    finally:
+        sub.close()
+
+@router.get("/stream")
+async def stream_events(
+    topics: Optional[str] = Query(None, description=f"Comma-separated subset of {', '.join(TOPICS)}"),
+    last_event_id: Optional[str] = Header(None),
+):
+    # Server-sent events; EventSource sends Last-Event-ID on reconnect
+    broker = get_event_broker()
+    sub = broker.subscribe(_topics(topics), transport="sse")
+    return StreamingResponse(
+        _sse(broker, sub, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def events_websocket(websocket: WebSocket, topics: Optional[str] = Query(None)):
+    await websocket.accept()
+    sub = get_event_broker().subscribe(_topics(topics), transport="websocket")
+
+    async def send_events():
+        while True:
+            event = await sub.get()
+            # A slow client only blocks this loop; its own queue absorbs (and then sheds) the backlog
+            await websocket.send_text(event.json().decode())
+
+    async def wait_for_close():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            return
+
+    sender = asyncio.create_task(send_events())
+    closer = asyncio.create_task(wait_for_close())
+    try:
+        await asyncio.wait({sender, closer}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        sub.close()
+        for task in (sender, closer):
+            task.cancel()
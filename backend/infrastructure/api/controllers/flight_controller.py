@@ -1,9 +1,16 @@
 
-from fastapi import APIRouter, Depends
-from backend.infrastructure.database.core import get_db_conn
+import asyncio
+from dataclasses import asdict, dataclass
+from fastapi import APIRouter, Depends, Query
+from backend.domain.entities.flight import Flight
+from backend.infrastructure.database.core import get_read_conn
 from backend.infrastructure.database.repositories import FlightRepository
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.infrastructure.api.controllers.params import parse_ids
+from backend.infrastructure.database.loaders import Loaders, get_loaders
 
 class FlightCrew(BaseModel):
     captain: str | None = None
@@ -22,10 +29,45 @@ class FlightOut(BaseModel):
     requiredQualifications: List[str]
     conflicts: List[str]
 
+@dataclass
+class RosteredCrew:
+    crew_id: int
+    crew_position: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+
+@dataclass
+class FlightWithCrew(Flight):
+    # Only filled in when the batch is asked for crew
+    crew: Optional[List[RosteredCrew]] = None
+
 router = APIRouter(prefix="/api/flights", tags=["flights"])
 
+async def _with_crew(flight: Flight, loaders: Loaders) -> FlightWithCrew:
+    rosters = await loaders.rosters_by_flight.load(flight.id)
+    crew = await loaders.crew.load_many([r.crew_id for r in rosters])
+    return FlightWithCrew(**asdict(flight), crew=[
+        RosteredCrew(r.crew_id, r.crew_position, c.first_name if c else None, c.last_name if c else None)
+        for r, c in zip(rosters, crew)
+    ])
+
+# Declared before any /{flight_id} route so "batch" is not parsed as an ID
+@router.get("/batch", response_model=List[FlightWithCrew])
+@traced()
+async def get_flights_batch(
+    ids: str = Query(..., description="Comma-separated flight IDs"),
+    include_crew: bool = Query(False, description="Add each flight's rostered crew"),
+    loaders: Loaders = Depends(get_loaders),
+):
+    flights = [f for f in await loaders.flights.load_many(parse_ids(ids)) if f is not None]
+    if not include_crew:
+        return FastJSONResponse([FlightWithCrew(**asdict(f)) for f in flights])
+    # Concurrent per-flight lookups coalesce into one rosters query and one crew query
+    return FastJSONResponse(await asyncio.gather(*(_with_crew(f, loaders) for f in flights)))
+
 @router.get("/", response_model=List[FlightOut])
-async def get_flights(conn=Depends(get_db_conn)):
+@traced()
+async def get_flights(conn=Depends(get_read_conn)):
     repo = FlightRepository(conn)
     flights = await repo.get_all_flights()
     result = []
@@ -42,16 +84,17 @@ async def get_flights(conn=Depends(get_db_conn)):
                 crew_map["firstOfficer"] = name
             elif pos == "flight_attendant":
                 crew_map["flightAttendants"].append(name)
-        result.append(FlightOut(
-            id=str(f["id"]),
-            flightNumber=f["flight_number"],
-            aircraft=f["aircraft_type"],
-            route={"from": f["departure_airport"], "to": f["arrival_airport"]},
-            departure=f["scheduled_departure"].isoformat() if f["scheduled_departure"] else "",
-            arrival=f["scheduled_arrival"].isoformat() if f["scheduled_arrival"] else "",
-            status=f["status"],
-            assignedCrew=FlightCrew(**crew_map),
-            requiredQualifications=f.get("crew_requirements") or [],
-            conflicts=[] # TODO: Add logic for conflicts if needed
-        ))
-    return result
+        # Plain dicts in the FlightOut shape; orjson renders the datetimes as ISO 8601
+        result.append({
+            "id": str(f["id"]),
+            "flightNumber": f["flight_number"],
+            "aircraft": f["aircraft_type"],
+            "route": {"from": f["departure_airport"], "to": f["arrival_airport"]},
+            "departure": f["scheduled_departure"] or "",
+            "arrival": f["scheduled_arrival"] or "",
+            "status": f["status"],
+            "assignedCrew": crew_map,
+            "requiredQualifications": f.get("crew_requirements") or [],
+            "conflicts": [] # TODO: Add logic for conflicts if needed
+        })
+    return FastJSONResponse(result)
@@ -0,0 +1,18 @@
+from typing import List
+from fastapi import HTTPException
+
+MAX_BATCH_IDS = 500
+
+
+def parse_ids(raw: str, limit: int = MAX_BATCH_IDS) -> List[int]:
+    """Comma-separated integer IDs from a query parameter, de-duplicated in request order."""
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="at least one id is required")
+    if len(ids) > limit:
+        raise HTTPException(status_code=400, detail=f"at most {limit} ids per request")
+    return ids
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+from typing import Optional
+
+from backend.infrastructure.profiling import profiler
+
+router = APIRouter(prefix="/api/profiling", tags=["profiling"])
+
+def _require_token(token: Optional[str]):
+    if not profiler.is_authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling not enabled or invalid token")
+
+@router.get("/hot")
+async def get_hot_functions(
+    limit: int = Query(20, ge=1, le=200),
+    x_profile_token: Optional[str] = Header(None),
+):
+    # Top-N functions (controllers, repositories, rag_service, ...) from the continuous sampler
+    _require_token(x_profile_token)
+    if profiler.continuous_profiler is None:
+        return {"running": False, "samples": 0, "functions": []}
+    return profiler.continuous_profiler.hot(limit)
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    _require_token(x_profile_token)
+    if not profile_id.isalnum():
+        raise HTTPException(status_code=400, detail="Invalid profile id")
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if path.endswith(".collapsed") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.rsplit("/", 1)[-1])
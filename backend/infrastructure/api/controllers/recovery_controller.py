@@ -0,0 +1,78 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Literal
+from backend.infrastructure.database.core import get_read_conn
+from backend.infrastructure.database.crew_repository import CrewRepository
+from backend.infrastructure.database.flight_repository import FlightRepository
+from backend.infrastructure.database.roster_repository import RosterRepository
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.applications.use_cases.recover_open_positions import RecoverOpenPositionsUseCase
+from backend.domain.services.recovery_service import Assignment, OpenPosition, RecoveryService
+from backend.infrastructure.settings import settings
+
+class OpenPositionIn(BaseModel):
+    flightId: int
+    position: Literal["captain", "first_officer", "flight_attendant"]
+
+class RecoveryRequest(BaseModel):
+    positions: List[OpenPositionIn] = Field(..., min_length=1)
+    excludeCrew: List[int] = Field(default_factory=list, description="Crew to leave out, e.g. those who reported sick")
+    alternatives: int = Field(3, ge=1, le=10)
+
+router = APIRouter(prefix="/api/recovery", tags=["recovery"])
+
+def _position(p: OpenPosition) -> dict:
+    return {"flightId": p.flight.id, "flightNumber": p.flight.flight_number, "position": p.position}
+
+def _assignment(a: Assignment) -> dict:
+    return {
+        **_position(a.position),
+        "crewId": a.crew.id,
+        "employeeId": a.crew.employee_id,
+        "name": f"{a.crew.first_name} {a.crew.last_name}",
+        "cost": round(a.cost, 3),
+    }
+
+@router.post("/reassign")
+@traced()
+async def reassign_open_positions(request: RecoveryRequest, conn=Depends(get_read_conn)):
+    # A proposal for the dispatcher; nothing is written until they confirm the rosters
+    if len(request.positions) > settings.recovery_max_positions:
+        raise HTTPException(status_code=422, detail=f"At most {settings.recovery_max_positions} positions per request")
+    started = time.perf_counter()
+    use_case = RecoverOpenPositionsUseCase(
+        FlightRepository(conn), CrewRepository(conn), RosterRepository(conn),
+        RecoveryService(max_candidates=settings.recovery_max_candidates),
+    )
+    plan, missing = await use_case.execute(
+        [(p.flightId, p.position) for p in request.positions], request.excludeCrew, request.alternatives
+    )
+    if missing and not plan.solutions:
+        raise HTTPException(status_code=404, detail=f"Flights not found: {missing}")
+    return FastJSONResponse({
+        "solutions": [
+            {
+                "rank": rank,
+                "totalCost": round(s.total_cost, 3),
+                "assignments": [_assignment(a) for a in s.assignments],
+                "unfilled": [_position(p) for p in s.unfilled],
+            }
+            for rank, s in enumerate(plan.solutions, start=1)
+        ],
+        # Swaps that leave the best solution otherwise unchanged, e.g. when its first choice declines
+        "fallbacks": [
+            {
+                **_position(p),
+                "candidates": [
+                    {"crewId": c.id, "name": f"{c.first_name} {c.last_name}", "extraCost": extra}
+                    for c, extra in plan.fallbacks.get(i, [])
+                ],
+            }
+            for i, p in enumerate(plan.positions)
+        ],
+        "missingFlights": missing,
+        "candidatePairs": plan.candidate_pairs,
+        "solveMs": round((time.perf_counter() - started) * 1000, 2),
+    })
@@ -1,18 +1,24 @@
 from fastapi import APIRouter, Depends, Query
-from backend.infrastructure.database.core import get_db_conn
+from backend.infrastructure.database.core import get_read_conn
 from backend.domain.entities.roster import Roster
-from typing import List
+from typing import Dict, List, Optional
 from datetime import datetime
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.infrastructure.api.controllers.params import parse_ids
+from backend.infrastructure.database.loaders import Loaders, get_loaders
+from backend.infrastructure.database.roster_repository import ROSTER_COLUMNS, RosterRepository
 
 router = APIRouter(prefix="/api/rosters", tags=["rosters"])
 
 @router.get("/", response_model=List[Roster])
+@traced()
 async def get_all_rosters(
-    conn=Depends(get_db_conn),
+    conn=Depends(get_read_conn),
     start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(None, description="End date (YYYY-MM-DD)")
 ):
-    base_query = "SELECT * FROM rosters"
+    base_query = f"SELECT {ROSTER_COLUMNS} FROM rosters"
     params = []
     if start_date and end_date:
         base_query += " WHERE duty_start >= %s AND duty_start <= %s"
@@ -31,11 +37,36 @@ async def get_all_rosters(
             from fastapi import HTTPException
             raise HTTPException(status_code=404, detail="No rosters found")
         columns = [desc[0] for desc in cur.description]
-        return [Roster(**dict(zip(columns, row))) for row in rows]
+        return FastJSONResponse([Roster(**dict(zip(columns, row))) for row in rows])
+
+@router.get("/on-duty", response_model=List[Roster])
+async def get_on_duty(
+    start: datetime = Query(..., description="Window start (ISO 8601)"),
+    end: datetime = Query(..., description="Window end (ISO 8601), exclusive"),
+    crew_id: Optional[int] = Query(None),
+    conn=Depends(get_read_conn),
+):
+    if end <= start:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=400, detail="end must be after start")
+    return FastJSONResponse(await RosterRepository(conn).get_on_duty(start, end, crew_id))
+
+@router.get("/batch", response_model=Dict[int, List[Roster]])
+async def get_rosters_batch(
+    crew_ids: str = Query(..., description="Comma-separated crew IDs"),
+    start: datetime = Query(..., description="Window start (ISO 8601)"),
+    end: datetime = Query(..., description="Window end (ISO 8601)"),
+    loaders: Loaders = Depends(get_loaders),
+):
+    # Schedules for many crew members in one query, keyed by crew ID
+    ids = parse_ids(crew_ids)
+    schedules = await loaders.rosters_by_crew.load_many([(crew_id, start, end) for crew_id in ids])
+    return FastJSONResponse(dict(zip(ids, schedules)))
 
 @router.get("/{roster_id}", response_model=Roster)
-async def get_roster_by_id(roster_id: int, conn=Depends(get_db_conn)):
-    query = "SELECT * FROM rosters WHERE id = %s"
+@traced()
+async def get_roster_by_id(roster_id: int, conn=Depends(get_read_conn)):
+    query = f"SELECT {ROSTER_COLUMNS} FROM rosters WHERE id = %s"
     async with conn.cursor() as cur:
         await cur.execute(query, (roster_id,))
         row = await cur.fetchone()
@@ -43,4 +74,4 @@ async def get_roster_by_id(roster_id: int, conn=Depends(get_db_conn)):
             from fastapi import HTTPException
             raise HTTPException(status_code=404, detail="Roster not found")
         columns = [desc[0] for desc in cur.description]
-        return Roster(**dict(zip(columns, row)))
\ No newline at end of file
+        return FastJSONResponse(Roster(**dict(zip(columns, row))))
\ No newline at end of file
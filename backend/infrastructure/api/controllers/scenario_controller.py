@@ -0,0 +1,113 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Union
+from backend.infrastructure.database.core import get_read_conn
+from backend.infrastructure.database.instrumentation import traced
+from backend.infrastructure.database.scenarios import get_snapshot_cache
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.domain.services.recovery_service import RecoveryService
+from backend.domain.services.scenario_service import EntityChange, Finding, Scenario, Snapshot
+from backend.infrastructure.settings import settings
+
+class CancelFlights(BaseModel):
+    type: Literal["cancelFlights"]
+    flightIds: List[int] = Field(..., min_length=1)
+
+class DelayFlight(BaseModel):
+    type: Literal["delayFlight"]
+    flightId: int
+    minutes: float = Field(..., gt=0)
+
+class MoveCrew(BaseModel):
+    type: Literal["moveCrew"]
+    crewIds: List[int] = Field(..., min_length=1)
+    base: str = Field(..., min_length=3, max_length=4)
+
+class RemoveCrew(BaseModel):
+    type: Literal["removeCrew"]
+    crewIds: List[int] = Field(..., min_length=1)
+
+Action = Annotated[Union[CancelFlights, DelayFlight, MoveCrew, RemoveCrew], Field(discriminator="type")]
+
+class ScenarioIn(BaseModel):
+    name: str
+    actions: List[Action] = Field(..., min_length=1)
+    recover: bool = Field(False, description="Fill the positions the actions leave open from available crew")
+
+class EvaluateRequest(BaseModel):
+    scenarios: List[ScenarioIn] = Field(..., min_length=1)
+    start: Optional[datetime] = Field(None, description="Snapshot window; defaults to now .. the configured horizon")
+    end: Optional[datetime] = None
+
+router = APIRouter(prefix="/api/scenarios", tags=["scenarios"])
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def _apply(scenario: Scenario, action) -> None:
+    if isinstance(action, CancelFlights):
+        scenario.cancel_flights(action.flightIds)
+    elif isinstance(action, DelayFlight):
+        scenario.delay_flight(action.flightId, action.minutes)
+    elif isinstance(action, MoveCrew):
+        scenario.move_crew(action.crewIds, action.base)
+    elif isinstance(action, RemoveCrew):
+        scenario.remove_crew(action.crewIds)
+
+def _finding(f: Finding) -> dict:
+    return {"kind": f.kind, "hard": f.hard, "crewId": f.crew_id, "rosterIds": list(f.roster_ids),
+            "month": f.month, "detail": f.detail}
+
+def _change(c: EntityChange) -> dict:
+    return {"type": c.kind, "id": c.id, "added": c.added, "changes": {k: list(v) for k, v in c.changes.items()}}
+
+def _evaluate(snapshot: Snapshot, request: ScenarioIn) -> dict:
+    started = time.perf_counter()
+    scenario = snapshot.fork()
+    for action in request.actions:
+        _apply(scenario, action)
+    if request.recover:
+        scenario.recover(RecoveryService(max_candidates=settings.recovery_max_candidates))
+    result = scenario.evaluate()
+    return {
+        "name": request.name,
+        "changes": [_change(c) for c in result.changes],
+        "newFindings": [_finding(f) for f in result.new_findings],
+        "resolvedFindings": [_finding(f) for f in result.resolved_findings],
+        "openPositions": [{"flightId": fid, "position": position} for fid, position in result.open_positions],
+        "recovered": result.recovered,
+        "missing": result.missing,
+        "evaluateMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+@router.post("/evaluate")
+@traced()
+async def evaluate_scenarios(request: EvaluateRequest, conn=Depends(get_read_conn)):
+    # Nothing is written: each scenario is a fork of one shared in-memory snapshot
+    if len(request.scenarios) > settings.scenario_max_per_request:
+        raise HTTPException(status_code=422, detail=f"At most {settings.scenario_max_per_request} scenarios per request")
+    if (request.start is None) != (request.end is None):
+        raise HTTPException(status_code=422, detail="Give both start and end, or neither")
+    window = None
+    if request.start is not None:
+        window = (_naive_utc(request.start), _naive_utc(request.end))
+        if window[1] <= window[0]:
+            raise HTTPException(status_code=422, detail="end must be after start")
+    snapshot = await get_snapshot_cache().get(conn, window)
+    # CPU-bound and independent; the snapshot's lazily cached baseline findings are deterministic,
+    # so threads filling the same entry race harmlessly
+    results = await asyncio.gather(*(asyncio.to_thread(_evaluate, snapshot, s) for s in request.scenarios))
+    return FastJSONResponse({
+        "snapshot": {
+            "takenAt": snapshot.taken_at,
+            "start": snapshot.window[0],
+            "end": snapshot.window[1],
+            "flights": len(snapshot.flights),
+            "crew": len(snapshot.crew_by_id),
+            "rosters": len(snapshot.rosters),
+        },
+        "scenarios": results,
+    })
@@ -0,0 +1,35 @@
+# orjson-rendered JSON responses. Controllers return FastJSONResponse(entities) directly so
+# dataclasses, datetimes and dicts go straight to bytes; FastAPI passes a returned Response
+# through untouched, skipping the response_model validation and jsonable_encoder walk
+# (the response_model stays on the route for the OpenAPI schema).
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Naive datetimes render like isoformat() (no offset), matching what the frontend already parses
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    # NUMERIC columns come back as Decimal; the entities declare them as float
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
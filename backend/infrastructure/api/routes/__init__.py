@@ -9,6 +9,11 @@ from backend.infrastructure.api.routes.chat import router as chat_router
 from backend.infrastructure.api.controllers.compliance_controller import router as compliance_router
 from backend.infrastructure.api.controllers.conflicts_controller import router as conflicts_router
 from backend.infrastructure.api.routes.analytics import router as analytics_router
+from backend.infrastructure.api.controllers.profiling_controller import router as profiling_router
+from backend.infrastructure.api.controllers.events_controller import router as events_router
+from backend.infrastructure.api.controllers.recovery_controller import router as recovery_router
+from backend.infrastructure.api.controllers.availability_controller import router as availability_router
+from backend.infrastructure.api.controllers.scenario_controller import router as scenario_router
 
 api_router = APIRouter()
 api_router.include_router(flight_router)
@@ -20,3 +25,8 @@ api_router.include_router(chat_router, prefix="/api")
 api_router.include_router(compliance_router)
 api_router.include_router(conflicts_router)
 api_router.include_router(analytics_router, prefix="/api/analytics")
+api_router.include_router(profiling_router)
+api_router.include_router(events_router)
+api_router.include_router(recovery_router)
+api_router.include_router(availability_router)
+api_router.include_router(scenario_router)
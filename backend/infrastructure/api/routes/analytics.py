@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends
-from backend.infrastructure.database.core import get_db_conn
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from backend.infrastructure.database.core import get_read_conn
 from backend.infrastructure.database.flight_repository import FlightRepository
 from backend.infrastructure.database.crew_repository import CrewRepository
 from backend.infrastructure.database.disruption_repository import DisruptionRepositoryImpl
 from backend.infrastructure.database.audit_log_repository import AuditLogRepository
+from backend.infrastructure.database.instrumentation import traced
 
 router = APIRouter()
 
-@router.get("/metrics")
-async def get_metrics(conn=Depends(get_db_conn)):
+async def dashboard_metrics(conn):
+    # Shared with the live metrics feed (backend/infrastructure/events/feeds.py)
     flight_repo = FlightRepository(conn)
     crew_repo = CrewRepository(conn)
     disruption_repo = DisruptionRepositoryImpl(conn)
@@ -28,8 +30,14 @@ async def get_metrics(conn=Depends(get_db_conn)):
         {"title": "Disruptions", "value": str(total_disruptions), "change": "10%", "trend": "down", "icon": "AlertTriangle"},
     ]
 
+@router.get("/metrics")
+@traced()
+async def get_metrics(conn=Depends(get_read_conn)):
+    return await dashboard_metrics(conn)
+
 @router.get("/violations")
-async def get_violations(conn=Depends(get_db_conn)):
+@traced()
+async def get_violations(conn=Depends(get_read_conn)):
     disruption_repo = DisruptionRepositoryImpl(conn)
     disruptions = await disruption_repo.get_disruptions()
     return [
@@ -45,7 +53,12 @@ async def get_violations(conn=Depends(get_db_conn)):
     ]
 
 @router.get("/auditlog")
-async def get_audit_log(conn=Depends(get_db_conn)):
+@traced()
+async def get_audit_log(
+    conn=Depends(get_read_conn),
+    days: int = Query(30, ge=1, le=366, description="How many days of history to return"),
+    limit: int = Query(500, ge=1, le=5000),
+):
     audit_log_repo = AuditLogRepository(conn)
-    audit_logs = await audit_log_repo.get_all()
+    audit_logs = await audit_log_repo.get_all(since=datetime.now() - timedelta(days=days), limit=limit)
     return audit_logs
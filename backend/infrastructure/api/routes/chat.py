@@ -1,47 +1,71 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Literal, List, Dict
-from backend.infrastructure.ai.groq_client import chat_groq
-from backend.infrastructure.ai.perplexity_client import chat_perplexity
-from backend.infrastructure.ai.openai_client import chat_openai
-from backend.infrastructure.ai.cursor_client import chat_cursor
+from backend.infrastructure.ai.context_manager import get_context_manager
+from backend.infrastructure.ai.provider_router import get_provider_router
+from backend.infrastructure.ai.resilience import ProviderUnavailableError, guards_snapshot
 from backend.infrastructure.logging.logging_middleware import logger
 
 router = APIRouter()
 
 class ChatRequest(BaseModel):
     message: str
-    provider: Optional[Literal["groq", "perplexity", "claude", "openai", "cursor", "copilot"]] = "groq"
+    # None/"auto" lets the router pick the currently fastest healthy provider
+    provider: Optional[Literal["auto", "groq", "perplexity", "claude", "openai", "cursor", "copilot"]] = None
     history: Optional[List[Dict[str, str]]] = None  # Each message: {"role": "user"|"assistant", "content": str}
     model: Optional[str] = None
+    # Lets the server reuse the summary of older turns across requests
+    conversation_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    tokens_saved: int = 0
 
 @router.post("/chat/", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     try:
-        logger.info(f"Chat request: provider={request.provider}, model={request.model}, message={request.message}, history_length={len(request.history) if request.history else 0}")
-        # Prepare messages for context (history + current message)
-        messages = request.history or []
-        messages.append({"role": "user", "content": request.message})
-        if request.provider == "groq":
-            model = getattr(request, "model", None) or "gemma2-9b-it"
-            answer = await chat_groq(messages, model=model)
-        elif request.provider == "perplexity":
-            model = getattr(request, "model", None) or "pplx-7b-online"
-            answer = await chat_perplexity(messages, model=model)
-        elif request.provider == "openai":
-            model = getattr(request, "model", None) or "gpt-4"
-            answer = await chat_openai(messages, model=model)
-        elif request.provider == "cursor":
-            model = getattr(request, "model", None) or "cursor-pro"
-            answer = await chat_cursor(messages, model=model)
-        else:
+        logger.info(f"Chat request: provider={request.provider}, model={request.model}, message_chars={len(request.message)}, history_length={len(request.history) if request.history else 0}")
+        logger.debug(f"Chat message: {request.message}")
+        provider_router = get_provider_router()
+        provider = None if request.provider in (None, "auto") else request.provider
+        if provider is not None and not provider_router.has_provider(provider):
             logger.error(f"Unknown provider: {request.provider}")
             raise HTTPException(status_code=400, detail=f"Unknown provider: {request.provider}")
-        logger.info(f"Chat response: {answer}")
-        return ChatResponse(response=answer)
+        # Trim/summarize history to the model's token budget (history + current message); for
+        # "auto" that is the model of the provider the router picks
+        if provider is None:
+            chosen = provider_router.choose()
+            budget_model = request.model or (chosen.default_model if chosen else None)
+        else:
+            budget_model = request.model or provider_router.default_model(provider)
+        context = await get_context_manager().build(
+            request.history, request.message, model=budget_model, conversation_id=request.conversation_id
+        )
+        result = await provider_router.complete(context.messages, provider=provider, model=request.model)
+        logger.info(
+            f"Chat response: provider={result.provider}, model={result.model}, hedged={result.hedged}, "
+            f"prompt_tokens={context.tokens_after}, tokens_saved={context.tokens_saved}, "
+            f"summarized_turns={context.summarized_turns}, answer_chars={len(result.answer)}"
+        )
+        logger.debug(f"Chat answer: {result.answer}")
+        return ChatResponse(
+            response=result.answer, provider=result.provider, model=result.model, tokens_saved=context.tokens_saved
+        )
+    except HTTPException:
+        raise
+    except ProviderUnavailableError as e:
+        # Fail fast while the provider is tripped or rate limited instead of queueing
+        logger.warning(f"Chat provider unavailable: {str(e)}")
+        headers = {"Retry-After": str(int(e.retry_after + 0.5))} if e.retry_after is not None else None
+        raise HTTPException(status_code=503, detail=f"API error: {str(e)}", headers=headers)
     except Exception as e:
         logger.exception(f"Chat API error: {str(e)}")
         raise HTTPException(status_code=502, detail=f"API error: {str(e)}")
+
+
+@router.get("/chat/providers")
+async def chat_providers():
+    # Latency/error stats per provider+model and breaker/concurrency state per provider
+    return {"routing": get_provider_router().snapshot(), "guards": guards_snapshot()}
@@ -0,0 +1,121 @@
+# Keeps the response cache in step with the database: one LISTEN connection per worker
+# receives the "table:version" notifications sent by the migration 0007 triggers.
+# Other consumers share the connection: table-change callbacks, handlers for extra channels, and
+# state callbacks told when notifications start (True) or may have been missed (False).
+import asyncio
+from typing import Callable, Dict, List, Optional, Sequence
+
+import psycopg
+
+from backend.infrastructure.cache.response_cache import ResponseCache, get_response_cache, read_versions
+from backend.infrastructure.logging.logging_middleware import logger
+
+# Must match CHANGE_CHANNEL / CHANGE_NOTIFY_TABLES in scripts/schema_migrations.py
+CHANGE_CHANNEL = "table_changed"
+WATCHED_TABLES = ("crew", "flights", "rosters", "disruptions")
+
+_task: Optional[asyncio.Task] = None
+
+TableChangeCallback = Callable[[str, int], None]
+StateCallback = Callable[[bool], None]
+
+
+def parse_notification(payload: str):
+    table, _, version = payload.rpartition(":")
+    return table, int(version)
+
+
+class ChangeListener:
+    def __init__(
+        self,
+        dsn: str,
+        cache: ResponseCache,
+        retry_s: float = 5.0,
+        on_table_change: Sequence[TableChangeCallback] = (),
+        channels: Optional[Dict[str, Callable[[str], None]]] = None,
+        on_state: Sequence[StateCallback] = (),
+    ):
+        self.dsn = dsn
+        self.cache = cache
+        self.retry_s = retry_s
+        self.on_table_change: List[TableChangeCallback] = list(on_table_change)
+        self.channels = dict(channels or {})
+        self.on_state: List[StateCallback] = list(on_state)
+
+    def _set_state(self, listening: bool) -> None:
+        for callback in self.on_state:
+            try:
+                callback(listening)
+            except Exception as exc:
+                logger.warning(f"Change listener state callback failed: {exc}")
+
+    def dispatch(self, channel: str, payload: str) -> None:
+        if channel != CHANGE_CHANNEL:
+            handler = self.channels.get(channel)
+            if handler is not None:
+                handler(payload)
+            return
+        try:
+            table, version = parse_notification(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed change notification: {payload!r}")
+            return
+        self.cache.apply_version(table, version)
+        for callback in self.on_table_change:
+            try:
+                callback(table, version)
+            except Exception as exc:
+                logger.warning(f"Table change callback failed for {table}: {exc}")
+
+    async def listen_once(self) -> None:
+        async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+            for channel in [CHANGE_CHANNEL, *self.channels]:
+                await conn.execute(f"LISTEN {channel}")
+            # LISTEN first, then read: a change in between is seen twice rather than missed
+            self.cache.set_online(await read_versions(conn, WATCHED_TABLES))
+            self._set_state(True)
+            logger.info("Response cache online")
+            async for notify in conn.notifies():
+                self.dispatch(notify.channel, notify.payload)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.listen_once()
+            except asyncio.CancelledError:
+                self.cache.set_offline()
+                self._set_state(False)
+                raise
+            except Exception as exc:
+                logger.warning(f"Change listener disconnected, response cache bypassed: {exc}")
+            self.cache.set_offline()
+            self._set_state(False)
+            await asyncio.sleep(self.retry_s)
+
+
+def start_change_listener(
+    on_table_change: Sequence[TableChangeCallback] = (),
+    channels: Optional[Dict[str, Callable[[str], None]]] = None,
+    on_state: Sequence[StateCallback] = (),
+) -> None:
+    global _task
+    if _task is not None:
+        return
+    from backend.infrastructure.database.core import DSN
+
+    # Always the primary: replicas cannot LISTEN, and versions must never run behind the writes
+    listener = ChangeListener(
+        DSN, get_response_cache(), on_table_change=on_table_change, channels=channels, on_state=on_state
+    )
+    _task = asyncio.get_running_loop().create_task(listener.run())
+
+
+async def stop_change_listener() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,329 @@
+# Response cache and conditional GETs (ETag / If-None-Match) for the reference-data endpoints.
+# Entries are keyed by the request plus the versions of the tables the response was built from
+# (table_versions, bumped by triggers and announced with NOTIFY). A notification moves the
+# current version on, so older entries simply stop matching: no TTLs, and the shared tier never
+# needs explicit deletes. Until the change listener is connected every request bypasses the cache.
+# ETags are derived from the same versions, so a matching If-None-Match is answered with 304
+# before any row is fetched or serialized.
+import contextvars
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.metrics.registry import registry
+from backend.infrastructure.settings import settings
+
+# Path prefix ("*" matches one segment; first match wins) -> tables the response is computed from
+CACHED_ROUTES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("/api/disruptions/*/impact", ("disruptions", "flights", "rosters")),
+    ("/api/crew", ("crew",)),
+    ("/api/flights", ("flights", "rosters", "crew")),
+    ("/api/rosters", ("rosters",)),
+    ("/api/disruptions", ("disruptions",)),
+)
+
+# Browsers may store the body but must revalidate (a cheap 304) before reusing it
+CACHE_CONTROL = "private, no-cache"
+
+VERSIONS_QUERY = "SELECT table_name, version FROM table_versions WHERE table_name = ANY(%s)"
+
+cache_requests = registry.counter("response_cache_requests_total", "Cacheable requests by outcome", ("route", "result"))
+cache_invalidations = registry.counter("response_cache_invalidations_total", "Table version changes seen", ("table",))
+cache_entries = registry.gauge("response_cache_entries", "Entries in the in-process response cache")
+
+Versions = Dict[str, int]
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+    versions: Versions = field(default_factory=dict)
+
+    def encode(self) -> bytes:
+        return self.media_type.encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes, versions: Versions) -> "CachedResponse":
+        media_type, _, body = raw.partition(b"\n")
+        return cls(body, media_type.decode(), versions)
+
+
+@dataclass
+class _Fill:
+    """A cache miss in progress; get_read_conn records the versions its connection sees."""
+    tables: Tuple[str, ...]
+    base: str
+    if_none_match: Optional[str] = None
+    versions: Optional[Versions] = None
+
+
+_pending_fill: contextvars.ContextVar[Optional[_Fill]] = contextvars.ContextVar("response_cache_fill", default=None)
+
+
+class RedisTier:
+    """Shared tier so workers reuse each other's fills. Needs the optional `redis` package."""
+
+    def __init__(self, url: str, ttl_s: float, prefix: str = "respcache:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl_s = ttl_s
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        # Superseded versions are never read again; the TTL only bounds how long they occupy memory
+        await self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl_s)))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 2048, shared=None):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.online = False
+        self.versions: Versions = {}
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._by_table: Dict[str, set] = {}
+
+    @staticmethod
+    def key(base: str, versions: Versions) -> str:
+        return base + "|" + ",".join(f"{t}={versions[t]}" for t in sorted(versions))
+
+    def current(self, tables: Iterable[str]) -> Optional[Versions]:
+        if not self.online:
+            return None
+        try:
+            return {t: self.versions[t] for t in tables}
+        except KeyError:
+            return None
+
+    async def get(self, base: str, tables: Sequence[str]) -> Optional[CachedResponse]:
+        versions = self.current(tables)
+        if versions is None:
+            return None
+        key = self.key(base, versions)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.shared is not None:
+            try:
+                raw = await self.shared.get(key)
+            except Exception as exc:
+                logger.warning(f"Shared response cache unavailable: {exc}")
+                raw = None
+            if raw is not None:
+                entry = CachedResponse.decode(raw, versions)
+                self._store(key, entry)
+                return entry
+        return None
+
+    async def put(self, base: str, entry: CachedResponse) -> None:
+        # Versions come from the snapshot the response was built from, so the body is at least that new
+        if not self.online or any(v < self.versions.get(t, 0) for t, v in entry.versions.items()):
+            return
+        key = self.key(base, entry.versions)
+        self._store(key, entry)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry.encode())
+            except Exception as exc:
+                logger.warning(f"Shared response cache unavailable: {exc}")
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        for table in entry.versions:
+            self._by_table.setdefault(table, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._forget(*self._entries.popitem(last=False))
+        cache_entries.set(len(self._entries))
+
+    def _forget(self, key: str, entry: CachedResponse) -> None:
+        for table in entry.versions:
+            self._by_table.get(table, set()).discard(key)
+
+    def apply_version(self, table: str, version: int) -> None:
+        if version <= self.versions.get(table, 0):
+            return
+        self.versions[table] = version
+        cache_invalidations.inc(table)
+        for key in list(self._by_table.get(table, ())):
+            entry = self._entries.get(key)
+            if entry is not None and entry.versions.get(table, 0) < version:
+                self._forget(key, self._entries.pop(key))
+        cache_entries.set(len(self._entries))
+
+    def apply_versions(self, versions: Versions) -> None:
+        for table, version in versions.items():
+            self.apply_version(table, version)
+
+    def set_online(self, versions: Versions) -> None:
+        self.apply_versions(versions)
+        self.online = True
+
+    def set_offline(self) -> None:
+        # Changes may be missed while disconnected; drop everything and bypass until reconnected
+        self.online = False
+        self.versions.clear()
+        self._entries.clear()
+        self._by_table.clear()
+        cache_entries.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        shared = None
+        if settings.cache_redis_url:
+            try:
+                shared = RedisTier(settings.cache_redis_url, settings.cache_shared_ttl_s)
+            except ImportError:
+                logger.warning("CACHE_REDIS_URL is set but the redis package is not installed; using the local cache only")
+        _cache = ResponseCache(settings.response_cache_entries, shared)
+    return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def _route(path: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    segments = path.rstrip("/").split("/")
+    for prefix, tables in CACHED_ROUTES:
+        parts = prefix.split("/")
+        if len(segments) >= len(parts) and all(p in ("*", s) for p, s in zip(parts, segments)):
+            return prefix, tables
+    return None
+
+
+class NotModified(Exception):
+    """Raised from get_read_conn when the client's ETag is current; main.py turns it into a 304."""
+
+    def __init__(self, etag: str):
+        super().__init__(etag)
+        self.etag = etag
+
+
+def make_etag(base: str, versions: Versions) -> str:
+    # Strong: a given request over the same table versions always renders the same bytes
+    return '"' + hashlib.sha1(ResponseCache.key(base, versions).encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison, so W/"x" (as sent back for a compressed body) matches "x"
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+async def read_versions(conn, tables: Sequence[str]) -> Versions:
+    async with conn.cursor() as cur:
+        await cur.execute(VERSIONS_QUERY, (list(tables),))
+        return {name: version for name, version in await cur.fetchall()}
+
+
+async def capture_fill_versions(conn) -> None:
+    """Called by get_read_conn: record table versions on the connection that will build the response.
+
+    Raises NotModified when they match the request's If-None-Match, before any rows are read.
+    """
+    fill = _pending_fill.get()
+    if fill is None:
+        return
+    try:
+        async with conn.transaction():
+            versions = await read_versions(conn, fill.tables)
+    except Exception as exc:
+        # e.g. migration 0007 not applied yet; serve uncached
+        logger.debug(f"Response cache fill skipped: {exc}")
+        return
+    if set(versions) == set(fill.tables):
+        fill.versions = versions
+        etag = make_etag(fill.base, versions)
+        if etag_matches(fill.if_none_match, etag):
+            raise NotModified(etag)
+
+
+async def commit_and_invalidate(conn, tables: Sequence[str]) -> None:
+    """Commit a write, then retire this worker's cached responses at once (the NOTIFY follows for the rest)."""
+    try:
+        # Savepoint: a failure here must not abort (and so silently roll back) the write
+        async with conn.transaction():
+            versions = await read_versions(conn, tables)
+    except Exception:
+        versions = {}
+    await conn.commit()
+    get_response_cache().apply_versions(versions)
+
+
+async def cache_responses(request: Request, call_next):
+    match = _route(request.url.path) if request.method == "GET" else None
+    if match is None:
+        return await call_next(request)
+    route, tables = match
+    cache = get_response_cache()
+    base = f"{request.url.path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.query_params.multi_items()))}"
+    if_none_match = request.headers.get("if-none-match")
+
+    # With the listener connected the current versions are in memory: no connection, no query
+    versions = cache.current(tables)
+    if versions is not None:
+        etag = make_etag(base, versions)
+        if etag_matches(if_none_match, etag):
+            cache_requests.inc(route, "not_modified")
+            return not_modified_response(etag)
+        entry = await cache.get(base, tables)
+        if entry is not None:
+            cache_requests.inc(route, "hit")
+            return Response(entry.body, media_type=entry.media_type,
+                            headers={"X-Cache": "HIT", "ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    fill = _Fill(tables, base, if_none_match)
+    token = _pending_fill.set(fill)
+    try:
+        response = await call_next(request)
+    finally:
+        _pending_fill.reset(token)
+    if response.status_code == 304:
+        cache_requests.inc(route, "not_modified")
+        return response
+    if response.status_code != 200 or fill.versions is None:
+        cache_requests.inc(route, "bypass")
+        return response
+
+    response.headers["ETag"] = make_etag(base, fill.versions)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if not cache.online or cache.max_entries <= 0:
+        cache_requests.inc(route, "uncached")
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    media_type = response.headers.get("content-type", "application/json")
+    await cache.put(base, CachedResponse(body, media_type, fill.versions))
+    cache_requests.inc(route, "miss")
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-type")}
+    headers["X-Cache"] = "MISS"
+    return Response(body, status_code=200, media_type=media_type, headers=headers)
@@ -1,15 +1,24 @@
 from backend.applications.interfaces.audit_log_repository import IAuditLogRepository
 from backend.domain.entities.audit_log import AuditLog
-from typing import List
+from typing import List, Optional
+from datetime import datetime
+from backend.infrastructure.database.instrumentation import traced
 
 class AuditLogRepository(IAuditLogRepository):
     def __init__(self, conn):
         self.conn = conn
 
-    async def get_all(self) -> List[AuditLog]:
-        query = "SELECT * FROM audit_log ORDER BY timestamp DESC"
+    @traced(read_only=True)
+    async def get_all(self, since: datetime, until: Optional[datetime] = None, limit: int = 500) -> List[AuditLog]:
+        # Bounded on the partition key so only the months in [since, until) are scanned
+        query = """
+        SELECT id, timestamp, user_id AS "user", action, details, type FROM audit_log
+        WHERE timestamp >= %s AND timestamp < %s
+        ORDER BY timestamp DESC
+        LIMIT %s
+        """
         async with self.conn.cursor() as cur:
-            await cur.execute(query)
+            await cur.execute(query, (since, until or datetime.now(), limit))
             rows = await cur.fetchall()
             columns = [desc[0] for desc in cur.description]
             return [AuditLog(**dict(zip(columns, row))) for row in rows]
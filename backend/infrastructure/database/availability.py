@@ -0,0 +1,182 @@
+# Keeps one AvailabilityIndex per worker current. It is loaded on first use for a window around
+# now, then patched from the roster_rows notifications (migration 0008) and crew table changes
+# received on the change listener's connection. Loads read the primary, where those notifications
+# come from; rows notified while a load runs are replayed onto the new index. Whenever
+# notifications may have been missed (listener down, a bulk "resync"), the index is reloaded on
+# next use. Until the listener is connected, callers get None and use the SQL path.
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import psycopg
+
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.roster import Roster
+from backend.domain.services.availability_index import AvailabilityIndex
+from backend.infrastructure.database.crew_repository import CrewRepository
+from backend.infrastructure.database.instrumentation import InstrumentedConnection
+from backend.infrastructure.database.roster_repository import RosterRepository
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.metrics.registry import registry
+
+# Must match ROSTER_ROWS_CHANNEL in scripts/schema_migrations.py
+ROSTER_ROWS_CHANNEL = "roster_rows"
+LOOKBACK = timedelta(days=1)
+
+index_loads = registry.counter("availability_index_loads_total", "Full availability index loads", ("reason",))
+index_updates = registry.counter("availability_index_updates_total", "Roster rows applied to the availability index")
+
+
+async def available_crew_sql(
+    conn, start: datetime, end: datetime, rank: Optional[str] = None, base: Optional[str] = None
+) -> List[Crew]:
+    """The database path: available crew for the window minus those on an overlapping duty."""
+    crew = await CrewRepository(conn).get_available_crew(start, end)
+    busy = {r.crew_id for r in await RosterRepository(conn).get_on_duty(start, end)}
+    return sorted(
+        (c for c in crew
+         if c.id not in busy and (rank is None or c.rank == rank) and (base is None or c.base_airport == base)),
+        key=lambda c: c.id,
+    )
+
+
+def _utcnow() -> datetime:
+    # Duty timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@asynccontextmanager
+async def _primary_conn() -> AsyncIterator[InstrumentedConnection]:
+    from backend.infrastructure.database.core import DSN
+
+    async with await psycopg.AsyncConnection.connect(DSN) as conn:
+        yield InstrumentedConnection(conn)
+
+
+class AvailabilityIndexManager:
+    def __init__(
+        self,
+        horizon: timedelta = timedelta(days=14),
+        clock: Callable[[], datetime] = _utcnow,
+        connect: Callable[[], AsyncContextManager[Any]] = _primary_conn,
+    ):
+        self.horizon = horizon
+        self.clock = clock
+        self.connect = connect
+        self.index: Optional[AvailabilityIndex] = None
+        self.window: Optional[Tuple[datetime, datetime]] = None
+        self.live = False
+        self._stale = "initial"
+        self._crew_stale = False
+        # Row notifications received while a load runs, replayed onto the index it builds
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._lock = asyncio.Lock()
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return self.window is not None and self.window[0] <= start and end <= self.window[1]
+
+    def set_live(self, listening: bool) -> None:
+        self.live = listening
+        if listening:
+            self._stale = self._stale or "reconnect"
+
+    def on_table_change(self, table: str, version: int) -> None:
+        if table == "crew":
+            self._crew_stale = True
+
+    def on_roster_rows(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed roster rows notification: {payload[:200]!r}")
+            return
+        if message.get("resync"):
+            self._stale = self._stale or "resync"
+        elif self._pending is not None:
+            self._pending.append(message)
+        elif self.index is None:
+            self._stale = self._stale or "resync"
+        else:
+            self._apply(self.index, message)
+
+    @staticmethod
+    def _apply(index: AvailabilityIndex, message: Dict[str, Any]) -> None:
+        for row in message.get("rows") or ():
+            if message.get("op") == "DELETE":
+                index.remove_roster(row["id"])
+                continue
+            index.upsert_roster(Roster(
+                id=row["id"], crew_id=row["crew_id"], flight_id=row["flight_id"], status=row.get("status"),
+                duty_start=datetime.fromisoformat(row["duty_start"]) if row.get("duty_start") else None,
+                duty_end=datetime.fromisoformat(row["duty_end"]) if row.get("duty_end") else None,
+            ))
+            index_updates.inc()
+
+    async def get(self) -> Optional[AvailabilityIndex]:
+        if not self.live:
+            return None
+        async with self._lock:
+            now = self.clock()
+            # Slide the window once a day's worth of the horizon has been used up
+            if not self._stale and self.window is not None and now + self.horizon - self.window[1] > timedelta(days=1):
+                self._stale = "window"
+            if self._stale:
+                await self._load(now, self._stale)
+            elif self._crew_stale:
+                await self._refresh_crew()
+        return self.index
+
+    async def _refresh_crew(self) -> None:
+        self._crew_stale = False
+        try:
+            async with self.connect() as conn:
+                crew = await CrewRepository(conn).get_all()
+        except Exception:
+            self._crew_stale = True
+            raise
+        for c in crew:
+            self.index.upsert_crew(c)
+        for crew_id in set(self.index.crew_ids()) - {c.id for c in crew}:
+            self.index.remove_crew(crew_id)
+
+    async def _load(self, now: datetime, reason: str) -> None:
+        # Flags are cleared first: a resync or crew change that lands while loading marks the index
+        # stale again, and roster rows notified meanwhile are buffered and replayed onto the new index
+        self._stale, self._crew_stale, self._pending = "", False, []
+        start, end = now - LOOKBACK, now + self.horizon
+        try:
+            async with self.connect() as conn:
+                crew = await CrewRepository(conn).get_all()
+                rosters = await RosterRepository(conn).get_on_duty(start, end)
+        except Exception:
+            self._stale = self._stale or reason
+            raise
+        finally:
+            pending, self._pending = self._pending, None
+        index = AvailabilityIndex(crew, rosters)
+        for message in pending:
+            self._apply(index, message)
+        self.index = index
+        self.window = (start, end)
+        index_loads.inc(reason)
+        logger.info(f"Availability index loaded ({reason}): {len(crew)} crew, {len(rosters)} duties, "
+                    f"{len(pending)} notifications replayed")
+
+
+_manager: Optional[AvailabilityIndexManager] = None
+
+
+def get_availability_manager() -> AvailabilityIndexManager:
+    global _manager
+    if _manager is None:
+        from backend.infrastructure.settings import settings
+
+        _manager = AvailabilityIndexManager(timedelta(days=settings.availability_horizon_days))
+    return _manager
+
+
+def set_availability_manager(manager: Optional[AvailabilityIndexManager]) -> None:
+    global _manager
+    _manager = manager
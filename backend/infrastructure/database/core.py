@@ -2,6 +2,7 @@
 import os, psycopg
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from backend.infrastructure.database.instrumentation import InstrumentedConnection
 
 load_dotenv()
 
@@ -16,6 +17,24 @@ DSN = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={
 async def get_db_conn():
     conn = await psycopg.AsyncConnection.connect(DSN)
     try:
-        yield conn
+        yield InstrumentedConnection(conn)
     finally:
         await conn.close()
+
+
+async def get_read_conn():
+    # For read-only endpoints: a replica when one is healthy and caught up, otherwise the primary
+    from backend.infrastructure.cache.response_cache import capture_fill_versions
+    from backend.infrastructure.database.replicas import get_replica_router
+
+    conn, _, replica = await get_replica_router().connect_read()
+    if replica is not None:
+        replica.in_flight += 1
+    try:
+        instrumented = InstrumentedConnection(conn)
+        await capture_fill_versions(instrumented)
+        yield instrumented
+    finally:
+        if replica is not None:
+            replica.in_flight -= 1
+        await conn.close()
@@ -1,12 +1,14 @@
 from backend.applications.interfaces.crew_repository import ICrewRepository
 from backend.domain.entities.crew import Crew
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
+from backend.infrastructure.database.instrumentation import traced
 
 class CrewRepository(ICrewRepository):
     def __init__(self, conn):
         self.conn = conn
 
+    @traced(read_only=True)
     async def get_by_id(self, crew_id: int) -> Optional[Crew]:
         query = "SELECT * FROM crew WHERE id = %s"
         async with self.conn.cursor() as cur:
@@ -16,6 +18,24 @@ class CrewRepository(ICrewRepository):
                 return Crew(**dict(zip([desc[0] for desc in cur.description], row)))
             return None
 
+    @traced(read_only=True)
+    async def get_by_ids(self, crew_ids: Sequence[int]) -> Dict[int, Crew]:
+        query = "SELECT * FROM crew WHERE id = ANY(%s)"
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, (list(crew_ids),))
+            rows = await cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            return {crew.id: crew for crew in (Crew(**dict(zip(columns, row))) for row in rows)}
+
+    @traced(read_only=True)
+    async def get_all(self) -> List[Crew]:
+        async with self.conn.cursor() as cur:
+            await cur.execute("SELECT * FROM crew ORDER BY id")
+            rows = await cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            return [Crew(**dict(zip(columns, row))) for row in rows]
+
+    @traced(read_only=True)
     async def get_available_crew(self, start_time: datetime, end_time: datetime) -> List[Crew]:
         query = """
         SELECT * FROM crew WHERE status = 'available' AND duty_start_time <= %s AND duty_end_time >= %s
@@ -26,6 +46,7 @@ class CrewRepository(ICrewRepository):
             columns = [desc[0] for desc in cur.description]
             return [Crew(**dict(zip(columns, row))) for row in rows]
 
+    @traced()
     async def save(self, crew: Crew) -> Crew:
         # Example: upsert logic (simplified)
         query = """
@@ -40,6 +61,7 @@ class CrewRepository(ICrewRepository):
             row = await cur.fetchone()
             return Crew(**dict(zip([desc[0] for desc in cur.description], row)))
 
+    @traced(read_only=True)
     async def get_total_active_count(self) -> int:
         query = "SELECT COUNT(*) FROM crew WHERE status = 'available'"
         async with self.conn.cursor() as cur:
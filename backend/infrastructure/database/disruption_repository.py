@@ -1,32 +1,44 @@
 from backend.applications.interfaces.disruption_repository import IDisruptionRepository
 from backend.domain.entities.disruption import Disruption
 from backend.infrastructure.database.core import get_db_conn
-from typing import List
+from typing import List, Optional
+from backend.infrastructure.database.instrumentation import traced
+
+def _to_disruption(d: dict) -> Disruption:
+    return Disruption(
+        id=d["id"],
+        type=d["type"],
+        severity=d["severity"],
+        title=d["title"],
+        description=d["description"],
+        affected_flights=d["affected_flights"] if isinstance(d["affected_flights"], list) else [],
+        timestamp=d["timestamp"].isoformat() if d["timestamp"] else ""
+    )
 
 class DisruptionRepositoryImpl(IDisruptionRepository):
     def __init__(self, conn):
         self.conn = conn
 
+    @traced(read_only=True)
     async def get_disruptions(self) -> List[Disruption]:
         query = "SELECT * FROM disruptions ORDER BY timestamp DESC"
         async with self.conn.cursor() as cur:
             await cur.execute(query)
             rows = await cur.fetchall()
             columns = [desc[0] for desc in cur.description]
-            disruptions = []
-            for row in rows:
-                d = dict(zip(columns, row))
-                disruptions.append(Disruption(
-                    id=d["id"],
-                    type=d["type"],
-                    severity=d["severity"],
-                    title=d["title"],
-                    description=d["description"],
-                    affected_flights=d["affected_flights"] if isinstance(d["affected_flights"], list) else [],
-                    timestamp=d["timestamp"].isoformat() if d["timestamp"] else ""
-                ))
-            return disruptions
+            return [_to_disruption(dict(zip(columns, row))) for row in rows]
+
+    @traced(read_only=True)
+    async def get_by_id(self, disruption_id: int) -> Optional[Disruption]:
+        query = "SELECT * FROM disruptions WHERE id = %s"
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, (disruption_id,))
+            row = await cur.fetchone()
+            if row:
+                return _to_disruption(dict(zip([desc[0] for desc in cur.description], row)))
+            return None
 
+    @traced(read_only=True)
     async def get_total_count(self) -> int:
         query = "SELECT COUNT(*) FROM disruptions"
         async with self.conn.cursor() as cur:
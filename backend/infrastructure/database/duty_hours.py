@@ -0,0 +1,128 @@
+# Consistency check and repair for the crew_month_hours summary (migration 0010) and the
+# crew.total_*_hours_month columns mirrored from it. The triggers keep both in step with roster
+# writes; what they cannot see (flight time changes, partitions dropped directly, month rollover
+# of the crew columns) shows up here as drift.
+#
+#     python scripts/check_duty_hours.py --from 2025-01 --to 2025-03 [--fix]
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Tuple
+
+from backend.domain.services.duty_hours import MonthHours
+from backend.infrastructure.database.partitions import month_start
+
+# Must match ROSTER_DUTY_HOURS_SQL / ROSTER_FLIGHT_HOURS_SQL in scripts/schema_migrations.py
+DUTY_HOURS_SQL = "coalesce(EXTRACT(EPOCH FROM r.duty_end - r.duty_start) / 3600, 0)"
+FLIGHT_HOURS_SQL = (
+    "coalesce(EXTRACT(EPOCH FROM coalesce(f.actual_arrival - f.actual_departure, "
+    "f.scheduled_arrival - f.scheduled_departure)) / 3600, 0)"
+)
+RAW_MONTH_HOURS_SQL = f"""
+SELECT r.crew_id, date_trunc('month', r.duty_start)::date,
+       sum({DUTY_HOURS_SQL})::float8, sum({FLIGHT_HOURS_SQL})::float8, count(*)
+FROM rosters r LEFT JOIN flights f ON f.id = r.flight_id
+WHERE r.status IS DISTINCT FROM 'cancelled' AND r.crew_id IS NOT NULL
+  AND r.duty_start >= %s AND r.duty_start < %s
+GROUP BY 1, 2
+"""
+# Must match CREW_MONTH_TOTALS_REFRESH in scripts/schema_migrations.py
+CREW_MONTH_TOTALS_REFRESH = """
+UPDATE crew c SET total_duty_hours_month = t.duty_hours, total_flight_hours_month = t.flight_hours
+FROM (
+    SELECT c2.id, coalesce(m.duty_hours, 0) AS duty_hours, coalesce(m.flight_hours, 0) AS flight_hours
+    FROM crew c2 LEFT JOIN crew_month_hours m
+      ON m.crew_id = c2.id AND m.month = date_trunc('month', NOW() AT TIME ZONE 'UTC')::date
+) t
+WHERE c.id = t.id
+  AND (c.total_duty_hours_month IS DISTINCT FROM t.duty_hours
+       OR c.total_flight_hours_month IS DISTINCT FROM t.flight_hours)
+"""
+TOLERANCE_H = 1e-6  # the triggers add and subtract floats, so sums drift in the last digits
+
+MonthKey = Tuple[int, date]
+
+
+@dataclass
+class HoursDrift:
+    crew_id: int
+    month: date
+    stored: MonthHours
+    actual: MonthHours
+
+
+def compare_month_hours(
+    stored: Dict[MonthKey, MonthHours], actual: Dict[MonthKey, MonthHours], tolerance: float = TOLERANCE_H
+) -> List[HoursDrift]:
+    """Months whose stored totals differ from the re-summed rosters; a missing row counts as zero."""
+    none = MonthHours()
+    drift = []
+    for key in sorted(stored.keys() | actual.keys()):
+        s, a = stored.get(key, none), actual.get(key, none)
+        if (
+            s.duties != a.duties
+            or abs(s.duty_hours - a.duty_hours) > tolerance
+            or abs(s.flight_hours - a.flight_hours) > tolerance
+        ):
+            drift.append(HoursDrift(key[0], key[1], s, a))
+    return drift
+
+
+async def _month_rows(conn, query: str, params) -> Dict[MonthKey, MonthHours]:
+    async with conn.cursor() as cur:
+        await cur.execute(query, params)
+        return {(row[0], row[1]): MonthHours(row[2], row[3], row[4]) for row in await cur.fetchall()}
+
+
+async def check_month_hours(conn, first: date, last: date) -> List[HoursDrift]:
+    """Compare the summary with a full re-sum of rosters for months first..last (inclusive)."""
+    start, end = month_start(first), month_start(last, 1)
+    actual = await _month_rows(conn, RAW_MONTH_HOURS_SQL, (start, end))
+    stored = await _month_rows(
+        conn,
+        "SELECT crew_id, month, duty_hours, flight_hours, duties FROM crew_month_hours "
+        "WHERE month >= %s AND month < %s",
+        (start, end),
+    )
+    return compare_month_hours(stored, actual)
+
+
+async def check_crew_month_totals(conn) -> List[int]:
+    """Crew whose total_*_hours_month columns disagree with the summary for the current month."""
+    async with conn.cursor() as cur:
+        await cur.execute(
+            """
+            SELECT c.id FROM crew c LEFT JOIN crew_month_hours m
+              ON m.crew_id = c.id AND m.month = date_trunc('month', NOW() AT TIME ZONE 'UTC')::date
+            WHERE abs(coalesce(c.total_duty_hours_month, 0) - coalesce(m.duty_hours, 0)) > %s
+               OR abs(coalesce(c.total_flight_hours_month, 0) - coalesce(m.flight_hours, 0)) > %s
+            ORDER BY c.id
+            """,
+            (TOLERANCE_H, TOLERANCE_H),
+        )
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def refresh_crew_month_totals(conn) -> int:
+    """Copy the current month's summary onto the crew rows that differ (e.g. after month rollover)."""
+    async with conn.cursor() as cur:
+        await cur.execute(CREW_MONTH_TOTALS_REFRESH)
+        updated = cur.rowcount
+    await conn.commit()
+    return updated
+
+
+async def reconcile_month_hours(conn, first: date, last: date) -> int:
+    """Rewrite the summary for months first..last from rosters; returns the rows written."""
+    start, end = month_start(first), month_start(last, 1)
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            # Roster writers wait, so none of their trigger deltas land on rows being rebuilt
+            await cur.execute("LOCK TABLE rosters IN SHARE MODE")
+            await cur.execute("DELETE FROM crew_month_hours WHERE month >= %s AND month < %s", (start, end))
+            await cur.execute(
+                f"INSERT INTO crew_month_hours (crew_id, month, duty_hours, flight_hours, duties) {RAW_MONTH_HOURS_SQL}",
+                (start, end),
+            )
+            written = cur.rowcount
+            await cur.execute(CREW_MONTH_TOTALS_REFRESH)
+    return written
@@ -0,0 +1,215 @@
+# Fatigue scoring jobs for the model in backend/domain/services/fatigue_service.py. Duty histories are
+# read as hours relative to `as_of` straight into arrays, scored in one pass and written back with one
+# UPDATE ... FROM unnest() per table, skipping rows whose values did not change.
+# Incremental: migration 0009 queues the crew of every roster change; each round claims a batch of
+# them and rescores those crew plus everyone sharing an upcoming flight with them, since the flight's
+# crew_utilization_score averages over its whole crew. Claimed crew are queued again if the round fails.
+# Full: once a day after the nightly hour, the first worker to claim the fatigue_runs row rescores all crew.
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+import numpy as np
+import psycopg
+
+from backend.domain.services.fatigue_service import (
+    HISTORY_AFTER,
+    HISTORY_BEFORE,
+    DutyHistory,
+    FatigueScores,
+    compute_fatigue,
+)
+from backend.infrastructure.database.roster_repository import RosterRepository
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.metrics.registry import registry
+from backend.infrastructure.settings import settings
+
+fatigue_runs = registry.counter("fatigue_runs_total", "Fatigue scoring runs", ("kind",))
+fatigue_crew_scored = registry.counter("fatigue_crew_scored_total", "Crew rescored by fatigue runs", ("kind",))
+fatigue_run_duration = registry.histogram("fatigue_run_duration_seconds", "Fatigue scoring run time", ("kind",))
+
+_task: Optional[asyncio.Task] = None
+
+
+def _utcnow() -> datetime:
+    # Duty timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def load_duty_history(conn, as_of: datetime, crew_ids: Optional[Sequence[int]] = None) -> DutyHistory:
+    query = """
+    SELECT crew_id, flight_id,
+           EXTRACT(EPOCH FROM duty_start - %s::timestamp)::float8 / 3600,
+           coalesce(EXTRACT(EPOCH FROM duty_end - %s::timestamp)::float8 / 3600, 'NaN')
+    FROM rosters
+    WHERE duty_start >= %s AND duty_start < %s AND status IS DISTINCT FROM 'cancelled'
+    """
+    params: List = [as_of, as_of, as_of - HISTORY_BEFORE, as_of + HISTORY_AFTER]
+    if crew_ids is not None:
+        query += " AND crew_id = ANY(%s)"
+        params.append(list(crew_ids))
+    async with conn.cursor() as cur:
+        await cur.execute(query, params)
+        rows = await cur.fetchall()
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 4).T
+    return DutyHistory.from_arrays(as_of, columns[0], columns[1], columns[2], columns[3], crew_ids)
+
+
+async def _all_crew_ids(conn) -> List[int]:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id FROM crew ORDER BY id")
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def write_scores(conn, scores: FatigueScores) -> None:
+    # Rounded so an unchanged score compares equal and its row is left alone
+    async with conn.cursor() as cur:
+        await cur.execute(
+            """
+            UPDATE crew SET fatigue_score = s.fatigue, predicted_availability = s.availability
+            FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS s(id, fatigue, availability)
+            WHERE crew.id = s.id
+              AND (crew.fatigue_score IS DISTINCT FROM s.fatigue
+                   OR crew.predicted_availability IS DISTINCT FROM s.availability)
+            """,
+            (scores.crew_ids.tolist(), np.round(scores.fatigue, 4).tolist(),
+             np.round(scores.predicted_availability, 4).tolist()),
+        )
+        if len(scores.flight_ids):
+            await cur.execute(
+                """
+                UPDATE flights SET crew_utilization_score = s.score
+                FROM unnest(%s::int[], %s::float8[]) AS s(id, score)
+                WHERE flights.id = s.id AND flights.crew_utilization_score IS DISTINCT FROM s.score
+                """,
+                (scores.flight_ids.tolist(), np.round(scores.flight_utilization, 4).tolist()),
+            )
+
+
+async def rescore_crew(conn, as_of: datetime, crew_ids: Optional[Sequence[int]] = None) -> FatigueScores:
+    """Score `crew_ids` (all crew when None) at `as_of`, write the results and commit."""
+    if crew_ids is None:
+        crew_ids = await _all_crew_ids(conn)
+    else:
+        # Bring in everyone on the same upcoming flights so their flight scores see the whole crew
+        history = await load_duty_history(conn, as_of, crew_ids)
+        upcoming = history.flight_ids[history.end > 0.0]
+        crew_ids = set(crew_ids)
+        if len(upcoming):
+            by_flight = await RosterRepository(conn).get_by_flight_ids(np.unique(upcoming).tolist())
+            crew_ids.update(r.crew_id for rosters in by_flight.values() for r in rosters if r.status != "cancelled")
+        crew_ids = sorted(crew_ids)
+    history = await load_duty_history(conn, as_of, crew_ids)
+    scores = await asyncio.to_thread(compute_fatigue, history)
+    await write_scores(conn, scores)
+    await conn.commit()
+    return scores
+
+
+async def run_incremental(conn, batch: int, as_of: Optional[datetime] = None) -> int:
+    """Rescore up to `batch` queued crew; returns how many were claimed."""
+    async with conn.cursor() as cur:
+        await cur.execute(
+            """
+            DELETE FROM fatigue_queue WHERE crew_id IN (
+                SELECT crew_id FROM fatigue_queue ORDER BY queued_at LIMIT %s FOR UPDATE SKIP LOCKED
+            ) RETURNING crew_id
+            """,
+            (batch,),
+        )
+        claimed = [row[0] for row in await cur.fetchall()]
+    await conn.commit()
+    if not claimed:
+        return 0
+    started = time.perf_counter()
+    try:
+        scores = await rescore_crew(conn, as_of or _utcnow(), claimed)
+    except Exception:
+        await conn.rollback()
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "INSERT INTO fatigue_queue (crew_id) SELECT unnest(%s::int[]) ON CONFLICT DO NOTHING", (claimed,)
+            )
+        await conn.commit()
+        raise
+    fatigue_runs.inc("incremental")
+    fatigue_crew_scored.inc("incremental", amount=len(scores.crew_ids))
+    fatigue_run_duration.observe(time.perf_counter() - started, "incremental")
+    return len(claimed)
+
+
+def last_nightly_slot(now: datetime, hour_utc: int) -> datetime:
+    slot = now.replace(hour=hour_utc, minute=0, second=0, microsecond=0)
+    return slot if slot <= now else slot - timedelta(days=1)
+
+
+async def run_full_if_due(conn, hour_utc: int, now: Optional[datetime] = None) -> Optional[int]:
+    """Rescore all crew unless a full run already started since the last nightly slot; returns crew scored."""
+    now = now or _utcnow()
+    async with conn.cursor() as cur:
+        await cur.execute(
+            """
+            UPDATE fatigue_runs SET started_at = NOW()
+            WHERE kind = 'full' AND (started_at IS NULL OR started_at < %s::timestamp AT TIME ZONE 'UTC')
+            RETURNING kind
+            """,
+            (last_nightly_slot(now, hour_utc),),
+        )
+        claimed = await cur.fetchone()
+    await conn.commit()
+    if claimed is None:
+        return None
+    started = time.perf_counter()
+    # Everything queued so far is covered by this run; the delete commits with the scores
+    async with conn.cursor() as cur:
+        await cur.execute("DELETE FROM fatigue_queue")
+    scores = await rescore_crew(conn, now)
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "UPDATE fatigue_runs SET finished_at = NOW(), crew_scored = %s WHERE kind = 'full'",
+            (len(scores.crew_ids),),
+        )
+    await conn.commit()
+    fatigue_runs.inc("full")
+    fatigue_crew_scored.inc("full", amount=len(scores.crew_ids))
+    fatigue_run_duration.observe(time.perf_counter() - started, "full")
+    return len(scores.crew_ids)
+
+
+async def _fatigue_loop(interval_s: float, batch: int, hour_utc: int) -> None:
+    from backend.infrastructure.database.core import DSN
+
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(DSN) as conn:
+                scored = await run_full_if_due(conn, hour_utc)
+                if scored is not None:
+                    logger.info(f"Nightly fatigue run scored {scored} crew")
+                # Drain a backlog without waiting a full interval per batch
+                while await run_incremental(conn, batch) >= batch:
+                    pass
+        except Exception as exc:
+            # Nothing to do until the database (or migration 0009) is there; try again next round
+            logger.warning(f"Fatigue scoring failed: {exc}")
+        await asyncio.sleep(interval_s)
+
+
+def start_fatigue_jobs() -> None:
+    global _task
+    if settings.fatigue_incremental_interval_s <= 0 or _task is not None:
+        return
+    _task = asyncio.get_running_loop().create_task(_fatigue_loop(
+        settings.fatigue_incremental_interval_s, settings.fatigue_incremental_batch, settings.fatigue_nightly_hour_utc
+    ))
+
+
+async def stop_fatigue_jobs() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -1,12 +1,14 @@
 from backend.applications.interfaces.flight_repository import IFlightRepository
 from backend.domain.entities.flight import Flight
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
+from backend.infrastructure.database.instrumentation import traced
 
 class FlightRepository(IFlightRepository):
     def __init__(self, conn):
         self.conn = conn
 
+    @traced(read_only=True)
     async def get_by_id(self, flight_id: int) -> Optional[Flight]:
         query = "SELECT * FROM flights WHERE id = %s"
         async with self.conn.cursor() as cur:
@@ -16,6 +18,25 @@ class FlightRepository(IFlightRepository):
                 return Flight(**dict(zip([desc[0] for desc in cur.description], row)))
             return None
 
+    @traced(read_only=True)
+    async def get_by_ids(self, flight_ids: Sequence[int]) -> Dict[int, Flight]:
+        query = "SELECT * FROM flights WHERE id = ANY(%s)"
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, (list(flight_ids),))
+            rows = await cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            return {flight.id: flight for flight in (Flight(**dict(zip(columns, row))) for row in rows)}
+
+    @traced(read_only=True)
+    async def get_by_flight_numbers(self, flight_numbers: Sequence[str]) -> List[Flight]:
+        query = "SELECT * FROM flights WHERE flight_number = ANY(%s) ORDER BY scheduled_departure"
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, (list(flight_numbers),))
+            rows = await cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            return [Flight(**dict(zip(columns, row))) for row in rows]
+
+    @traced(read_only=True)
     async def get_flights_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Flight]:
         query = "SELECT * FROM flights WHERE scheduled_departure >= %s AND scheduled_arrival <= %s"
         async with self.conn.cursor() as cur:
@@ -24,6 +45,7 @@ class FlightRepository(IFlightRepository):
             columns = [desc[0] for desc in cur.description]
             return [Flight(**dict(zip(columns, row))) for row in rows]
 
+    @traced()
     async def save(self, flight: Flight) -> Flight:
         # Example: upsert logic (simplified)
         query = """
@@ -38,6 +60,7 @@ class FlightRepository(IFlightRepository):
             row = await cur.fetchone()
             return Flight(**dict(zip([desc[0] for desc in cur.description], row)))
 
+    @traced(read_only=True)
     async def get_total_count(self) -> int:
         query = "SELECT COUNT(*) FROM flights"
         async with self.conn.cursor() as cur:
@@ -0,0 +1,232 @@
+# Per-statement timing for psycopg async connections.
+# Wraps the connection handed out by get_db_conn so repositories and controllers
+# keep using `async with conn.cursor() as cur` unchanged.
+import functools
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from backend.infrastructure.logging.logging_middleware import logger, request_id_var
+from backend.infrastructure.metrics.registry import registry
+from backend.infrastructure.settings import settings
+
+query_tag_var: ContextVar[Optional[str]] = ContextVar("query_tag", default=None)
+# Set inside traced(read_only=True) calls: their statements may be re-run under EXPLAIN ANALYZE
+read_only_var: ContextVar[bool] = ContextVar("read_only", default=False)
+
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement time by caller and phase (execute/fetch/map)", ("tag", "phase")
+)
+db_rows_returned = registry.counter("db_rows_returned_total", "Rows fetched by caller", ("tag",))
+db_slow_statements = registry.counter("db_slow_statements_total", "Statements over the slow-query threshold", ("tag",))
+db_traced_call_duration = registry.histogram(
+    "db_traced_call_duration_seconds", "Wall time of traced repository/controller calls", ("tag",)
+)
+
+
+def traced(tag: Optional[str] = None, read_only: bool = False):
+    """Tag every statement issued inside the decorated coroutine (default: Class.method / module.function).
+
+    `read_only` allow-lists its statements for a sampled EXPLAIN ANALYZE, which runs them again;
+    anything else only gets a plain EXPLAIN.
+    """
+
+    def decorator(fn):
+        name = tag or fn.__qualname__
+        if tag is None and "." not in name:
+            name = f"{fn.__module__.rsplit('.', 1)[-1]}.{name}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            token = query_tag_var.set(name)
+            read_only_token = read_only_var.set(read_only)
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                db_traced_call_duration.observe(time.perf_counter() - start, name)
+                read_only_var.reset(read_only_token)
+                query_tag_var.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+@dataclass
+class StatementStats:
+    query: str
+    params: Any
+    tag: str
+    request_id: Optional[str]
+    read_only: bool = False
+    execute_s: float = 0.0
+    fetch_s: float = 0.0
+    map_s: float = 0.0
+    rows: int = 0
+
+    @property
+    def total_s(self) -> float:
+        return self.execute_s + self.fetch_s + self.map_s
+
+
+def _compact(query: str) -> str:
+    return " ".join(query.split())
+
+
+def _explain_prefix(stats: StatementStats) -> Optional[str]:
+    """How to explain a slow statement: ANALYZE re-runs it, so only allow-listed reads get it.
+
+    A plain EXPLAIN only plans, so it is safe for anything else that can be explained: SELECT
+    pg_notify(...), a function that creates partitions or a data-modifying CTE are not run twice.
+    """
+    query = stats.query
+    head = query.lstrip().split(None, 1)[0].upper() if query.strip() else ""
+    if head not in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+        return None
+    if stats.read_only and head in ("SELECT", "WITH") and "FOR UPDATE" not in query.upper():
+        return "EXPLAIN (ANALYZE, BUFFERS) "
+    return "EXPLAIN "
+
+
+class InstrumentedCursor:
+    def __init__(self, conn: "InstrumentedConnection", cursor):
+        self._conn = conn
+        self._cur = cursor
+        self._stats: List[StatementStats] = []
+        self._last_fetch_end: Optional[float] = None
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    async def __aenter__(self):
+        await self._cur.__aenter__()
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = await self.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Whatever ran between the last fetch and leaving the block is row mapping
+        if self._stats and self._last_fetch_end is not None:
+            self._stats[-1].map_s += time.perf_counter() - self._last_fetch_end
+        result = await self._cur.__aexit__(exc_type, exc, tb)
+        for stats in self._stats:
+            await self._conn.finish_statement(stats, explain_ok=exc_type is None)
+        return result
+
+    def _current(self) -> Optional[StatementStats]:
+        return self._stats[-1] if self._stats else None
+
+    async def execute(self, query, params=None, **kwargs):
+        self._close_mapping()
+        stats = StatementStats(
+            query=str(query), params=params, tag=query_tag_var.get() or "untagged", request_id=request_id_var.get(),
+            read_only=read_only_var.get(),
+        )
+        start = time.perf_counter()
+        try:
+            await self._cur.execute(query, params, **kwargs)
+        finally:
+            stats.execute_s = time.perf_counter() - start
+            self._stats.append(stats)
+            self._last_fetch_end = None
+        return self
+
+    async def executemany(self, query, params_seq, **kwargs):
+        self._close_mapping()
+        stats = StatementStats(
+            query=str(query), params=None, tag=query_tag_var.get() or "untagged", request_id=request_id_var.get(),
+            read_only=read_only_var.get(),
+        )
+        start = time.perf_counter()
+        try:
+            await self._cur.executemany(query, params_seq, **kwargs)
+        finally:
+            stats.execute_s = time.perf_counter() - start
+            self._stats.append(stats)
+            self._last_fetch_end = None
+
+    def _close_mapping(self) -> None:
+        stats = self._current()
+        if stats is not None and self._last_fetch_end is not None:
+            stats.map_s += time.perf_counter() - self._last_fetch_end
+            self._last_fetch_end = None
+
+    async def _timed_fetch(self, coro, count_rows):
+        start = time.perf_counter()
+        result = await coro
+        end = time.perf_counter()
+        stats = self._current()
+        if stats is not None:
+            stats.fetch_s += end - start
+            stats.rows += count_rows(result)
+        self._last_fetch_end = end
+        return result
+
+    async def fetchone(self):
+        return await self._timed_fetch(self._cur.fetchone(), lambda row: 0 if row is None else 1)
+
+    async def fetchmany(self, size: int = 0):
+        return await self._timed_fetch(self._cur.fetchmany(size), len)
+
+    async def fetchall(self):
+        return await self._timed_fetch(self._cur.fetchall(), len)
+
+
+class InstrumentedConnection:
+    def __init__(self, conn, slow_query_ms: Optional[float] = None, explain_sample_rate: Optional[float] = None):
+        self._conn = conn
+        self.slow_query_ms = settings.db_slow_query_ms if slow_query_ms is None else slow_query_ms
+        self.explain_sample_rate = (
+            settings.db_explain_sample_rate if explain_sample_rate is None else explain_sample_rate
+        )
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs) -> InstrumentedCursor:
+        return InstrumentedCursor(self, self._conn.cursor(*args, **kwargs))
+
+    async def finish_statement(self, stats: StatementStats, explain_ok: bool = True) -> None:
+        db_statement_duration.observe(stats.execute_s, stats.tag, "execute")
+        db_statement_duration.observe(stats.fetch_s, stats.tag, "fetch")
+        db_statement_duration.observe(stats.map_s, stats.tag, "map")
+        db_rows_returned.inc(stats.tag, amount=stats.rows)
+        summary = (
+            f"{stats.tag} rows={stats.rows} execute={stats.execute_s * 1000:.1f}ms "
+            f"fetch={stats.fetch_s * 1000:.1f}ms map={stats.map_s * 1000:.1f}ms"
+        )
+        extra = {"correlation_id": stats.request_id, "query_tag": stats.tag}
+        if stats.total_s * 1000 < self.slow_query_ms:
+            logger.debug(f"SQL {summary}", extra=extra)
+            return
+        db_slow_statements.inc(stats.tag)
+        logger.warning(f"Slow SQL {summary} request_id={stats.request_id} query={_compact(stats.query)}", extra=extra)
+        prefix = _explain_prefix(stats) if explain_ok and self.explain_sample_rate > 0 else None
+        if prefix is not None and random.random() < self.explain_sample_rate:
+            await self._explain(stats, prefix, extra)
+
+    async def _explain(self, stats: StatementStats, prefix: str, extra) -> None:
+        # With ANALYZE this re-runs the (allow-listed, read-only) statement; sampled so it never
+        # doubles steady-state load
+        label = prefix.split("(", 1)[0].strip() + (" ANALYZE" if "ANALYZE" in prefix else "")
+        try:
+            async with self._conn.cursor() as cur:
+                await cur.execute(prefix + stats.query, stats.params)
+                plan = "\n".join(row[0] for row in await cur.fetchall())
+            logger.warning(f"{label} for {stats.tag} request_id={stats.request_id}:\n{plan}", extra=extra)
+        except Exception as exc:
+            logger.warning(f"{label} failed for {stats.tag}: {exc}", extra=extra)
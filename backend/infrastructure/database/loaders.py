@@ -0,0 +1,115 @@
+# Request-scoped batching for ID lookups (the DataLoader pattern).
+# load(key) returns a future; every key requested during the current event-loop tick is
+# resolved by a single batch call (one `= ANY(%s)` query per entity type), and each key is
+# fetched at most once per request. Build a fresh Loaders per request: results are not
+# invalidated, and sharing them across requests would serve stale rows.
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from fastapi import Depends
+
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.infrastructure.database.core import get_read_conn
+from backend.infrastructure.database.crew_repository import CrewRepository
+from backend.infrastructure.database.flight_repository import FlightRepository
+from backend.infrastructure.database.roster_repository import RosterRepository
+from backend.infrastructure.metrics.registry import SIZE_BUCKETS, registry
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+loader_batch_size = registry.histogram("db_loader_batch_size", "Keys resolved per batch query", ("loader",), buckets=SIZE_BUCKETS)
+
+BatchFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    def __init__(self, name: str, batch_fn: BatchFn, max_batch: int = 1000, missing: Callable[[], V] = lambda: None):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.missing = missing
+        self._cache: Dict[K, "asyncio.Future[V]"] = {}
+        self._queue: List[K] = []
+        self._scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        future = self._cache.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+            if not self._scheduled:
+                # Runs after every coroutine that is ready this tick has had a chance to call load()
+                self._scheduled = True
+                asyncio.get_running_loop().call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Sequence[K]) -> List[V]:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        queue, self._queue = self._queue, []
+        for i in range(0, len(queue), self.max_batch):
+            task = asyncio.ensure_future(self._resolve(queue[i:i + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys: List[K]) -> None:
+        loader_batch_size.observe(len(keys), self.name)
+        try:
+            found = await self.batch_fn(keys)
+        except Exception as exc:
+            for key in keys:
+                # Forget failures so a later load() in the same request can retry
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(found[key] if key in found else self.missing())
+
+
+class Loaders:
+    """The per-request loaders; repositories share the request's read connection."""
+
+    def __init__(self, conn):
+        self.crew_repo = CrewRepository(conn)
+        self.flight_repo = FlightRepository(conn)
+        self.roster_repo = RosterRepository(conn)
+        self.crew: DataLoader[int, Optional[Crew]] = DataLoader("crew", self.crew_repo.get_by_ids)
+        self.flights: DataLoader[int, Optional[Flight]] = DataLoader("flights", self.flight_repo.get_by_ids)
+        self.rosters_by_flight: DataLoader[int, List[Roster]] = DataLoader(
+            "rosters_by_flight", self.roster_repo.get_by_flight_ids, missing=list
+        )
+        self.rosters_by_crew: DataLoader[Tuple[int, datetime, datetime], List[Roster]] = DataLoader(
+            "rosters_by_crew", self._rosters_by_crew, missing=list
+        )
+
+    async def _rosters_by_crew(self, keys: List[Tuple[int, datetime, datetime]]) -> Dict[Tuple[int, datetime, datetime], List[Roster]]:
+        # One query per distinct window; callers building several schedules usually share one
+        windows: Dict[Tuple[datetime, datetime], List[int]] = {}
+        for crew_id, start, end in keys:
+            windows.setdefault((start, end), []).append(crew_id)
+        found = {}
+        for (start, end), crew_ids in windows.items():
+            by_crew = await self.roster_repo.get_by_crew_ids_and_date(crew_ids, start, end)
+            found.update({(crew_id, start, end): rosters for crew_id, rosters in by_crew.items()})
+        return found
+
+
+async def get_loaders(conn=Depends(get_read_conn)) -> Loaders:
+    return Loaders(conn)
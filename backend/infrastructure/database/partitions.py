@@ -0,0 +1,73 @@
+# Keeps monthly partitions of rosters/audit_log created ahead of time from inside the app,
+# so inserts never hit a missing month even if nobody runs the maintenance CLI. The same round
+# rolls crew.total_*_hours_month over to the new month (migration 0010 summary).
+import asyncio
+from datetime import date
+from typing import Dict, Optional
+
+import psycopg
+
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.settings import settings
+
+PARTITIONED_TABLES = ("rosters", "audit_log")
+
+_task: Optional[asyncio.Task] = None
+
+
+def month_start(value: date, months: int = 0) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def ensure_future_partitions(conn, months_ahead: int, today: Optional[date] = None) -> Dict[str, int]:
+    today = today or date.today()
+    created = {}
+    async with conn.cursor() as cur:
+        for table in PARTITIONED_TABLES:
+            await cur.execute(
+                "SELECT ensure_monthly_partitions(%s, %s, %s)",
+                (table, month_start(today), month_start(today, months_ahead)),
+            )
+            created[table] = (await cur.fetchone())[0]
+    await conn.commit()
+    return created
+
+
+async def _maintenance_loop(interval_s: float, months_ahead: int) -> None:
+    from backend.infrastructure.database.core import DSN
+    from backend.infrastructure.database.duty_hours import refresh_crew_month_totals
+
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(DSN) as conn:
+                created = await ensure_future_partitions(conn, months_ahead)
+                if any(created.values()):
+                    logger.info(f"Created partitions: {created}")
+                refreshed = await refresh_crew_month_totals(conn)
+                if refreshed:
+                    logger.info(f"Refreshed monthly hour totals of {refreshed} crew")
+        except Exception as exc:
+            # Nothing to do until the database (or migrations 0005/0010) are there; try again next round
+            logger.warning(f"Partition maintenance failed: {exc}")
+        await asyncio.sleep(interval_s)
+
+
+def start_partition_maintenance() -> None:
+    global _task
+    if settings.partition_maintenance_interval_s <= 0 or _task is not None:
+        return
+    _task = asyncio.get_running_loop().create_task(
+        _maintenance_loop(settings.partition_maintenance_interval_s, settings.partition_months_ahead)
+    )
+
+
+async def stop_partition_maintenance() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,149 @@
+# Routes read-only traffic to streaming replicas.
+# Replicas are picked by fewest in-flight reads (round-robin on ties). A replica whose replay
+# lag is over the limit, or that fails to connect, is skipped until it recovers; with none
+# usable the read goes to the primary.
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import psycopg
+
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.metrics.registry import registry
+
+# 0 when the replica has replayed everything it received (an idle primary is not "lag"),
+# otherwise the age of the last replayed transaction. NULL on a primary.
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+db_read_routing = registry.counter("db_read_routing_total", "Read connections by target and reason", ("target", "reason"))
+db_replica_lag = registry.gauge("db_replica_lag_seconds", "Last measured replay lag per replica", ("replica",))
+
+Connect = Callable[[str], Awaitable[psycopg.AsyncConnection]]
+
+
+async def _connect(dsn: str, timeout_s: float = 2.0) -> psycopg.AsyncConnection:
+    return await psycopg.AsyncConnection.connect(dsn, connect_timeout=max(1, int(timeout_s)))
+
+
+@dataclass
+class Replica:
+    name: str
+    dsn: str
+    lag_s: Optional[float] = None
+    checked_at: float = 0.0
+    down_until: float = 0.0
+    in_flight: int = 0
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary_dsn: str,
+        replica_dsns: List[str],
+        max_lag_s: float = 5.0,
+        lag_check_interval_s: float = 2.0,
+        retry_after_s: float = 15.0,
+        connect: Optional[Connect] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.primary_dsn = primary_dsn
+        self.replicas = [Replica(f"replica{i}", dsn) for i, dsn in enumerate(replica_dsns)]
+        self.max_lag_s = max_lag_s
+        self.lag_check_interval_s = lag_check_interval_s
+        self.retry_after_s = retry_after_s
+        self._connect = connect or _connect
+        self._clock = clock
+        self._rr = itertools.count()
+
+    def candidates(self) -> List[Replica]:
+        """Usable replicas, least loaded first; a known-lagging one stays out until its next check."""
+        now = self._clock()
+        usable = []
+        for replica in self.replicas:
+            if replica.down_until > now:
+                continue
+            stale = now - replica.checked_at >= self.lag_check_interval_s
+            if not stale and replica.lag_s is not None and replica.lag_s > self.max_lag_s:
+                continue
+            usable.append(replica)
+        offset = next(self._rr)
+        n = len(usable) or 1
+        return sorted(usable, key=lambda r: (r.in_flight, (usable.index(r) - offset) % n))
+
+    async def _check_lag(self, replica: Replica, conn) -> bool:
+        async with conn.cursor() as cur:
+            await cur.execute(LAG_QUERY)
+            row = await cur.fetchone()
+        lag = None if row is None or row[0] is None else float(row[0])
+        replica.checked_at = self._clock()
+        if lag is None:
+            # Not in recovery: misconfigured or promoted; never treat it as a replica
+            replica.lag_s = float("inf")
+            logger.warning(f"{replica.name} is not in recovery; excluding it from read routing")
+            return False
+        replica.lag_s = lag
+        db_replica_lag.set(lag, replica.name)
+        return lag <= self.max_lag_s
+
+    async def connect_read(self) -> Tuple[psycopg.AsyncConnection, str, Optional[Replica]]:
+        reason = "no_replicas" if not self.replicas else "all_unavailable"
+        for replica in self.candidates():
+            try:
+                conn = await self._connect(replica.dsn)
+            except Exception as exc:
+                replica.down_until = self._clock() + self.retry_after_s
+                logger.warning(f"{replica.name} unreachable, retrying in {self.retry_after_s:.0f}s: {exc}")
+                continue
+            try:
+                fresh = self._clock() - replica.checked_at < self.lag_check_interval_s
+                if fresh or await self._check_lag(replica, conn):
+                    db_read_routing.inc(replica.name, "replica")
+                    return conn, replica.name, replica
+            except Exception as exc:
+                replica.down_until = self._clock() + self.retry_after_s
+                logger.warning(f"Lag check failed on {replica.name}: {exc}")
+            await conn.close()
+            reason = "lagging"
+        db_read_routing.inc("primary", reason)
+        return await self._connect(self.primary_dsn), "primary", None
+
+    def snapshot(self) -> List[dict]:
+        return [
+            {
+                "name": r.name,
+                "lag_s": r.lag_s,
+                "in_flight": r.in_flight,
+                "available": r.down_until <= self._clock(),
+            }
+            for r in self.replicas
+        ]
+
+
+_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _router
+    if _router is None:
+        from backend.infrastructure.database.core import DSN
+        from backend.infrastructure.settings import settings
+
+        _router = ReplicaRouter(
+            DSN,
+            settings.replica_dsns,
+            max_lag_s=settings.replica_max_lag_s,
+            lag_check_interval_s=settings.replica_lag_check_interval_s,
+        )
+    return _router
+
+
+def set_replica_router(router: Optional[ReplicaRouter]) -> None:
+    global _router
+    _router = router
@@ -1,11 +1,13 @@
 # Repository for flights data access
 from typing import List, Dict, Any
 from backend.infrastructure.database.core import get_db_conn
+from backend.infrastructure.database.instrumentation import traced
 
 class FlightRepository:
     def __init__(self, conn):
         self.conn = conn
 
+    @traced(read_only=True)
     async def get_all_flights(self) -> List[Dict[str, Any]]:
         query = """
         SELECT f.*, 
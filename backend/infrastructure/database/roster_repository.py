@@ -1,37 +1,125 @@
 from backend.applications.interfaces.roster_repository import IRosterRepository
 from backend.domain.entities.roster import Roster
-from datetime import datetime
-from typing import List, Optional
+from backend.domain.exceptions import RosterOverlapError
+from backend.domain.services.duty_hours import DutyHoursLedger
+from dataclasses import fields
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from psycopg import errors
+from backend.infrastructure.database.instrumentation import traced
+
+# Entity columns only: the table also has the generated duty_period range
+ROSTER_COLUMNS = ", ".join(f.name for f in fields(Roster))
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Duty timestamps are stored as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
 
 class RosterRepository(IRosterRepository):
     def __init__(self, conn):
         self.conn = conn
 
+    @traced(read_only=True)
     async def get_by_crew_and_date(self, crew_id: int, start_date: datetime, end_date: datetime) -> List[Roster]:
-        query = "SELECT * FROM rosters WHERE crew_id = %s AND duty_start >= %s AND duty_end <= %s"
+        query = f"SELECT {ROSTER_COLUMNS} FROM rosters WHERE crew_id = %s AND duty_start >= %s AND duty_end <= %s"
         async with self.conn.cursor() as cur:
             await cur.execute(query, (crew_id, start_date, end_date))
             rows = await cur.fetchall()
             columns = [desc[0] for desc in cur.description]
             return [Roster(**dict(zip(columns, row))) for row in rows]
 
-    async def save(self, roster: Roster) -> Roster:
-        # Example: upsert logic (simplified)
+    @traced(read_only=True)
+    async def get_by_crew_ids_and_date(self, crew_ids: Sequence[int], start_date: datetime, end_date: datetime) -> Dict[int, List[Roster]]:
+        query = f"""
+        SELECT {ROSTER_COLUMNS} FROM rosters
+        WHERE crew_id = ANY(%s) AND duty_start >= %s AND duty_end <= %s
+        ORDER BY duty_start
+        """
+        return await self._grouped(query, (list(crew_ids), start_date, end_date), "crew_id", crew_ids)
+
+    @traced(read_only=True)
+    async def get_by_flight_ids(self, flight_ids: Sequence[int]) -> Dict[int, List[Roster]]:
+        query = f"SELECT {ROSTER_COLUMNS} FROM rosters WHERE flight_id = ANY(%s) ORDER BY flight_id, id"
+        return await self._grouped(query, (list(flight_ids),), "flight_id", flight_ids)
+
+    async def _grouped(self, query: str, params, key: str, keys: Sequence[int]) -> Dict[int, List[Roster]]:
+        grouped: Dict[int, List[Roster]] = {k: [] for k in keys}
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, params)
+            rows = await cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            for row in rows:
+                roster = Roster(**dict(zip(columns, row)))
+                grouped.setdefault(getattr(roster, key), []).append(roster)
+        return grouped
+
+    @traced(read_only=True)
+    async def get_on_duty(self, start: datetime, end: datetime, crew_id: Optional[int] = None) -> List[Roster]:
+        # GiST range overlap; duty_start < end additionally prunes partitions for later months
+        start, end = _naive_utc(start), _naive_utc(end)
+        query = f"""
+        SELECT {ROSTER_COLUMNS} FROM rosters
+        WHERE duty_period && tstzrange(%s::timestamp AT TIME ZONE 'UTC', %s::timestamp AT TIME ZONE 'UTC', '[)')
+          AND duty_start < %s
+          AND status IS DISTINCT FROM 'cancelled'
+        """
+        params = [start, end, end]
+        if crew_id is not None:
+            query += " AND crew_id = %s"
+            params.append(crew_id)
+        async with self.conn.cursor() as cur:
+            await cur.execute(query + " ORDER BY duty_start", params)
+            rows = await cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+            return [Roster(**dict(zip(columns, row))) for row in rows]
+
+    @traced(read_only=True)
+    async def get_month_hours(self, crew_ids: Sequence[int], months: Sequence[date]) -> DutyHoursLedger:
+        # Summary rows kept in step by the migration 0010 triggers: one primary-key probe per (crew, month)
         query = """
-        INSERT INTO rosters (id, crew_id, flight_id, assignment_type, status, crew_position, duty_start, duty_end)
+        SELECT crew_id, month, duty_hours, flight_hours, duties FROM crew_month_hours
+        WHERE crew_id = ANY(%s) AND month = ANY(%s)
+        """
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, (list(crew_ids), list(months)))
+            return DutyHoursLedger(await cur.fetchall())
+
+    @traced()
+    async def save(self, roster: Roster) -> Roster:
+        # rosters is partitioned on duty_start, so its key is (id, duty_start): update by id first (a new
+        # duty_start moves the row to its month's partition) and insert only when no row has the id.
+        # roster_ids (migration 0011) keeps ids unique across partitions.
+        update = f"""
+        UPDATE rosters SET crew_id = %s, flight_id = %s, assignment_type = %s, status = %s, crew_position = %s,
+            duty_start = %s, duty_end = %s, updated_at = NOW()
+        WHERE id = %s
+        RETURNING {ROSTER_COLUMNS}
+        """
+        insert = f"""
+        INSERT INTO rosters (crew_id, flight_id, assignment_type, status, crew_position, duty_start, duty_end, id)
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO UPDATE SET status = EXCLUDED.status
-        RETURNING *
+        RETURNING {ROSTER_COLUMNS}
         """
-        values = (roster.id, roster.crew_id, roster.flight_id, roster.assignment_type, roster.status, roster.crew_position, roster.duty_start, roster.duty_end)
+        values = (roster.crew_id, roster.flight_id, roster.assignment_type, roster.status, roster.crew_position, roster.duty_start, roster.duty_end, roster.id)
         async with self.conn.cursor() as cur:
-            await cur.execute(query, values)
-            row = await cur.fetchone()
+            try:
+                await cur.execute(update, values)
+                row = await cur.fetchone()
+                if row is None:
+                    await cur.execute(insert, values)
+                    row = await cur.fetchone()
+            except errors.ExclusionViolation as exc:
+                raise RosterOverlapError(roster.crew_id, roster.duty_start, roster.duty_end, str(exc.diag.message_primary or "")) from exc
             return Roster(**dict(zip([desc[0] for desc in cur.description], row)))
 
+    @traced()
     async def bulk_save(self, rosters: List[Roster]) -> List[Roster]:
-        # Example: bulk insert/update
+        # All or nothing: one overlapping assignment rolls back the whole batch, and with it the
+        # crew_month_hours updates its triggers made
         results = []
-        for roster in rosters:
-            results.append(await self.save(roster))
+        async with self.conn.transaction():
+            for roster in rosters:
+                results.append(await self.save(roster))
         return results
@@ -0,0 +1,91 @@
+# Keeps one scenario Snapshot per worker for the default window (now .. now + horizon). It is
+# loaded on first use and reused by every scenario request until crew, flights or rosters change
+# (table change notifications) or it reaches its maximum age, which also bounds staleness while
+# the change listener is down. Other windows are loaded per request and not kept.
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Tuple
+
+from backend.applications.use_cases.load_scenario_snapshot import LoadScenarioSnapshotUseCase
+from backend.domain.services.scenario_service import Snapshot
+from backend.infrastructure.database.crew_repository import CrewRepository
+from backend.infrastructure.database.flight_repository import FlightRepository
+from backend.infrastructure.database.roster_repository import RosterRepository
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.metrics.registry import registry
+
+SNAPSHOT_TABLES = {"crew", "flights", "rosters"}
+
+snapshot_loads = registry.counter("scenario_snapshot_loads_total", "Scenario snapshot loads", ("reason",))
+
+
+def _utcnow() -> datetime:
+    # Duty timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def load_snapshot(conn, start: datetime, end: datetime, taken_at: datetime) -> Snapshot:
+    use_case = LoadScenarioSnapshotUseCase(FlightRepository(conn), CrewRepository(conn), RosterRepository(conn))
+    return await use_case.execute(start, end, taken_at)
+
+
+class ScenarioSnapshotCache:
+    def __init__(
+        self,
+        horizon: timedelta = timedelta(days=7),
+        max_age: timedelta = timedelta(minutes=15),
+        clock: Callable[[], datetime] = _utcnow,
+    ):
+        self.horizon = horizon
+        self.max_age = max_age
+        self.clock = clock
+        self.snapshot: Optional[Snapshot] = None
+        self._stale = "initial"
+        self._lock = asyncio.Lock()
+
+    def default_window(self, now: datetime) -> Tuple[datetime, datetime]:
+        return now, now + self.horizon
+
+    def on_table_change(self, table: str, version: int) -> None:
+        if table in SNAPSHOT_TABLES:
+            self._stale = self._stale or "change"
+
+    async def get(self, conn, window: Optional[Tuple[datetime, datetime]] = None) -> Snapshot:
+        now = self.clock()
+        if window is not None and window != self.default_window(now):
+            snapshot_loads.inc("window")
+            return await load_snapshot(conn, window[0], window[1], now)
+        async with self._lock:
+            now = self.clock()
+            if not self._stale and now - self.snapshot.taken_at > self.max_age:
+                self._stale = "age"
+            if self._stale:
+                # Cleared first: a change that lands while loading marks the snapshot stale again
+                reason, self._stale = self._stale, ""
+                start, end = self.default_window(now)
+                self.snapshot = await load_snapshot(conn, start, end, now)
+                snapshot_loads.inc(reason)
+                logger.info(
+                    f"Scenario snapshot loaded ({reason}): {len(self.snapshot.flights)} flights, "
+                    f"{len(self.snapshot.crew_by_id)} crew, {len(self.snapshot.rosters)} rosters"
+                )
+        return self.snapshot
+
+
+_cache: Optional[ScenarioSnapshotCache] = None
+
+
+def get_snapshot_cache() -> ScenarioSnapshotCache:
+    global _cache
+    if _cache is None:
+        from backend.infrastructure.settings import settings
+
+        _cache = ScenarioSnapshotCache(
+            timedelta(days=settings.scenario_horizon_days), timedelta(seconds=settings.scenario_snapshot_max_age_s)
+        )
+    return _cache
+
+
+def set_snapshot_cache(cache: Optional[ScenarioSnapshotCache]) -> None:
+    global _cache
+    _cache = cache
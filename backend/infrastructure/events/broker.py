@@ -0,0 +1,141 @@
+# In-process fan-out of live dashboard events to SSE and WebSocket subscribers.
+# publish() never blocks: each subscriber has a bounded queue, and a consumer that falls a full
+# queue behind has its backlog replaced by one "stream.resync" event (refetch, then carry on),
+# so a slow client costs a bounded amount of memory and never slows the others down.
+import asyncio
+import itertools
+import os
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from backend.infrastructure.api.responses import dumps
+from backend.infrastructure.metrics.registry import registry
+
+TOPICS = ("disruptions", "conflicts", "metrics", "rosters")
+
+# Identifies this worker in event IDs and cross-worker notifications
+WORKER_ID = f"{os.getpid():x}{uuid.uuid4().hex[:6]}"
+
+events_published = registry.counter("events_published_total", "Events published to live subscribers", ("topic",))
+events_dropped = registry.counter("events_dropped_total", "Events dropped from slow subscribers' queues", ("topic",))
+events_subscribers = registry.gauge("events_subscribers", "Connected live-event subscribers", ("transport",))
+
+
+class Event:
+    __slots__ = ("id", "topic", "type", "data", "_json", "_sse")
+
+    def __init__(self, id: str, topic: str, type: str, data: Any):
+        self.id = id
+        self.topic = topic
+        self.type = type
+        self.data = data
+        self._json: Optional[bytes] = None
+        self._sse: Optional[bytes] = None
+
+    def json(self) -> bytes:
+        # Encoded once, however many subscribers receive it
+        if self._json is None:
+            self._json = dumps({"id": self.id, "topic": self.topic, "type": self.type, "data": self.data})
+        return self._json
+
+    def sse(self) -> bytes:
+        if self._sse is None:
+            self._sse = b"id: " + self.id.encode() + b"\nevent: " + self.type.encode() + b"\ndata: " + self.json() + b"\n\n"
+        return self._sse
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", topics: Set[str], queue_size: int, transport: str):
+        self.broker = broker
+        self.topics = topics
+        self.transport = transport
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            dropped = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.dropped += dropped + 1
+            events_dropped.inc(event.topic, amount=dropped + 1)
+            self.queue.put_nowait(self.broker.resync_event())
+
+    async def get(self) -> Event:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    def __init__(self, queue_size: int = 256, replay_size: int = 1000):
+        self.queue_size = queue_size
+        self._by_topic: Dict[str, Set[Subscription]] = {t: set() for t in TOPICS}
+        self._replay: Deque[Event] = deque(maxlen=replay_size)
+        self._seq = itertools.count(1)
+
+    def _next_id(self) -> str:
+        return f"{WORKER_ID}-{next(self._seq)}"
+
+    def resync_event(self) -> Event:
+        return Event(self._next_id(), "stream", "stream.resync", {"reason": "missed events; refetch current state"})
+
+    def subscribe(self, topics: Iterable[str], transport: str = "sse") -> Subscription:
+        wanted = set(topics) & set(TOPICS) or set(TOPICS)
+        sub = Subscription(self, wanted, self.queue_size, transport)
+        for topic in wanted:
+            self._by_topic[topic].add(sub)
+        events_subscribers.inc(transport)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        removed = False
+        for topic in sub.topics:
+            if sub in self._by_topic[topic]:
+                self._by_topic[topic].discard(sub)
+                removed = True
+        if removed:
+            events_subscribers.dec(sub.transport)
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        if topic is not None:
+            return len(self._by_topic.get(topic, ()))
+        return len({s for subs in self._by_topic.values() for s in subs})
+
+    def publish(self, topic: str, type: str, data: Any) -> Event:
+        if topic not in self._by_topic:
+            raise ValueError(f"Unknown event topic: {topic}")
+        event = Event(self._next_id(), topic, type, data)
+        self._replay.append(event)
+        events_published.inc(topic)
+        for sub in list(self._by_topic[topic]):
+            sub.offer(event)
+        return event
+
+    def replay_since(self, last_id: str, topics: Set[str]) -> Optional[List[Event]]:
+        """Events after last_id for a reconnecting client, or None when they are no longer buffered."""
+        ids = [e.id for e in self._replay]
+        if last_id not in ids:
+            return None
+        return [e for e in list(self._replay)[ids.index(last_id) + 1:] if e.topic in topics]
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_event_broker() -> EventBroker:
+    global _broker
+    if _broker is None:
+        from backend.infrastructure.settings import settings
+
+        _broker = EventBroker(settings.events_queue_size, settings.events_replay_size)
+    return _broker
+
+
+def set_event_broker(broker: Optional[EventBroker]) -> None:
+    global _broker
+    _broker = broker
@@ -0,0 +1,131 @@
+# Sources for the live event broker.
+# - Domain events (a new disruption, a rejected conflicting assignment) are published locally
+#   at once and sent to the other workers with pg_notify inside the writing transaction, so
+#   they only go out if it commits. A rejected write has no transaction to ride on, so its
+#   event (conflict.rejected) goes out on a short autocommit connection to the primary.
+# - Table-change notifications (migration 0007) become "rosters.changed" deltas and trigger a
+#   debounced recompute of the dashboard metrics, published only when the numbers move.
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, List, Optional
+
+import psycopg
+
+from backend.infrastructure.api.responses import dumps
+from backend.infrastructure.events.broker import WORKER_ID, EventBroker, get_event_broker
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.settings import settings
+
+DOMAIN_CHANNEL = "domain_events"
+# NOTIFY payloads must stay under 8000 bytes; bigger events go out without their data
+MAX_NOTIFY_BYTES = 7900
+METRICS_TABLES = ("crew", "flights", "disruptions")
+
+_watcher: Optional["MetricsWatcher"] = None
+_task: Optional[asyncio.Task] = None
+
+
+async def notify_event(conn, topic: str, type: str, data: Any) -> None:
+    """Queue an event for the other workers; call inside the write's transaction, before commit."""
+    payload = dumps({"origin": WORKER_ID, "topic": topic, "type": type, "data": data}).decode()
+    if len(payload) > MAX_NOTIFY_BYTES:
+        payload = dumps({"origin": WORKER_ID, "topic": topic, "type": type, "data": None, "truncated": True}).decode()
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT pg_notify(%s, %s)", (DOMAIN_CHANNEL, payload))
+
+
+async def broadcast_event(topic: str, type: str, data: Any) -> None:
+    """Publish an event here and send it to the other workers, outside any write transaction."""
+    from backend.infrastructure.database.core import DSN
+
+    get_event_broker().publish(topic, type, data)
+    try:
+        async with await psycopg.AsyncConnection.connect(DSN, autocommit=True) as conn:
+            await notify_event(conn, topic, type, data)
+    except psycopg.Error as exc:
+        logger.warning(f"Could not send {type} to the other workers: {exc}")
+
+
+def on_domain_notification(payload: str, broker: Optional[EventBroker] = None) -> None:
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning(f"Ignoring malformed domain event: {payload[:200]!r}")
+        return
+    if message.get("origin") == WORKER_ID:
+        return  # already published locally when the write committed
+    try:
+        (broker or get_event_broker()).publish(message["topic"], message["type"], message.get("data"))
+    except (KeyError, ValueError) as exc:
+        logger.warning(f"Ignoring domain event: {exc}")
+
+
+def on_table_change(table: str, version: int) -> None:
+    if table == "rosters":
+        get_event_broker().publish("rosters", "rosters.changed", {"version": version})
+    if table in METRICS_TABLES and _watcher is not None:
+        _watcher.mark_dirty()
+
+
+class MetricsWatcher:
+    def __init__(self, broker: EventBroker, compute: Callable[[], Awaitable[List[dict]]], debounce_s: float = 2.0):
+        self.broker = broker
+        self.compute = compute
+        self.debounce_s = debounce_s
+        self.last: Optional[List[dict]] = None
+        self._dirty = asyncio.Event()
+
+    def mark_dirty(self) -> None:
+        self._dirty.set()
+
+    async def refresh(self) -> bool:
+        # Nobody listening: skip the queries; new subscribers fetch the current numbers over REST
+        if not self.broker.subscriber_count("metrics"):
+            return False
+        metrics = await self.compute()
+        if metrics == self.last:
+            return False
+        self.last = metrics
+        self.broker.publish("metrics", "metrics.updated", metrics)
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await self._dirty.wait()
+            # Coalesce a burst of writes (a bulk roster import) into one recompute
+            await asyncio.sleep(self.debounce_s)
+            self._dirty.clear()
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning(f"Live metrics refresh failed: {exc}")
+
+
+async def _compute_metrics() -> List[dict]:
+    from backend.infrastructure.api.routes.analytics import dashboard_metrics
+    from backend.infrastructure.database.replicas import get_replica_router
+
+    conn, _, _ = await get_replica_router().connect_read()
+    try:
+        return await dashboard_metrics(conn)
+    finally:
+        await conn.close()
+
+
+def start_event_feeds() -> None:
+    global _watcher, _task
+    if _task is not None:
+        return
+    _watcher = MetricsWatcher(get_event_broker(), _compute_metrics, settings.events_metrics_debounce_s)
+    _task = asyncio.get_running_loop().create_task(_watcher.run())
+
+
+async def stop_event_feeds() -> None:
+    global _watcher, _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _watcher, _task = None, None
@@ -1,8 +1,17 @@
 import logging
 import time
 import uuid
+from contextvars import ContextVar
+from typing import Optional
 from fastapi import Request
 
+from backend.infrastructure.metrics.registry import (
+    http_request_duration,
+    http_requests_in_flight,
+    http_requests_total,
+    http_response_size,
+)
+
 logger = logging.getLogger("backend")
 logger.setLevel(logging.INFO)
 
@@ -11,13 +20,35 @@ formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+# Correlation id of the request being served; lets lower layers (e.g. DB timing) tag their logs
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def _route_template(request: Request) -> str:
+    # Label by the matched route template (/api/crew/{crew_id}), never the raw path,
+    # so metric cardinality stays bounded
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
 async def log_requests(request: Request, call_next):
     correlation_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-    start = time.time()
+    request_id_token = request_id_var.set(correlation_id)
+    method = request.method
+    start = time.perf_counter()
+    http_requests_in_flight.inc(method)
     logger.info(f"Request: {request.method} {request.url}", extra={"correlation_id": correlation_id})
     try:
         response = await call_next(request)
-        duration_ms = int((time.time() - start) * 1000)
+        elapsed = time.perf_counter() - start
+        duration_ms = int(elapsed * 1000)
+        route = _route_template(request)
+        status = str(response.status_code)
+        http_request_duration.observe(elapsed, method, route, status)
+        http_requests_total.inc(method, route, status)
+        content_length = response.headers.get("content-length")
+        if content_length is not None:
+            http_response_size.observe(int(content_length), method, route)
         response.headers["X-Request-ID"] = correlation_id
         logger.info(
             f"Response {response.status_code} {request.method} {request.url.path} in {duration_ms}ms",
@@ -25,9 +56,16 @@ async def log_requests(request: Request, call_next):
         )
         return response
     except Exception as exc:
-        duration_ms = int((time.time() - start) * 1000)
+        elapsed = time.perf_counter() - start
+        duration_ms = int(elapsed * 1000)
+        route = _route_template(request)
+        http_request_duration.observe(elapsed, method, route, "500")
+        http_requests_total.inc(method, route, "500")
         logger.exception(
             f"Unhandled error {request.method} {request.url.path} in {duration_ms}ms",
             extra={"correlation_id": correlation_id, "duration_ms": duration_ms},
         )
         raise
+    finally:
+        http_requests_in_flight.dec(method)
+        request_id_var.reset(request_id_token)
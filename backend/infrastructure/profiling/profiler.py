@@ -0,0 +1,251 @@
+# Opt-in profiling: per-request (header/query flag, privileged) and a low-frequency
+# continuous sampler. Stacks are written in collapsed "a;b;c N" form, which
+# flamegraph.pl, speedscope and inferno read directly.
+import cProfile
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from backend.infrastructure.logging.logging_middleware import logger
+from backend.infrastructure.settings import settings
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(_BACKEND_ROOT)
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+def _stack(frame, max_depth: int = 128) -> Tuple[str, ...]:
+    labels: List[str] = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.record(_stack(frame))
+
+    def record(self, stack: Tuple[str, ...]) -> None:
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.stacks)
+
+    def decay(self) -> None:
+        with self._lock:
+            for key in list(self.stacks):
+                self.stacks[key] //= 2
+                if self.stacks[key] == 0:
+                    del self.stacks[key]
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.snapshot().most_common()) + "\n"
+
+
+def hot_functions(stacks: Counter, limit: int = 20, prefix: str = "backend/") -> List[Dict[str, object]]:
+    # Inclusive sample counts for our own code; self counts where the frame was on top
+    inclusive: Counter = Counter()
+    own: Counter = Counter()
+    total = sum(stacks.values()) or 1
+    for stack, count in stacks.items():
+        seen = set()
+        for label in stack:
+            if label.startswith(prefix) and label not in seen:
+                inclusive[label] += count
+                seen.add(label)
+        if stack and stack[-1].startswith(prefix):
+            own[stack[-1]] += count
+    return [
+        {
+            "function": label,
+            "samples": count,
+            "inclusive_pct": round(100.0 * count / total, 2),
+            "self_pct": round(100.0 * own[label] / total, 2),
+        }
+        for label, count in inclusive.most_common(limit)
+    ]
+
+
+class RateLimiter:
+    def __init__(self, per_minute: int):
+        self.capacity = max(1, per_minute)
+        self.tokens = float(self.capacity)
+        self.refill_per_s = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_s)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ContinuousProfiler:
+    """Always-on sampler at a few Hz, decayed periodically so it tracks current load."""
+
+    def __init__(self, hz: float, decay_every_s: float = 600.0):
+        # Cap the rate: this runs in production next to real traffic
+        self.interval_s = 1.0 / min(max(hz, 0.1), 20.0)
+        self.decay_every_s = decay_every_s
+        self._sampler: Optional[StackSampler] = None
+        self._last_decay = time.monotonic()
+
+    def start(self, thread_id: int) -> None:
+        self._sampler = StackSampler(thread_id, self.interval_s).start()
+
+    def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None
+
+    def hot(self, limit: int = 20) -> Dict[str, object]:
+        if self._sampler is None:
+            return {"running": False, "samples": 0, "functions": []}
+        if time.monotonic() - self._last_decay > self.decay_every_s:
+            self._sampler.decay()
+            self._last_decay = time.monotonic()
+        stacks = self._sampler.snapshot()
+        return {
+            "running": True,
+            "interval_ms": round(self.interval_s * 1000, 1),
+            "samples": sum(stacks.values()),
+            "functions": hot_functions(stacks, limit),
+        }
+
+
+_rate_limiter: Optional[RateLimiter] = None
+# cProfile hooks the interpreter's one profile function, so one profile at a time per process
+_cprofile_lock = threading.Lock()
+continuous_profiler: Optional[ContinuousProfiler] = None
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.profiling_token)
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    return profiling_enabled() and token is not None and hmac.compare_digest(token, settings.profiling_token)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    for ext in (".collapsed", ".prof"):
+        path = os.path.join(settings.profile_dir, profile_id + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _requested_mode(request: Request) -> Optional[str]:
+    mode = request.headers.get("X-Profile") or request.query_params.get("__profile")
+    if mode is None:
+        return None
+    return "cprofile" if mode.lower() == "cprofile" else "sample"
+
+
+async def profile_requests(request: Request, call_next):
+    mode = _requested_mode(request)
+    if mode is None or not is_authorized(request.headers.get("X-Profile-Token")):
+        return await call_next(request)
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(settings.profiles_per_minute)
+    if not _rate_limiter.allow():
+        logger.warning("Profile request dropped: rate limit reached")
+        return await call_next(request)
+    if mode == "cprofile" and not _cprofile_lock.acquire(blocking=False):
+        logger.warning("Profile request dropped: another cProfile run is active")
+        return await call_next(request)
+
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    profile_id = uuid.uuid4().hex
+    # Note: both modes see everything the event loop thread runs meanwhile, including
+    # concurrent requests; profile on a quiet worker for a clean picture.
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            response = await call_next(request)
+        finally:
+            profiler.disable()
+            _cprofile_lock.release()
+        path = os.path.join(settings.profile_dir, profile_id + ".prof")
+        profiler.dump_stats(path)
+    else:
+        sampler = StackSampler(threading.get_ident(), settings.profile_sample_interval_ms / 1000.0).start()
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+        path = os.path.join(settings.profile_dir, profile_id + ".collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(sampler.collapsed())
+    logger.info(f"Stored {mode} profile {path} for {request.method} {request.url.path}")
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+def start_continuous_profiler() -> None:
+    global continuous_profiler
+    if settings.continuous_profiling_hz <= 0 or continuous_profiler is not None:
+        return
+    continuous_profiler = ContinuousProfiler(settings.continuous_profiling_hz)
+    # Called from the event loop thread, which is the one worth sampling
+    continuous_profiler.start(threading.get_ident())
+
+
+def stop_continuous_profiler() -> None:
+    global continuous_profiler
+    if continuous_profiler is not None:
+        continuous_profiler.stop()
+        continuous_profiler = None
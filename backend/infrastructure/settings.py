@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -15,6 +15,82 @@ class Settings(BaseSettings):
     perplexity_api_key: Optional[str] = Field(default=None, env="PERPLEXITY_API_KEY")
     sentence_transformer_model: str = Field(default="all-MiniLM-L6-v2")
 
+    # AI provider resilience (per provider: circuit breaker + AIMD concurrency)
+    ai_request_timeout_s: float = 20.0
+    ai_connect_timeout_s: float = 5.0
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_reset_s: float = 30.0
+    ai_initial_concurrency: int = 8
+    ai_max_concurrency: int = 64
+    ai_max_queue_wait_s: float = 2.0
+
+    # Database statement timing: log statements slower than this, optionally with a sampled EXPLAIN
+    # (EXPLAIN ANALYZE for statements of traced(read_only=True) calls, which it runs again)
+    db_slow_query_ms: float = 200.0
+    db_explain_sample_rate: float = 0.0
+
+    # Read replicas: comma-separated libpq DSNs for streaming replicas of the primary (POSTGRES_*).
+    # GET traffic goes to the least-loaded replica within replica_max_lag_s, else the primary.
+    postgres_replica_dsns: str = ""
+    replica_max_lag_s: float = 5.0
+    replica_lag_check_interval_s: float = 2.0
+
+    # Responses at least this large are gzip/brotli compressed when the client accepts it
+    compression_min_bytes: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
+    # Response cache for reference-data GETs, invalidated by table-change NOTIFYs (0 entries disables).
+    # With CACHE_REDIS_URL set (needs the redis package) workers also share entries.
+    response_cache_entries: int = 2048
+    cache_redis_url: Optional[str] = None
+    cache_shared_ttl_s: float = 3600.0
+
+    # Live events (SSE /api/events/stream, WebSocket /api/events/ws): per-subscriber queue bound,
+    # events kept for Last-Event-ID replay, idle keep-alive interval, metrics recompute debounce
+    events_queue_size: int = 256
+    events_replay_size: int = 1000
+    events_heartbeat_s: float = 15.0
+    events_metrics_debounce_s: float = 2.0
+
+    # Disruption impact propagation (/api/disruptions/{id}/impact): how far ahead of the disrupted
+    # flights and how many links deep a delay is followed
+    impact_horizon_hours: float = 24.0
+    impact_max_depth: int = 6
+
+    # Recovery re-rostering (/api/recovery/reassign): candidates kept per open position, request size cap
+    recovery_max_candidates: int = 40
+    recovery_max_positions: int = 1000
+
+    # In-memory crew availability index (/api/availability/crew): days ahead it covers; queries
+    # outside that window, or while the change listener is down, go to the database
+    availability_horizon_days: float = 14.0
+
+    # What-if scenarios (/api/scenarios/evaluate): days ahead the shared snapshot covers, how old it may
+    # get before a reload (table changes reload it sooner), scenarios per request
+    scenario_horizon_days: float = 7.0
+    scenario_snapshot_max_age_s: float = 900.0
+    scenario_max_per_request: int = 50
+
+    # Fatigue scoring (crew fatigue_score/predicted_availability, flight crew_utilization_score): crew whose
+    # rosters changed are rescored every interval, up to a batch per round; everyone is rescored once a day
+    # after the nightly hour (UTC). 0 interval disables both.
+    fatigue_incremental_interval_s: float = 60.0
+    fatigue_incremental_batch: int = 500
+    fatigue_nightly_hour_utc: int = 21
+
+    # rosters/audit_log are partitioned by month; keep this many future months created (0 interval disables)
+    partition_months_ahead: int = 3
+    partition_maintenance_interval_s: float = 6 * 3600
+
+    # Profiling (disabled unless a token is set): per-request via X-Profile + X-Profile-Token,
+    # continuous low-frequency sampling when continuous_profiling_hz > 0
+    profiling_token: Optional[str] = None
+    profile_dir: str = "./data/profiles"
+    profile_sample_interval_ms: float = 2.0
+    profiles_per_minute: int = 6
+    continuous_profiling_hz: float = 0.0
+
     # RAG parameters
     chunk_tokens: int = 700
     chunk_overlap: int = 80
@@ -27,6 +103,9 @@ class Settings(BaseSettings):
     groq_api_key: str = Field(..., env="GROQ_API_KEY")
     cursor_api_key: str = Field(..., env="CURSOR_API_KEY")
 
+    @property
+    def replica_dsns(self) -> List[str]:
+        return [dsn.strip() for dsn in self.postgres_replica_dsns.split(",") if dsn.strip()]
 
     class Config:
         extra = "ignore"
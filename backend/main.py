@@ -1,15 +1,67 @@
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+from backend.domain.exceptions import RosterOverlapError
 from backend.infrastructure.logging.logging_middleware import log_requests
 from backend.infrastructure.api.routes import api_router
+from backend.infrastructure.api.compression import CompressionMiddleware
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.infrastructure.metrics.registry import registry
+from backend.infrastructure.settings import settings
+from backend.infrastructure.cache.invalidation import start_change_listener, stop_change_listener
+from backend.infrastructure.cache.response_cache import NotModified, cache_responses, not_modified_response
+from backend.infrastructure.events.feeds import (
+    DOMAIN_CHANNEL,
+    broadcast_event,
+    on_domain_notification,
+    on_table_change,
+    start_event_feeds,
+    stop_event_feeds,
+)
+from backend.infrastructure.database.availability import ROSTER_ROWS_CHANNEL, get_availability_manager
+from backend.infrastructure.database.fatigue import start_fatigue_jobs, stop_fatigue_jobs
+from backend.infrastructure.database.partitions import start_partition_maintenance, stop_partition_maintenance
+from backend.infrastructure.database.scenarios import get_snapshot_cache
+from backend.infrastructure.profiling.profiler import (
+    profile_requests,
+    start_continuous_profiler,
+    stop_continuous_profiler,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_continuous_profiler()
+    start_partition_maintenance()
+    start_fatigue_jobs()
+    start_event_feeds()
+    availability = get_availability_manager()
+    start_change_listener(
+        on_table_change=[on_table_change, availability.on_table_change, get_snapshot_cache().on_table_change],
+        channels={DOMAIN_CHANNEL: on_domain_notification, ROSTER_ROWS_CHANNEL: availability.on_roster_rows},
+        on_state=[availability.set_live],
+    )
+    yield
+    await stop_change_listener()
+    await stop_event_feeds()
+    await stop_fatigue_jobs()
+    await stop_partition_maintenance()
+    stop_continuous_profiler()
 
-app = FastAPI(title="Crew Rostering Backend", version="0.1.0")
+app = FastAPI(
+    title="Crew Rostering Backend",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+app.middleware("http")(cache_responses)
+app.middleware("http")(profile_requests)
 app.middleware("http")(log_requests)
 
 # Allow CORS for local frontend dev
@@ -25,9 +77,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_bytes,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
+
+@app.exception_handler(RosterOverlapError)
+async def roster_overlap_handler(request: Request, exc: RosterOverlapError):
+    await broadcast_event("conflicts", "conflict.rejected", {
+        "crew_id": exc.crew_id, "duty_start": exc.duty_start, "duty_end": exc.duty_end, "detail": str(exc),
+    })
+    return JSONResponse(status_code=409, content={"detail": str(exc), "crew_id": exc.crew_id})
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return not_modified_response(exc.etag)
+
 @app.get("/health", tags=["Health"])
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    # Prometheus text exposition format; async so rendering never races the event loop
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Import and include API routers
 app.include_router(api_router)
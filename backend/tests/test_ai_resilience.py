@@ -0,0 +1,70 @@
+
+import sys
+import os
+import pytest
+import httpx
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.infrastructure.ai.resilience import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    ProviderGuard,
+    ProviderUnavailableError,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("soon") is None
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    clock.now = 10.0
+    assert breaker.allow_request()      # single half-open probe
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_aimd_halves_on_overload_and_grows_on_success():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1)
+    assert await limiter.acquire()
+    await limiter.release(overloaded=True)
+    assert limiter.limit == 4
+    for _ in range(8):
+        assert await limiter.acquire()
+        await limiter.release()
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_guard_honours_429_retry_after_and_fails_fast():
+    clock = FakeClock()
+    guard = ProviderGuard("groq", breaker=CircuitBreaker(clock=clock))
+    request = httpx.Request("POST", "https://example.test")
+    with pytest.raises(ProviderUnavailableError):
+        async with guard.slot():
+            guard.check_response(httpx.Response(429, headers={"Retry-After": "12"}, request=request))
+    assert guard.snapshot()["state"] == CircuitBreaker.OPEN
+    with pytest.raises(ProviderUnavailableError) as exc:
+        async with guard.slot():
+            pass
+    assert exc.value.retry_after == 12.0
+    assert guard.counters["rate_limited"] == 1
+    assert guard.counters["rejected_open"] == 1
@@ -0,0 +1,22 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.benchmarks.api_benchmark import compare, run_benchmark
+
+
+@pytest.mark.asyncio
+async def test_benchmark_smoke():
+    report = await run_benchmark(requests=10, concurrency=2, crew=30, flights=60,
+                                 only=["crew", "crew_by_id", "flights", "chat"])
+    assert set(report["results"]) == {"crew", "crew_by_id", "flights", "chat"}
+    for result in report["results"].values():
+        assert result["errors"] == 0
+        assert result["requests"] == 10
+        assert result["p50_ms"] <= result["p99_ms"]
+
+
+def test_compare_flags_regressions():
+    base = {"results": {"crew": {"p50_ms": 10, "p95_ms": 20, "p99_ms": 30, "throughput_rps": 100}}}
+    current = {"results": {"crew": {"p50_ms": 10, "p95_ms": 30, "p99_ms": 31, "throughput_rps": 95}}}
+    assert compare(current, base, 0.2) == ["crew.p95_ms: 20 -> 30"]
@@ -0,0 +1,180 @@
+import sys
+import os
+import json
+import random
+import pytest
+from contextlib import asynccontextmanager
+from dataclasses import fields
+from datetime import datetime, timedelta
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import FakeConnection, FakeDataset, install_fake_database
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.roster import Roster
+from backend.domain.services.availability_index import AvailabilityIndex
+from backend.infrastructure.database.availability import (
+    AvailabilityIndexManager,
+    available_crew_sql,
+    set_availability_manager,
+)
+
+T0 = datetime(2025, 3, 1)
+
+
+def crew(id, rank="CAPTAIN", base="DEL", **extra):
+    values = {f.name: None for f in fields(Crew)}
+    values.update(id=id, employee_id=f"EMP{id}", first_name=f"F{id}", last_name=f"L{id}", rank=rank,
+                  base_airport=base, status="available", duty_start_time=T0, duty_end_time=T0 + timedelta(days=30))
+    values.update(extra)
+    return Crew(**values)
+
+
+def duty(id, crew_id, start_h, end_h, status="confirmed"):
+    return Roster(id=id, crew_id=crew_id, flight_id=id, status=status,
+                  duty_start=T0 + timedelta(hours=start_h), duty_end=T0 + timedelta(hours=end_h))
+
+
+def primary(conn, on_connect=None):
+    @asynccontextmanager
+    async def connect():
+        if on_connect:
+            on_connect()
+        yield conn
+    return connect
+
+
+def brute_force(crews, rosters, start, end, rank=None, base=None):
+    busy = {r.crew_id for r in rosters
+            if r.status != "cancelled" and r.duty_start < end and r.duty_end > start}
+    return sorted(
+        c.id for c in crews
+        if c.id not in busy and c.status == "available" and c.duty_start_time <= start and c.duty_end_time >= end
+        and (rank is None or c.rank == rank) and (base is None or c.base_airport == base)
+    )
+
+
+def test_index_matches_brute_force_on_random_windows():
+    rng = random.Random(4)
+    crews = [crew(i, rng.choice(["CAPTAIN", "FIRST_OFFICER"]), rng.choice(["DEL", "BOM"]),
+                  status="available" if i % 7 else "off_duty") for i in range(1, 60)]
+    rosters = []
+    for i in range(1, 400):
+        start = rng.uniform(0, 300)
+        rosters.append(duty(i, rng.randrange(1, 60), start, start + rng.uniform(1, 16),
+                            "cancelled" if i % 11 == 0 else "confirmed"))
+    index = AvailabilityIndex(crews, rosters)
+    for _ in range(300):
+        start = T0 + timedelta(hours=rng.uniform(0, 300))
+        end = start + timedelta(hours=rng.uniform(0.5, 12))
+        rank, base = rng.choice([None, "CAPTAIN"]), rng.choice([None, "BOM"])
+        assert index.available(start, end, rank, base) == brute_force(crews, rosters, start, end, rank, base)
+
+
+def test_single_crew_check_and_incremental_updates():
+    index = AvailabilityIndex([crew(1), crew(2)], [duty(10, 1, 10, 18)])
+    at = lambda h: T0 + timedelta(hours=h)
+    assert not index.is_free(1, at(17), at(20))
+    assert index.is_free(1, at(18), at(20)) and index.is_free(1, at(2), at(10))
+    assert index.available(at(12), at(13)) == [2]
+
+    index.upsert_roster(duty(10, 1, 30, 38))  # moved
+    assert index.available(at(12), at(13)) == [1, 2]
+    index.upsert_roster(duty(11, 2, 12, 20, status="cancelled"))
+    assert index.duty_count == 1 and index.is_free(2, at(12), at(13))
+
+    # A rank change refiles the crew member with their duties
+    index.upsert_crew(crew(1, rank="FIRST_OFFICER"))
+    assert index.available(at(31), at(32), rank="CAPTAIN") == [2]
+    assert index.available(at(31), at(32), rank="FIRST_OFFICER") == []
+    assert index.available(at(40), at(41), rank="FIRST_OFFICER") == [1]
+
+    index.remove_roster(10)
+    assert index.available(at(31), at(32)) == [1, 2]
+    index.remove_crew(2)
+    assert index.available(at(31), at(32)) == [1] and len(index) == 1
+
+
+def test_manager_applies_row_notifications_and_flags_resyncs():
+    manager = AvailabilityIndexManager()
+    manager.index = AvailabilityIndex([crew(1)], [duty(10, 1, 10, 18)])
+    row = {"id": 10, "crew_id": 1, "flight_id": 10, "status": "confirmed",
+           "duty_start": (T0 + timedelta(hours=40)).isoformat(), "duty_end": (T0 + timedelta(hours=48)).isoformat()}
+    manager.on_roster_rows(json.dumps({"op": "UPDATE", "rows": [row]}))
+    assert manager.index.is_free(1, T0 + timedelta(hours=12), T0 + timedelta(hours=13))
+    manager.on_roster_rows(json.dumps({"op": "DELETE", "rows": [{"id": 10}]}))
+    assert manager.index.duty_count == 0
+
+    manager._stale = ""
+    manager.on_roster_rows("not json")
+    assert not manager._stale
+    manager.on_roster_rows(json.dumps({"resync": True}))
+    assert manager._stale == "resync"
+
+
+@pytest.mark.asyncio
+async def test_index_agrees_with_sql_path_on_fake_data():
+    dataset = FakeDataset(crew=120, flights=600)
+    conn = FakeConnection(dataset)
+    manager = AvailabilityIndexManager(timedelta(days=14), clock=lambda: datetime(2025, 1, 3), connect=primary(conn))
+    manager.set_live(True)
+    index = await manager.get()
+    assert index is not None and manager.covers(datetime(2025, 1, 5), datetime(2025, 1, 6))
+    for hour in range(0, 24 * 10, 7):
+        start = datetime(2025, 1, 2, 6) + timedelta(hours=hour)
+        end = start + timedelta(hours=5)
+        expected = [c.id for c in await available_crew_sql(conn, start, end, "CAPTAIN")]
+        assert index.available(start, end, "CAPTAIN") == expected
+
+
+@pytest.mark.asyncio
+async def test_manager_replays_rows_notified_during_a_load():
+    conn = FakeConnection(FakeDataset(crew=20, flights=50))
+    row = {"id": 9001, "crew_id": 3, "flight_id": 1, "status": "confirmed",
+           "duty_start": "2025-01-04T08:00:00", "duty_end": "2025-01-04T14:00:00"}
+    manager = AvailabilityIndexManager(timedelta(days=14), clock=lambda: datetime(2025, 1, 3))
+    manager.connect = primary(conn, lambda: manager.on_roster_rows(json.dumps({"op": "INSERT", "rows": [row]})))
+    manager.set_live(True)
+    index = await manager.get()
+    assert not index.is_free(3, datetime(2025, 1, 4, 9), datetime(2025, 1, 4, 10))
+    assert manager._pending is None and not manager._stale
+
+
+@pytest.mark.asyncio
+async def test_manager_drops_deleted_crew_on_refresh():
+    dataset = FakeDataset(crew=20, flights=50)
+    manager = AvailabilityIndexManager(timedelta(days=14), clock=lambda: datetime(2025, 1, 3),
+                                       connect=primary(FakeConnection(dataset)))
+    manager.set_live(True)
+    assert (await manager.get()).get_crew(4) is not None
+    crew_table = dataset.tables["crew"]
+    crew_table.rows = [r for r in crew_table.rows if r[crew_table.index_of("id")] != 4]
+    manager.on_table_change("crew", dataset.bump_version("crew"))
+    index = await manager.get()
+    assert index.get_crew(4) is None and len(index) == 19
+
+
+@pytest.mark.asyncio
+async def test_availability_endpoint_uses_index_when_live():
+    dataset = install_fake_database(app, FakeDataset(crew=90, flights=400))
+    manager = AvailabilityIndexManager(timedelta(days=14), clock=lambda: datetime(2025, 1, 3),
+                                       connect=primary(FakeConnection(dataset)))
+    set_availability_manager(manager)
+    params = {"start": "2025-01-05T10:00:00", "end": "2025-01-05T16:00:00", "rank": "FIRST_OFFICER"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            from_db = await ac.get("/api/availability/crew", params=params)
+            manager.set_live(True)
+            from_index = await ac.get("/api/availability/crew", params=params)
+            outside = await ac.get("/api/availability/crew", params={**params, "start": "2025-03-01T10:00:00",
+                                                                     "end": "2025-03-01T12:00:00"})
+            bad = await ac.get("/api/availability/crew", params={**params, "end": params["start"]})
+        assert from_db.headers["x-availability-source"] == "database"
+        assert from_index.headers["x-availability-source"] == "index"
+        assert from_index.json() == from_db.json() and from_db.json()
+        assert all(c["rank"] == "FIRST_OFFICER" for c in from_index.json())
+        assert outside.headers["x-availability-source"] == "database"
+        assert bad.status_code == 422
+    finally:
+        set_availability_manager(None)
+        app.dependency_overrides.clear()
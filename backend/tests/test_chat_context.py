@@ -0,0 +1,62 @@
+
+import sys
+import os
+import pytest
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.infrastructure.ai.context_manager import ConversationContextManager, SUMMARY_PREFIX
+from backend.infrastructure.ai.provider_router import Provider, ProviderRouter, set_provider_router
+
+
+def make_history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i}: " + "crew roster detail " * 20})
+        history.append({"role": "assistant", "content": f"Answer {i}: " + "duty time limit " * 20})
+    return history
+
+
+@pytest.mark.asyncio
+async def test_short_history_is_forwarded_untouched_and_not_mutated():
+    manager = ConversationContextManager(default_budget=4000)
+    history = make_history(1)
+    result = await manager.build(history, "next?")
+    assert len(history) == 2
+    assert result.messages[:-1] == history
+    assert result.tokens_saved == 0
+
+
+@pytest.mark.asyncio
+async def test_long_history_is_trimmed_to_budget_with_cached_summary():
+    manager = ConversationContextManager(default_budget=600)
+    history = make_history(20)
+    result = await manager.build(history, "next?", conversation_id="c1")
+    assert result.tokens_after <= 600
+    assert result.tokens_saved > 0
+    assert result.messages[0]["content"].startswith(SUMMARY_PREFIX)
+    assert result.messages[-1] == {"role": "user", "content": "next?"}
+    assert not result.summary_cached
+
+    again = await manager.build(history, "next?", conversation_id="c1")
+    assert again.summary_cached
+    assert again.messages == result.messages
+
+
+@pytest.mark.asyncio
+async def test_auto_provider_gets_its_models_budget():
+    async def echo(messages, model):
+        return str(len(messages))
+
+    # Over the 4000-token default, within gpt-4o-mini's budget
+    history = make_history(40)
+    assert (await ConversationContextManager().build(history, "next?")).tokens_saved > 0
+    assert (await ConversationContextManager().build(history, "next?", model="gpt-4o-mini")).tokens_saved == 0
+    set_provider_router(ProviderRouter([Provider("openai", echo, "gpt-4o-mini")]))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.post("/api/chat/", json={"message": "next?", "history": history, "provider": "auto"})
+        assert response.status_code == 200
+        assert response.json()["tokens_saved"] == 0 and response.json()["response"] == str(len(history) + 1)
+    finally:
+        set_provider_router(None)
@@ -0,0 +1,103 @@
+
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.infrastructure.database.instrumentation import InstrumentedConnection, traced
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.description = [("id",)]
+        self.executed = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    async def fetchall(self):
+        return self.rows
+
+    async def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursors = []
+        self.rows = rows
+
+    def cursor(self):
+        cur = FakeCursor(self.rows)
+        self.cursors.append(cur)
+        return cur
+
+
+class RecordingConnection(InstrumentedConnection):
+    def __init__(self, conn, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.finished = []
+
+    async def finish_statement(self, stats, explain_ok=True):
+        self.finished.append(stats)
+        await super().finish_statement(stats, explain_ok)
+
+
+class Repo:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @traced(read_only=True)
+    async def list_ids(self):
+        async with self.conn.cursor() as cur:
+            await cur.execute("SELECT id FROM crew WHERE id > %s", (0,))
+            rows = await cur.fetchall()
+            return [r[0] for r in rows]
+
+
+@pytest.mark.asyncio
+async def test_statements_are_tagged_and_timed_per_phase():
+    conn = RecordingConnection(FakeConnection([(1,), (2,), (3,)]), slow_query_ms=10_000, explain_sample_rate=0)
+    assert await Repo(conn).list_ids() == [1, 2, 3]
+    [stats] = conn.finished
+    assert stats.tag == "Repo.list_ids"
+    assert stats.rows == 3
+    assert stats.execute_s >= 0 and stats.fetch_s >= 0 and stats.map_s >= 0
+
+
+@pytest.mark.asyncio
+async def test_slow_select_gets_sampled_explain():
+    fake = FakeConnection([("Seq Scan on crew",)])
+    conn = RecordingConnection(fake, slow_query_ms=0, explain_sample_rate=1.0)
+    await Repo(conn).list_ids()
+    assert fake.cursors[-1].executed[0][0].startswith("EXPLAIN (ANALYZE, BUFFERS) SELECT id FROM crew")
+
+
+@pytest.mark.asyncio
+async def test_statements_outside_the_allow_list_are_only_planned():
+    fake = FakeConnection([("Result",)])
+    conn = RecordingConnection(fake, slow_query_ms=0, explain_sample_rate=1.0)
+
+    @traced()
+    async def notify():
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT pg_notify(%s, %s)", ("events", "{}"))
+
+    await notify()
+    # ANALYZE would send the notification a second time
+    assert [c.executed[0][0] for c in fake.cursors] == ["SELECT pg_notify(%s, %s)", "EXPLAIN SELECT pg_notify(%s, %s)"]
+
+
+@pytest.mark.asyncio
+async def test_wrapped_cursor_iterates_rows():
+    conn = RecordingConnection(FakeConnection([(1,), (2,)]), slow_query_ms=10_000, explain_sample_rate=0)
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id FROM crew")
+        assert [row async for row in cur] == [(1,), (2,)]
+    assert conn.finished[0].rows == 2
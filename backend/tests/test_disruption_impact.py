@@ -0,0 +1,79 @@
+import sys
+import os
+import pytest
+from dataclasses import fields
+from datetime import datetime, timedelta
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import install_fake_database
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.domain.services.impact_service import ImpactGraph
+
+T0 = datetime(2025, 3, 1, 6, 0)
+
+
+def flight(id, dep_min, block_min=90, tail="VT-AAA"):
+    values = {f.name: None for f in fields(Flight)}
+    values.update(id=id, flight_number=f"6E{id}", departure_airport="DEL", arrival_airport="BOM",
+                  scheduled_departure=T0 + timedelta(minutes=dep_min),
+                  scheduled_arrival=T0 + timedelta(minutes=dep_min + block_min),
+                  aircraft_type="A320", aircraft_registration=tail, status="scheduled")
+    return Flight(**values)
+
+
+def duty(id, crew_id, f):
+    return Roster(id=id, crew_id=crew_id, flight_id=f.id, duty_start=f.scheduled_departure - timedelta(hours=1),
+                  duty_end=f.scheduled_arrival + timedelta(minutes=30))
+
+
+def build():
+    a = flight(1, 0)                        # lands 07:30
+    b = flight(2, 135)                      # same tail, 45 min on the ground: 15 min of slack
+    c = flight(3, 840, tail="VT-BBB")       # crew 7's next duty after a rest of 11 h: 60 min of slack
+    d = flight(4, 960, tail="VT-BBB")       # same tail as c, tight turn, but past a 15 h horizon from a
+    e = flight(5, 600)                      # same tail as b, hours later: absorbs everything
+    rosters = [duty(10, 7, a), duty(11, 8, b), duty(12, 7, c), duty(13, 9, d)]
+    return ImpactGraph([a, b, c, d, e], rosters)
+
+
+def test_delay_spreads_along_rotations_and_crew_duties_until_absorbed():
+    graph = build()
+    result = graph.propagate([1], 120, horizon=timedelta(hours=15))
+    assert result.delays == {1: 120.0, 2: 105.0, 3: 60.0}
+    assert result.via == {2: (1, "rotation"), 3: (1, "rest")}
+    assert result.crew_ids == {7, 8} and result.roster_ids == {10, 11, 12}
+
+    affected = graph.apply(result)
+    assert [(f.id, f.disruption_impact) for f in affected] == [(1, 120.0), (2, 105.0), (3, 60.0)]
+
+    # Without the horizon the tight turn carries the delay on to flight 4
+    assert graph.propagate([1], 120).delays[4] == 60.0
+
+
+def test_depth_bound_stops_the_search_and_says_so():
+    result = build().propagate([1], 120, max_depth=0)
+    assert result.delays == {1: 120.0} and result.truncated
+    assert build().propagate([99], 120).delays == {}
+
+
+@pytest.mark.asyncio
+async def test_impact_endpoint_reports_affected_flights_crew_and_rosters():
+    install_fake_database(app)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/api/disruptions/1/impact", params={"delay_minutes": 300})
+            missing = await ac.get("/api/disruptions/999/impact")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["seedFlights"] == ["6E1001"]
+    first, *downstream = body["flights"]
+    assert (first["flightNumber"], first["disruptionImpact"], first["depth"]) == ("6E1001", 300.0, 0)
+    assert downstream and all(0 < f["disruptionImpact"] < 300 for f in downstream)
+    assert all(f["via"]["link"] in ("rotation", "connection", "rest") for f in downstream)
+    assert body["affectedCrew"] and len(body["affectedRosters"]) == 3 * len(body["flights"])
+    assert missing.status_code == 404
@@ -0,0 +1,127 @@
+import sys
+import os
+import pytest
+import psycopg
+from dataclasses import fields
+from datetime import date, datetime, timedelta, timezone
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.benchmarks.fakes import FakeConnection, FakeDataset
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.domain.services.duty_hours import MONTHLY_DUTY_LIMIT_H, DutyHoursLedger, MonthHours, month_of
+from backend.domain.services.recovery_service import OpenPosition, RecoveryService
+from backend.infrastructure.database import duty_hours
+from backend.infrastructure.database.roster_repository import RosterRepository
+from scripts import schema_migrations
+
+MARCH = date(2025, 3, 1)
+
+needs_database = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_DSN"),
+    reason="set TEST_DATABASE_DSN to a scratch database; the test migrates it and reverts everything",
+)
+
+
+def test_ledger_lookups_and_tentative_bookings():
+    ledger = DutyHoursLedger([(1, MARCH, 180.0, 90.0, 20)])
+    assert ledger.duty_hours(1, MARCH) == 180 and ledger.duty_hours(2, MARCH) == 0
+    assert ledger.remaining_duty(1, MARCH) == MONTHLY_DUTY_LIMIT_H - 180
+    assert ledger.fits(1, datetime(2025, 3, 31, 22), 10) and not ledger.fits(1, datetime(2025, 3, 31, 22), 10, 11)
+    # The next month starts from zero
+    assert ledger.fits(1, datetime(2025, 4, 1), 12, 12)
+
+    ledger.add(1, datetime(2025, 3, 20), 8, 6)
+    ledger.add(2, datetime(2025, 4, 2), 5)
+    assert ledger.get(1, MARCH) == MonthHours(188, 96, 21)
+    assert ledger.get(2, month_of(datetime(2025, 4, 30))) == MonthHours(5, 0, 1)
+    assert not ledger.fits(1, datetime(2025, 3, 25), 3)
+
+
+def test_compare_treats_missing_rows_as_zero_and_ignores_float_noise():
+    stored = {(1, MARCH): MonthHours(10.0 + 1e-9, 5.0, 2), (2, MARCH): MonthHours(0.0, 0.0, 0), (3, MARCH): MonthHours(4, 2, 1)}
+    actual = {(1, MARCH): MonthHours(10.0, 5.0, 2), (3, MARCH): MonthHours(6, 2, 1), (4, MARCH): MonthHours(1, 1, 1)}
+    drift = duty_hours.compare_month_hours(stored, actual)
+    assert [(d.crew_id, d.stored.duty_hours, d.actual.duty_hours) for d in drift] == [(3, 4, 6), (4, 0, 1)]
+
+
+def test_checker_sums_like_the_migration_triggers():
+    assert duty_hours.DUTY_HOURS_SQL == schema_migrations.ROSTER_DUTY_HOURS_SQL
+    assert duty_hours.FLIGHT_HOURS_SQL == schema_migrations.ROSTER_FLIGHT_HOURS_SQL
+    assert duty_hours.CREW_MONTH_TOTALS_REFRESH == schema_migrations.CREW_MONTH_TOTALS_REFRESH
+    migration = next(m for m in schema_migrations.MIGRATIONS if m.name == "crew_month_hours")
+    created = " ".join(migration.up)
+    for event in ("INSERT", "UPDATE", "DELETE", "TRUNCATE"):
+        assert f"AFTER {event} ON rosters" in created
+
+
+def _crew(id, **extra):
+    values = {f.name: None for f in fields(Crew)}
+    values.update(id=id, employee_id=f"EMP{id}", first_name="F", last_name="L", rank="CAPTAIN",
+                  base_airport="DEL", status="available", qualifications=["A320"])
+    values.update(extra)
+    return Crew(**values)
+
+
+def test_recovery_checks_the_positions_month_in_the_ledger():
+    values = {f.name: None for f in fields(Flight)}
+    values.update(id=1, flight_number="6E1", departure_airport="DEL", arrival_airport="BOM",
+                  scheduled_departure=datetime(2025, 4, 1, 8), scheduled_arrival=datetime(2025, 4, 1, 12),
+                  aircraft_type="A320", status="scheduled")
+    position = OpenPosition(Flight(**values), "captain")
+    # Crew 1 is full for March (their current-month total) but has room in April
+    crew = [_crew(1, total_duty_hours_month=189.0), _crew(2)]
+    ledger = DutyHoursLedger([(2, date(2025, 4, 1), 186.0, 80.0, 20)])
+
+    without = RecoveryService().recover([position], crew)
+    assert [a.crew.id for a in without.solutions[0].assignments] == [2]
+    with_ledger = RecoveryService().recover([position], crew, ledger=ledger)
+    assert [a.crew.id for a in with_ledger.solutions[0].assignments] == [1]
+
+
+@pytest.mark.asyncio
+async def test_repository_reads_the_month_summary():
+    dataset = FakeDataset(crew=30, flights=200)
+    ledger = await RosterRepository(FakeConnection(dataset)).get_month_hours([1, 2, 3], [date(2025, 1, 1)])
+    rosters = dataset.tables["rosters"]
+    crew_id, start, end = rosters.index_of("crew_id"), rosters.index_of("duty_start"), rosters.index_of("duty_end")
+    expected = sum((r[end] - r[start]) / timedelta(hours=1) for r in rosters.rows if r[crew_id] == 2)
+    assert ledger.duty_hours(2, date(2025, 1, 1)) == pytest.approx(expected)
+    assert ledger.get(2, date(2025, 1, 1)).duties == sum(r[crew_id] == 2 for r in rosters.rows)
+
+
+@pytest.mark.asyncio
+@needs_database
+async def test_only_current_month_roster_writes_touch_crew():
+    dsn = os.environ["TEST_DATABASE_DSN"]
+    runner = schema_migrations.MigrationRunner(dsn)
+    runner.upgrade()
+    try:
+        conn = await psycopg.AsyncConnection.connect(dsn, autocommit=True)
+        try:
+            now = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+            this_month = now.date().replace(day=1)
+            await conn.execute("SELECT ensure_monthly_partitions('rosters', '2025-01-01', %s)",
+                               (this_month + timedelta(days=62),))
+            await conn.execute("INSERT INTO crew (id, employee_id) VALUES (7, 'EMP7')")
+
+            async def crew_version():
+                row = await (await conn.execute("SELECT version FROM table_versions WHERE table_name = 'crew'")).fetchone()
+                return row[0]
+
+            repo = RosterRepository(conn)
+            version = await crew_version()
+            await repo.save(Roster(id=1, crew_id=7, flight_id=None, duty_start=datetime(2025, 1, 5, 6),
+                                   duty_end=datetime(2025, 1, 5, 14)))
+            await conn.execute("DELETE FROM rosters WHERE id = 1")
+            assert await crew_version() == version
+
+            await repo.save(Roster(id=2, crew_id=7, flight_id=None, duty_start=now.replace(day=1, hour=6),
+                                   duty_end=now.replace(day=1, hour=11)))
+            assert await crew_version() == version + 1
+            totals = await (await conn.execute("SELECT total_duty_hours_month FROM crew WHERE id = 7")).fetchone()
+            assert totals == (5.0,)
+        finally:
+            await conn.close()
+    finally:
+        runner.downgrade(0)
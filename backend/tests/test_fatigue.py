@@ -0,0 +1,104 @@
+import sys
+import os
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.benchmarks.fakes import FakeConnection, FakeDataset
+from backend.domain.services.fatigue_service import DutyHistory, compute_fatigue
+from backend.infrastructure.database.fatigue import last_nightly_slot, load_duty_history, rescore_crew
+
+AS_OF = datetime(2025, 3, 10, 12, 0)
+
+
+def hours(h):
+    return AS_OF + timedelta(hours=h)
+
+
+def scores_for(rows, crew_ids=None, **kwargs):
+    return compute_fatigue(DutyHistory.from_rows(rows, AS_OF, crew_ids), **kwargs)
+
+
+def test_history_is_sorted_filtered_and_open_duties_get_an_assumed_end():
+    rows = [(2, 20, hours(-5), None), (1, 11, hours(-3), hours(1)), (1, 10, hours(-30), hours(-20)), (9, 90, hours(-2), hours(0))]
+    history = DutyHistory.from_rows(rows, AS_OF, crew_ids=[1, 2, 3])
+    assert history.crew_ids.tolist() == [1, 2, 3]
+    assert history.flight_ids.tolist() == [10, 11, 20]
+    assert history.start.tolist() == [-30, -3, -5] and history.end.tolist() == [-20, 1, 9]
+
+
+def test_each_component_raises_fatigue():
+    rested = scores_for([(1, 1, hours(-80), hours(-72))], crew_ids=[1, 2])
+    assert rested.fatigue[1] == 0 and rested.predicted_availability[1] == 1
+    assert 0 < rested.fatigue[0] < 0.2
+
+    # Same duty hours, but only four hours' rest between the duties
+    spread = scores_for([(1, 1, hours(-60), hours(-50)), (1, 2, hours(-20), hours(-10))])
+    short_rest = scores_for([(1, 1, hours(-24), hours(-14)), (1, 2, hours(-10), hours(0))])
+    assert short_rest.fatigue[0] > spread.fatigue[0]
+
+    # 03:30-09:30 UTC is a day duty at UTC+5:30 and overnight at UTC-5:30
+    day = scores_for([(1, 1, hours(-8.5), hours(-2.5))])
+    night = scores_for([(1, 1, hours(-8.5), hours(-2.5))], utc_offset_h=-5.5)
+    assert night.fatigue[0] > day.fatigue[0]
+
+    # Ten-hour duties every day for a week and every other day before that reach the recovery cut-off
+    week = scores_for([(1, i, hours(-24 * i - 10), hours(-24 * i)) for i in range(1, 8)]
+                      + [(1, 100 + i, hours(-24 * i - 10), hours(-24 * i)) for i in range(8, 28, 2)])
+    assert week.utilization[0] == pytest.approx(170 / 190)
+    assert week.fatigue[0] >= 0.8 > spread.fatigue[0]
+
+
+def test_predicted_availability_and_flight_utilization():
+    scores = scores_for([
+        (1, 1, hours(-40), hours(-30)),
+        (1, 5, hours(10), hours(40)),
+        (2, 5, hours(10), hours(40)),
+        (2, 6, hours(-100), hours(-95)),
+    ])
+    assert scores.predicted_availability[0] == pytest.approx((1 - 30 / 60) * (1 - scores.fatigue[0]))
+    assert scores.flight_ids.tolist() == [5]
+    assert scores.flight_utilization[0] == pytest.approx((10 + 5) / 190 / 2)
+
+
+def test_last_nightly_slot():
+    assert last_nightly_slot(datetime(2025, 3, 10, 22, 5), 21) == datetime(2025, 3, 10, 21)
+    assert last_nightly_slot(datetime(2025, 3, 10, 20, 59), 21) == datetime(2025, 3, 9, 21)
+
+
+@pytest.mark.asyncio
+async def test_rescore_writes_scores_and_widens_incremental_runs_to_co_crew():
+    dataset = FakeDataset(crew=60, flights=400)
+    conn = FakeConnection(dataset)
+    as_of = datetime(2025, 1, 8)
+    crew, flights = dataset.tables["crew"], dataset.tables["flights"]
+
+    history = await load_duty_history(conn, as_of)
+    rosters = dataset.tables["rosters"]
+    expected = DutyHistory.from_rows(
+        [(r[rosters.index_of("crew_id")], r[rosters.index_of("flight_id")],
+          r[rosters.index_of("duty_start")], r[rosters.index_of("duty_end")]) for r in rosters.rows],
+        as_of,
+    )
+    keep = (expected.start >= -29 * 24) & (expected.start < 7 * 24)
+    assert np.allclose(np.sort(history.start), np.sort(expected.start[keep]))
+
+    scores = await rescore_crew(conn, as_of, [7])
+    assert 7 in scores.crew_ids and len(scores.crew_ids) > 1
+    fatigue = {r[0]: r[crew.index_of("fatigue_score")] for r in crew.rows}
+    assert fatigue[7] is not None and 0 < fatigue[7] < 1
+    assert sum(v is not None for v in fatigue.values()) == len(scores.crew_ids)
+
+    full = await rescore_crew(conn, as_of)
+    assert full.crew_ids.tolist() == sorted(r[0] for r in crew.rows)
+    util = {r[0]: r[flights.index_of("crew_utilization_score")] for r in flights.rows}
+    assert all(util[f] is not None for f in full.flight_ids.tolist())
+    # Incremental and full runs agree on the crew both scored
+    index = {c: i for i, c in enumerate(full.crew_ids.tolist())}
+    for i, c in enumerate(scores.crew_ids.tolist()):
+        assert scores.fatigue[i] == pytest.approx(full.fatigue[index[c]])
+
+    # Nothing changed, so a rerun writes nothing
+    version = dict(dataset.tables["table_versions"].rows)["crew"]
+    await rescore_crew(conn, as_of)
+    assert dict(dataset.tables["table_versions"].rows)["crew"] == version
@@ -0,0 +1,145 @@
+import sys
+import os
+import asyncio
+import json
+import pytest
+import psycopg
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import install_fake_database
+from backend.infrastructure.api.controllers.events_controller import stream_events
+from backend.infrastructure.events.broker import WORKER_ID, EventBroker, set_event_broker
+from backend.infrastructure.database import core
+from backend.infrastructure.events.feeds import DOMAIN_CHANNEL, MetricsWatcher, broadcast_event, on_domain_notification
+
+needs_database = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_DSN"),
+    reason="set TEST_DATABASE_DSN to a scratch database",
+)
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_shed_to_a_resync_without_blocking_others():
+    broker = EventBroker(queue_size=3)
+    slow = broker.subscribe(["disruptions"])
+    fast = broker.subscribe(["disruptions", "metrics"])
+    other = broker.subscribe(["metrics"])
+    for i in range(3):
+        broker.publish("disruptions", "disruption.created", {"id": i})
+        assert (await fast.get()).data == {"id": i}
+    broker.publish("disruptions", "disruption.created", {"id": 3})
+
+    assert slow.queue.qsize() == 1 and slow.dropped == 4
+    assert (await slow.get()).type == "stream.resync"
+    assert (await fast.get()).data == {"id": 3}
+    assert other.queue.empty()
+
+    slow.close()
+    assert broker.subscriber_count("disruptions") == 1
+
+
+def test_replay_after_last_event_id():
+    broker = EventBroker(replay_size=3)
+    events = [broker.publish("rosters", "rosters.changed", {"version": v}) for v in range(5)]
+    assert [e.data["version"] for e in broker.replay_since(events[2].id, {"rosters"})] == [3, 4]
+    assert broker.replay_since(events[0].id, {"rosters"}) is None
+
+
+def test_domain_notifications_from_other_workers_are_published():
+    broker = EventBroker()
+    sub = broker.subscribe(["disruptions"])
+    message = {"topic": "disruptions", "type": "disruption.created", "data": {"id": 9}}
+    on_domain_notification(json.dumps({**message, "origin": WORKER_ID}), broker)
+    assert sub.queue.empty()
+    on_domain_notification(json.dumps({**message, "origin": "another-worker"}), broker)
+    assert sub.queue.get_nowait().data == {"id": 9}
+    on_domain_notification("not json", broker)
+    on_domain_notification(json.dumps({**message, "topic": "unknown", "origin": "x"}), broker)
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_published_only_when_they_change_and_someone_listens():
+    broker = EventBroker()
+    values = iter([[{"title": "Disruptions", "value": "1"}]] * 2 + [[{"title": "Disruptions", "value": "2"}]])
+
+    async def compute():
+        return next(values)
+
+    watcher = MetricsWatcher(broker, compute, debounce_s=0)
+    assert not await watcher.refresh()
+    sub = broker.subscribe(["metrics"])
+    assert await watcher.refresh()
+    assert not await watcher.refresh()
+    assert await watcher.refresh()
+    assert [sub.queue.get_nowait().data[0]["value"] for _ in range(2)] == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_created_disruption_reaches_sse_and_websocket_subscribers():
+    broker = EventBroker()
+    set_event_broker(broker)
+    install_fake_database(app)
+    try:
+        response = await stream_events(topics="disruptions", last_event_id=None)
+        stream = response.body_iterator
+        assert await stream.__anext__() == b"retry: 3000\n\n"
+
+        # WebSocket driven directly over ASGI so it shares this event loop with the POST
+        inbox: asyncio.Queue = asyncio.Queue()
+        sent = []
+        await inbox.put({"type": "websocket.connect"})
+        scope = {"type": "websocket", "path": "/api/events/ws", "query_string": b"topics=disruptions",
+                 "headers": [], "scheme": "ws", "server": ("test", 80), "client": ("test", 1), "root_path": ""}
+
+        async def send(message):
+            sent.append(message)
+
+        ws = asyncio.create_task(app(scope, inbox.get, send))
+        while broker.subscriber_count("disruptions") < 2:
+            await asyncio.sleep(0)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            created = await ac.post("/api/disruptions/", json={
+                "type": "foreseen", "severity": "medium", "title": "ATC slot restrictions",
+                "description": "Flow control at BOM.", "affectedFlights": ["6E1002"],
+            })
+        assert created.status_code == 201
+
+        frame = (await asyncio.wait_for(stream.__anext__(), 1)).decode()
+        assert "event: disruption.created" in frame
+        assert json.loads(frame.split("data: ", 1)[1])["data"]["title"] == "ATC slot restrictions"
+
+        while not any(m["type"] == "websocket.send" for m in sent):
+            await asyncio.sleep(0)
+        message = json.loads(next(m["text"] for m in sent if m["type"] == "websocket.send"))
+        assert message["type"] == "disruption.created" and message["data"]["id"] == created.json()["id"]
+
+        await inbox.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(ws, 1)
+        await stream.aclose()
+        assert broker.subscriber_count() == 0
+    finally:
+        set_event_broker(None)
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+@needs_database
+async def test_rejected_conflicts_reach_the_other_workers(monkeypatch):
+    dsn = os.environ["TEST_DATABASE_DSN"]
+    monkeypatch.setattr(core, "DSN", dsn)
+    broker = EventBroker()
+    set_event_broker(broker)
+    sub = broker.subscribe(["conflicts"])
+    try:
+        async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as listener:
+            await listener.execute(f"LISTEN {DOMAIN_CHANNEL}")
+            await broadcast_event("conflicts", "conflict.rejected", {"crew_id": 7})
+            notification = await asyncio.wait_for(anext(listener.notifies()), 5)
+        message = json.loads(notification.payload)
+        assert (message["origin"], message["type"], message["data"]) == (WORKER_ID, "conflict.rejected", {"crew_id": 7})
+        # Published here at once; on_domain_notification skips our own NOTIFY
+        assert sub.queue.get_nowait().data == {"crew_id": 7}
+    finally:
+        set_event_broker(None)
@@ -0,0 +1,94 @@
+import sys
+import os
+import asyncio
+import pytest
+from datetime import datetime
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import FakeConnection, FakeDataset, install_fake_database
+from backend.infrastructure.api.controllers.flight_controller import _with_crew
+from backend.infrastructure.database.loaders import DataLoader, Loaders
+
+
+@pytest.mark.asyncio
+async def test_loads_in_one_tick_share_a_batch_and_are_memoized():
+    calls = []
+
+    async def batch(keys):
+        calls.append(list(keys))
+        return {k: k * 10 for k in keys if k != 4}
+
+    loader = DataLoader("test", batch)
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(4)) == [10, 20, 10, None]
+    assert await loader.load_many([2, 3]) == [20, 30]
+    assert calls == [[1, 2, 4], [3]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_can_be_retried():
+    attempts = []
+
+    async def batch(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise RuntimeError("connection lost")
+        return {k: str(k) for k in keys}
+
+    loader = DataLoader("test", batch)
+    with pytest.raises(RuntimeError):
+        await loader.load(7)
+    assert await loader.load(7) == "7"
+
+
+@pytest.mark.asyncio
+async def test_fake_cursor_fetches_continue_where_the_last_stopped():
+    conn = FakeConnection(FakeDataset(crew=5, flights=5))
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT * FROM crew")
+        first, second = await cur.fetchone(), await cur.fetchone()
+        assert (first[0], second[0]) == (1, 2)
+        assert [r[0] for r in await cur.fetchmany(2)] == [3, 4]
+        assert [r[0] for r in await cur.fetchall()] == [5]
+        assert await cur.fetchone() is None and await cur.fetchall() == []
+        await cur.execute("SELECT * FROM crew WHERE id = %s", (3,))
+        assert (await cur.fetchone())[0] == 3
+
+
+@pytest.mark.asyncio
+async def test_flight_crew_lists_cost_two_queries():
+    conn = FakeConnection(FakeDataset(crew=40, flights=30))
+    loaders = Loaders(conn)
+    flights = await loaders.flights.load_many(list(range(1, 21)))
+    queries_before = len(conn.queries)
+    results = await asyncio.gather(*(_with_crew(f, loaders) for f in flights))
+    assert len(conn.queries) - queries_before == 2
+    assert all(len(r.crew) == 3 and r.crew[0].first_name for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoints():
+    install_fake_database(app)
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            crew = await ac.get("/api/crew/batch", params={"ids": "3,1,99999,3"})
+            assert crew.status_code == 200
+            assert [c["id"] for c in crew.json()] == [3, 1]
+            assert (await ac.get("/api/crew/batch", params={"ids": "1,x"})).status_code == 400
+
+            flights = await ac.get("/api/flights/batch", params={"ids": "2,1", "include_crew": "true"})
+            assert [f["id"] for f in flights.json()] == [2, 1]
+            assert {c["crew_position"] for c in flights.json()[0]["crew"]} == {"captain", "first_officer", "flight_attendant"}
+            plain = await ac.get("/api/flights/batch", params={"ids": "1"})
+            assert plain.json()[0]["flight_number"] and plain.json()[0]["crew"] is None
+
+            rosters = await ac.get("/api/rosters/batch", params={
+                "crew_ids": "4,5", "start": "2024-12-01T00:00:00", "end": datetime(2026, 1, 1).isoformat(),
+            })
+            assert rosters.status_code == 200
+            body = rosters.json()
+            assert set(body) == {"4", "5"}
+            assert all(r["crew_id"] == 4 for r in body["4"])
+    finally:
+        app.dependency_overrides.clear()
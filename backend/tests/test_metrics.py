@@ -0,0 +1,32 @@
+
+import sys
+import os
+import pytest
+from httpx import AsyncClient
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from httpx import ASGITransport
+from backend.infrastructure.metrics.registry import Histogram, http_requests_total
+
+
+def test_histogram_quantile_and_exposition():
+    hist = Histogram("demo_seconds", "demo", ("route",), buckets=(0.1, 0.5, 1.0))
+    for value in (0.05, 0.2, 0.3, 0.7):
+        hist.observe(value, "/x")
+    assert hist.count("/x") == 4
+    assert hist.quantile(0.5, "/x") == 0.5
+    lines = list(hist.samples())
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_records_templated_routes():
+    before = http_requests_total.get("GET", "/health", "200")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        await ac.get("/health")
+        response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert http_requests_total.get("GET", "/health", "200") == before + 1
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
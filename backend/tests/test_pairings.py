@@ -0,0 +1,137 @@
+import sys
+import os
+import numpy as np
+from dataclasses import fields
+from datetime import date, datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.services.duty_hours import DutyHoursLedger
+from backend.domain.services.pairing_service import PairingGenerator
+from backend.domain.services.rostering_service import MAX_DUTY_PERIOD_H, POSITIONS, RosteringProblem, RosteringService
+
+T0 = datetime(2025, 3, 10, 6, 0)
+
+
+def crew(id, rank, base="DEL"):
+    values = {f.name: None for f in fields(Crew)}
+    values.update(id=id, employee_id=f"EMP{id}", first_name=f"F{id}", last_name=f"L{id}", rank=rank,
+                  base_airport=base, current_location=base, status="available", qualifications=["A320"])
+    return Crew(**values)
+
+
+def flight(id, hour, origin, dest, hours=2.0, tail="VT-A", aircraft_type="A320"):
+    values = {f.name: None for f in fields(Flight)}
+    values.update(id=id, flight_number=f"6E{id}", departure_airport=origin, arrival_airport=dest,
+                  scheduled_departure=T0 + timedelta(hours=hour), scheduled_arrival=T0 + timedelta(hours=hour + hours),
+                  aircraft_type=aircraft_type, aircraft_registration=tail, status="scheduled")
+    return Flight(**values)
+
+
+def trips(pairings, problem):
+    return sorted(tuple(problem.flight_ids[pairings.flights_of(i)].tolist()) for i in range(len(pairings)))
+
+
+def test_connections_respect_minimum_times():
+    flights = [
+        flight(1, 0, "DEL", "GOI"),
+        flight(2, 2.5, "GOI", "DEL"),  # same aircraft after 30 minutes
+        flight(3, 2.6, "GOI", "DEL", tail="VT-B"),  # another aircraft after 36 minutes: too tight
+        flight(4, 3.0, "GOI", "DEL", tail="VT-B"),  # another aircraft after an hour
+        flight(5, 2.5, "GOI", "DEL", aircraft_type="ATR72", tail="VT-C"),  # another fleet
+        flight(6, 14.0, "GOI", "DEL", tail="VT-B"),  # 10.5h from release to report: too short a rest
+        flight(7, 14.5, "GOI", "DEL", tail="VT-B"),  # a full rest: the next morning's duty
+    ]
+    problem = RosteringProblem.from_entities(flights, [crew(1, "CAPTAIN")])
+    graph = PairingGenerator(max_sit_arcs=5, max_rest_arcs=5).graph(problem)
+    ids = problem.flight_ids
+    assert ids[graph.sit_to[graph.sit_ptr[0]:graph.sit_ptr[1]]].tolist() == [2, 4]
+    assert ids[graph.rest_to[graph.rest_ptr[0]:graph.rest_ptr[1]]].tolist() == [6, 7]
+
+    # Arc caps keep the earliest successors
+    graph = PairingGenerator(max_sit_arcs=1, max_rest_arcs=1).graph(problem)
+    assert ids[graph.sit_to[graph.sit_ptr[0]:graph.sit_ptr[1]]].tolist() == [2]
+
+
+def test_pairings_return_to_base_within_limits():
+    flights = [
+        flight(1, 0, "DEL", "GOI"), flight(2, 2.5, "GOI", "DEL"),  # a day trip
+        # Too tight a connection from the day trip (another aircraft); out, then on to a layover
+        flight(3, 5, "DEL", "BOM", tail="VT-B"), flight(4, 9, "BOM", "PNQ", tail="VT-B"),
+        flight(5, 26, "PNQ", "DEL", hours=2.5, tail="VT-B"),  # home the next day
+        flight(6, 9, "DEL", "GOI", hours=2.5),  # only a home base crew can start here, none can end
+    ]
+    problem = RosteringProblem.from_entities(flights, [crew(1, "CAPTAIN")])
+    pairings = PairingGenerator().generate(problem)
+    assert trips(pairings, problem) == [(1, 2), (3, 4, 5)]
+
+    two_day = next(i for i in range(len(pairings)) if pairings.duties[i] == 2)
+    assert pairings.duty_h[two_day] == (9 + 2 + 0.5 - 4) + (26 + 2.5 + 0.5 - 25)
+    assert pairings.block_h[two_day] == 6.5
+    flights_of, period, start, end = pairings.duty_spans(problem, np.array([two_day]))
+    assert period.tolist() == [4, 4, 25] and start.tolist() == [4, 7.5, 25] and end.tolist() == [7.5, 11.5, 29]
+    assert (end - start).sum() == pairings.duty_h[two_day]
+    assert (end - period <= MAX_DUTY_PERIOD_H).all()
+
+    # One duty only: the layover trip is no longer legal
+    assert trips(PairingGenerator(max_duties=1).generate(problem), problem) == [(1, 2)]
+
+
+def test_duty_period_limit_prunes_long_days():
+    # Three DEL-GOI rotations in one day: all six legs would be a 17.5h duty
+    flights = [flight(2 * k + 1, 5.5 * k, "DEL", "GOI") for k in range(3)]
+    flights += [flight(2 * k + 2, 5.5 * k + 2.5, "GOI", "DEL") for k in range(3)]
+    problem = RosteringProblem.from_entities(flights, [crew(1, "CAPTAIN")])
+    pairings = PairingGenerator(max_duties=1, max_legs_per_duty=6).generate(problem)
+    assert trips(pairings, problem) == [(1, 2), (1, 2, 3, 4), (3, 4), (3, 4, 5, 6), (5, 6)]
+    assert (pairings.end_h - pairings.start_h <= MAX_DUTY_PERIOD_H).all()
+
+    chosen = pairings.select(len(flights))
+    covered = np.sort(pairings.legs[pairings.legs_of(chosen)])
+    assert covered.tolist() == list(range(len(flights)))
+
+
+def test_pairings_are_assigned_to_one_crew_member_each():
+    flights = [flight(1, 0, "DEL", "GOI"), flight(2, 2.5, "GOI", "DEL"),
+               flight(3, 24, "DEL", "GOI"), flight(4, 26.5, "GOI", "DEL"),
+               flight(5, 30, "BOM", "PNQ")]  # no base at either end: no pairing covers it
+    people = [crew(1, "CAPTAIN"), crew(2, "FIRST_OFFICER"), crew(3, "FLIGHT_ATTENDANT"), crew(4, "CAPTAIN", "BOM")]
+    problem = RosteringProblem.from_entities(flights, people)
+    pairings = PairingGenerator().generate(problem)
+    result = RosteringService(wave_hours=24.0).assign_pairings(problem, pairings)
+
+    assert len(result.flight) == 4 * len(POSITIONS)
+    by_flight = {}
+    for f, p, c in zip(result.flight, result.position, result.crew):
+        by_flight.setdefault(int(problem.flight_ids[f]), {})[POSITIONS[p]] = int(problem.crew_ids[c])
+    # A rest between the two days lets the same crew fly both trips
+    assert by_flight[1] == by_flight[2] == by_flight[3] == by_flight[4] == {
+        "captain": 1, "first_officer": 2, "flight_attendant": 3,
+    }
+    assert sorted(map(tuple, result.unfilled.tolist())) == [(4, 0), (4, 1), (4, 2)]
+    assert result.month_hours[0, 0] == 2 * (2.5 + 2 + 0.5 + 1)
+
+    rosters = [r for r in result.rosters(problem) if r.crew_id == 1]
+    assert [(r.flight_id, r.duty_start, r.duty_end) for r in rosters] == [
+        (1, T0 - timedelta(hours=1), T0 + timedelta(hours=2.5)),
+        (2, T0 + timedelta(hours=2.5), T0 + timedelta(hours=5)),
+        (3, T0 + timedelta(hours=23), T0 + timedelta(hours=26.5)),
+        (4, T0 + timedelta(hours=26.5), T0 + timedelta(hours=29)),
+    ]
+
+
+def test_pairing_across_a_month_end_must_fit_both_months():
+    # Out on March 31st, back on April 1st after a layover: 3.5 duty hours in each month
+    flights = [flight(1, 21 * 24 + 8, "DEL", "GOI"), flight(2, 22 * 24 + 2, "GOI", "DEL")]
+    people = [crew(1, "CAPTAIN"), crew(2, "CAPTAIN")]
+    # Captain 1 has more room in March than captain 2, but only 1.5h left in April
+    ledger = DutyHoursLedger([(1, date(2025, 3, 1), 100.0, 50.0, 10), (1, date(2025, 4, 1), 188.5, 90.0, 20),
+                              (2, date(2025, 3, 1), 180.0, 90.0, 20)])
+    problem = RosteringProblem.from_entities(flights, people, ledger=ledger)
+    pairings = PairingGenerator().generate(problem)
+    assert len(problem.months) == 2 and trips(pairings, problem) == [(1, 2)]
+    result = RosteringService(wave_hours=24.0).assign_pairings(problem, pairings)
+
+    captains = result.crew[result.position == 0]
+    assert problem.crew_ids[captains].tolist() == [2, 2]
+    assert result.month_hours[1].tolist() == [183.5, 3.5]
@@ -0,0 +1,52 @@
+
+import sys
+import os
+import pytest
+from collections import Counter
+from httpx import AsyncClient
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from httpx import ASGITransport
+from backend.infrastructure.settings import settings
+from backend.infrastructure.profiling import profiler
+from backend.infrastructure.profiling.profiler import hot_functions
+
+
+def test_hot_functions_counts_inclusive_and_self_samples():
+    stacks = Counter({
+        ("asyncio:run", "backend/infrastructure/api/controllers/flight_controller.py:get_flights",
+         "backend/infrastructure/database/repositories.py:get_all_flights"): 3,
+        ("asyncio:run", "backend/infrastructure/api/controllers/flight_controller.py:get_flights"): 1,
+    })
+    top = hot_functions(stacks, limit=5)
+    assert top[0]["function"].endswith("flight_controller.py:get_flights")
+    assert top[0]["inclusive_pct"] == 100.0
+    assert top[1]["self_pct"] == 75.0
+
+
+@pytest.mark.asyncio
+async def test_profile_header_requires_token_and_stores_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        anonymous = await ac.get("/health", headers={"X-Profile": "sample"})
+        assert "X-Profile-Id" not in anonymous.headers
+        profiled = await ac.get("/health", headers={"X-Profile": "cprofile", "X-Profile-Token": "s3cret"})
+        profile_id = profiled.headers["X-Profile-Id"]
+        assert (tmp_path / f"{profile_id}.prof").exists()
+        fetched = await ac.get(f"/api/profiling/profiles/{profile_id}", headers={"X-Profile-Token": "s3cret"})
+        assert fetched.status_code == 200
+        assert (await ac.get("/api/profiling/hot")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_cprofile_skips_requests_while_another_run_is_active(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    headers = {"X-Profile": "cprofile", "X-Profile-Token": "s3cret"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        with profiler._cprofile_lock:
+            busy = await ac.get("/health", headers=headers)
+        assert busy.status_code == 200 and "X-Profile-Id" not in busy.headers
+        assert "X-Profile-Id" in (await ac.get("/health", headers=headers)).headers
@@ -0,0 +1,76 @@
+
+import sys
+import os
+import asyncio
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.infrastructure.ai.provider_router import Provider, ProviderRouter
+
+
+def fake_provider(name, delay=0.0, fail=False, calls=None):
+    async def call(messages, model):
+        if calls is not None:
+            calls.append(name)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if calls is not None:
+                calls.append(f"{name}:cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{name} down")
+        return f"{name}:{model}"
+    return Provider(name, call, f"{name}-model")
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_primary_fails():
+    router = ProviderRouter([fake_provider("groq", fail=True), fake_provider("openai")])
+    result = await router.complete([{"role": "user", "content": "hi"}])
+    assert result.provider == "openai"
+    assert router.stats("groq", "groq-model").error_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_named_provider_is_neither_hedged_nor_replaced():
+    calls = []
+    router = ProviderRouter([fake_provider("groq", delay=0.05, calls=calls), fake_provider("openai", calls=calls)],
+                            min_samples_for_hedge=3, min_hedge_delay_s=0.01)
+    for _ in range(3):
+        router.stats("groq", "groq-model").record(0.01, ok=True)
+    result = await router.complete([{"role": "user", "content": "hi"}], provider="groq")
+    assert (result.provider, result.hedged) == ("groq", False)
+
+    router.register(fake_provider("groq", fail=True, calls=calls))
+    with pytest.raises(RuntimeError, match="groq down"):
+        await router.complete([{"role": "user", "content": "hi"}], provider="groq")
+    assert "openai" not in calls
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_primary_and_cancels_loser():
+    calls = []
+    router = ProviderRouter(
+        [fake_provider("groq", delay=0.5, calls=calls), fake_provider("openai", delay=0.0, calls=calls)],
+        min_samples_for_hedge=3,
+        min_hedge_delay_s=0.01,
+    )
+    for _ in range(3):
+        router.stats("groq", "groq-model").record(0.02, ok=True)
+        router.stats("openai", "openai-model").record(0.04, ok=True)
+    result = await router.complete([{"role": "user", "content": "hi"}])
+    assert result.provider == "openai"
+    assert result.hedged
+    assert "groq:cancelled" in calls
+
+
+@pytest.mark.asyncio
+async def test_adaptive_choice_prefers_fast_healthy_provider():
+    router = ProviderRouter([fake_provider("groq"), fake_provider("openai")])
+    for _ in range(10):
+        router.stats("groq", "groq-model").record(0.5, ok=True)
+        router.stats("openai", "openai-model").record(0.2, ok=True)
+    assert router.choose().name == "openai"
+    for _ in range(10):
+        router.stats("openai", "openai-model").record(0.2, ok=False)
+    assert router.choose().name == "groq"
@@ -0,0 +1,143 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.infrastructure.database.replicas import ReplicaRouter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Cursor:
+    def __init__(self, lag):
+        self.lag = lag
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, query, params=None):
+        return self
+
+    async def fetchone(self):
+        return (self.lag,)
+
+
+class _Conn:
+    def __init__(self, dsn, lag):
+        self.dsn = dsn
+        self.lag = lag
+        self.closed = False
+
+    def cursor(self):
+        return _Cursor(self.lag)
+
+    async def close(self):
+        self.closed = True
+
+
+class _Servers:
+    """Fake connect(): per-DSN replay lag (None = primary), or an exception to raise."""
+
+    def __init__(self, **lags):
+        self.lags = lags
+        self.opened = []
+
+    async def connect(self, dsn):
+        lag = self.lags.get(dsn)
+        if isinstance(lag, Exception):
+            raise lag
+        conn = _Conn(dsn, lag)
+        self.opened.append(conn)
+        return conn
+
+
+def _router(servers, replicas, clock=None, **kwargs):
+    return ReplicaRouter("primary", replicas, connect=servers.connect, clock=clock or _Clock(), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_spread_across_healthy_replicas():
+    servers = _Servers(r1=0.0, r2=0.0)
+    router = _router(servers, ["r1", "r2"])
+    targets = [(await router.connect_read())[1] for _ in range(4)]
+    assert sorted(targets) == ["replica0", "replica0", "replica1", "replica1"]
+
+
+@pytest.mark.asyncio
+async def test_least_loaded_replica_wins():
+    servers = _Servers(r1=0.0, r2=0.0)
+    router = _router(servers, ["r1", "r2"])
+    router.replicas[0].in_flight = 3
+    for _ in range(3):
+        conn, target, _ = await router.connect_read()
+        assert target == "replica1" and conn.dsn == "r2"
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary_until_rechecked():
+    clock = _Clock()
+    servers = _Servers(r1=30.0)
+    router = _router(servers, ["r1"], clock=clock, max_lag_s=5.0, lag_check_interval_s=2.0)
+
+    conn, target, replica = await router.connect_read()
+    assert (target, replica, conn.dsn) == ("primary", None, "primary")
+    assert servers.opened[0].closed
+    assert router.replicas[0].lag_s == 30.0
+
+    # Within the check interval the lagging replica is not even tried
+    opened = len(servers.opened)
+    assert (await router.connect_read())[1] == "primary"
+    assert len(servers.opened) == opened + 1
+
+    servers.lags["r1"] = 0.5
+    clock.now += 2.0
+    assert (await router.connect_read())[1] == "replica0"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_is_skipped_until_retry():
+    clock = _Clock()
+    servers = _Servers(r1=ConnectionError("refused"), r2=0.0)
+    router = _router(servers, ["r1", "r2"], clock=clock, retry_after_s=10.0)
+    assert {(await router.connect_read())[1] for _ in range(3)} == {"replica1"}
+    assert not router.snapshot()[0]["available"]
+
+    servers.lags["r1"] = 0.0
+    clock.now += 10.0
+    router.replicas[1].in_flight = 1
+    assert (await router.connect_read())[1] == "replica0"
+
+
+@pytest.mark.asyncio
+async def test_promoted_replica_and_no_replicas_use_primary():
+    servers = _Servers(r1=None)
+    router = _router(servers, ["r1"])
+    assert (await router.connect_read())[1] == "primary"
+    assert router.replicas[0].lag_s == float("inf")
+    assert (await _router(servers, []).connect_read())[1] == "primary"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not (os.environ.get("TEST_PRIMARY_DSN") and os.environ.get("TEST_REPLICA_DSN")),
+    reason="set TEST_PRIMARY_DSN and TEST_REPLICA_DSN to a primary and its streaming replica",
+)
+async def test_routes_to_live_replica():
+    router = ReplicaRouter(os.environ["TEST_PRIMARY_DSN"], [os.environ["TEST_REPLICA_DSN"]], max_lag_s=60.0)
+    conn, target, _ = await router.connect_read()
+    try:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT pg_is_in_recovery()")
+            in_recovery = (await cur.fetchone())[0]
+    finally:
+        await conn.close()
+    assert target == "replica0" and in_recovery
+    assert router.replicas[0].lag_s is not None and router.replicas[0].lag_s <= 60.0
@@ -0,0 +1,107 @@
+import sys
+import os
+import itertools
+import numpy as np
+import pytest
+from dataclasses import fields
+from datetime import datetime, timedelta
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import install_fake_database
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.services.assignment import InfeasibleAssignment, _lsa_numpy, solve_assignment
+from backend.domain.services.recovery_service import OpenPosition, RecoveryService, pair_cost
+
+T0 = datetime(2025, 3, 1, 8, 0)
+
+
+def crew(id, rank="CAPTAIN", base="DEL", **extra):
+    values = {f.name: None for f in fields(Crew)}
+    values.update(id=id, employee_id=f"EMP{id}", first_name=f"F{id}", last_name=f"L{id}", rank=rank,
+                  base_airport=base, status="available", qualifications=["A320"])
+    values.update(extra)
+    return Crew(**values)
+
+
+def open_position(id, position="captain", origin="DEL"):
+    values = {f.name: None for f in fields(Flight)}
+    values.update(id=id, flight_number=f"6E{id}", departure_airport=origin, arrival_airport="BOM",
+                  scheduled_departure=T0 + timedelta(hours=id), scheduled_arrival=T0 + timedelta(hours=id + 2),
+                  aircraft_type="A320", status="scheduled")
+    return OpenPosition(Flight(**values), position)
+
+
+def test_numpy_solver_matches_brute_force_on_rectangular_problems():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n = int(rng.integers(1, 5))
+        m = int(rng.integers(n, 7))
+        cost = rng.integers(0, 30, (n, m)).astype(float)
+        rows, cols = _lsa_numpy(cost)
+        best = min(sum(cost[i, p[i]] for i in range(n)) for p in itertools.permutations(range(m), n))
+        assert cost[rows, cols].sum() == best and len(set(cols)) == n
+
+    with pytest.raises(InfeasibleAssignment):
+        solve_assignment(np.array([[1.0, np.inf], [2.0, np.inf]]))
+    with pytest.raises(ValueError):
+        solve_assignment(np.zeros((3, 2)))
+
+
+def test_numpy_solver_agrees_with_scipy():
+    scipy_optimize = pytest.importorskip("scipy.optimize")
+    cost = np.random.default_rng(5).random((60, 150))
+    r1, c1 = _lsa_numpy(cost)
+    r2, c2 = scipy_optimize.linear_sum_assignment(cost)
+    assert cost[r1, c1].sum() == pytest.approx(cost[r2, c2].sum())
+
+
+def test_pair_cost_applies_hard_limits_and_prefers_nearby_rested_crew():
+    p = open_position(1)
+    assert pair_cost(p, crew(1, rank="FIRST_OFFICER")) is None
+    assert pair_cost(p, crew(1, qualifications=["ATR72"])) is None
+    assert pair_cost(open_position(1, "flight_attendant"), crew(1, rank="FLIGHT_ATTENDANT", qualifications=["ATR72"]))
+    assert pair_cost(p, crew(1, fatigue_score=0.95)) is None
+    assert pair_cost(p, crew(1, total_duty_hours_month=188.0)) is None
+    assert pair_cost(p, crew(1), busy=[(p.duty_start + timedelta(hours=1), p.duty_end + timedelta(hours=3))]) is None
+    assert pair_cost(p, crew(1)) < pair_cost(p, crew(2, base="BOM")) < pair_cost(p, crew(3, base="CCU"))
+    assert pair_cost(p, crew(1)) < pair_cost(p, crew(2, fatigue_score=0.5))
+
+
+def test_recovery_assigns_optimally_and_ranks_alternatives():
+    positions = [open_position(1), open_position(2, origin="BOM"), open_position(3, "first_officer")]
+    pool = [crew(10, base="DEL"), crew(11, base="BOM"), crew(12, base="MAA"), crew(13, rank="FLIGHT_ATTENDANT")]
+    plan = RecoveryService().recover(positions, pool, alternatives=3)
+
+    best, *others = plan.solutions
+    assert {(a.position.flight.id, a.crew.id) for a in best.assignments} == {(1, 10), (2, 11)}
+    assert [p.flight.id for p in best.unfilled] == [3]  # no first officer available
+    assert others and all(best.total_cost <= s.total_cost for s in others)
+    assert [s.total_cost for s in others] == sorted(s.total_cost for s in others)
+    assert [c.id for c, _ in plan.fallbacks[0]] == [12] and plan.fallbacks[0][0][1] > 0
+    assert plan.candidate_pairs == 6
+
+
+@pytest.mark.asyncio
+async def test_reassign_endpoint_proposes_available_crew():
+    install_fake_database(app)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.post("/api/recovery/reassign", json={
+                "positions": [{"flightId": 5, "position": "captain"}, {"flightId": 5, "position": "flight_attendant"}],
+                "excludeCrew": [3, 6],
+                "alternatives": 2,
+            })
+            missing = await ac.post("/api/recovery/reassign", json={"positions": [{"flightId": 99999, "position": "captain"}]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    best = body["solutions"][0]
+    assert len(best["assignments"]) == 2 and not best["unfilled"]
+    assert {a["crewId"] for a in best["assignments"]}.isdisjoint({3, 6})
+    assert len({a["crewId"] for a in best["assignments"]}) == 2
+    assert len(body["fallbacks"]) == 2 and body["candidatePairs"] > 2
+    assert missing.status_code == 404
@@ -0,0 +1,127 @@
+import sys
+import os
+import pytest
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import install_fake_database
+from backend.infrastructure.cache.invalidation import parse_notification
+from backend.infrastructure.cache.response_cache import CachedResponse, ResponseCache, set_response_cache
+
+
+def _entry(body, **versions):
+    return CachedResponse(body, "application/json", versions)
+
+
+@pytest.mark.asyncio
+async def test_new_table_version_retires_entries():
+    cache = ResponseCache(max_entries=10)
+    cache.set_online({"crew": 3, "rosters": 7})
+    await cache.put("/api/crew/?", _entry(b"[1]", crew=3))
+    await cache.put("/api/rosters/?", _entry(b"[2]", rosters=7))
+    assert (await cache.get("/api/crew/?", ["crew"])).body == b"[1]"
+
+    cache.apply_version("crew", 4)
+    assert await cache.get("/api/crew/?", ["crew"]) is None
+    assert (await cache.get("/api/rosters/?", ["rosters"])).body == b"[2]"
+    assert len(cache) == 1
+
+    # A fill built from a snapshot older than the known version is not stored
+    await cache.put("/api/crew/?", _entry(b"[old]", crew=3))
+    assert await cache.get("/api/crew/?", ["crew"]) is None
+
+
+@pytest.mark.asyncio
+async def test_offline_cache_is_bypassed_and_lru_bounded():
+    cache = ResponseCache(max_entries=2)
+    await cache.put("/a?", _entry(b"a", crew=1))
+    assert await cache.get("/a?", ["crew"]) is None
+
+    cache.set_online({"crew": 1})
+    for name in ("a", "b", "c"):
+        await cache.put(f"/{name}?", _entry(name.encode(), crew=1))
+    assert await cache.get("/a?", ["crew"]) is None
+    assert len(cache) == 2
+
+    cache.set_offline()
+    assert len(cache) == 0 and await cache.get("/b?", ["crew"]) is None
+
+
+def test_parse_notification():
+    assert parse_notification("rosters:42") == ("rosters", 42)
+    with pytest.raises(ValueError):
+        parse_notification("rosters")
+
+
+@pytest.mark.asyncio
+async def test_disruptions_served_from_cache_until_written():
+    dataset = install_fake_database(app)
+    cache = ResponseCache(max_entries=16)
+    cache.set_online({name: version for name, version in dataset.tables["table_versions"].rows})
+    set_response_cache(cache)
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            first = await ac.get("/api/disruptions/")
+            second = await ac.get("/api/disruptions/")
+            assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+            assert first.content == second.content
+
+            created = await ac.post("/api/disruptions/", json={
+                "type": "unforeseen", "severity": "high", "title": "Fog at DEL",
+                "description": "Visibility below minima.", "affectedFlights": ["6E1001"],
+            })
+            assert created.status_code == 201 and created.json()["affectedFlights"] == ["6E1001"]
+
+            after = await ac.get("/api/disruptions/")
+            assert after.headers["X-Cache"] == "MISS"
+            assert [d["affectedFlights"] for d in after.json() if d["title"] == "Fog at DEL"] == [["6E1001"]]
+    finally:
+        set_response_cache(None)
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_is_answered_before_rows_are_read():
+    dataset = install_fake_database(app)
+    set_response_cache(ResponseCache(max_entries=0))
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            first = await ac.get("/api/crew/5")
+            etag = first.headers["ETag"]
+            assert first.status_code == 200 and etag.startswith('"')
+
+            # Reading crew rows now fails, so a 304 proves only table_versions was consulted
+            crew = dataset.tables.pop("crew")
+            again = await ac.get("/api/crew/5", headers={"If-None-Match": f'W/{etag}'})
+            assert again.status_code == 304 and again.headers["ETag"] == etag and again.content == b""
+            dataset.tables["crew"] = crew
+
+            other = await ac.get("/api/crew/6", headers={"If-None-Match": etag})
+            assert other.status_code == 200 and other.headers["ETag"] != etag
+
+            dataset.bump_version("crew")
+            changed = await ac.get("/api/crew/5", headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    finally:
+        set_response_cache(None)
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_listener_versions_answer_304_without_a_query():
+    dataset = install_fake_database(app)
+    cache = ResponseCache(max_entries=16)
+    cache.set_online({name: version for name, version in dataset.tables["table_versions"].rows})
+    set_response_cache(cache)
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            etag = (await ac.get("/api/rosters/", params={"start_date": "2025-01-02"})).headers["ETag"]
+            dataset.tables.clear()
+            response = await ac.get("/api/rosters/", params={"start_date": "2025-01-02"}, headers={"If-None-Match": etag})
+            assert response.status_code == 304
+    finally:
+        set_response_cache(None)
+        app.dependency_overrides.clear()
@@ -0,0 +1,165 @@
+import sys
+import os
+import psycopg
+import pytest
+from datetime import datetime
+from httpx import AsyncClient, ASGITransport
+from psycopg import errors
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend import app
+from backend.benchmarks.fakes import install_fake_database
+from backend.domain.entities.roster import Roster
+from backend.domain.exceptions import DomainException, RosterOverlapError
+from backend.infrastructure.database.roster_repository import ROSTER_COLUMNS, RosterRepository
+from scripts.schema_migrations import MigrationRunner
+
+needs_database = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_DSN"),
+    reason="set TEST_DATABASE_DSN to a scratch database; the test migrates it and reverts everything",
+)
+
+
+class _RejectingCursor:
+    description = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, query, params=None):
+        raise errors.ExclusionViolation("conflicting key value violates exclusion constraint")
+
+
+class _RejectingConnection:
+    def cursor(self):
+        return _RejectingCursor()
+
+
+class _RecordingCursor(_RejectingCursor):
+    description = [(name,) for name in ROSTER_COLUMNS.split(", ")]
+
+    def __init__(self, existing):
+        self.existing, self.statements, self.row = existing, [], None
+
+    async def execute(self, query, params=None):
+        verb = query.split()[0]
+        self.statements.append(verb)
+        found = verb == "INSERT" or params[-1] in self.existing
+        self.row = tuple(params[-1] if name == "id" else None for name, in self.description) if found else None
+
+    async def fetchone(self):
+        return self.row
+
+
+class _RecordingConnection:
+    def __init__(self, existing=()):
+        self.cur = _RecordingCursor(set(existing))
+
+    def cursor(self):
+        return self.cur
+
+
+@pytest.mark.asyncio
+async def test_exclusion_violation_becomes_domain_error():
+    roster = Roster(id=1, crew_id=7, flight_id=3, duty_start=datetime(2025, 1, 1, 6), duty_end=datetime(2025, 1, 1, 14))
+    with pytest.raises(RosterOverlapError) as info:
+        await RosterRepository(_RejectingConnection()).save(roster)
+    assert isinstance(info.value, DomainException)
+    assert info.value.crew_id == 7
+    assert "duty_period" not in ROSTER_COLUMNS
+
+
+@pytest.mark.asyncio
+async def test_on_duty_returns_overlapping_rosters():
+    dataset = install_fake_database(app)
+    table = dataset.tables["rosters"]
+    start_i, end_i = table.index_of("duty_start"), table.index_of("duty_end")
+    start, end = datetime(2025, 1, 2, 0), datetime(2025, 1, 2, 2)
+    expected = {r[0] for r in table.rows if r[start_i] < end and r[end_i] > start}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/api/rosters/on-duty", params={"start": start.isoformat(), "end": end.isoformat()})
+            assert response.status_code == 200
+            assert {r["id"] for r in response.json()} == expected and expected
+            bad = await ac.get("/api/rosters/on-duty", params={"start": end.isoformat(), "end": start.isoformat()})
+            assert bad.status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_save_updates_by_id_before_inserting():
+    roster = Roster(id=5, crew_id=7, flight_id=3, duty_start=datetime(2025, 1, 31, 20), duty_end=datetime(2025, 2, 1, 4))
+    conn = _RecordingConnection(existing=[5])
+    assert (await RosterRepository(conn).save(roster)).id == 5
+    assert conn.cur.statements == ["UPDATE"]
+
+    conn = _RecordingConnection()
+    assert (await RosterRepository(conn).save(roster)).id == 5
+    assert conn.cur.statements == ["UPDATE", "INSERT"]
+
+
+@pytest.mark.asyncio
+@needs_database
+async def test_resave_moves_the_row_and_ids_stay_unique():
+    dsn = os.environ["TEST_DATABASE_DSN"]
+    runner = MigrationRunner(dsn)
+    runner.upgrade()
+    try:
+        conn = await psycopg.AsyncConnection.connect(dsn, autocommit=True)
+        try:
+            await conn.execute("SELECT ensure_monthly_partitions('rosters', '2025-01-01', '2025-03-01')")
+            await conn.execute("INSERT INTO crew (id, employee_id) VALUES (7, 'EMP7'), (8, 'EMP8')")
+            await conn.execute("INSERT INTO flights (id, flight_number) VALUES (3, '6E3'), (4, '6E4')")
+            repo = RosterRepository(conn)
+            await repo.save(Roster(id=1, crew_id=7, flight_id=3, status="proposed",
+                                   duty_start=datetime(2025, 1, 31, 20), duty_end=datetime(2025, 2, 1, 4)))
+            moved = await repo.save(Roster(id=1, crew_id=8, flight_id=4, status="confirmed", crew_position="captain",
+                                           duty_start=datetime(2025, 2, 3, 6), duty_end=datetime(2025, 2, 3, 14)))
+            assert (moved.crew_id, moved.flight_id, moved.status, moved.crew_position) == (8, 4, "confirmed", "captain")
+            rows = await (await conn.execute("SELECT tableoid::regclass::text, crew_id FROM rosters WHERE id = 1")).fetchall()
+            assert rows == [("rosters_p202502", 8)]
+            # A raw insert can no longer put the same id into another month
+            with pytest.raises(errors.UniqueViolation):
+                await conn.execute("INSERT INTO rosters (id, crew_id, flight_id, duty_start, duty_end) "
+                                   "VALUES (1, 7, 3, '2025-01-05 06:00', '2025-01-05 14:00')")
+            await conn.execute("DELETE FROM rosters WHERE id = 1")
+            assert await (await conn.execute("SELECT count(*) FROM roster_ids")).fetchone() == (0,)
+        finally:
+            await conn.close()
+    finally:
+        runner.downgrade(0)
+
+
+@pytest.mark.asyncio
+@needs_database
+async def test_overlaps_across_months_are_still_rejected():
+    dsn = os.environ["TEST_DATABASE_DSN"]
+    runner = MigrationRunner(dsn)
+    runner.upgrade()
+    try:
+        conn = await psycopg.AsyncConnection.connect(dsn, autocommit=True)
+        try:
+            await conn.execute("SELECT ensure_monthly_partitions('rosters', '2025-01-01', '2025-04-01')")
+            await conn.execute("INSERT INTO crew (id, employee_id) VALUES (7, 'EMP7')")
+            repo = RosterRepository(conn)
+            await repo.save(Roster(id=1, crew_id=7, flight_id=None, duty_start=datetime(2025, 1, 31, 20), duty_end=datetime(2025, 2, 1, 4)))
+            with pytest.raises(RosterOverlapError):
+                await repo.save(Roster(id=2, crew_id=7, flight_id=None, duty_start=datetime(2025, 2, 1, 2), duty_end=datetime(2025, 2, 1, 9)))
+            await repo.save(Roster(id=2, crew_id=7, flight_id=None, duty_start=datetime(2025, 2, 1, 4), duty_end=datetime(2025, 2, 1, 9)))
+            # The probe only looks back MAX_ROSTER_DUTY, so no row may be longer
+            with pytest.raises(errors.CheckViolation):
+                await repo.save(Roster(id=3, crew_id=7, flight_id=None, duty_start=datetime(2025, 2, 2), duty_end=datetime(2025, 2, 3, 1)))
+            # ...except open-ended rows, which still block every later duty
+            await repo.save(Roster(id=3, crew_id=7, flight_id=None, duty_start=datetime(2025, 2, 10)))
+            with pytest.raises(RosterOverlapError):
+                await repo.save(Roster(id=4, crew_id=7, flight_id=None, duty_start=datetime(2025, 3, 20), duty_end=datetime(2025, 3, 20, 8)))
+            await repo.save(Roster(id=3, crew_id=7, flight_id=None, duty_start=datetime(2025, 2, 10), duty_end=datetime(2025, 2, 10, 8)))
+            await repo.save(Roster(id=4, crew_id=7, flight_id=None, duty_start=datetime(2025, 3, 20), duty_end=datetime(2025, 3, 20, 8)))
+        finally:
+            await conn.close()
+    finally:
+        runner.downgrade(0)
@@ -0,0 +1,151 @@
+import sys
+import os
+import warnings
+import numpy as np
+from dataclasses import fields
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.benchmarks.rostering_benchmark import synthetic_schedule
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.services.decomposition import BY_BASE, BY_FLEET, partition, solve_decomposed
+from backend.domain.services.rostering_service import (
+    MIN_REST_H,
+    MIN_TURNAROUND_H,
+    POSITIONS,
+    RELEASE_H,
+    RosteringProblem,
+    RosteringResult,
+    RosteringService,
+)
+
+T0 = datetime(2025, 3, 10, 6, 0)
+
+
+def crew(id, rank, base="DEL", qualifications=("A320",)):
+    values = {f.name: None for f in fields(Crew)}
+    values.update(id=id, employee_id=f"EMP{id}", first_name=f"F{id}", last_name=f"L{id}", rank=rank,
+                  base_airport=base, current_location=base, status="available", qualifications=list(qualifications))
+    return Crew(**values)
+
+
+def flight(id, hour, origin="DEL", dest="BOM", hours=2.0, aircraft_type="A320"):
+    values = {f.name: None for f in fields(Flight)}
+    values.update(id=id, flight_number=f"6E{id}", departure_airport=origin, arrival_airport=dest,
+                  scheduled_departure=T0 + timedelta(hours=hour), scheduled_arrival=T0 + timedelta(hours=hour + hours),
+                  aircraft_type=aircraft_type, status="scheduled")
+    return Flight(**values)
+
+
+def one_crew_set(first_id, base="DEL"):
+    return [crew(first_id, "CAPTAIN", base), crew(first_id + 1, "FIRST_OFFICER", base),
+            crew(first_id + 2, "FLIGHT_ATTENDANT", base)]
+
+
+def assert_legal(problem, result):
+    """No position or crew member twice on a flight; each crew member's duties never overlap."""
+    assert len(set(zip(result.flight.tolist(), result.position.tolist()))) == len(result.flight)
+    assert len(set(zip(result.flight.tolist(), result.crew.tolist()))) == len(result.flight)
+    for c in np.unique(result.crew):
+        mine = np.flatnonzero(result.crew == c)
+        mine = mine[np.argsort(problem.dep_h[result.flight[mine]])]
+        arrivals = problem.arr_h[result.flight[mine]]
+        departures = problem.dep_h[result.flight[mine]]
+        gaps = departures[1:] - arrivals[:-1]
+        assert (gaps >= MIN_TURNAROUND_H - 1e-9).all()
+        # A new duty period (a gap at least a rest long) must not start before the last release
+        assert (result.start_h[mine][1:][gaps >= MIN_REST_H] >= arrivals[:-1][gaps >= MIN_REST_H] + RELEASE_H - 1e-9).all()
+
+
+def test_out_and_back_is_flown_by_one_crew_set():
+    flights = [flight(1, 0), flight(2, 2.75, "BOM", "DEL")]
+    problem = RosteringProblem.from_entities(flights, one_crew_set(1) + one_crew_set(4, base="BOM"))
+    # One wave per leg: within a wave each crew member takes at most one flight
+    result = RosteringService(wave_hours=2.0).solve(problem)
+
+    assert len(result.unfilled) == 0 and len(result.flight) == 2 * len(POSITIONS)
+    assert_legal(problem, result)
+    # The DEL crew fly both legs and end the day at home; the BOM crew would end it in DEL
+    assert set(problem.crew_ids[result.crew].tolist()) == {1, 2, 3}
+    assert (result.deadhead_km == 0).all()
+
+    rosters = sorted(result.rosters(problem), key=lambda r: (r.flight_id, r.crew_id))
+    assert [(r.flight_id, r.crew_id, r.crew_position) for r in rosters[:3]] == [
+        (1, 1, "captain"), (1, 2, "first_officer"), (1, 3, "flight_attendant"),
+    ]
+    assert rosters[0].duty_start == T0 - timedelta(hours=1) and rosters[0].status == "proposed"
+
+
+def test_unrated_or_missing_crew_leave_positions_open():
+    flights = [flight(1, 0, aircraft_type="ATR72"), flight(2, 0.5, "DEL", "BLR")]
+    problem = RosteringProblem.from_entities(flights, one_crew_set(1))
+    result = RosteringService().solve(problem)
+    # Nobody is rated on the ATR72; the A320 set can only fly one of two simultaneous flights
+    filled = problem.flight_ids[result.flight].tolist()
+    assert filled == [2, 2, 2]
+    assert sorted(map(tuple, result.unfilled.tolist())) == [(0, 0), (0, 1), (0, 2)]
+    assert result.total_cost > result.cost.sum()
+
+
+def test_fill_works_around_existing_duties():
+    flights = [flight(1, 0), flight(2, 1, "DEL", "BLR"), flight(3, 2.75, "BOM", "DEL")]
+    problem = RosteringProblem.from_entities(flights, one_crew_set(1) + one_crew_set(4))
+    service = RosteringService()
+    first = service.solve(problem.subset(np.array([0, 2]), np.arange(3))).remap(np.array([0, 2]), np.arange(3))
+    first.unfilled = np.array([(1, p) for p in range(len(POSITIONS))], dtype=np.int64)
+    first.month_hours = problem.month_hours.copy()
+
+    filled = service.fill(problem, first)
+    # Crew 1-3 are flying flight 1 when flight 2 leaves, so the other set takes it
+    assert len(filled.unfilled) == 0
+    assert set(problem.crew_ids[filled.crew].tolist()) == {4, 5, 6}
+    combined = RosteringResult.concat([first, filled])
+    assert_legal(problem, combined)
+
+
+def test_fill_must_end_where_the_next_duty_begins():
+    service = RosteringService()
+    for next_origin, fills in (("DEL", False), ("BOM", True)):
+        flights = [flight(1, 0, "DEL", "BOM"), flight(2, 30, next_origin, "BLR")]
+        problem = RosteringProblem.from_entities(flights, one_crew_set(1))
+        first = service.solve(problem.subset(np.array([1]), np.arange(3))).remap(np.array([1]), np.arange(3))
+        first.unfilled = np.array([(0, p) for p in range(len(POSITIONS))], dtype=np.int64)
+        filled = service.fill(problem, first)
+        # Flight 2 was costed from DEL: stranding its crew in BOM first would break it
+        assert (len(filled.unfilled) == 0) is fills and (len(filled.flight) == len(POSITIONS)) is fills
+
+
+def test_partitions_by_base_and_fleet():
+    flights = [flight(1, 0, "DEL", "GOI"), flight(2, 3, "GOI", "DEL"), flight(3, 1, "DEL", "BOM"),
+               flight(4, 1, "BOM", "PNQ", aircraft_type="ATR72")]
+    people = one_crew_set(1) + one_crew_set(4, "BOM") + [crew(7, "CAPTAIN", "BOM", ("ATR72",)), crew(8, "CAPTAIN", "DEL", ())]
+    problem = RosteringProblem.from_entities(flights, people)
+
+    keys, flight_part, crew_part = partition(problem, BY_BASE)
+    assert keys == ["BOM", "DEL"]
+    # Both legs of the outstation rotation stay with DEL; the base-to-base flight is left to the final pass
+    assert flight_part.tolist() == [1, 1, -1, 0]
+    assert crew_part.tolist() == [1, 1, 1, 0, 0, 0, 0, 1]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # crew 8 has no rating to take the log of
+        keys, flight_part, crew_part = partition(problem, BY_FLEET)
+    assert keys == ["A320", "ATR72"]
+    assert flight_part.tolist() == [0, 0, 0, 1]
+    assert crew_part.tolist() == [0] * 6 + [1, -1]
+
+
+def test_decomposed_matches_serial_coverage_in_and_out_of_process():
+    flights, crew = synthetic_schedule(bases=3, days=2, aircraft_per_base=3, crew_per_aircraft=9.0)
+    problem = RosteringProblem.from_entities(flights, crew)
+    serial = RosteringService().solve(problem)
+
+    for workers in (0, 2):
+        decomposed = solve_decomposed(problem, BY_BASE, workers=workers)
+        result = decomposed.result
+        assert_legal(problem, result)
+        assert len(result.flight) + len(result.unfilled) == problem.slots
+        assert len(result.unfilled) <= len(serial.unfilled) + 3
+        assert [p.key for p in decomposed.partitions] and decomposed.final_pass.key == "final pass"
+        assert sum(p.filled for p in decomposed.partitions) + decomposed.final_pass.filled == len(result.flight)
+        assert decomposed.workers == workers
@@ -0,0 +1,173 @@
+import sys
+import os
+import pytest
+from dataclasses import fields
+from datetime import date, datetime, timedelta
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import FakeDataset, install_fake_database
+from backend.domain.entities.crew import Crew
+from backend.domain.entities.flight import Flight
+from backend.domain.entities.roster import Roster
+from backend.domain.services.duty_hours import DutyHoursLedger
+from backend.domain.services.recovery_service import RecoveryService
+from backend.domain.services.scenario_service import AWAY_FROM_BASE, DUTY_PERIOD, MONTHLY_DUTY, OVERLAP, Snapshot
+from backend.infrastructure.database.scenarios import ScenarioSnapshotCache, set_snapshot_cache
+
+T0 = datetime(2025, 3, 10, 6, 0)
+MARCH = date(2025, 3, 1)
+
+
+def crew(id, rank="CAPTAIN", base="DEL"):
+    values = {f.name: None for f in fields(Crew)}
+    values.update(id=id, employee_id=f"EMP{id}", first_name=f"F{id}", last_name=f"L{id}", rank=rank,
+                  base_airport=base, current_location=base, status="available", qualifications=["A320"])
+    return Crew(**values)
+
+
+def flight(id, hour, origin="DEL", dest="BOM", hours=2):
+    values = {f.name: None for f in fields(Flight)}
+    values.update(id=id, flight_number=f"6E{id}", departure_airport=origin, arrival_airport=dest,
+                  scheduled_departure=T0 + timedelta(hours=hour), scheduled_arrival=T0 + timedelta(hours=hour + hours),
+                  aircraft_type="A320", status="scheduled")
+    return Flight(**values)
+
+
+def roster(id, crew_id, f, position="captain"):
+    return Roster(id=id, crew_id=crew_id, flight_id=f.id, status="assigned", crew_position=position,
+                  duty_start=f.scheduled_departure - timedelta(hours=1), duty_end=f.scheduled_arrival + timedelta(minutes=30))
+
+
+def snapshot(ledger=()):
+    # Crew 1 flies DEL-BOM-DEL; crew 2 flies out of BOM at 12:00; crew 3 is spare; flight 4 is unassigned
+    flights = [flight(1, 0), flight(2, 4, "BOM", "DEL"), flight(3, 6, "BOM", "DEL"), flight(4, 10, "DEL", "BOM", hours=9)]
+    rosters = [roster(10, 1, flights[0]), roster(11, 1, flights[1]), roster(12, 2, flights[2])]
+    return Snapshot(flights, [crew(1), crew(2, base="BOM"), crew(3)], rosters, DutyHoursLedger(ledger),
+                    (T0 - timedelta(days=1), T0 + timedelta(days=7)), T0)
+
+
+def kinds(findings):
+    return sorted((f.kind, f.crew_id) for f in findings)
+
+
+def test_forks_are_copy_on_write():
+    base = snapshot()
+    a, b = base.fork(), base.fork()
+    a.cancel_flights([1, 99])
+    b.move_crew([2], "DEL")
+
+    assert base.roster(10).status == "assigned" and base.flight(1).status == "scheduled"
+    assert a.roster(10).status == "cancelled" and b.roster(10).status == "assigned"
+    assert b.crew(2).base_airport == "DEL" and a.crew(2).base_airport == "BOM" == base.crew(2).base_airport
+    # Untouched entities are the snapshot's own objects, not copies
+    assert a.flight(3) is base.flight(3) and a.roster_ids_of_crew(2) is base.roster_ids_of_crew(2)
+
+    result = a.evaluate()
+    assert [(c.kind, c.id, c.changes) for c in result.changes] == [
+        ("flight", 1, {"status": ("scheduled", "cancelled")}),
+        ("roster", 10, {"status": ("assigned", "cancelled")}),
+    ]
+    assert result.missing == {"flights": [99]}
+
+    # A fork of a fork starts from its parent's changes and does not write back into them
+    c = a.fork()
+    c.cancel_flights([2])
+    assert c.roster(10).status == c.roster(11).status == "cancelled"
+    assert a.roster(11).status == "assigned"
+
+
+def test_findings_are_diffed_against_the_baseline():
+    base = snapshot()
+    assert kinds(base.findings(1)) == [] and kinds(base.findings(2)) == []
+
+    late = base.fork()
+    late.delay_flight(1, 4 * 60)  # now ends after flight 2 reports
+    overlap = late.evaluate()
+    assert kinds(overlap.new_findings) == [(OVERLAP, 1)] and overlap.resolved_findings == []
+    assert late.roster(10).duty_start == base.roster(10).duty_start + timedelta(hours=4)
+
+    # Moving crew 2 to DEL leaves their BOM departure away from base
+    moved = base.fork()
+    moved.move_crew([2], "DEL")
+    assert kinds(moved.evaluate().new_findings) == [(AWAY_FROM_BASE, 2)]
+    # Cancelling the flight as well leaves nothing to report
+    back = moved.fork()
+    back.cancel_flights([3])
+    assert kinds(back.evaluate().new_findings) == []
+    # Forks of a fork report against the snapshot, not their parent
+    assert kinds(late.fork().evaluate().new_findings) == [(OVERLAP, 1)]
+
+
+def test_duty_period_and_monthly_limits():
+    base = snapshot(ledger=[(2, MARCH, 186.0, 90.0, 20)])
+    assert kinds(base.findings(2)) == []
+    # 186h in March already includes flight 3's 3.5h duty; flight 4 straight after breaks both limits
+    scenario = base.fork()
+    extra = base.flight(4)
+    scenario.add_roster(crew_id=2, flight_id=4, status="proposed", crew_position="captain",
+                        duty_start=extra.scheduled_departure - timedelta(hours=1),
+                        duty_end=extra.scheduled_arrival + timedelta(minutes=30))
+    found = kinds(scenario.evaluate().new_findings)
+    assert (DUTY_PERIOD, 2) in found and (MONTHLY_DUTY, 2) in found
+    assert scenario.month_total(2, MARCH) == pytest.approx(186.0 + 10.5)
+    assert base.month_total(2, MARCH) == 186.0
+
+    # A baseline finding goes away when its cause is removed
+    over = snapshot(ledger=[(2, MARCH, 191.0, 90.0, 20)])
+    assert kinds(over.findings(2)) == [(MONTHLY_DUTY, 2)]
+    cancelled = over.fork()
+    cancelled.cancel_flights([3])
+    result = cancelled.evaluate()
+    assert kinds(result.resolved_findings) == [(MONTHLY_DUTY, 2)] and result.new_findings == []
+
+
+def test_removed_crew_positions_are_recovered_in_the_fork():
+    base = snapshot()
+    scenario = base.fork()
+    scenario.remove_crew([2])
+    assert scenario.open_positions == [(3, "captain")]
+    filled = scenario.recover(RecoveryService())
+    assert filled == 1 and scenario.open_positions == []
+    added = [c for c in scenario.evaluate().changes if c.added]
+    assert [(c.id, c.changes["crew_id"][1]) for c in added] == [(-1, 3)]
+    assert base.roster_ids_of_flight(3) == [12] and scenario.roster_ids_of_flight(3) == [12, -1]
+    # Crew 3 now starts a duty in BOM; crew 1 is busy until 12:30 so cannot take it
+    assert kinds(scenario.evaluate().new_findings) == [(AWAY_FROM_BASE, 3)]
+
+
+@pytest.mark.asyncio
+async def test_evaluate_endpoint_reuses_one_snapshot():
+    install_fake_database(app, FakeDataset(crew=60, flights=300))
+    cache = ScenarioSnapshotCache(timedelta(days=3), clock=lambda: datetime(2025, 1, 2))
+    set_snapshot_cache(cache)
+    body = {"scenarios": [
+        {"name": "cancel", "actions": [{"type": "cancelFlights", "flightIds": [41, 42, 43]}]},
+        {"name": "sick", "actions": [{"type": "removeCrew", "crewIds": [1, 2]}], "recover": True},
+        {"name": "move", "actions": [{"type": "moveCrew", "crewIds": [4], "base": "BLR"},
+                                     {"type": "delayFlight", "flightId": 50, "minutes": 90}]},
+    ]}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.post("/api/scenarios/evaluate", json=body)
+            first = cache.snapshot
+            again = await ac.post("/api/scenarios/evaluate", json=body)
+            reused = cache.snapshot is first
+            cache.on_table_change("rosters", 2)
+            await ac.post("/api/scenarios/evaluate", json=body)
+            reloaded = cache.snapshot is not first
+            bad = await ac.post("/api/scenarios/evaluate", json={"scenarios": [{"name": "x", "actions": [{"type": "nope"}]}]})
+    finally:
+        set_snapshot_cache(None)
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200 and again.json()["scenarios"] == [
+        {**s, "evaluateMs": again.json()["scenarios"][i]["evaluateMs"]} for i, s in enumerate(response.json()["scenarios"])
+    ]
+    assert reused and reloaded and bad.status_code == 422
+    cancel, sick, move = response.json()["scenarios"]
+    assert {c["id"] for c in cancel["changes"] if c["type"] == "flight"} == {41, 42, 43}
+    assert all(c["changes"]["status"] == ["confirmed", "cancelled"] for c in cancel["changes"] if c["type"] == "roster")
+    assert sick["recovered"] is not None and sick["recovered"] + len(sick["openPositions"]) > 0
+    assert any(c["added"] for c in sick["changes"]) == (sick["recovered"] > 0)
+    assert {"type": "crew", "id": 4} in [{"type": c["type"], "id": c["id"]} for c in move["changes"]]
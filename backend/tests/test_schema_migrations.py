@@ -0,0 +1,119 @@
+import sys
+import os
+import pytest
+import psycopg
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scripts.schema_migrations import HOT_QUERIES, MIGRATIONS, Migration, MigrationRunner, indexes_used
+
+needs_database = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_DSN"),
+    reason="set TEST_DATABASE_DSN to a scratch database; the test migrates it and reverts everything",
+)
+
+
+def test_migrations_are_ordered_and_reversible():
+    assert [m.version for m in MIGRATIONS] == sorted({m.version for m in MIGRATIONS})
+    for migration in MIGRATIONS:
+        assert migration.up and migration.down
+        if not migration.transactional:
+            assert all("CONCURRENTLY" in sql or sql.startswith("ANALYZE") for sql in migration.up)
+    with pytest.raises(ValueError):
+        MigrationRunner("", [Migration(2, "b", ["x"], ["y"]), Migration(1, "a", ["x"], ["y"])])
+
+
+def test_every_hot_query_has_its_index_created():
+    created = " ".join(sql for m in MIGRATIONS for sql in m.up)
+    for query in HOT_QUERIES:
+        assert f" {query.index} ON " in created
+
+
+def test_indexes_used_walks_nested_plans():
+    plan = [{"Plan": {
+        "Node Type": "Sort",
+        "Plans": [{
+            "Node Type": "Bitmap Heap Scan",
+            "Plans": [{"Node Type": "Bitmap Index Scan", "Index Name": "idx_rosters_crew_duty"}],
+        }, {"Node Type": "Seq Scan", "Relation Name": "crew"}],
+    }}]
+    assert indexes_used(plan) == ["idx_rosters_crew_duty"]
+    assert indexes_used('[{"Plan": {"Node Type": "Seq Scan"}}]') == []
+
+
+def test_partition_migration_rebuilds_tables_with_indexes():
+    from scripts.schema_migrations import PARTITIONED, relations_scanned
+
+    migration = next(m for m in MIGRATIONS if m.name == "monthly_partitions")
+    up = "\n".join(migration.up)
+    for table, spec in PARTITIONED.items():
+        assert f"PARTITION BY RANGE ({spec['key']})" in up
+        assert f"PRIMARY KEY (id, {spec['key']})" in up
+        assert f"DROP TABLE {table}_unpartitioned" in up
+    assert "CREATE INDEX idx_rosters_crew_duty ON rosters" in up
+    assert "CONCURRENTLY" not in up  # not allowed on partitioned parents
+    plan = [{"Plan": {"Node Type": "Append", "Plans": [
+        {"Node Type": "Index Scan", "Relation Name": "audit_log_p202503", "Index Name": "x"},
+    ]}}]
+    assert relations_scanned(plan) == ["audit_log_p202503"]
+
+
+def test_no_overlap_migration_covers_new_partitions():
+    from scripts.schema_migrations import ROSTER_PARTITION_HOOK
+
+    up = "\n".join(next(m for m in MIGRATIONS if m.name == "roster_no_overlap").up)
+    assert "btree_gist" in up and "GENERATED ALWAYS AS" in up
+    assert "EXCLUDE USING gist (crew_id WITH =, duty_period WITH &&)" in up
+    # The hook is embedded in a PL/pgSQL string, so its literal must be quoted
+    assert "''cancelled''" in ROSTER_PARTITION_HOOK and ROSTER_PARTITION_HOOK in up
+
+
+def test_overlap_probe_is_bounded_by_the_longest_duty():
+    from scripts.schema_migrations import MAX_ROSTER_DUTY
+
+    migration = next(m for m in MIGRATIONS if m.name == "bounded_overlap_probe")
+    up, down = "\n".join(migration.up), "\n".join(migration.down)
+    # duty_start bounds on both sides let the trigger's probe skip every other month's partition
+    assert f"r.duty_start >= NEW.duty_start - interval '{MAX_ROSTER_DUTY}'" in up
+    assert "r.duty_start < coalesce(NEW.duty_end, 'infinity')" in up
+    assert f"duty_end - duty_start <= interval '{MAX_ROSTER_DUTY}'" in up
+    assert "NEW.duty_start - interval" not in down and "DROP CONSTRAINT IF EXISTS chk_rosters_duty_length" in down
+
+
+def test_open_ended_rows_get_their_own_probe():
+    migration = next(m for m in MIGRATIONS if m.name == "open_ended_overlap_probe")
+    up, down = "\n".join(migration.up), "\n".join(migration.down)
+    # No lower duty_start bound: an open-ended duty from any earlier month still clashes
+    assert "AND r.duty_end IS NULL\n          AND r.duty_start < coalesce(NEW.duty_end, 'infinity')" in up
+    assert "idx_rosters_open_duty ON rosters (crew_id, duty_start) WHERE duty_end IS NULL" in up
+    assert "r.duty_end IS NULL" not in down and "DROP INDEX IF EXISTS idx_rosters_open_duty" in down
+
+
+def test_month_hours_only_mirror_current_month_writes_onto_crew():
+    migration = next(m for m in MIGRATIONS if m.name == "month_hours_crew_guard")
+    up, down = "\n".join(migration.up), "\n".join(migration.down)
+    # An empty UPDATE on crew still bumps crew's version, so it only runs for current-month rows
+    assert up.count("IF EXISTS (SELECT 1 FROM") == 2 and up.count("UPDATE crew c SET") == 2
+    assert "IF EXISTS" not in down and "UPDATE crew c SET" in down
+
+
+@needs_database
+def test_retry_rebuilds_an_index_a_failed_concurrent_build_left_invalid():
+    dsn = os.environ["TEST_DATABASE_DSN"]
+    create = "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_retry_x ON retry_probe (x)"
+    runner = MigrationRunner(dsn, [
+        Migration(1, "retry_probe", up=["CREATE TABLE retry_probe (x INTEGER)"], down=["DROP TABLE retry_probe"]),
+        Migration(2, "retry_index", up=[create], down=["DROP INDEX CONCURRENTLY IF EXISTS idx_retry_x"],
+                  transactional=False),
+    ])
+    runner.upgrade(1)
+    try:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute("INSERT INTO retry_probe VALUES (1), (1)")
+            with pytest.raises(psycopg.errors.UniqueViolation):
+                runner.upgrade()
+            conn.execute("DELETE FROM retry_probe WHERE ctid = (SELECT min(ctid) FROM retry_probe)")
+            valid = "SELECT indisvalid FROM pg_index WHERE indexrelid = 'idx_retry_x'::regclass"
+            assert conn.execute(valid).fetchone() == (False,)
+            assert runner.upgrade() == [2]
+            assert conn.execute(valid).fetchone() == (True,)
+    finally:
+        runner.downgrade(0)
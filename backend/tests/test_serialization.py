@@ -0,0 +1,64 @@
+import sys
+import os
+import json
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from httpx import AsyncClient, ASGITransport
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend import app
+from backend.benchmarks.fakes import install_fake_database
+from backend.benchmarks.serialization_benchmark import run_serialization_benchmark
+from backend.domain.entities.roster import Roster
+from backend.infrastructure.api.compression import choose_encoding
+from backend.infrastructure.api.responses import FastJSONResponse
+from backend.infrastructure.cache.response_cache import ResponseCache, set_response_cache
+
+
+def test_fast_json_renders_entities_like_the_default_encoder():
+    roster = Roster(id=1, crew_id=2, flight_id=3, duty_start=datetime(2025, 1, 1, 6, 30), optimization_score=Decimal("0.5"))
+    body = json.loads(FastJSONResponse([roster]).body)
+    assert body[0]["duty_start"] == "2025-01-01T06:30:00"
+    assert body[0]["optimization_score"] == 0.5
+    assert body[0]["duty_end"] is None
+
+
+def test_accept_encoding_negotiation():
+    assert choose_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert choose_encoding("gzip;q=0, identity", brotli_available=False) is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+    assert choose_encoding(None) is None
+
+
+@pytest.mark.asyncio
+async def test_large_lists_are_compressed_and_revalidate():
+    install_fake_database(app)
+    set_response_cache(ResponseCache(max_entries=0))
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.get("/api/crew/", headers={"Accept-Encoding": "gzip"})
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert "Accept-Encoding" in response.headers["Vary"]
+            assert response.num_bytes_downloaded < len(response.content)
+            assert len(response.json()) == 300
+            etag = response.headers["ETag"]
+            assert etag.startswith('W/"')
+
+            again = await ac.get("/api/crew/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+            assert again.status_code == 304 and again.headers["ETag"] == etag.removeprefix("W/")
+
+            small = await ac.get("/api/crew/3", headers={"Accept-Encoding": "gzip"})
+            assert "Content-Encoding" not in small.headers
+    finally:
+        set_response_cache(None)
+        app.dependency_overrides.clear()
+
+
+def test_serialization_benchmark_smoke():
+    report = run_serialization_benchmark(rows=200, repeat=1)
+    assert set(report["results"]) == {"crew", "rosters", "flights"}
+    for result in report["results"].values():
+        assert result["bytes"] > 0 and result["gzip_ratio"] > 1
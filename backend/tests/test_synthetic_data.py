@@ -0,0 +1,70 @@
+import sys
+import os
+import psycopg
+import pytest
+from datetime import date
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scripts.schema_migrations import MigrationRunner
+from scripts.synthetic_data_generator import COLUMNS, LOAD_ORDER, ScaleSpec, SyntheticDataGenerator, generate_partition
+
+SPEC = ScaleSpec(scale=0.5, seed=3, days=10)
+
+
+def _all_rows():
+    rows = {table: [] for table in COLUMNS}
+    for partition in range(SPEC.partitions):
+        for table, part in generate_partition(SPEC, partition).items():
+            rows[table].extend(part)
+    return rows
+
+
+def test_partitions_are_deterministic_and_disjoint():
+    assert generate_partition(SPEC, 1) == generate_partition(SPEC, 1)
+    assert generate_partition(SPEC, 1) != generate_partition(ScaleSpec(scale=0.5, seed=4, days=10), 1)
+    rows = _all_rows()
+    for table, expected in SPEC.totals().items():
+        ids = [r[0] for r in rows[table]]
+        assert len(ids) == expected
+        assert sorted(ids) == list(range(1, expected + 1))
+
+
+def test_flights_chain_and_duties_cover_them():
+    rows = _all_rows()
+    flights = {r[0]: r for r in rows["flights"]}
+    for fid, flight in flights.items():
+        nxt = flights.get(fid + 1)
+        if nxt and (fid % SPEC.legs_per_day) != 0:
+            assert nxt[3] == flight[4]  # departs where the previous leg arrived
+            assert nxt[5] > flight[6]
+    crew = {r[0]: r for r in rows["crew"]}
+    duties = {}
+    for r in rows["rosters"]:
+        flight = flights[r[2]]
+        assert r[6] <= flight[5] and flight[6] <= r[7]
+        assert crew[r[1]][5] == flights[r[2] - (r[2] - 1) % SPEC.legs_per_day][3]  # crew fly from their base
+        assert crew[r[1]][12] == [flight[7]]  # rated on the aircraft type
+        duties.setdefault(r[1], []).append((r[6], r[7], r[0]))
+    # One row per leg: each crew member's rows tile their duties without overlapping
+    for crew_id, periods in duties.items():
+        ordered = sorted(periods)
+        for a, b in zip(ordered, ordered[1:]):
+            assert a[1] <= b[0], f"crew {crew_id}: roster {a[2]} overlaps roster {b[2]}"
+    assert len({(f[9], f[5]) for f in flights.values()}) == len(flights)  # a tail flies one leg at a time
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_DSN"),
+                    reason="set TEST_DATABASE_DSN to a scratch database; the test migrates it and reverts everything")
+def test_generated_data_loads_under_the_no_overlap_constraints():
+    dsn = os.environ["TEST_DATABASE_DSN"]
+    runner = MigrationRunner(dsn)
+    runner.upgrade()
+    try:
+        # Starts mid-month, so duties land in two monthly partitions and cross-partition checks run too
+        spec = ScaleSpec(scale=0.5, seed=3, start=date(2025, 1, 20), days=20)
+        assert SyntheticDataGenerator(dsn, spec, workers=1).run() == spec.totals()
+        with psycopg.connect(dsn) as conn:
+            counts = {t: conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for t in LOAD_ORDER}
+            months = conn.execute("SELECT count(DISTINCT tableoid) FROM rosters").fetchone()[0]
+        assert counts == spec.totals() and months == 2
+    finally:
+        runner.downgrade(0)
@@ -0,0 +1,62 @@
+"""
+Check the crew_month_hours summary (migration 0010) against a re-sum of rosters, and the
+crew.total_*_hours_month columns against the summary's current month. Exits 1 on drift.
+
+    python scripts/check_duty_hours.py --from 2025-01 --to 2025-03
+    python scripts/check_duty_hours.py --from 2025-03 --fix
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import psycopg
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+async def run(dsn: str, first: date, last: date, fix: bool) -> int:
+    from backend.infrastructure.database.duty_hours import (
+        check_crew_month_totals,
+        check_month_hours,
+        reconcile_month_hours,
+    )
+
+    async with await psycopg.AsyncConnection.connect(dsn) as conn:
+        drift = await check_month_hours(conn, first, last)
+        stale_crew = await check_crew_month_totals(conn)
+        for d in drift[:50]:
+            print(f"  crew {d.crew_id} {d.month:%Y-%m}: stored {d.stored.duty_hours:.2f}h duty/"
+                  f"{d.stored.flight_hours:.2f}h flight/{d.stored.duties} duties, rosters say "
+                  f"{d.actual.duty_hours:.2f}/{d.actual.flight_hours:.2f}/{d.actual.duties}")
+        if len(drift) > 50:
+            print(f"  ... and {len(drift) - 50} more")
+        print(f"{len(drift)} crew-months drifted, {len(stale_crew)} crew with stale current-month totals")
+        if fix and (drift or stale_crew):
+            written = await reconcile_month_hours(conn, first, last)
+            print(f"Rebuilt {written} crew-month rows")
+            return 0
+    return 1 if drift or stale_crew else 0
+
+
+def main(argv=None) -> int:
+    from scripts.database_migration import DatabaseConfig
+
+    today = date.today().replace(day=1)
+    parser = argparse.ArgumentParser(description="Monthly duty/flight hour summary consistency check")
+    parser.add_argument("--from", dest="first", type=_month, default=today, help="First month, YYYY-MM")
+    parser.add_argument("--to", dest="last", type=_month, help="Last month, YYYY-MM (default: --from)")
+    parser.add_argument("--fix", action="store_true", help="Rebuild the checked months from rosters")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(DatabaseConfig().dsn, args.first, args.last or args.first, args.fix))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,19 @@
 Database table creation, migration, and sample data generation script
 Optimized and refactored for seamless integration
 """
-import os, logging, random, psycopg
-from datetime import datetime, timedelta
+import os, sys, logging, random, psycopg
+from datetime import date, datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Any
 from contextlib import contextmanager
 from psycopg.rows import dict_row
 from dotenv import load_dotenv
 
+# Ensure project root is on sys.path when run directly (e.g., python scripts/..)
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
 load_dotenv()
 
 class DatabaseConfig:
@@ -174,15 +180,86 @@ class SchemaDefinitions:
     def get_drop_statements() -> List[str]:
         return [
             "DROP TABLE IF EXISTS rosters CASCADE;",
+            "DROP TABLE IF EXISTS roster_ids CASCADE;",
             "DROP TABLE IF EXISTS flights CASCADE;",
             "DROP TABLE IF EXISTS crew CASCADE;",
-            "DROP TABLE IF EXISTS audit_log CASCADE;"
+            "DROP TABLE IF EXISTS audit_log CASCADE;",
+            "DROP TABLE IF EXISTS disruptions CASCADE;",
+            "DROP TABLE IF EXISTS schema_migrations CASCADE;",
+            "DROP TABLE IF EXISTS table_versions CASCADE;"
         ]
 
 
+class PartitionManager:
+    """Monthly range partitions of rosters (by duty_start) and audit_log (by timestamp)."""
+
+    TABLES = ("rosters", "audit_log")
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def month_start(value: date, months: int = 0) -> date:
+        index = value.year * 12 + value.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
+
+    def ensure_range(self, table: str, start: date, end: date) -> int:
+        with self.db_manager.get_connection() as conn:
+            created = conn.execute("SELECT ensure_monthly_partitions(%s, %s, %s)", (table, start, end)).fetchone()[0]
+            conn.commit()
+        if created:
+            self.logger.info(f"Created {created} partition(s) of {table} for {start}..{end}")
+        return created
+
+    def ensure_future(self, months_ahead: int = 3) -> Dict[str, int]:
+        today = date.today()
+        return {t: self.ensure_range(t, self.month_start(today), self.month_start(today, months_ahead)) for t in self.TABLES}
+
+    def list_partitions(self, table: str) -> List[Dict[str, Any]]:
+        rows = self.db_manager.fetchall(
+            "SELECT c.relname AS name FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            f"WHERE i.inhparent = '{table}'::regclass ORDER BY c.relname"
+        )
+        partitions = []
+        for row in rows:
+            suffix = row["name"].rsplit("_p", 1)[-1]
+            if len(suffix) == 6 and suffix.isdigit():
+                month = date(int(suffix[:4]), int(suffix[4:]), 1)
+                partitions.append({"name": row["name"], "from": month, "to": self.month_start(month, 1)})
+        return partitions
+
+    def archive_before(self, cutoff: date, schema: str = "archive", drop: bool = False) -> List[str]:
+        """Detach every partition that ends on or before `cutoff`, then move it to `schema` (or drop it).
+
+        Detached partitions are invisible to queries on the parent, so old months cost nothing at read
+        time while staying restorable with ALTER TABLE ... ATTACH PARTITION.
+        """
+        done = []
+        # DETACH ... CONCURRENTLY (PostgreSQL 14+) cannot run inside a transaction block
+        with psycopg.connect(self.db_manager.config.dsn, autocommit=True) as conn:
+            for table in self.TABLES:
+                for part in self.list_partitions(table):
+                    if part["to"] > cutoff:
+                        continue
+                    conn.execute(f"ALTER TABLE {table} DETACH PARTITION {part['name']} CONCURRENTLY")
+                    if drop:
+                        if table == "rosters":
+                            # Dropped ids may be reused; archived ones stay reserved for a later ATTACH
+                            conn.execute(f"DELETE FROM roster_ids k USING {part['name']} p WHERE k.id = p.id")
+                        conn.execute(f"DROP TABLE {part['name']}")
+                    else:
+                        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+                        conn.execute(f"ALTER TABLE {part['name']} SET SCHEMA {schema}")
+                    self.logger.info(f"{'Dropped' if drop else 'Archived'} partition {part['name']}")
+                    done.append(part["name"])
+        return done
+
+
 class SampleDataGenerator:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
+        self.partitions = PartitionManager(db_manager)
 
     def _get_date_range(self, year: int, quarter: int):
         if quarter == 1:
@@ -244,10 +321,13 @@ class SampleDataGenerator:
         if not crew_ids or not flight_ids:
             return
         params = []
-        for _ in range(count):
-            crew_id = random.choice(crew_ids)
+        # At most one duty per crew member per day: rosters reject overlapping duty periods
+        days = (end - start).days + 1
+        slots = random.sample(range(len(crew_ids) * days), min(count, len(crew_ids) * days))
+        for slot in slots:
+            crew_id = crew_ids[slot % len(crew_ids)]
             flight_id = random.choice(flight_ids)
-            duty_start = start + timedelta(days=random.randint(0, (end - start).days))
+            duty_start = start + timedelta(days=slot // len(crew_ids), hours=6)
             duty_end = duty_start + timedelta(hours=8)
             params.append((crew_id, flight_id, "assignment", "planned", "Pilot",
                            duty_start, duty_end, duty_start - timedelta(hours=1), duty_end + timedelta(hours=1)))
@@ -274,6 +354,10 @@ class SampleDataGenerator:
         self.db_manager.execute_many(sql, params)
 
     def generate_all(self, year: int, quarter: int):
+        start, end = self._get_date_range(year, quarter)
+        today = date.today()
+        self.partitions.ensure_range("rosters", start.date(), end.date())
+        self.partitions.ensure_range("audit_log", today - timedelta(days=91), today)
         self.generate_crew()
         self.generate_flights(year, quarter)
         self.generate_rosters(year, quarter)
@@ -286,12 +370,21 @@ class DatabaseMigration:
         self.db_manager = DatabaseManager(self.config)
         self.schema = SchemaDefinitions()
         self.sample_generator = SampleDataGenerator(self.db_manager)
+        self.partitions = PartitionManager(self.db_manager)
+
+    def migration_runner(self):
+        from scripts.schema_migrations import MigrationRunner
+
+        return MigrationRunner(self.config.dsn)
 
     def create_tables(self) -> bool:
-        for table in ["crew", "flights", "rosters", "audit_log"]:
-            if not self.db_manager.execute_sql(self.schema.get_table_definitions()[table]):
-                return False
-        return True
+        # Tables now come from the versioned migrations (baseline = the definitions above)
+        try:
+            self.migration_runner().upgrade()
+            return True
+        except Exception as e:
+            logging.getLogger(self.__class__.__name__).error(f"Migration failed: {e}")
+            return False
 
     def drop_all_tables(self) -> bool:
         for drop_sql in self.schema.get_drop_statements():
@@ -305,6 +398,15 @@ class DatabaseMigration:
             self.print_row_counts()
         return ok
 
+    def generate_synthetic(self, scale: float, seed: int = 42, workers: int = 0,
+                           start: date = date(2025, 1, 1), days: int = 90) -> Dict[str, int]:
+        from scripts.synthetic_data_generator import ScaleSpec, SyntheticDataGenerator
+
+        if not self.create_tables():
+            return {}
+        spec = ScaleSpec(scale=scale, seed=seed, start=start, days=days)
+        return SyntheticDataGenerator(self.config.dsn, spec, workers).run()
+
     def print_row_counts(self):
         tables = ["crew", "flights", "rosters", "audit_log"]
         print("Row counts:")
@@ -327,6 +429,23 @@ def main():
     parser.add_argument("--reset", nargs=2, metavar=("YEAR", "QUARTER"))
     parser.add_argument("--reset-with-counts", nargs=2, metavar=("YEAR", "QUARTER"))
     parser.add_argument("--generate", nargs=2, metavar=("YEAR", "QUARTER"))
+    parser.add_argument("--synthetic", type=float, metavar="SCALE",
+                        help="Replace table contents with seeded synthetic data (1.0 ~ 86k roster rows)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for --synthetic (default: CPU count)")
+    parser.add_argument("--migrate", nargs="?", type=int, const=-1, metavar="VERSION",
+                        help="Apply pending migrations (up to VERSION)")
+    parser.add_argument("--rollback", type=int, metavar="VERSION", help="Revert migrations above VERSION")
+    parser.add_argument("--migration-status", action="store_true")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="EXPLAIN the hot queries and verify they use their indexes")
+    parser.add_argument("--maintain-partitions", nargs="?", type=int, const=3, metavar="MONTHS_AHEAD",
+                        help="Create monthly partitions up to MONTHS_AHEAD (default 3) months ahead")
+    parser.add_argument("--archive-before", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Detach partitions ending on/before this date into the archive schema")
+    parser.add_argument("--drop-archived", action="store_true", help="With --archive-before: drop instead of moving")
     parser.add_argument("--test-connection", action="store_true")
     parser.add_argument("--show-config", action="store_true")
     args = parser.parse_args()
@@ -341,7 +460,21 @@ def main():
         return
 
     migration = DatabaseMigration(config)
-    if args.create:
+    if args.migrate is not None:
+        print("Applied:", migration.migration_runner().upgrade(None if args.migrate < 0 else args.migrate))
+    elif args.rollback is not None:
+        print("Reverted:", migration.migration_runner().downgrade(args.rollback))
+    elif args.migration_status:
+        for row in migration.migration_runner().status():
+            print(f"  {row['version']:04d}_{row['name']:24} {row['applied_at'] or 'pending'}")
+    elif args.maintain_partitions is not None:
+        print("Created:", migration.partitions.ensure_future(args.maintain_partitions))
+    elif args.archive_before:
+        print("Detached:", migration.partitions.archive_before(args.archive_before, drop=args.drop_archived))
+    elif args.check_plans:
+        from scripts.schema_migrations import check_query_plans, print_plan_checks
+        sys.exit(print_plan_checks(check_query_plans(config.dsn)))
+    elif args.create:
         print("Create:", migration.create_tables())
     elif args.drop:
         print("Drop:", migration.drop_all_tables())
@@ -355,6 +488,10 @@ def main():
         year, quarter = int(args.generate[0]), int(args.generate[1])
         migration.sample_generator.generate_all(year, quarter)
         migration.print_row_counts()
+    elif args.synthetic is not None:
+        migration.generate_synthetic(args.synthetic, seed=args.seed, workers=args.workers,
+                                     start=args.start_date, days=args.days)
+        migration.print_row_counts()
     else:
         parser.print_help()
 
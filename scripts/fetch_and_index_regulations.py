@@ -81,7 +81,7 @@ async def main() -> None:
     print("[extract] Generating structured rules (JSON) via RAG extractor...")
     rules = []
     try:
-        rules = get_compliance_rules_from_vector_store(top_k=10)
+        rules = await get_compliance_rules_from_vector_store(top_k=10)
     except Exception as e:
         print(f"[warn] Rule extraction failed: {e}. Writing empty rules list; vectors are indexed.")
     rules_path = os.path.join(out_dir, f"rules-{timestamp}.json")
@@ -0,0 +1,973 @@
+"""
+Versioned schema migrations with up/down steps, plus an EXPLAIN check that the
+hot repository queries are served by the indexes created here.
+
+Applied versions are recorded in `schema_migrations`. A session advisory lock
+keeps two runners from migrating the same database at once. Migrations that
+build indexes CONCURRENTLY run outside a transaction, so a big table stays
+writable while they run.
+
+    python scripts/schema_migrations.py upgrade
+    python scripts/schema_migrations.py downgrade 2
+    python scripts/schema_migrations.py status
+    python scripts/schema_migrations.py check-plans
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import psycopg
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+logger = logging.getLogger("SchemaMigrations")
+
+LOCK_KEY = 7_341_001
+
+CONCURRENT_INDEX = re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    up: Sequence[str]
+    down: Sequence[str]
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    transactional: bool = True
+
+
+def _baseline_up() -> List[str]:
+    from scripts.database_migration import SchemaDefinitions
+
+    tables = SchemaDefinitions.get_table_definitions()
+    return [tables[name] for name in ("crew", "flights", "rosters", "audit_log")] + [
+        """
+        CREATE TABLE IF NOT EXISTS disruptions (
+            id SERIAL PRIMARY KEY,
+            type VARCHAR(20) NOT NULL,
+            severity VARCHAR(20) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            description TEXT NOT NULL,
+            affected_flights JSONB NOT NULL,
+            timestamp TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """
+    ]
+
+
+# Columns the domain entities read with SELECT * but the baseline tables never had
+ENTITY_COLUMNS: Dict[str, List[str]] = {
+    "crew": [
+        "current_location VARCHAR(8)", "duty_start_time TIMESTAMP", "duty_end_time TIMESTAMP",
+        "last_rest_start TIMESTAMP", "total_flight_hours_month DOUBLE PRECISION",
+        "total_duty_hours_month DOUBLE PRECISION", "qualifications TEXT[]", "languages TEXT[]",
+        "performance_rating DOUBLE PRECISION", "preferences TEXT[]", "medical_expiry TIMESTAMP",
+        "license_expiry TIMESTAMP", "fatigue_score DOUBLE PRECISION", "predicted_availability DOUBLE PRECISION",
+        "optimization_weight DOUBLE PRECISION",
+    ],
+    "flights": [
+        "actual_departure TIMESTAMP", "actual_arrival TIMESTAMP", "aircraft_registration VARCHAR(16)",
+        "gate_number VARCHAR(8)", "flight_type VARCHAR(32)", "estimated_flight_time DOUBLE PRECISION",
+        "actual_flight_time DOUBLE PRECISION", "distance DOUBLE PRECISION", "crew_requirements JSONB",
+        "minimum_crew_count INT", "passenger_count INT", "cargo_weight DOUBLE PRECISION",
+        "fuel_required DOUBLE PRECISION", "priority_level INT", "revenue DOUBLE PRECISION",
+        "cost_per_delay_hour DOUBLE PRECISION", "weather_info TEXT", "special_requirements JSONB",
+        "delay_probability DOUBLE PRECISION", "crew_utilization_score DOUBLE PRECISION",
+        "disruption_impact DOUBLE PRECISION",
+    ],
+    "rosters": [
+        "assignment_confidence DOUBLE PRECISION", "optimization_score DOUBLE PRECISION",
+        "constraint_violations INT", "actual_duty_hours DOUBLE PRECISION", "crew_feedback_rating DOUBLE PRECISION",
+        "assigned_by VARCHAR(64)", "assigned_at TIMESTAMP",
+    ],
+}
+
+
+def _add_columns() -> List[str]:
+    return [
+        f"ALTER TABLE {table} " + ", ".join(f"ADD COLUMN IF NOT EXISTS {col}" for col in columns)
+        for table, columns in ENTITY_COLUMNS.items()
+    ]
+
+
+def _drop_columns() -> List[str]:
+    return [
+        f"ALTER TABLE {table} " + ", ".join(f"DROP COLUMN IF EXISTS {col.split()[0]}" for col in columns)
+        for table, columns in ENTITY_COLUMNS.items()
+    ]
+
+
+# name -> ON clause; each one backs a query in HOT_QUERIES below
+INDEXES: Dict[str, str] = {
+    "idx_rosters_crew_duty": "rosters (crew_id, duty_start, duty_end)",
+    "idx_rosters_duty_start": "rosters (duty_start)",
+    "idx_rosters_flight_id": "rosters (flight_id)",
+    "idx_flights_schedule": "flights (scheduled_departure, scheduled_arrival)",
+    "idx_crew_status_duty": "crew (status, duty_start_time) INCLUDE (duty_end_time)",
+    "idx_audit_log_timestamp": "audit_log (timestamp DESC)",
+    "idx_disruptions_timestamp": "disruptions (timestamp DESC)",
+}
+
+CHECKS: Dict[str, str] = {
+    "chk_rosters_duty_order": "rosters CHECK (duty_end IS NULL OR duty_start IS NULL OR duty_end > duty_start)",
+    "chk_flights_schedule_order": (
+        "flights CHECK (scheduled_arrival IS NULL OR scheduled_departure IS NULL "
+        "OR scheduled_arrival > scheduled_departure)"
+    ),
+}
+
+
+def _add_checks() -> List[str]:
+    # NOT VALID first, then VALIDATE: the scan runs under a lock that still allows writes
+    statements = []
+    for name, spec in CHECKS.items():
+        table, check = spec.split(" ", 1)
+        statements.append(
+            f"DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{name}') THEN "
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} {check} NOT VALID; END IF; END $$;"
+        )
+        statements.append(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+    return statements
+
+
+def _ensure_partitions_fn(on_create: str = "") -> str:
+    """ensure_monthly_partitions(parent, from, to); `on_create` runs for each new partition `part`."""
+    return """
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent regclass, from_date date, to_date date)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', from_date)::date;
+    created integer := 0;
+    part text;
+BEGIN
+    WHILE month <= to_date LOOP
+        part := format('%s_p%s', parent::text, to_char(month, 'YYYYMM'));
+        IF to_regclass(part) IS NULL THEN
+            BEGIN
+                EXECUTE format('CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                               part, parent, month, (month + interval '1 month')::date);
+                """ + on_create + """
+                created := created + 1;
+            EXCEPTION WHEN duplicate_table THEN
+                NULL;  -- another session created it first
+            END;
+        END IF;
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END $$;
+"""
+
+
+# Partitioned tables: partition key, fallback for legacy NULL keys, full column list
+PARTITIONED: Dict[str, Dict[str, Any]] = {
+    "rosters": {
+        "key": "duty_start",
+        "fill": "COALESCE(duty_start, created_at, LOCALTIMESTAMP)",
+        "columns": [
+            "id INT NOT NULL DEFAULT nextval('rosters_id_seq')", "crew_id INT REFERENCES crew(id)",
+            "flight_id INT REFERENCES flights(id)", "assignment_type VARCHAR(32)", "status VARCHAR(32)",
+            "crew_position VARCHAR(32)", "duty_start TIMESTAMP NOT NULL", "duty_end TIMESTAMP",
+            "report_time TIMESTAMP", "release_time TIMESTAMP", "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+            "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        ] + ENTITY_COLUMNS["rosters"],
+        "foreign_keys": ["FOREIGN KEY (crew_id) REFERENCES crew(id)", "FOREIGN KEY (flight_id) REFERENCES flights(id)"],
+    },
+    "audit_log": {
+        "key": "timestamp",
+        "fill": "COALESCE(timestamp, LOCALTIMESTAMP)",
+        "columns": [
+            "id INT NOT NULL DEFAULT nextval('audit_log_id_seq')", "timestamp TIMESTAMP NOT NULL DEFAULT NOW()",
+            "user_id VARCHAR(255)", "action VARCHAR(255)", "details TEXT", "type VARCHAR(255)",
+        ],
+        "foreign_keys": [],
+    },
+}
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _table_indexes(table: str) -> Dict[str, str]:
+    return {name: spec for name, spec in INDEXES.items() if spec.startswith(f"{table} ")}
+
+
+def _partition_up(table: str) -> List[str]:
+    spec = PARTITIONED[table]
+    key, legacy = spec["key"], f"{table}_unpartitioned"
+    names = [c.split()[0] for c in spec["columns"]]
+    checks = [f"CONSTRAINT {n} {c.split(' ', 1)[1]}" for n, c in CHECKS.items() if c.startswith(f"{table} ")]
+    select = ", ".join(spec["fill"] if n == key else n for n in names)
+    return (
+        [f"ALTER TABLE {table} RENAME TO {legacy}", f"ALTER INDEX {table}_pkey RENAME TO {legacy}_pkey"]
+        + [f"DROP INDEX IF EXISTS {name}" for name in _table_indexes(table)]
+        + [
+            f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE",
+            f"CREATE TABLE {table} ({', '.join(spec['columns'] + checks)}, PRIMARY KEY (id, {key})) "
+            f"PARTITION BY RANGE ({key})",
+            # Every month that holds data, plus the next few so inserts never miss a partition
+            f"SELECT ensure_monthly_partitions('{table}', "
+            f"COALESCE((SELECT MIN({spec['fill']}) FROM {legacy}), LOCALTIMESTAMP)::date, "
+            f"(date_trunc('month', GREATEST(LOCALTIMESTAMP, (SELECT MAX({spec['fill']}) FROM {legacy}))) "
+            f"+ interval '{PARTITION_MONTHS_AHEAD} months')::date)",
+            f"INSERT INTO {table} ({', '.join(names)}) SELECT {select} FROM {legacy}",
+            f"DROP TABLE {legacy}",
+            f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id",
+        ]
+        + [f"CREATE INDEX {name} ON {on}" for name, on in _table_indexes(table).items()]
+        + [f"ANALYZE {table}"]
+    )
+
+
+def _partition_down(table: str) -> List[str]:
+    spec = PARTITIONED[table]
+    staged = f"{table}_partitioned"
+    return (
+        [f"ALTER TABLE {table} RENAME TO {staged}", f"ALTER INDEX {table}_pkey RENAME TO {staged}_pkey"]
+        + [f"DROP INDEX IF EXISTS {name}" for name in _table_indexes(table)]
+        + [
+            f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE",
+            f"CREATE TABLE {table} (LIKE {staged} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            f"ALTER TABLE {table} ADD PRIMARY KEY (id)",
+        ]
+        + [f"ALTER TABLE {table} ADD {fk}" for fk in spec["foreign_keys"]]
+        + [
+            f"INSERT INTO {table} SELECT * FROM {staged}",
+            f"DROP TABLE {staged}",
+            f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id",
+        ]
+        + [f"CREATE INDEX {name} ON {on}" for name, on in _table_indexes(table).items()]
+    )
+
+
+# Duty periods are stored as naive UTC timestamps; the range is their tstzrange, [report, release)
+DUTY_PERIOD_EXPR = "tstzrange(duty_start AT TIME ZONE 'UTC', duty_end AT TIME ZONE 'UTC', '[)')"
+# Cancelled assignments keep their row but no longer block the crew member
+ACTIVE_ROSTER = "status IS DISTINCT FROM 'cancelled'"
+ROSTER_NO_OVERLAP = f"EXCLUDE USING gist (crew_id WITH =, duty_period WITH &&) WHERE ({ACTIVE_ROSTER})"
+# Same clause, quoted for use inside a PL/pgSQL format() string
+_ROSTER_NO_OVERLAP_SQL = ROSTER_NO_OVERLAP.replace("'", "''")
+OVERLAP_LOCK_NS = 36
+
+# Longest duty a roster row may span. Scenario rules flag duty periods over 13h but still store them;
+# this bound lets the cross-partition probe only read partitions a clashing duty could start in.
+MAX_ROSTER_DUTY = "24 hours"
+
+
+def _cross_partition_overlap_fn(bounded: bool = True, open_ended: bool = True) -> str:
+    bound = (
+        f"AND r.duty_start >= NEW.duty_start - interval '{MAX_ROSTER_DUTY}'\n"
+        "          AND r.duty_start < coalesce(NEW.duty_end, 'infinity')\n          "
+    ) if bounded else ""
+    # Rows without a duty_end have no length bound, so the bounded probe cannot see one that started
+    # earlier; they get their own probe, served by the partial idx_rosters_open_duty
+    open_probe = """ OR EXISTS (
+        SELECT 1 FROM rosters r
+        WHERE r.crew_id = NEW.crew_id
+          AND r.duty_end IS NULL
+          AND r.duty_start < coalesce(NEW.duty_end, 'infinity')
+          AND r.status IS DISTINCT FROM 'cancelled'
+          AND date_trunc('month', r.duty_start) <> date_trunc('month', NEW.duty_start)
+          AND NOT (TG_OP = 'UPDATE' AND r.id = OLD.id)
+    )""" if open_ended else ""
+    return f"""
+CREATE OR REPLACE FUNCTION rosters_no_cross_partition_overlap() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    period tstzrange := tstzrange(NEW.duty_start AT TIME ZONE 'UTC', NEW.duty_end AT TIME ZONE 'UTC', '[)');
+BEGIN
+    IF NEW.crew_id IS NULL OR NEW.status IS NOT DISTINCT FROM 'cancelled' THEN
+        RETURN NEW;
+    END IF;
+    -- Each partition's exclusion constraint catches overlaps within its month; this catches a duty that
+    -- overlaps one stored in another month. The lock serialises writers for the same crew member.
+    PERFORM pg_advisory_xact_lock({OVERLAP_LOCK_NS}, NEW.crew_id);
+    IF EXISTS (
+        SELECT 1 FROM rosters r
+        WHERE r.crew_id = NEW.crew_id
+          AND r.duty_period && period
+          {bound}AND r.status IS DISTINCT FROM 'cancelled'
+          AND date_trunc('month', r.duty_start) <> date_trunc('month', NEW.duty_start)
+          AND NOT (TG_OP = 'UPDATE' AND r.id = OLD.id)
+    ){open_probe} THEN
+        RAISE EXCEPTION 'duty period % of crew % overlaps a roster in another month', period, NEW.crew_id
+            USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'rosters_no_cross_partition_overlap';
+    END IF;
+    RETURN NEW;
+END $$;
+"""
+
+
+CHK_ROSTERS_DUTY_LENGTH = f"CHECK (duty_end IS NULL OR duty_end - duty_start <= interval '{MAX_ROSTER_DUTY}')"
+
+# Existing double bookings would make the constraint impossible to add; cancel the later row of each pair
+CANCEL_EXISTING_OVERLAPS = f"""
+DO $$
+DECLARE
+    n integer;
+BEGIN
+    WITH clash AS (
+        SELECT DISTINCT b.id, b.duty_start
+        FROM rosters a
+        JOIN rosters b ON a.crew_id = b.crew_id AND a.id < b.id
+        WHERE tsrange(a.duty_start, a.duty_end, '[)') && tsrange(b.duty_start, b.duty_end, '[)')
+          AND a.{ACTIVE_ROSTER} AND b.{ACTIVE_ROSTER}
+    )
+    UPDATE rosters r SET status = 'cancelled', updated_at = NOW()
+    FROM clash WHERE r.id = clash.id AND r.duty_start = clash.duty_start;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    IF n > 0 THEN
+        RAISE WARNING '% overlapping roster rows were cancelled before adding the no-overlap constraint', n;
+    END IF;
+END $$;
+"""
+
+ADD_PARTITION_EXCLUSIONS = f"""
+DO $$
+DECLARE
+    part regclass;
+BEGIN
+    FOR part IN SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'rosters'::regclass LOOP
+        EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I {_ROSTER_NO_OVERLAP_SQL}', part, part::text || '_no_overlap');
+    END LOOP;
+END $$;
+"""
+
+# New rosters partitions get the same per-partition constraint
+ROSTER_PARTITION_HOOK = (
+    f"IF parent = 'rosters'::regclass THEN EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I {_ROSTER_NO_OVERLAP_SQL}', "
+    "part, part || '_no_overlap'); END IF;"
+)
+
+# Tables whose changes are published for response-cache invalidation (backend/infrastructure/cache)
+CHANGE_NOTIFY_TABLES = ("crew", "flights", "rosters", "disruptions")
+CHANGE_CHANNEL = "table_changed"
+
+# One version per table, bumped once per writing statement and published with NOTIFY (delivered on
+# commit, so listeners never see uncommitted changes). The row lock on table_versions serialises
+# writers of the same table until commit, which is fine at rostering write rates.
+TABLE_CHANGE_FN = f"""
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    v bigint;
+BEGIN
+    INSERT INTO table_versions AS tv (table_name, version, changed_at) VALUES (TG_TABLE_NAME, 1, NOW())
+    ON CONFLICT (table_name) DO UPDATE SET version = tv.version + 1, changed_at = NOW()
+    RETURNING version INTO v;
+    PERFORM pg_notify('{CHANGE_CHANNEL}', TG_TABLE_NAME || ':' || v);
+    RETURN NULL;
+END $$;
+"""
+
+# Row-level roster changes for in-process indexes (backend/infrastructure/database/availability.py).
+# One NOTIFY per statement: the changed rows when there are few, otherwise just "resync".
+ROSTER_ROWS_CHANNEL = "roster_rows"
+ROSTER_ROWS_MAX = 100
+ROSTER_ROWS_FN = f"""
+CREATE OR REPLACE FUNCTION notify_roster_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    payload text;
+BEGIN
+    IF TG_OP <> 'TRUNCATE' THEN
+        SELECT json_build_object('op', TG_OP, 'rows', coalesce(json_agg(json_build_object(
+                   'id', id, 'crew_id', crew_id, 'flight_id', flight_id, 'status', status,
+                   'duty_start', duty_start, 'duty_end', duty_end)), '[]'::json))::text
+          INTO payload
+          FROM (SELECT * FROM changed_rows LIMIT {ROSTER_ROWS_MAX + 1}) r
+        HAVING count(*) <= {ROSTER_ROWS_MAX};
+    END IF;
+    IF payload IS NULL OR octet_length(payload) > 7900 THEN
+        payload := json_build_object('op', TG_OP, 'resync', true)::text;
+    END IF;
+    PERFORM pg_notify('{ROSTER_ROWS_CHANNEL}', payload);
+    RETURN NULL;
+END $$;
+"""
+# Transition tables allow only one event per trigger
+ROSTER_ROWS_TRIGGERS = {
+    "rosters_notify_rows_ins": "AFTER INSERT ON rosters REFERENCING NEW TABLE AS changed_rows",
+    "rosters_notify_rows_upd": "AFTER UPDATE ON rosters REFERENCING NEW TABLE AS changed_rows",
+    "rosters_notify_rows_del": "AFTER DELETE ON rosters REFERENCING OLD TABLE AS changed_rows",
+    "rosters_notify_rows_trunc": "AFTER TRUNCATE ON rosters",
+}
+
+# Crew to rescore (backend/infrastructure/database/fatigue.py): every roster change queues the crew
+# on both sides of it; the incremental job drains the queue, the nightly run rescores everyone.
+FATIGUE_QUEUE_FN = """
+CREATE OR REPLACE FUNCTION queue_fatigue_rescore() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO fatigue_queue (crew_id)
+    SELECT DISTINCT crew_id FROM changed_rows WHERE crew_id IS NOT NULL
+    ON CONFLICT DO NOTHING;
+    IF TG_OP = 'UPDATE' THEN
+        INSERT INTO fatigue_queue (crew_id)
+        SELECT DISTINCT crew_id FROM previous_rows WHERE crew_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END $$;
+"""
+FATIGUE_QUEUE_TRIGGERS = {
+    "rosters_fatigue_queue_ins": "AFTER INSERT ON rosters REFERENCING NEW TABLE AS changed_rows",
+    "rosters_fatigue_queue_upd": "AFTER UPDATE ON rosters REFERENCING OLD TABLE AS previous_rows NEW TABLE AS changed_rows",
+    "rosters_fatigue_queue_del": "AFTER DELETE ON rosters REFERENCING OLD TABLE AS changed_rows",
+}
+
+# Per-crew, per-month duty and flight hours (backend/infrastructure/database/duty_hours.py), kept in step
+# with rosters by statement triggers in the writing transaction, so RosterRepository.save/bulk_save need
+# no extra round trips. A duty counts toward the month it starts in; flight hours are the block time of
+# the rostered flight (actual when flown, else scheduled). The current month is mirrored onto
+# crew.total_duty_hours_month/total_flight_hours_month. Flight time changes are not tracked here: the
+# consistency check reports the drift and reconcile_month_hours rewrites the month.
+ROSTER_DUTY_HOURS_SQL = "coalesce(EXTRACT(EPOCH FROM r.duty_end - r.duty_start) / 3600, 0)"
+ROSTER_FLIGHT_HOURS_SQL = (
+    "coalesce(EXTRACT(EPOCH FROM coalesce(f.actual_arrival - f.actual_departure, "
+    "f.scheduled_arrival - f.scheduled_departure)) / 3600, 0)"
+)
+
+
+CURRENT_MONTH_SQL = "date_trunc('month', NOW() AT TIME ZONE 'UTC')::date"
+
+
+def _month_hours_delta(rows: str, sign: str, crew_guard: bool = True) -> str:
+    # An UPDATE on crew fires crew's change notification even when it matches no rows, so with
+    # crew_guard the mirror update only runs when the statement touched current-month duties
+    changed = "r.status IS DISTINCT FROM 'cancelled' AND r.crew_id IS NOT NULL AND r.duty_start IS NOT NULL"
+    upsert = f"""
+        INSERT INTO crew_month_hours AS m (crew_id, month, duty_hours, flight_hours, duties)
+        SELECT r.crew_id, date_trunc('month', r.duty_start)::date,
+               {sign}sum({ROSTER_DUTY_HOURS_SQL}), {sign}sum({ROSTER_FLIGHT_HOURS_SQL}), {sign}count(*)
+        FROM {rows} r LEFT JOIN flights f ON f.id = r.flight_id
+        WHERE {changed}
+        GROUP BY 1, 2
+        ON CONFLICT (crew_id, month) DO UPDATE SET
+            duty_hours = m.duty_hours + EXCLUDED.duty_hours,
+            flight_hours = m.flight_hours + EXCLUDED.flight_hours,
+            duties = m.duties + EXCLUDED.duties"""
+    mirrored = f"""
+    WITH delta AS ({upsert}
+        RETURNING m.crew_id, m.month, m.duty_hours, m.flight_hours
+    )
+    UPDATE crew c SET total_duty_hours_month = d.duty_hours, total_flight_hours_month = d.flight_hours
+    FROM delta d
+    WHERE c.id = d.crew_id AND d.month = {CURRENT_MONTH_SQL};
+    """
+    if not crew_guard:
+        return mirrored
+    return f"""
+    IF EXISTS (SELECT 1 FROM {rows} r WHERE {changed} AND date_trunc('month', r.duty_start)::date = {CURRENT_MONTH_SQL}) THEN
+        {mirrored}
+    ELSE
+        {upsert};
+    END IF;
+    """
+
+
+def _crew_month_hours_fn(crew_guard: bool = True) -> str:
+    return f"""
+CREATE OR REPLACE FUNCTION apply_crew_month_hours() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM crew_month_hours;
+        UPDATE crew SET total_duty_hours_month = 0, total_flight_hours_month = 0;
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        {_month_hours_delta("old_rows", "-", crew_guard)}
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        {_month_hours_delta("new_rows", "", crew_guard)}
+    END IF;
+    RETURN NULL;
+END $$;
+"""
+
+
+CREW_MONTH_HOURS_TRIGGERS = {
+    "rosters_month_hours_ins": "AFTER INSERT ON rosters REFERENCING NEW TABLE AS new_rows",
+    "rosters_month_hours_upd": "AFTER UPDATE ON rosters REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "rosters_month_hours_del": "AFTER DELETE ON rosters REFERENCING OLD TABLE AS old_rows",
+    "rosters_month_hours_trunc": "AFTER TRUNCATE ON rosters",
+}
+CREW_MONTH_HOURS_BACKFILL = f"""
+INSERT INTO crew_month_hours (crew_id, month, duty_hours, flight_hours, duties)
+SELECT r.crew_id, date_trunc('month', r.duty_start)::date,
+       sum({ROSTER_DUTY_HOURS_SQL}), sum({ROSTER_FLIGHT_HOURS_SQL}), count(*)
+FROM rosters r LEFT JOIN flights f ON f.id = r.flight_id
+WHERE r.status IS DISTINCT FROM 'cancelled' AND r.crew_id IS NOT NULL AND r.duty_start IS NOT NULL
+GROUP BY 1, 2
+"""
+CREW_MONTH_TOTALS_REFRESH = """
+UPDATE crew c SET total_duty_hours_month = t.duty_hours, total_flight_hours_month = t.flight_hours
+FROM (
+    SELECT c2.id, coalesce(m.duty_hours, 0) AS duty_hours, coalesce(m.flight_hours, 0) AS flight_hours
+    FROM crew c2 LEFT JOIN crew_month_hours m
+      ON m.crew_id = c2.id AND m.month = date_trunc('month', NOW() AT TIME ZONE 'UTC')::date
+) t
+WHERE c.id = t.id
+  AND (c.total_duty_hours_month IS DISTINCT FROM t.duty_hours
+       OR c.total_flight_hours_month IS DISTINCT FROM t.flight_hours)
+"""
+
+# rosters' primary key is (id, duty_start), so each partition only keeps ids unique within its month.
+# roster_ids holds one row per roster id; its primary key rejects the same id in a second partition.
+# Updates that keep a row's id leave it alone, including ones that move the row to another partition.
+ROSTER_IDS_FN = """
+CREATE OR REPLACE FUNCTION sync_roster_ids() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE roster_ids;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO roster_ids (id) SELECT id FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM roster_ids k USING old_rows o WHERE k.id = o.id;
+    ELSE
+        DELETE FROM roster_ids k USING old_rows o
+        WHERE k.id = o.id AND NOT EXISTS (SELECT 1 FROM new_rows n WHERE n.id = o.id);
+        INSERT INTO roster_ids (id)
+        SELECT n.id FROM new_rows n WHERE NOT EXISTS (SELECT 1 FROM old_rows o WHERE o.id = n.id);
+    END IF;
+    RETURN NULL;
+END $$;
+"""
+ROSTER_IDS_TRIGGERS = {
+    "rosters_ids_ins": "AFTER INSERT ON rosters REFERENCING NEW TABLE AS new_rows",
+    "rosters_ids_upd": "AFTER UPDATE ON rosters REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "rosters_ids_del": "AFTER DELETE ON rosters REFERENCING OLD TABLE AS old_rows",
+    "rosters_ids_trunc": "AFTER TRUNCATE ON rosters",
+}
+# Upserts keyed on (id, duty_start) inserted a second row when duty_start changed; keep the latest copy
+DELETE_DUPLICATE_ROSTER_IDS = """
+DO $$
+DECLARE
+    n integer;
+BEGIN
+    WITH ranked AS (
+        SELECT id, duty_start, row_number() OVER (
+            PARTITION BY id ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, duty_start DESC
+        ) AS rank
+        FROM rosters
+    )
+    DELETE FROM rosters r USING ranked
+    WHERE ranked.rank > 1 AND r.id = ranked.id AND r.duty_start = ranked.duty_start;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    IF n > 0 THEN
+        RAISE WARNING '% stale roster rows sharing an id with a later row were deleted', n;
+    END IF;
+END $$;
+"""
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1, "baseline_tables",
+        up=_baseline_up(),
+        down=["DROP TABLE IF EXISTS disruptions CASCADE"]
+        + [f"DROP TABLE IF EXISTS {t} CASCADE" for t in ("rosters", "flights", "crew", "audit_log")],
+    ),
+    Migration(2, "entity_columns", up=_add_columns(), down=_drop_columns()),
+    Migration(
+        3, "performance_indexes",
+        up=[f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {spec}" for name, spec in INDEXES.items()]
+        + [f"ANALYZE {t}" for t in ("crew", "flights", "rosters", "audit_log", "disruptions")],
+        down=[f"DROP INDEX CONCURRENTLY IF EXISTS {name}" for name in INDEXES],
+        transactional=False,
+    ),
+    Migration(
+        4, "check_constraints",
+        up=_add_checks(),
+        down=[f"ALTER TABLE {spec.split(' ', 1)[0]} DROP CONSTRAINT IF EXISTS {name}" for name, spec in CHECKS.items()],
+    ),
+    Migration(
+        5, "monthly_partitions",
+        # Rewrites both tables in one transaction; on a large live database run it in a maintenance window
+        up=[_ensure_partitions_fn()] + _partition_up("rosters") + _partition_up("audit_log"),
+        down=_partition_down("audit_log") + _partition_down("rosters")
+        + ["DROP FUNCTION IF EXISTS ensure_monthly_partitions(regclass, date, date)"],
+    ),
+    Migration(
+        6, "roster_no_overlap",
+        up=[
+            "CREATE EXTENSION IF NOT EXISTS btree_gist",
+            CANCEL_EXISTING_OVERLAPS,
+            f"ALTER TABLE rosters ADD COLUMN duty_period tstzrange GENERATED ALWAYS AS ({DUTY_PERIOD_EXPR}) STORED",
+            ADD_PARTITION_EXCLUSIONS,
+            "CREATE INDEX idx_rosters_duty_period ON rosters USING gist (duty_period)",
+            _cross_partition_overlap_fn(bounded=False, open_ended=False),
+            "CREATE TRIGGER rosters_no_cross_partition_overlap "
+            "BEFORE INSERT OR UPDATE OF crew_id, duty_start, duty_end, status ON rosters "
+            "FOR EACH ROW EXECUTE FUNCTION rosters_no_cross_partition_overlap()",
+            _ensure_partitions_fn(ROSTER_PARTITION_HOOK),
+        ],
+        down=[
+            _ensure_partitions_fn(),
+            "DROP TRIGGER IF EXISTS rosters_no_cross_partition_overlap ON rosters",
+            "DROP FUNCTION IF EXISTS rosters_no_cross_partition_overlap()",
+            "DROP INDEX IF EXISTS idx_rosters_duty_period",
+            # Dropping the column also drops every partition's exclusion constraint
+            "ALTER TABLE rosters DROP COLUMN IF EXISTS duty_period",
+        ],
+    ),
+    Migration(
+        7, "change_notifications",
+        up=[
+            "CREATE TABLE IF NOT EXISTS table_versions ("
+            "table_name TEXT PRIMARY KEY, version BIGINT NOT NULL, changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW())",
+            "INSERT INTO table_versions (table_name, version) VALUES "
+            + ", ".join(f"('{t}', 1)" for t in CHANGE_NOTIFY_TABLES) + " ON CONFLICT DO NOTHING",
+            TABLE_CHANGE_FN,
+        ]
+        + [
+            f"CREATE TRIGGER {t}_notify_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {t} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()"
+            for t in CHANGE_NOTIFY_TABLES
+        ],
+        down=[f"DROP TRIGGER IF EXISTS {t}_notify_change ON {t}" for t in CHANGE_NOTIFY_TABLES]
+        + ["DROP FUNCTION IF EXISTS notify_table_change()", "DROP TABLE IF EXISTS table_versions"],
+    ),
+    Migration(
+        8, "roster_row_notifications",
+        up=[ROSTER_ROWS_FN]
+        + [f"CREATE TRIGGER {name} {spec} FOR EACH STATEMENT EXECUTE FUNCTION notify_roster_rows()"
+           for name, spec in ROSTER_ROWS_TRIGGERS.items()],
+        down=[f"DROP TRIGGER IF EXISTS {name} ON rosters" for name in ROSTER_ROWS_TRIGGERS]
+        + ["DROP FUNCTION IF EXISTS notify_roster_rows()"],
+    ),
+    Migration(
+        9, "fatigue_rescore_queue",
+        up=[
+            "CREATE TABLE IF NOT EXISTS fatigue_queue ("
+            "crew_id INTEGER PRIMARY KEY, queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW())",
+            # One row per scheduled job; claiming a run is a conditional UPDATE of its started_at
+            "CREATE TABLE IF NOT EXISTS fatigue_runs ("
+            "kind TEXT PRIMARY KEY, started_at TIMESTAMPTZ, finished_at TIMESTAMPTZ, crew_scored INTEGER)",
+            "INSERT INTO fatigue_runs (kind) VALUES ('full') ON CONFLICT DO NOTHING",
+            FATIGUE_QUEUE_FN,
+        ]
+        + [f"CREATE TRIGGER {name} {spec} FOR EACH STATEMENT EXECUTE FUNCTION queue_fatigue_rescore()"
+           for name, spec in FATIGUE_QUEUE_TRIGGERS.items()],
+        down=[f"DROP TRIGGER IF EXISTS {name} ON rosters" for name in FATIGUE_QUEUE_TRIGGERS]
+        + [
+            "DROP FUNCTION IF EXISTS queue_fatigue_rescore()",
+            "DROP TABLE IF EXISTS fatigue_runs",
+            "DROP TABLE IF EXISTS fatigue_queue",
+        ],
+    ),
+    Migration(
+        10, "crew_month_hours",
+        up=[
+            "CREATE TABLE IF NOT EXISTS crew_month_hours ("
+            "crew_id INTEGER NOT NULL, month DATE NOT NULL, duty_hours DOUBLE PRECISION NOT NULL DEFAULT 0, "
+            "flight_hours DOUBLE PRECISION NOT NULL DEFAULT 0, duties INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (crew_id, month))",
+            # Lock out roster writers between the backfill and the triggers taking over
+            "LOCK TABLE rosters IN SHARE MODE",
+            CREW_MONTH_HOURS_BACKFILL,
+            CREW_MONTH_TOTALS_REFRESH,
+            _crew_month_hours_fn(crew_guard=False),
+        ]
+        + [f"CREATE TRIGGER {name} {spec} FOR EACH STATEMENT EXECUTE FUNCTION apply_crew_month_hours()"
+           for name, spec in CREW_MONTH_HOURS_TRIGGERS.items()],
+        down=[f"DROP TRIGGER IF EXISTS {name} ON rosters" for name in CREW_MONTH_HOURS_TRIGGERS]
+        + ["DROP FUNCTION IF EXISTS apply_crew_month_hours()", "DROP TABLE IF EXISTS crew_month_hours"],
+    ),
+    Migration(
+        11, "roster_id_uniqueness",
+        up=[
+            "CREATE TABLE IF NOT EXISTS roster_ids (id INTEGER PRIMARY KEY)",
+            "LOCK TABLE rosters IN SHARE ROW EXCLUSIVE MODE",
+            DELETE_DUPLICATE_ROSTER_IDS,
+            "INSERT INTO roster_ids (id) SELECT id FROM rosters",
+            ROSTER_IDS_FN,
+        ]
+        + [f"CREATE TRIGGER {name} {spec} FOR EACH STATEMENT EXECUTE FUNCTION sync_roster_ids()"
+           for name, spec in ROSTER_IDS_TRIGGERS.items()],
+        down=[f"DROP TRIGGER IF EXISTS {name} ON rosters" for name in ROSTER_IDS_TRIGGERS]
+        + ["DROP FUNCTION IF EXISTS sync_roster_ids()", "DROP TABLE IF EXISTS roster_ids"],
+    ),
+    Migration(
+        12, "bounded_overlap_probe",
+        up=[
+            # NOT VALID first, then VALIDATE, as in check_constraints
+            f"ALTER TABLE rosters ADD CONSTRAINT chk_rosters_duty_length {CHK_ROSTERS_DUTY_LENGTH} NOT VALID",
+            "ALTER TABLE rosters VALIDATE CONSTRAINT chk_rosters_duty_length",
+            _cross_partition_overlap_fn(open_ended=False),
+        ],
+        down=[
+            _cross_partition_overlap_fn(bounded=False, open_ended=False),
+            "ALTER TABLE rosters DROP CONSTRAINT IF EXISTS chk_rosters_duty_length",
+        ],
+    ),
+    Migration(
+        13, "open_ended_overlap_probe",
+        up=[
+            "CREATE INDEX IF NOT EXISTS idx_rosters_open_duty ON rosters (crew_id, duty_start) "
+            f"WHERE duty_end IS NULL AND {ACTIVE_ROSTER}",
+            _cross_partition_overlap_fn(),
+        ],
+        down=[
+            _cross_partition_overlap_fn(open_ended=False),
+            "DROP INDEX IF EXISTS idx_rosters_open_duty",
+        ],
+    ),
+    Migration(
+        14, "month_hours_crew_guard",
+        up=[_crew_month_hours_fn()],
+        down=[_crew_month_hours_fn(crew_guard=False)],
+    ),
+]
+
+
+@dataclass
+class AppliedMigration:
+    version: int
+    name: str
+    applied_at: datetime
+
+
+class MigrationRunner:
+    def __init__(self, dsn: str, migrations: Sequence[Migration] = MIGRATIONS):
+        versions = [m.version for m in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError("Migration versions must be unique and increasing")
+        self.dsn = dsn
+        self.migrations = list(migrations)
+
+    def _connect(self) -> psycopg.Connection:
+        conn = psycopg.connect(self.dsn, autocommit=True)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(128) NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+        conn.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+        return conn
+
+    def applied(self, conn: Optional[psycopg.Connection] = None) -> List[AppliedMigration]:
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            rows = conn.execute("SELECT version, name, applied_at FROM schema_migrations ORDER BY version").fetchall()
+            return [AppliedMigration(*row) for row in rows]
+        finally:
+            if own:
+                conn.close()
+
+    @staticmethod
+    def _run(conn: psycopg.Connection, migration: Migration, statements: Sequence[str], record_sql: str,
+             record_params: Sequence[Any]) -> None:
+        if migration.transactional:
+            with conn.transaction():
+                for sql in statements:
+                    conn.execute(sql)
+                conn.execute(record_sql, record_params)
+        else:
+            # Each statement commits on its own, so a retry after a failure re-runs the ones that
+            # already succeeded; IF [NOT] EXISTS covers those, except an index a failed CONCURRENTLY
+            # build left behind INVALID, which IF NOT EXISTS would keep
+            for sql in statements:
+                MigrationRunner._drop_invalid_index(conn, sql)
+                conn.execute(sql)
+            conn.execute(record_sql, record_params)
+
+    @staticmethod
+    def _drop_invalid_index(conn: psycopg.Connection, sql: str) -> None:
+        match = CONCURRENT_INDEX.search(sql)
+        if match is None:
+            return
+        row = conn.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                           (match.group(1),)).fetchone()
+        if row is not None and not row[0]:
+            logger.warning(f"Dropping invalid index {match.group(1)} left by an earlier failed build")
+            conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}")
+
+    def upgrade(self, target: Optional[int] = None) -> List[int]:
+        done: List[int] = []
+        with self._connect() as conn:
+            current = {m.version for m in self.applied(conn)}
+            for migration in self.migrations:
+                if migration.version in current or (target is not None and migration.version > target):
+                    continue
+                logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+                self._run(conn, migration, migration.up,
+                          "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                          (migration.version, migration.name))
+                done.append(migration.version)
+        return done
+
+    def downgrade(self, target: int) -> List[int]:
+        """Revert every applied migration above `target` (0 reverts everything)."""
+        done: List[int] = []
+        with self._connect() as conn:
+            current = {m.version for m in self.applied(conn)}
+            for migration in reversed(self.migrations):
+                if migration.version not in current or migration.version <= target:
+                    continue
+                logger.info(f"Reverting migration {migration.version:04d}_{migration.name}")
+                self._run(conn, migration, migration.down,
+                          "DELETE FROM schema_migrations WHERE version = %s", (migration.version,))
+                done.append(migration.version)
+        return done
+
+    def status(self) -> List[Dict[str, Any]]:
+        applied = {m.version: m for m in self.applied()}
+        return [
+            {
+                "version": m.version,
+                "name": m.name,
+                "applied_at": applied[m.version].applied_at.isoformat() if m.version in applied else None,
+            }
+            for m in self.migrations
+        ]
+
+
+@dataclass
+class HotQuery:
+    name: str
+    sql: str
+    params: Sequence[Any]
+    index: str
+    # Partitioned tables: the most partitions the plan may touch after pruning
+    max_partitions: Optional[int] = None
+
+
+# Mirrors the repository/controller statements; params are typical values for the synthetic data
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("roster.by_crew_and_date",
+             "SELECT * FROM rosters WHERE crew_id = %s AND duty_start >= %s AND duty_end <= %s",
+             (42, datetime(2025, 1, 10), datetime(2025, 1, 17)), "idx_rosters_crew_duty"),
+    HotQuery("roster.by_duty_window",
+             "SELECT * FROM rosters WHERE duty_start >= %s AND duty_start <= %s",
+             (datetime(2025, 1, 10), datetime(2025, 1, 10, 6)), "idx_rosters_duty_start", max_partitions=1),
+    HotQuery("roster.on_duty",
+             "SELECT * FROM rosters WHERE duty_period && tstzrange(%s::timestamp AT TIME ZONE 'UTC', "
+             "%s::timestamp AT TIME ZONE 'UTC', '[)') AND duty_start < %s",
+             (datetime(2025, 1, 10, 6), datetime(2025, 1, 10, 7), datetime(2025, 1, 10, 7)),
+             "idx_rosters_duty_period"),
+    # The cross-partition overlap trigger's probe (migration 0012): the duty_start bounds prune partitions
+    HotQuery("roster.overlap_probe",
+             "SELECT 1 FROM rosters r WHERE r.crew_id = %s AND r.duty_period && tstzrange(%s::timestamp AT TIME ZONE 'UTC', "
+             f"%s::timestamp AT TIME ZONE 'UTC', '[)') AND r.duty_start >= %s::timestamp - interval '{MAX_ROSTER_DUTY}' "
+             "AND r.duty_start < %s",
+             (42, datetime(2025, 1, 10, 6), datetime(2025, 1, 10, 16), datetime(2025, 1, 10, 6), datetime(2025, 1, 10, 16)),
+             "idx_rosters_crew_duty", max_partitions=2),
+    HotQuery("roster.by_flight", "SELECT * FROM rosters WHERE flight_id = %s", (1234,), "idx_rosters_flight_id"),
+    HotQuery("flight.by_date_range",
+             "SELECT * FROM flights WHERE scheduled_departure >= %s AND scheduled_arrival <= %s",
+             (datetime(2025, 1, 10), datetime(2025, 1, 10, 6)), "idx_flights_schedule"),
+    HotQuery("crew.available",
+             "SELECT * FROM crew WHERE status = 'available' AND duty_start_time <= %s AND duty_end_time >= %s",
+             (datetime(2025, 1, 10), datetime(2025, 1, 10, 8)), "idx_crew_status_duty"),
+    HotQuery("audit_log.recent",
+             'SELECT id, timestamp, user_id AS "user", action, details, type FROM audit_log '
+             "WHERE timestamp >= %s AND timestamp < %s ORDER BY timestamp DESC LIMIT %s",
+             (datetime(2025, 3, 1), datetime(2025, 3, 31), 500), "idx_audit_log_timestamp", max_partitions=1),
+]
+
+INDEX_NODE_TYPES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def iter_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def indexes_used(explain_json: Any) -> List[str]:
+    """Index names read by index/bitmap scans anywhere in an EXPLAIN (FORMAT JSON) result."""
+    if isinstance(explain_json, str):
+        explain_json = json.loads(explain_json)
+    root = explain_json[0]["Plan"] if isinstance(explain_json, list) else explain_json["Plan"]
+    return [n["Index Name"] for n in iter_plan_nodes(root) if n.get("Node Type") in INDEX_NODE_TYPES]
+
+
+def relations_scanned(explain_json: Any) -> List[str]:
+    root = explain_json[0]["Plan"] if isinstance(explain_json, list) else explain_json["Plan"]
+    return sorted({n["Relation Name"] for n in iter_plan_nodes(root) if "Relation Name" in n})
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    index: str
+    used: List[str] = field(default_factory=list)
+    node_types: List[str] = field(default_factory=list)
+    relations: List[str] = field(default_factory=list)
+    max_partitions: Optional[int] = None
+
+    @property
+    def pruned(self) -> bool:
+        return self.max_partitions is None or len(self.relations) <= self.max_partitions
+
+    @property
+    def ok(self) -> bool:
+        return self.index in self.used and self.pruned
+
+
+def check_query_plans(dsn: str, queries: Sequence[HotQuery] = HOT_QUERIES) -> List[PlanCheck]:
+    # Only meaningful on a realistically sized, analyzed database (e.g. after --synthetic 10):
+    # on a few hundred rows a sequential scan is the right plan.
+    results = []
+    with psycopg.connect(dsn) as conn:
+        for q in queries:
+            plan = conn.execute("EXPLAIN (FORMAT JSON) " + q.sql, q.params).fetchone()[0]
+            used = indexes_used(plan)
+            # Scans on a partition name the partition's own index; credit the parent index it belongs to
+            parents = conn.execute(
+                "SELECT p.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent WHERE c.relname = ANY(%s)", (used,),
+            ).fetchall()
+            node_types = [n["Node Type"] for n in iter_plan_nodes(plan[0]["Plan"])]
+            results.append(PlanCheck(
+                q.name, q.index, used + [r[0] for r in parents], node_types, relations_scanned(plan), q.max_partitions,
+            ))
+    return results
+
+
+def print_plan_checks(results: Sequence[PlanCheck]) -> int:
+    failed = 0
+    for r in results:
+        status = "ok" if r.ok else ("UNPRUNED" if r.index in r.used else "MISSING")
+        failed += not r.ok
+        print(f"  [{status:8}] {r.name:28} expects {r.index:26} partitions={len(r.relations)} "
+              f"plan: {' > '.join(r.node_types)}")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    from scripts.database_migration import DatabaseConfig, setup_logging
+
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade")
+    up.add_argument("target", type=int, nargs="?")
+    down = sub.add_parser("downgrade")
+    down.add_argument("target", type=int)
+    sub.add_parser("status")
+    sub.add_parser("check-plans")
+    args = parser.parse_args(argv)
+
+    runner = MigrationRunner(DatabaseConfig().dsn)
+    if args.command == "upgrade":
+        print("Applied:", runner.upgrade(args.target))
+    elif args.command == "downgrade":
+        print("Reverted:", runner.downgrade(args.target))
+    elif args.command == "status":
+        for row in runner.status():
+            print(f"  {row['version']:04d}_{row['name']:24} {row['applied_at'] or 'pending'}")
+    else:
+        return print_plan_checks(check_query_plans(runner.dsn))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
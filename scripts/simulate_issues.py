@@ -37,15 +37,20 @@ async def main():
                 if cap:
                     captain_id = cap[0]
                     # assign same captain to both flights with overlapping times
-                    for fid in (f1[0], f2[0]):
-                        await cur.execute(
-                            """
-                            INSERT INTO rosters (crew_id, flight_id, crew_position, status)
-                            VALUES (%s, %s, %s, %s)
-                            ON CONFLICT DO NOTHING
-                            """,
-                            (captain_id, fid, 'captain', 'active'),
-                        )
+                    # (duty_start is the partition key of rosters, so it must be set)
+                    for fid, _, dep, arr in (f1, f2):
+                        try:
+                            async with conn.transaction():
+                                await cur.execute(
+                                    """
+                                    INSERT INTO rosters (crew_id, flight_id, crew_position, status, duty_start, duty_end)
+                                    VALUES (%s, %s, %s, %s, %s, %s)
+                                    """,
+                                    (captain_id, fid, 'captain', 'active', dep - timedelta(hours=1), arr),
+                                )
+                        except psycopg.errors.ExclusionViolation as exc:
+                            # Expected once the no-overlap constraint is in place
+                            print(f"Overlapping roster for captain {captain_id} rejected: {exc.diag.message_primary}")
 
             # 2) Add upcoming disruptions forecasts
             disruptions = [
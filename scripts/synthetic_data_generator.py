@@ -0,0 +1,314 @@
+"""
+Seeded, scalable synthetic data for performance testing.
+
+The network is built from aircraft: every aircraft belongs to a base airport and
+flies a fixed number of legs per day that chain by airport (each leg departs
+where the previous one arrived, and the day ends back at base). Crew belong to
+the same base, are rated on its aircraft type and work in teams; one team flies
+an aircraft's whole day as a single duty and then rests while the other teams
+rotate in. Each leg's roster row covers its share of that duty (report to the
+next departure, the last one to release), so a crew member's rows never
+overlap at any scale.
+
+Work is split into partitions of consecutive aircraft. Each partition derives
+its own RNG from (seed, partition) and owns fixed id ranges, so any partition
+can be generated in any process in any order and the output is identical.
+Rows are written with COPY, one worker process per partition in flight.
+
+    python scripts/synthetic_data_generator.py --scale 10 --workers 8
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import psycopg
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+logger = logging.getLogger("SyntheticDataGenerator")
+
+# Domestic network: (lat, lon)
+AIRPORTS: Dict[str, Tuple[float, float]] = {
+    "DEL": (28.556, 77.100), "BOM": (19.089, 72.868), "BLR": (13.199, 77.706), "HYD": (17.240, 78.429),
+    "MAA": (12.994, 80.171), "CCU": (22.654, 88.447), "AMD": (23.077, 72.635), "PNQ": (18.582, 73.920),
+    "COK": (10.152, 76.402), "GOI": (15.381, 73.831), "JAI": (26.824, 75.812), "LKO": (26.761, 80.889),
+    "GAU": (26.106, 91.586), "PAT": (25.591, 85.088), "IXC": (30.673, 76.788), "TRV": (8.482, 76.920),
+}
+BASES = ["DEL", "BOM", "BLR", "HYD", "MAA", "CCU"]
+AIRCRAFT_TYPES = ["A320", "A321", "ATR72"]
+
+# A team covers one aircraft-day: two pilots and four cabin crew
+TEAM = [("CAPTAIN", "captain"), ("FIRST_OFFICER", "first_officer")] + [("FLIGHT_ATTENDANT", "flight_attendant")] * 4
+TEAMS_PER_AIRCRAFT = 3
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Meera", "Rohan", "Saanvi",
+               "Arjun", "Priya", "Karan", "Neha", "Vikram", "Pooja"]
+LAST_NAMES = ["Sharma", "Verma", "Iyer", "Nair", "Reddy", "Gupta", "Singh", "Das", "Menon", "Kulkarni",
+              "Patel", "Bose", "Rao", "Chopra"]
+AUDIT_ACTIONS = [("Roster Update", "roster_change"), ("Disruption Alert", "disruption"),
+                 ("Compliance Rule Update", "rule_update"), ("System Maintenance", "system")]
+AUDIT_USERS = ["admin", "system", "compliance_officer", "dispatcher"]
+
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "crew": ("id", "employee_id", "first_name", "last_name", "rank", "base_airport", "hire_date",
+             "seniority_number", "status", "current_location", "duty_start_time", "duty_end_time", "qualifications"),
+    "flights": ("id", "flight_number", "airline_code", "departure_airport", "arrival_airport",
+                "scheduled_departure", "scheduled_arrival", "aircraft_type", "status", "aircraft_registration"),
+    "rosters": ("id", "crew_id", "flight_id", "assignment_type", "status", "crew_position",
+                "duty_start", "duty_end", "report_time", "release_time"),
+    "audit_log": ("id", "timestamp", "user_id", "action", "details", "type"),
+}
+# Parents before children so foreign keys hold inside each partition's transaction
+LOAD_ORDER = ("crew", "flights", "rosters", "audit_log")
+
+REPORT_BEFORE = timedelta(minutes=60)
+RELEASE_AFTER = timedelta(minutes=30)
+MIN_TURN = timedelta(minutes=35)
+MAX_SECTOR = timedelta(minutes=150)
+
+
+@dataclass(frozen=True)
+class ScaleSpec:
+    """Sizes derived from a scale factor; scale 1 is ~14k flights and ~86k roster rows."""
+
+    scale: float = 1.0
+    seed: int = 42
+    start: date = date(2025, 1, 1)
+    days: int = 90
+    aircraft_per_scale: int = 40
+    legs_per_day: int = 4
+    aircraft_per_partition: int = 8
+    audit_per_aircraft: int = 50
+
+    def __post_init__(self):
+        if self.legs_per_day < 2 or self.legs_per_day % 2:
+            raise ValueError("legs_per_day must be a positive even number so each day ends at base")
+
+    @property
+    def aircraft(self) -> int:
+        return max(1, int(round(self.aircraft_per_scale * self.scale)))
+
+    @property
+    def crew_per_aircraft(self) -> int:
+        return TEAMS_PER_AIRCRAFT * len(TEAM)
+
+    @property
+    def flights_per_aircraft(self) -> int:
+        return self.days * self.legs_per_day
+
+    @property
+    def partitions(self) -> int:
+        return math.ceil(self.aircraft / self.aircraft_per_partition)
+
+    def totals(self) -> Dict[str, int]:
+        flights = self.aircraft * self.flights_per_aircraft
+        return {
+            "crew": self.aircraft * self.crew_per_aircraft,
+            "flights": flights,
+            "rosters": flights * len(TEAM),
+            "audit_log": self.aircraft * self.audit_per_aircraft,
+        }
+
+    def aircraft_range(self, partition: int) -> range:
+        first = partition * self.aircraft_per_partition
+        return range(first, min(first + self.aircraft_per_partition, self.aircraft))
+
+
+def block_time(origin: str, destination: str) -> timedelta:
+    (lat1, lon1), (lat2, lon2) = AIRPORTS[origin], AIRPORTS[destination]
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    km = 2 * 6371 * math.asin(math.sqrt(math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2))
+    # ~750 km/h cruise plus 25 minutes of taxi/climb/descent, rounded to 5 minutes
+    minutes = 25 + km / 750 * 60
+    return timedelta(minutes=int(5 * round(minutes / 5)))
+
+
+@lru_cache(maxsize=None)
+def _outstations(base: str) -> Tuple[str, ...]:
+    # Short sectors only, so four legs plus turns fit in a single day's duty
+    return tuple(a for a in AIRPORTS if a != base and block_time(base, a) <= MAX_SECTOR)
+
+
+def _rotation(rng: random.Random, base: str, legs: int) -> List[Tuple[str, str]]:
+    """Airport pairs for one aircraft-day: out-and-back trips that start and end at base."""
+    pairs: List[Tuple[str, str]] = []
+    while len(pairs) < legs:
+        outstation = rng.choice(_outstations(base))
+        pairs.append((base, outstation))
+        pairs.append((outstation, base))
+    return pairs
+
+
+def generate_partition(spec: ScaleSpec, partition: int) -> Dict[str, List[tuple]]:
+    """All rows for one partition; pure function of (spec, partition)."""
+    rng = random.Random(f"{spec.seed}:{partition}")
+    rows: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+    start = datetime.combine(spec.start, datetime.min.time())
+
+    for aircraft in spec.aircraft_range(partition):
+        base = BASES[aircraft % len(BASES)]
+        aircraft_type = AIRCRAFT_TYPES[aircraft % len(AIRCRAFT_TYPES)]
+        registration = f"VT-{base}{aircraft // len(BASES)}"
+        crew_base_id = aircraft * spec.crew_per_aircraft + 1
+        flight_base_id = aircraft * spec.flights_per_aircraft + 1
+
+        for k in range(spec.crew_per_aircraft):
+            crew_id = crew_base_id + k
+            rank, _ = TEAM[k % len(TEAM)]
+            hired = spec.start - timedelta(days=rng.randint(200, 8000))
+            rows["crew"].append((
+                crew_id, f"EMP{crew_id:07d}", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rank, base,
+                hired, crew_id, "available", base, start, start + timedelta(days=spec.days), [aircraft_type],
+            ))
+
+        for day in range(spec.days):
+            team = (aircraft + day) % TEAMS_PER_AIRCRAFT
+            first_departure = start + timedelta(days=day, hours=5, minutes=5 * rng.randint(0, 24))
+            legs: List[Tuple[int, datetime, datetime]] = []
+            departure = first_departure
+            for leg, (origin, destination) in enumerate(_rotation(rng, base, spec.legs_per_day)):
+                flight_id = flight_base_id + day * spec.legs_per_day + leg
+                arrival = departure + block_time(origin, destination)
+                rows["flights"].append((
+                    flight_id, f"6E{flight_id}", "6E", origin, destination, departure, arrival, aircraft_type,
+                    "scheduled", registration,
+                ))
+                legs.append((flight_id, departure, arrival))
+                departure = arrival + MIN_TURN + timedelta(minutes=5 * rng.randint(0, 6))
+
+            report = legs[0][1] - REPORT_BEFORE
+            release = legs[-1][2] + RELEASE_AFTER
+            # Leg rows split the duty at departures; report_time/release_time are the whole duty's
+            bounds = [report] + [departure for _, departure, _ in legs[1:]] + [release]
+            for leg, (flight_id, _, _) in enumerate(legs):
+                for k, (_, position) in enumerate(TEAM):
+                    slot = (flight_id - 1) * len(TEAM) + k
+                    rows["rosters"].append((
+                        slot + 1, crew_base_id + team * len(TEAM) + k, flight_id, "regular", "confirmed",
+                        position, bounds[leg], bounds[leg + 1], report, release,
+                    ))
+
+        audit_base_id = aircraft * spec.audit_per_aircraft + 1
+        span_minutes = spec.days * 24 * 60
+        for k in range(spec.audit_per_aircraft):
+            action, kind = rng.choice(AUDIT_ACTIONS)
+            rows["audit_log"].append((
+                audit_base_id + k, start + timedelta(minutes=rng.randrange(span_minutes)), rng.choice(AUDIT_USERS),
+                action, f"{action} for aircraft {aircraft + 1} at {base}.", kind,
+            ))
+
+    rows["audit_log"].sort(key=lambda r: r[1])
+    return rows
+
+
+def copy_rows(conn: psycopg.Connection, table: str, columns: Sequence[str], rows: Sequence[tuple]) -> None:
+    with conn.cursor() as cur:
+        with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def load_partition(dsn: str, spec: ScaleSpec, partition: int) -> Dict[str, int]:
+    rows = generate_partition(spec, partition)
+    with psycopg.connect(dsn) as conn:
+        for table in LOAD_ORDER:
+            copy_rows(conn, table, COLUMNS[table], rows[table])
+        conn.commit()
+    return {table: len(rows[table]) for table in LOAD_ORDER}
+
+
+class SyntheticDataGenerator:
+    def __init__(self, dsn: str, spec: ScaleSpec, workers: int = 0):
+        self.dsn = dsn
+        self.spec = spec
+        self.workers = workers or min(os.cpu_count() or 1, spec.partitions)
+
+    def truncate(self) -> None:
+        with psycopg.connect(self.dsn) as conn:
+            conn.execute(f"TRUNCATE {', '.join(reversed(LOAD_ORDER))} RESTART IDENTITY CASCADE")
+
+    def prepare_partitions(self) -> None:
+        # rosters and audit_log are partitioned by month; every month we write into must exist
+        end = self.spec.start + timedelta(days=self.spec.days + 1)
+        with psycopg.connect(self.dsn) as conn:
+            for table in ("rosters", "audit_log"):
+                conn.execute("SELECT ensure_monthly_partitions(%s, %s, %s)", (table, self.spec.start, end))
+
+    def reset_sequences(self) -> None:
+        # Ids were assigned here, so serial sequences must continue after them
+        with psycopg.connect(self.dsn) as conn:
+            for table in LOAD_ORDER:
+                conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+                )
+
+    def analyze(self) -> None:
+        # Fresh statistics, so the planner sees the real table sizes immediately
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            for table in LOAD_ORDER:
+                conn.execute(f"ANALYZE {table}")
+
+    @staticmethod
+    def _accumulate(totals: Dict[str, int], results) -> None:
+        for counts in results:
+            for table, n in counts.items():
+                totals[table] += n
+
+    def run(self, truncate: bool = True) -> Dict[str, int]:
+        started = time.perf_counter()
+        if truncate:
+            self.truncate()
+        self.prepare_partitions()
+        totals = {table: 0 for table in LOAD_ORDER}
+        logger.info(
+            f"Generating scale={self.spec.scale} seed={self.spec.seed} partitions={self.spec.partitions} "
+            f"workers={self.workers} expected={self.spec.totals()}"
+        )
+        partitions = range(self.spec.partitions)
+        if self.workers <= 1:
+            self._accumulate(totals, [load_partition(self.dsn, self.spec, p) for p in partitions])
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                n = len(partitions)
+                self._accumulate(totals, pool.map(load_partition, [self.dsn] * n, [self.spec] * n, partitions))
+        self.reset_sequences()
+        self.analyze()
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        logger.info(f"Loaded {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s): {totals}")
+        return totals
+
+
+def main(argv=None):
+    from scripts.database_migration import DatabaseMigration, setup_logging
+
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Seeded synthetic crew/flight/roster data loaded with COPY")
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 ~ 40 aircraft, 720 crew, 86k roster rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    migration = DatabaseMigration()
+    migration.generate_synthetic(args.scale, seed=args.seed, workers=args.workers, start=args.start_date, days=args.days)
+    migration.print_row_counts()
+
+
+if __name__ == "__main__":
+    main()